@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import copy
+import os
+import tempfile
+import threading
+import unittest
+from typing import Any, Dict, Iterable, List, Optional
+from unittest.mock import patch
+
+import torch
+from torch import nn
+from torchtnt.framework.callbacks.async_evaluator import AsyncEvaluator
+from torchtnt.framework.callbacks.base_checkpointer import BaseCheckpointer
+from torchtnt.framework.state import State
+from torchtnt.framework.train import train
+from torchtnt.framework.unit import AppStateMixin, EvalUnit, TrainUnit
+from torchtnt.utils.checkpoint import BestCheckpointConfig
+from torchtnt.utils.swa import AveragedModel
+
+
+class IncrementUnit(TrainUnit[int]):
+    """Increments the weight of its module by one at every step."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.module = nn.Linear(1, 1, bias=False)
+        nn.init.zeros_(self.module.weight)
+
+    def train_step(self, state: State, data: int) -> None:
+        with torch.no_grad():
+            self.module.weight.add_(1)
+
+
+class EMAIncrementUnit(IncrementUnit):
+    """Also updates an EMA of its module, offloaded to CPU, at every step."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.swa_model = AveragedModel(
+            self.module, averaging_method="ema", ema_decay=0.5, offload_to_cpu=True
+        )
+
+    def train_step(self, state: State, data: int) -> None:
+        super().train_step(state, data)
+        self.swa_model.update_parameters(self.module)
+
+
+class WeightEvalUnit(EvalUnit[int]):
+    def __init__(self, module: nn.Module) -> None:
+        super().__init__()
+        self.module = module
+        self.weights: List[float] = []
+        self.thread_names: List[str] = []
+
+    def eval_step(self, state: State, data: int) -> None:
+        self.weights.append(float(self.module.weight))
+        self.thread_names.append(threading.current_thread().name)
+
+
+def _get_metrics(unit: WeightEvalUnit) -> Dict[str, float]:
+    weight = unit.weights[-1]
+    return {"weight": weight, "val_loss": (weight - 4) ** 2 + 1}
+
+
+class DirCheckpointer(BaseCheckpointer):
+    def _checkpoint_impl(
+        self, state: State, unit: AppStateMixin, *, checkpoint_id: str, hook: str
+    ) -> bool:
+        os.makedirs(checkpoint_id, exist_ok=True)
+        return True
+
+    @staticmethod
+    def restore(
+        path: str,
+        unit: AppStateMixin,
+        *,
+        train_dataloader: Optional[Iterable[Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        pass
+
+
+class AsyncEvaluatorTest(unittest.TestCase):
+    def test_async_evaluator(self) -> None:
+        unit = IncrementUnit()
+        eval_unit = WeightEvalUnit(copy.deepcopy(unit.module))
+        async_evaluator = AsyncEvaluator(
+            eval_unit,
+            [0, 1],
+            evaluate_every_n_steps=2,
+            metrics_fn=_get_metrics,
+        )
+        train(unit, list(range(7)), max_epochs=1, callbacks=[async_evaluator])
+
+        # metrics of the weights of the train step at which they were copied
+        self.assertEqual([r.train_step for r in async_evaluator.results], [2, 4, 6])
+        self.assertEqual(
+            [r.metrics["weight"] for r in async_evaluator.results], [2.0, 4.0, 6.0]
+        )
+        self.assertEqual(eval_unit.weights, [2.0, 2.0, 4.0, 4.0, 6.0, 6.0])
+        self.assertTrue(
+            all(name.startswith("async_eval") for name in eval_unit.thread_names)
+        )
+        self.assertEqual(eval_unit.eval_progress.num_epochs_completed, 3)
+        # the train module is not modified by evaluations
+        self.assertEqual(float(unit.module.weight), 7.0)
+
+    def test_averaged_model_source(self) -> None:
+        unit = IncrementUnit()
+        # pyre-ignore[16]: the source module defaults to the swa_model of the unit
+        unit.swa_model = AveragedModel(unit.module, averaging_method="swa")
+        eval_unit = WeightEvalUnit(copy.deepcopy(unit.module))
+        async_evaluator = AsyncEvaluator(
+            eval_unit,
+            [0],
+            evaluate_every_n_steps=2,
+            metrics_fn=_get_metrics,
+        )
+        with patch.object(
+            unit.swa_model, "wait_for_update", wraps=unit.swa_model.wait_for_update
+        ) as wait_for_update_mock:
+            train(unit, list(range(4)), max_epochs=1, callbacks=[async_evaluator])
+        # the copies wait for the updates of the averaged model
+        self.assertEqual(wait_for_update_mock.call_count, 2)
+        # the averaged model isn't updated by the unit
+        self.assertEqual(eval_unit.weights, [0.0, 0.0])
+
+    def test_offloaded_averaged_model_source(self) -> None:
+        unit = EMAIncrementUnit()
+        eval_unit = WeightEvalUnit(copy.deepcopy(unit.module))
+        async_evaluator = AsyncEvaluator(
+            eval_unit,
+            [0],
+            evaluate_every_n_steps=2,
+            metrics_fn=_get_metrics,
+        )
+        train(unit, list(range(4)), max_epochs=1, callbacks=[async_evaluator])
+        # EMA with a decay of 0.5 of the weights 1, 2, 3 and 4
+        self.assertEqual(eval_unit.weights, [1.5, 3.125])
+
+    def test_best_checkpoint(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpointer = DirCheckpointer(
+                temp_dir,
+                save_every_n_train_steps=2,
+                keep_last_n_checkpoints=1,
+                best_checkpoint_config=BestCheckpointConfig(
+                    monitored_metric="val_loss", mode="min"
+                ),
+            )
+            unit = IncrementUnit()
+            async_evaluator = AsyncEvaluator(
+                WeightEvalUnit(copy.deepcopy(unit.module)),
+                [0],
+                evaluate_every_n_steps=2,
+                metrics_fn=_get_metrics,
+                checkpointer=checkpointer,
+            )
+            train(
+                unit,
+                list(range(6)),
+                max_epochs=1,
+                callbacks=[async_evaluator, checkpointer],
+            )
+
+            self.assertEqual(
+                [str(x) for x in checkpointer._checkpoint_manager._ckpt_paths],
+                [os.path.join(temp_dir, "epoch_0_train_step_4_val_loss=1.0")],
+            )
+            self.assertNotIn("epoch_0_train_step_2", os.listdir(temp_dir))
+            self.assertNotIn("epoch_0_train_step_6", os.listdir(temp_dir))
+
+    def test_eval_error(self) -> None:
+        unit = IncrementUnit()
+        async_evaluator = AsyncEvaluator(
+            WeightEvalUnit(copy.deepcopy(unit.module)),
+            [0],
+            evaluate_every_n_steps=1,
+            metrics_fn=lambda eval_unit: {"loss": torch.ones(2)},
+        )
+        with self.assertRaisesRegex(RuntimeError, "Asynchronous evaluation failed"):
+            train(unit, [0, 1], max_epochs=1, callbacks=[async_evaluator])
+
+    def test_invalid_modules(self) -> None:
+        unit = IncrementUnit()
+        for eval_module in (unit.module, nn.Linear(2, 1)):
+            async_evaluator = AsyncEvaluator(
+                WeightEvalUnit(eval_module),
+                [0],
+                evaluate_every_n_steps=1,
+                metrics_fn=_get_metrics,
+            )
+            with self.assertRaisesRegex(ValueError, "eval module"):
+                train(unit, [0], max_epochs=1, callbacks=[async_evaluator])
+
+        with self.assertRaisesRegex(ValueError, "evaluate_every_n_steps"):
+            AsyncEvaluator(
+                WeightEvalUnit(unit.module),
+                [0],
+                evaluate_every_n_steps=0,
+                metrics_fn=_get_metrics,
+            )
@@ -118,6 +118,23 @@ class BaseCheckpointSaver(BaseCheckpointer):
         return
 
 
+class AsyncBaseCheckpointSaver(BaseCheckpointSaver):
+    """
+    A checkpointer class which writes the directory of a checkpoint once it's waited for, like an async checkpointer
+    """
+
+    def _checkpoint_impl(
+        self, state: State, unit: AppStateMixin, checkpoint_id: str, hook: str
+    ) -> bool:
+        self._wait_for_pending_checkpoint()
+        self._latest_checkpoint_path = checkpoint_id
+        return True
+
+    def _wait_for_pending_checkpoint(self) -> None:
+        if self._latest_checkpoint_path:
+            os.makedirs(self._latest_checkpoint_path, exist_ok=True)
+
+
 class BaseCheckpointerTest(unittest.TestCase):
     cuda_available: bool = torch.cuda.is_available()
     distributed_available: bool = torch.distributed.is_available()
@@ -1070,6 +1087,148 @@ class BaseCheckpointerTest(unittest.TestCase):
                 ],
             )
 
+    def test_best_checkpoint_delayed_metric(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bcs = BaseCheckpointSaver(
+                temp_dir,
+                save_every_n_train_steps=1,
+                best_checkpoint_config=BestCheckpointConfig(
+                    monitored_metric="val_loss",
+                    mode="min",
+                ),
+                keep_last_n_checkpoints=1,
+            )
+            bcs.expect_delayed_metrics()
+            state = get_dummy_train_state()
+            my_train_unit = MyTrainLossUnit()
+
+            # checkpoint is saved without metric, and renamed once the metric is reported
+            my_train_unit.train_progress.increment_step()
+            bcs.on_train_step_end(state, my_train_unit)
+            self.assertEqual(os.listdir(temp_dir), ["epoch_0_train_step_1"])
+            self.assertEqual(bcs._checkpoint_manager._ckpt_paths, [])
+            bcs.record_delayed_metric(1, 0.5)
+            self.assertEqual(
+                [str(x) for x in bcs._checkpoint_manager._ckpt_paths],
+                [os.path.join(temp_dir, "epoch_0_train_step_1_val_loss=0.5")],
+            )
+            self.assertEqual(
+                os.listdir(temp_dir), ["epoch_0_train_step_1_val_loss=0.5"]
+            )
+
+            # less optimal checkpoint is deleted once its metric is reported
+            my_train_unit.train_progress.increment_step()
+            bcs.on_train_step_end(state, my_train_unit)
+            bcs.record_delayed_metric(2, 0.9)
+            self.assertEqual(
+                os.listdir(temp_dir), ["epoch_0_train_step_1_val_loss=0.5"]
+            )
+
+            # metric reported before the checkpoint of its step is saved
+            bcs.record_delayed_metric(3, 0.1)
+            my_train_unit.train_progress.increment_step()
+            bcs.on_train_step_end(state, my_train_unit)
+            self.assertEqual(
+                [str(x) for x in bcs._checkpoint_manager._ckpt_paths],
+                [os.path.join(temp_dir, "epoch_0_train_step_3_val_loss=0.1")],
+            )
+            self.assertEqual(
+                os.listdir(temp_dir), ["epoch_0_train_step_3_val_loss=0.1"]
+            )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bcs = BaseCheckpointSaver(temp_dir)
+            with self.assertRaisesRegex(ValueError, "best_checkpoint_config"):
+                bcs.expect_delayed_metrics()
+            with self.assertRaisesRegex(RuntimeError, "expect_delayed_metrics"):
+                bcs.record_delayed_metric(1, 0.5)
+
+    def test_best_checkpoint_delayed_metric_mismatched_cadence(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+
+            def create_checkpointer() -> BaseCheckpointSaver:
+                bcs = BaseCheckpointSaver(
+                    temp_dir,
+                    save_every_n_train_steps=1,
+                    best_checkpoint_config=BestCheckpointConfig(
+                        monitored_metric="val_loss",
+                        mode="min",
+                    ),
+                    keep_last_n_checkpoints=1,
+                )
+                bcs.expect_delayed_metrics()
+                return bcs
+
+            bcs = create_checkpointer()
+            state = get_dummy_train_state()
+            my_train_unit = MyTrainLossUnit()
+
+            def save_next_step() -> None:
+                my_train_unit.train_progress.increment_step()
+                bcs.on_train_step_end(state, my_train_unit)
+
+            # only checkpoints of even steps receive a metric
+            save_next_step()
+            save_next_step()
+            bcs.record_delayed_metric(2, 0.5)
+            self.assertEqual(
+                os.listdir(temp_dir), ["epoch_0_train_step_2_val_loss=0.5"]
+            )
+
+            save_next_step()
+            save_next_step()
+            bcs.record_delayed_metric(4, 0.4)
+            self.assertEqual(
+                os.listdir(temp_dir), ["epoch_0_train_step_4_val_loss=0.4"]
+            )
+
+            # the latest checkpoint is kept until a later one is saved
+            save_next_step()
+            bcs.record_delayed_metric(6, 0.3)
+            self.assertEqual(
+                sorted(os.listdir(temp_dir)),
+                ["epoch_0_train_step_4_val_loss=0.4", "epoch_0_train_step_5"],
+            )
+            save_next_step()
+            save_next_step()
+            bcs.record_delayed_metric(8, 0.2)
+            self.assertEqual(
+                sorted(os.listdir(temp_dir)),
+                ["epoch_0_train_step_6_val_loss=0.3", "epoch_0_train_step_7"],
+            )
+
+            # checkpoints without metric are deleted after a restart
+            bcs = create_checkpointer()
+            save_next_step()
+            bcs.record_delayed_metric(8, 0.2)
+            self.assertEqual(
+                os.listdir(temp_dir), ["epoch_0_train_step_8_val_loss=0.2"]
+            )
+
+    def test_best_checkpoint_delayed_metric_waits_for_async_save(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bcs = AsyncBaseCheckpointSaver(
+                temp_dir,
+                save_every_n_train_steps=1,
+                best_checkpoint_config=BestCheckpointConfig(
+                    monitored_metric="val_loss",
+                    mode="min",
+                ),
+                keep_last_n_checkpoints=1,
+            )
+            bcs.expect_delayed_metrics()
+            state = get_dummy_train_state()
+            my_train_unit = MyTrainLossUnit()
+
+            my_train_unit.train_progress.increment_step()
+            bcs.on_train_step_end(state, my_train_unit)
+            self.assertEqual(os.listdir(temp_dir), [])
+            # the checkpoint is renamed once it's written
+            bcs.record_delayed_metric(1, 0.5)
+            self.assertEqual(
+                os.listdir(temp_dir), ["epoch_0_train_step_1_val_loss=0.5"]
+            )
+
     def test_no_assert_error_in_on_train_end(self) -> None:
         """
         Tests no assertion is thrown when using BestCheckpointConfig in on_train_end
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import json
+import os
+import tempfile
+import unittest
+from typing import Dict, List
+
+import numpy as np
+import torch
+from torchtnt.framework.callback import Callback
+from torchtnt.framework.callbacks.columnar_prediction_writer import (
+    ColumnarPredictionWriter,
+    read_columnar_predictions,
+)
+from torchtnt.framework.predict import predict
+from torchtnt.framework.state import State
+from torchtnt.framework.unit import PredictUnit, TPredictUnit
+from torchtnt.utils.distributed import spawn_multi_process
+from torchtnt.utils.test_utils import skip_if_not_distributed
+
+_BATCH_SIZE = 3
+
+
+class StepPredictUnit(PredictUnit[torch.Tensor]):
+    """Returns the index of the step and the inputs of every row."""
+
+    def __init__(self, dtype: torch.dtype = torch.float32) -> None:
+        super().__init__()
+        self.dtype = dtype
+
+    def predict_step(self, state: State, data: torch.Tensor) -> Dict[str, torch.Tensor]:
+        step = self.predict_progress.num_steps_completed
+        return {
+            "step": torch.full((data.shape[0],), step, dtype=torch.int64),
+            "value": data.to(self.dtype),
+        }
+
+
+class RaiseAtStep(Callback):
+    def __init__(self, step: int) -> None:
+        self.step = step
+
+    def on_predict_step_end(self, state: State, unit: TPredictUnit) -> None:
+        if unit.predict_progress.num_steps_completed == self.step:
+            raise RuntimeError("Interrupted")
+
+
+class ManifestRecorder(Callback):
+    """Records the number of steps written according to the manifest on disk after every step."""
+
+    def __init__(self, manifest_path: str) -> None:
+        self.manifest_path = manifest_path
+        self.num_steps_written: List[int] = []
+
+    def on_predict_step_end(self, state: State, unit: TPredictUnit) -> None:
+        with open(self.manifest_path) as f:
+            self.num_steps_written.append(json.load(f)["num_steps_completed"])
+
+
+def _get_dataloader(num_steps: int, first_step: int = 0) -> List[torch.Tensor]:
+    return [
+        torch.arange(_BATCH_SIZE * 2).reshape(_BATCH_SIZE, 2) + 10 * step
+        for step in range(first_step, num_steps)
+    ]
+
+
+class ColumnarPredictionWriterTest(unittest.TestCase):
+    def test_write_and_read(self) -> None:
+        for async_write in (True, False):
+            with self.subTest(async_write=async_write):
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    writer = ColumnarPredictionWriter(
+                        temp_dir, rows_per_group=7, async_write=async_write
+                    )
+                    predict(StepPredictUnit(), _get_dataloader(5), callbacks=[writer])
+
+                    columns = read_columnar_predictions(temp_dir)
+                    self.assertEqual(columns["step"].dtype, np.int64)
+                    np.testing.assert_array_equal(
+                        columns["step"], np.repeat(np.arange(5), _BATCH_SIZE)
+                    )
+                    np.testing.assert_array_equal(
+                        columns["value"], torch.cat(_get_dataloader(5)).float().numpy()
+                    )
+
+                    with open(os.path.join(temp_dir, "manifest.json")) as f:
+                        manifest = json.load(f)
+                    self.assertEqual(manifest["num_rows"], 15)
+                    self.assertEqual(
+                        manifest["columns"],
+                        {
+                            "step": {"dtype": "int64", "shape": []},
+                            "value": {"dtype": "float32", "shape": [2]},
+                        },
+                    )
+                    with open(writer.manifest_path) as f:
+                        rank_manifest = json.load(f)
+                    self.assertTrue(rank_manifest["completed"])
+                    self.assertEqual(rank_manifest["num_steps_completed"], 5)
+                    # steps 0-2, then 3-4
+                    self.assertEqual(
+                        [g["num_rows"] for g in rank_manifest["row_groups"]], [9, 6]
+                    )
+
+    def test_bfloat16(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = ColumnarPredictionWriter(temp_dir)
+            predict(
+                StepPredictUnit(torch.bfloat16), _get_dataloader(2), callbacks=[writer]
+            )
+            columns = read_columnar_predictions(temp_dir, columns=["value"])
+            self.assertEqual(list(columns), ["value"])
+            self.assertEqual(columns["value"].dtype, np.float32)
+            self.assertEqual(columns["value"].shape, (6, 2))
+
+    def test_resume(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = ColumnarPredictionWriter(temp_dir, rows_per_group=6)
+            unit = StepPredictUnit()
+            with self.assertRaisesRegex(RuntimeError, "Interrupted"):
+                predict(unit, _get_dataloader(8), callbacks=[writer, RaiseAtStep(5)])
+            with open(writer.manifest_path) as f:
+                self.assertEqual(json.load(f)["num_steps_completed"], 5)
+
+            # resume from a checkpoint taken after 3 steps
+            unit = StepPredictUnit()
+            unit.predict_progress.load_state_dict(
+                {
+                    "num_epochs_completed": 0,
+                    "num_steps_completed": 3,
+                    "num_steps_completed_in_epoch": 3,
+                }
+            )
+            writer = ColumnarPredictionWriter(temp_dir, rows_per_group=6)
+            predict(unit, _get_dataloader(8, first_step=3), callbacks=[writer])
+
+            columns = read_columnar_predictions(temp_dir)
+            np.testing.assert_array_equal(
+                columns["step"], np.repeat(np.arange(8), _BATCH_SIZE)
+            )
+            np.testing.assert_array_equal(
+                columns["value"], torch.cat(_get_dataloader(8)).float().numpy()
+            )
+
+    def test_resume_drops_several_row_groups(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # 2 steps per row group
+            writer = ColumnarPredictionWriter(temp_dir, rows_per_group=6)
+            with self.assertRaisesRegex(RuntimeError, "Interrupted"):
+                predict(
+                    StepPredictUnit(),
+                    _get_dataloader(8),
+                    callbacks=[writer, RaiseAtStep(6)],
+                )
+            with open(writer.manifest_path) as f:
+                self.assertEqual(len(json.load(f)["row_groups"]), 3)
+
+            # resume from a checkpoint taken after 1 step, in the first row group
+            unit = StepPredictUnit()
+            unit.predict_progress.load_state_dict(
+                {
+                    "num_epochs_completed": 0,
+                    "num_steps_completed": 1,
+                    "num_steps_completed_in_epoch": 1,
+                }
+            )
+            writer = ColumnarPredictionWriter(temp_dir, rows_per_group=6)
+            predict(unit, _get_dataloader(8, first_step=1), callbacks=[writer])
+
+            columns = read_columnar_predictions(temp_dir)
+            np.testing.assert_array_equal(
+                columns["step"], np.repeat(np.arange(8), _BATCH_SIZE)
+            )
+            np.testing.assert_array_equal(
+                columns["value"], torch.cat(_get_dataloader(8)).float().numpy()
+            )
+
+    def test_flush_every_n_steps(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = ColumnarPredictionWriter(temp_dir, flush_every_n_steps=2)
+            recorder = ManifestRecorder(writer.manifest_path)
+            predict(StepPredictUnit(), _get_dataloader(5), callbacks=[writer, recorder])
+            # the rows of every second step are written before the next callbacks run
+            self.assertEqual(recorder.num_steps_written, [0, 2, 2, 4, 4])
+            np.testing.assert_array_equal(
+                read_columnar_predictions(temp_dir)["step"],
+                np.repeat(np.arange(5), _BATCH_SIZE),
+            )
+
+            with self.assertRaisesRegex(ValueError, "flush_every_n_steps"):
+                ColumnarPredictionWriter(temp_dir, flush_every_n_steps=0)
+
+    def test_resume_after_lost_rows(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = ColumnarPredictionWriter(temp_dir)
+            predict(StepPredictUnit(), _get_dataloader(2), callbacks=[writer])
+
+            # the checkpoint is ahead of the written rows
+            unit = StepPredictUnit()
+            unit.predict_progress.load_state_dict(
+                {
+                    "num_epochs_completed": 0,
+                    "num_steps_completed": 4,
+                    "num_steps_completed_in_epoch": 4,
+                }
+            )
+            writer = ColumnarPredictionWriter(temp_dir)
+            with self.assertRaisesRegex(RuntimeError, "steps 2 to 3 were not written"):
+                predict(unit, _get_dataloader(8, first_step=4), callbacks=[writer])
+
+    def test_invalid_columns(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = ColumnarPredictionWriter(temp_dir)
+            with self.assertRaisesRegex(ValueError, "don't match the columns"):
+                predict(
+                    PredictUnitWithChangingOutput(),
+                    _get_dataloader(2),
+                    callbacks=[writer],
+                )
+
+        with self.assertRaisesRegex(ValueError, "rows_per_group must be"):
+            ColumnarPredictionWriter("", rows_per_group=0)
+
+    @skip_if_not_distributed
+    def test_distributed(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spawn_multi_process(2, "gloo", self._test_distributed, temp_dir)
+
+            columns = read_columnar_predictions(temp_dir)
+            np.testing.assert_array_equal(
+                columns["step"], np.tile(np.repeat(np.arange(4), _BATCH_SIZE), 2)
+            )
+
+    @staticmethod
+    def _test_distributed(temp_dir: str) -> None:
+        writer = ColumnarPredictionWriter(temp_dir, rows_per_group=4)
+        predict(StepPredictUnit(), _get_dataloader(4), callbacks=[writer])
+
+
+class PredictUnitWithChangingOutput(PredictUnit[torch.Tensor]):
+    def predict_step(self, state: State, data: torch.Tensor) -> torch.Tensor:
+        if self.predict_progress.num_steps_completed == 0:
+            return data
+        return data.float()
@@ -7,15 +7,21 @@
 
 # pyre-strict
 
+import gzip
+import json
+import os
 import tempfile
 import unittest
 from typing import Any, List, Union
 
+import torch.distributed as dist
 from torchtnt.framework._test_utils import DummyPredictUnit, generate_random_dataloader
 from torchtnt.framework.callbacks.base_csv_writer import BaseCSVWriter
 from torchtnt.framework.predict import predict
 from torchtnt.framework.state import State
 from torchtnt.framework.unit import PredictUnit, TPredictData
+from torchtnt.utils.distributed import spawn_multi_process
+from torchtnt.utils.test_utils import skip_if_not_distributed
 
 _HEADER_ROW = ["output"]
 _FILENAME = "test_csv_writer.csv"
@@ -41,6 +47,33 @@ class CustomCSVWriterSingleRow(BaseCSVWriter):
         return ["1"]
 
 
+class StepCSVWriter(BaseCSVWriter):
+    def get_step_output_rows(
+        self,
+        state: State,
+        unit: PredictUnit[TPredictData],
+        step_output: Any,
+    ) -> Union[List[str], List[List[str]]]:
+        step = unit.predict_progress.num_steps_completed
+        return [[f"{step}", "a"], [f"{step}", "b"]]
+
+
+class _Unwritable:
+    def __str__(self) -> str:
+        raise ValueError("Can't be written")
+
+
+class FailingCSVWriter(BaseCSVWriter):
+    def get_step_output_rows(
+        self,
+        state: State,
+        unit: PredictUnit[TPredictData],
+        step_output: Any,
+    ) -> Union[List[str], List[List[str]]]:
+        # pyre-ignore[7]: a value which can't be written to make the background writer fail
+        return [[_Unwritable()]]
+
+
 class BaseCSVWriterTest(unittest.TestCase):
     def test_csv_writer(self) -> None:
         """
@@ -105,3 +138,89 @@ class BaseCSVWriterTest(unittest.TestCase):
                 header_row=_HEADER_ROW, dir_path="", filename=_FILENAME
             )
             predict(my_unit, dataloader, callbacks=[csv_callback])
+
+    def test_csv_writer_sharded_async(self) -> None:
+        """
+        Test BaseCSVWriter writing a compressed part file from a background thread, then merging it
+        """
+        my_unit = DummyPredictUnit(2)
+        dataloader = generate_random_dataloader(10, 2, 2)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_callback = StepCSVWriter(
+                header_row=["step", "value"],
+                dir_path=temp_dir,
+                filename="predictions.csv.gz",
+                delimiter=",",
+                shard_by_rank=True,
+                merge_shards=True,
+                async_write=True,
+                max_queue_size=1,
+                compression="gzip",
+            )
+            predict(my_unit, dataloader, callbacks=[csv_callback])
+
+            expected_lines = ["step,value"] + [
+                f"{step},{value}" for step in range(1, 6) for value in ("a", "b")
+            ]
+            part_path = os.path.join(temp_dir, "predictions-rank0.csv.gz")
+            self.assertEqual(csv_callback.part_path, part_path)
+            with gzip.open(part_path, "rt") as f:
+                self.assertEqual(f.read().splitlines(), expected_lines)
+            with gzip.open(csv_callback.output_path, "rt") as f:
+                self.assertEqual(f.read().splitlines(), expected_lines)
+
+            with open(csv_callback.manifest_path) as f:
+                manifest = json.load(f)
+            self.assertEqual(manifest["num_rows"], 10)
+            self.assertEqual(manifest["parts"], [{"path": part_path, "num_rows": 10}])
+            self.assertEqual(manifest["merged_path"], csv_callback.output_path)
+
+    def test_csv_writer_async_error(self) -> None:
+        """
+        Test that errors of the background thread are raised in the predict loop
+        """
+        my_unit = DummyPredictUnit(2)
+        dataloader = generate_random_dataloader(10, 2, 2)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_callback = FailingCSVWriter(
+                header_row=_HEADER_ROW, dir_path=temp_dir, async_write=True
+            )
+            with self.assertRaisesRegex(RuntimeError, "Background writer failed"):
+                predict(my_unit, dataloader, callbacks=[csv_callback])
+
+        with self.assertRaisesRegex(ValueError, "requires shard_by_rank"):
+            StepCSVWriter(header_row=_HEADER_ROW, dir_path="", merge_shards=True)
+
+    @skip_if_not_distributed
+    def test_csv_writer_sharded_distributed(self) -> None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            spawn_multi_process(2, "gloo", self._test_csv_writer_sharded, temp_dir)
+
+            with open(os.path.join(temp_dir, "predictions.csv")) as f:
+                lines = f.read().splitlines()
+            self.assertEqual(lines[0], "step\tvalue")
+            # rows of both ranks, in rank order
+            self.assertEqual(len(lines), 1 + 2 * 10)
+            with open(os.path.join(temp_dir, "predictions.csv.manifest.json")) as f:
+                manifest = json.load(f)
+            self.assertEqual(
+                [os.path.basename(part["path"]) for part in manifest["parts"]],
+                ["predictions-rank0.csv", "predictions-rank1.csv"],
+            )
+
+    @staticmethod
+    def _test_csv_writer_sharded(temp_dir: str) -> None:
+        csv_callback = StepCSVWriter(
+            header_row=["step", "value"],
+            dir_path=temp_dir,
+            shard_by_rank=True,
+            merge_shards=True,
+            async_write=dist.get_rank() == 0,
+        )
+        predict(
+            DummyPredictUnit(2),
+            generate_random_dataloader(10, 2, 2),
+            callbacks=[csv_callback],
+        )
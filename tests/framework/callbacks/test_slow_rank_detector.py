@@ -11,8 +11,10 @@ import unittest
 from unittest import mock
 from unittest.mock import MagicMock
 
+import torch
 from torchtnt.framework.callbacks.slow_rank_detector import (
     _get_min_max_indices,
+    _make_report,
     SlowRankDetector,
 )
 from torchtnt.framework.state import State
@@ -21,6 +23,7 @@ from torchtnt.utils.distributed import get_global_rank, spawn_multi_process
 from torchtnt.utils.loggers.logger import MetricLogger
 from torchtnt.utils.progress import Progress
 from torchtnt.utils.test_utils import skip_if_not_distributed, skip_if_not_gpu
+from torchtnt.utils.timer import Timer
 
 
 class SlowRankDetectorTest(unittest.TestCase):
@@ -123,3 +126,62 @@ class SlowRankDetectorTest(unittest.TestCase):
             sync_times_mock.reset_mock()
             slow_rank_detector.on_train_epoch_end(state, unit)
             sync_times_mock.assert_not_called()
+
+    def test_phase_times(self) -> None:
+        logger = MagicMock(spec=MetricLogger)
+        slow_rank_detector = SlowRankDetector(
+            check_every_n_steps=2,
+            check_every_n_epochs=None,
+            logger=logger,
+            device=torch.device("cpu"),
+        )
+        unit = MagicMock(spec=TrainUnit)
+        unit.train_progress = Progress()
+        iteration_timer = Timer()
+        timer = Timer()
+        state = MagicMock(spec=State)
+        state.train_state.iteration_timer = iteration_timer
+        state.timer = timer
+        prefix = unit.__class__.__name__
+
+        for step in range(3):
+            iteration_timer.recorded_durations["data_wait_time"].append(1.0)
+            with mock.patch("time.perf_counter", return_value=10.0 * step):
+                slow_rank_detector.on_train_step_start(state, unit)
+            timer.recorded_durations[f"{prefix}.compute_loss"].append(2.0)
+            timer.recorded_durations[f"{prefix}.backward"].append(3.0)
+            timer.recorded_durations[f"{prefix}.optimizer_step"].append(1.5)
+            unit.train_progress.increment_step()
+            with mock.patch("time.perf_counter", return_value=10.0 * step + 7.0):
+                slow_rank_detector.on_train_step_end(state, unit)
+            iteration_timer.recorded_durations["train_iteration_time"].append(8.0)
+
+        # only the check at step 2 is done
+        self.assertEqual(len(slow_rank_detector.history), 1)
+        report = slow_rank_detector.history[0]
+        self.assertEqual(report.step, 2)
+        self.assertEqual(report.phase_times["data_wait"], [1.0])
+        self.assertEqual(report.phase_times["train_step"], [7.0])
+        self.assertEqual(report.phase_times["forward_backward"], [5.0])
+        self.assertEqual(report.phase_times["optimizer_step"], [1.5])
+        # callback time of the second step is only known at the start of the third step
+        self.assertEqual(report.phase_times["callbacks"], [0.5])
+        self.assertEqual(report.straggler_rank, 0)
+        logger.log_dict.assert_called_once()
+        self.assertEqual(logger.log_dict.call_args.args[1], 2)
+
+    def test_make_report(self) -> None:
+        # columns: data_wait, train_step, forward_backward, optimizer_step, callbacks
+        phase_times = torch.tensor(
+            [
+                [1.0, 5.0, 4.0, 1.0, 0.1],
+                [1.0, 5.0, 4.0, 1.0, 0.1],
+                [4.0, 5.0, 4.0, 1.0, 0.1],
+            ],
+            dtype=torch.float64,
+        )
+        report = _make_report(epoch=0, step=10, phase_times=phase_times)
+        self.assertEqual(report.straggler_rank, 2)
+        self.assertEqual(report.straggler_phase, "data_wait")
+        self.assertAlmostEqual(report.zscores["data_wait"][2], 2**0.5)
+        self.assertEqual(report.zscores["train_step"], [0.0, 0.0, 0.0])
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import unittest
+from typing import Any, Dict, Iterable, List, Optional
+from unittest.mock import MagicMock
+
+import torch
+import torch.distributed as dist
+from torchtnt.framework.callbacks.tracked_metrics_sync import TrackedMetricsSync
+from torchtnt.framework.evaluate import evaluate
+from torchtnt.framework.state import State
+from torchtnt.framework.unit import EvalUnit
+from torchtnt.utils.distributed import spawn_multi_process
+from torchtnt.utils.loggers.logger import MetricLogger
+from torchtnt.utils.test_utils import skip_if_not_distributed
+
+
+class MaxMetric:
+    def __init__(self) -> None:
+        self.max = torch.tensor(float("-inf"))
+
+    def update(self, x: torch.Tensor) -> None:
+        self.max = torch.maximum(self.max, x.max())
+
+    def compute(self) -> torch.Tensor:
+        return self.max
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"max": self.max}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        self.max = state_dict["max"]
+
+    def merge_state(self, metrics: Iterable["MaxMetric"]) -> "MaxMetric":
+        for metric in metrics:
+            self.max = torch.maximum(self.max, metric.max)
+        return self
+
+
+class MaxEvalUnit(EvalUnit[torch.Tensor]):
+    def __init__(self) -> None:
+        super().__init__()
+        self.max_metric = MaxMetric()
+
+    def eval_step(self, state: State, data: torch.Tensor) -> None:
+        self.max_metric.update(data)
+
+
+class TrackedMetricsSyncTest(unittest.TestCase):
+    def test_tracked_metrics_sync(self) -> None:
+        metric_logger = MagicMock(spec=MetricLogger)
+        metrics_sync = TrackedMetricsSync(metric_logger)
+        evaluate(
+            MaxEvalUnit(),
+            [torch.tensor([1.0, 3.0]), torch.tensor([2.0])],
+            callbacks=[metrics_sync],
+        )
+        self.assertEqual(metrics_sync.computed_metrics, {"max_metric": 3.0})
+        metric_logger.log_dict.assert_called_once_with({"max_metric": 3.0}, 2)
+
+    @skip_if_not_distributed
+    def test_tracked_metrics_sync_distributed(self) -> None:
+        computed_metrics = spawn_multi_process(
+            2, "gloo", self._test_tracked_metrics_sync_distributed
+        )
+        self.assertEqual(computed_metrics, [{"max_metric": 11.0}] * 2)
+
+    @staticmethod
+    def _test_tracked_metrics_sync_distributed() -> Optional[Dict[str, Any]]:
+        rank = dist.get_rank()
+        metrics_sync = TrackedMetricsSync()
+        dataloader: List[torch.Tensor] = [
+            torch.tensor([10.0 * rank + i]) for i in range(2)
+        ]
+        evaluate(MaxEvalUnit(), dataloader, callbacks=[metrics_sync])
+        return metrics_sync.computed_metrics
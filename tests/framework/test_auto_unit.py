@@ -8,13 +8,17 @@
 # pyre-strict
 
 import unittest
-from typing import Any, Literal, Optional, Tuple, TypeVar
+from contextlib import nullcontext
+from copy import deepcopy
+from typing import Any, Callable, ContextManager, Literal, Optional, Tuple, TypeVar
 from unittest.mock import MagicMock, Mock, patch
 
 import torch
 from pyre_extensions import none_throws, ParameterSpecification as ParamSpec
 from torch import nn
 from torch.distributed import GradBucket
+from torch.utils._pytree import tree_flatten
+from torchtnt.framework._cuda_graph import _CUDAGraphRunner
 from torchtnt.framework._test_utils import (
     DummyAutoUnit,
     generate_random_dataloader,
@@ -24,8 +28,11 @@ from torchtnt.framework._test_utils import (
 from torchtnt.framework.auto_unit import (
     AutoPredictUnit,
     AutoUnit,
+    CUDAGraphParams,
+    OOMRecoveryParams,
     SWALRParams,
     SWAParams,
+    TrainStepMetricsParams,
     TrainStepResults,
 )
 from torchtnt.framework.evaluate import evaluate
@@ -37,6 +44,7 @@ from torchtnt.utils.device import copy_data_to_device
 from torchtnt.utils.device_mesh import GlobalMeshCoordinator
 from torchtnt.utils.distributed import spawn_multi_process
 from torchtnt.utils.env import init_from_env
+from torchtnt.utils.loggers import InMemoryLogger
 from torchtnt.utils.lr_scheduler import TLRScheduler
 from torchtnt.utils.prepare_module import DDPStrategy, FSDPStrategy, TorchCompileParams
 from torchtnt.utils.progress import Progress
@@ -241,6 +249,65 @@ class TestAutoUnit(unittest.TestCase):
             # 1 warmup + epoch 2 + epoch 3 = 2
             self.assertEqual(update_swa_mock.call_count, 2)
 
+    @unittest.skipUnless(
+        _AVERAGED_MODEL_AVAIL, "AveragedModel needed in version of Pytorch"
+    )
+    def test_ema_decay_per_step(self) -> None:
+        """
+        Test that the EMA decay is compensated for the update frequency
+        """
+        my_module = torch.nn.Linear(2, 2)
+        auto_unit = DummyAutoUnit(
+            module=my_module,
+            step_lr_interval="step",
+            swa_params=SWAParams(
+                warmup_steps_or_epochs=0,
+                step_or_epoch_update_freq=4,
+                ema_decay=0.9,
+                ema_decay_per_step=True,
+                update_on_side_stream=True,
+                ema_dtype=torch.float64,
+            ),
+        )
+        swa_model = none_throws(auto_unit.swa_model)
+        self.assertEqual(swa_model._ema_steps_per_update, 4)
+        self.assertEqual(swa_model.module.weight.dtype, torch.float64)
+        # no side stream on CPU
+        self.assertIsNone(swa_model._update_stream)
+
+        dataloader = generate_random_dataloader(8, 2, 1)
+        train(auto_unit, dataloader, max_epochs=1)
+        # updates at steps 4 and 8
+        self.assertEqual(int(swa_model.n_averaged), 2)
+
+    @unittest.skipUnless(
+        _AVERAGED_MODEL_AVAIL, "AveragedModel needed in version of Pytorch"
+    )
+    def test_swa_offload_to_cpu(self) -> None:
+        """
+        Test that the averaged model can be offloaded to CPU and checkpointed with the app state
+        """
+        my_module = torch.nn.Linear(2, 2)
+        swa_params = SWAParams(
+            warmup_steps_or_epochs=0,
+            step_or_epoch_update_freq=1,
+            offload_to_cpu=True,
+        )
+        auto_unit = DummyAutoUnit(
+            module=my_module, step_lr_interval="step", swa_params=swa_params
+        )
+        dataloader = generate_random_dataloader(4, 2, 1)
+        train(auto_unit, dataloader, max_epochs=1)
+
+        auto_unit2 = DummyAutoUnit(
+            module=torch.nn.Linear(2, 2), swa_params=SWAParams(0, 1)
+        )
+        swa_model = none_throws(auto_unit.swa_model)
+        swa_model2 = none_throws(auto_unit2.swa_model)
+        swa_model2.load_state_dict(auto_unit.app_state()["swa_model"].state_dict())
+        self.assertEqual(int(swa_model.state_dict()["n_averaged"]), 4)
+        torch.testing.assert_close(swa_model2.state_dict(), swa_model.state_dict())
+
     def test_move_data_to_device(self) -> None:
         """
         Test that move_data_to_device is called
@@ -831,6 +898,163 @@ class TestAutoUnit(unittest.TestCase):
             fsdp_module_mock.assert_not_called()
             auto_unit.train_progress.increment_step()
 
+    def test_gradient_accumulation_window(self) -> None:
+        torch.manual_seed(0)
+        module = torch.nn.Linear(2, 2)
+        batches = [(torch.rand(2, 2), torch.randint(0, 2, (2,))) for _ in range(8)]
+
+        reference_unit = DummyAutoUnit(
+            module=deepcopy(module), gradient_accumulation_steps=3
+        )
+        train(reference_unit, batches, max_epochs=1)
+        self.assertEqual(reference_unit.train_progress.num_steps_completed, 8)
+
+        for window_progress, expected_steps in (
+            ("optimizer_step", 3),
+            ("micro_step", 8),
+        ):
+            window_unit = DummyAutoUnit(
+                module=deepcopy(module),
+                gradient_accumulation_steps=3,
+                gradient_accumulation_window=True,
+                # pyrefly: ignore [bad-argument-type]
+                gradient_accumulation_window_progress=window_progress,
+            )
+            train(window_unit, batches, max_epochs=1)
+            self.assertEqual(
+                window_unit.train_progress.num_steps_completed, expected_steps
+            )
+            for p1, p2 in zip(
+                reference_unit.module.parameters(), window_unit.module.parameters()
+            ):
+                torch.testing.assert_close(p1, p2)
+
+        # windows don't run past max_steps when counting micro steps
+        window_unit = DummyAutoUnit(
+            module=deepcopy(module),
+            gradient_accumulation_steps=3,
+            gradient_accumulation_window=True,
+            gradient_accumulation_window_progress="micro_step",
+        )
+        train(window_unit, batches, max_steps=5)
+        self.assertEqual(window_unit.train_progress.num_steps_completed, 5)
+
+        # every micro-batch of the window is timed like a train step
+        window_unit = DummyAutoUnit(
+            module=deepcopy(module),
+            gradient_accumulation_steps=3,
+            gradient_accumulation_window=True,
+        )
+        timer = Timer()
+        train(window_unit, batches, max_epochs=1, timer=timer)
+        for action in ("compute_loss", "backward"):
+            self.assertEqual(
+                len(timer.recorded_durations[f"DummyAutoUnit.{action}"]), 8
+            )
+
+        with self.assertRaisesRegex(
+            ValueError, "gradient_accumulation_window_progress"
+        ):
+            DummyAutoUnit(
+                module=deepcopy(module),
+                # pyrefly: ignore [bad-argument-type]
+                gradient_accumulation_window_progress="epoch",
+            )
+
+    @patch("torchtnt.framework.auto_unit._is_fsdp2_module", return_value=True)
+    def test_gradient_accumulation_window_fsdp2(self, _) -> None:
+        auto_unit = DummyAutoUnit(
+            module=torch.nn.Linear(1, 1),
+            gradient_accumulation_steps=3,
+            gradient_accumulation_window=True,
+        )
+        fsdp_module_mock = MagicMock()
+        auto_unit.module.set_requires_gradient_sync = fsdp_module_mock
+
+        state = get_dummy_train_state()
+        window = [(torch.rand(1, 1), torch.rand(1, 1)) for _ in range(3)]
+        loss, outputs = auto_unit.train_step(state, window)
+        self.assertEqual(len(outputs), 3)
+        self.assertEqual(loss.dim(), 0)
+        # sync is disabled once for the window and re-enabled for the last micro-batch
+        self.assertEqual(
+            [c.args for c in fsdp_module_mock.call_args_list], [(False,), (True,)]
+        )
+
+    def test_cuda_graph_equivalence(self) -> None:
+        """
+        Check that capturing and replaying the train step matches eager training, using a CPU emulation of CUDA graphs
+        """
+        torch.manual_seed(0)
+        module = torch.nn.Linear(2, 2)
+        batches = [(torch.rand(2, 2), torch.randint(0, 2, (2,))) for _ in range(6)]
+        # the smaller last batch can't be replayed
+        batches.append((torch.rand(1, 2), torch.randint(0, 2, (1,))))
+
+        eager_unit = CUDAGraphAutoUnit(module=deepcopy(module))
+        train(eager_unit, batches, max_epochs=1)
+
+        graph_unit = CUDAGraphAutoUnit(
+            module=deepcopy(module),
+            cuda_graph_params=CUDAGraphParams(warmup_steps=2),
+        )
+        runner = FakeCUDAGraphRunner(graph_unit)
+        graph_unit._cuda_graph_runner = runner
+        train(graph_unit, batches, max_epochs=1)
+
+        self.assertTrue(runner.is_captured)
+        self.assertEqual(runner.num_replays, 4)
+        self.assertEqual(graph_unit.train_progress.num_steps_completed, 7)
+        for p1, p2 in zip(
+            eager_unit.module.parameters(), graph_unit.module.parameters()
+        ):
+            torch.testing.assert_close(p1, p2)
+        torch.testing.assert_close(
+            eager_unit.optimizer.param_groups[0]["lr"],
+            graph_unit.optimizer.param_groups[0]["lr"],
+        )
+
+    def test_cuda_graph_fallbacks(self) -> None:
+        batches = [(torch.rand(2, 2), torch.randint(0, 2, (2,))) for _ in range(4)]
+
+        # no CUDA device
+        auto_unit = CUDAGraphAutoUnit(
+            module=torch.nn.Linear(2, 2), cuda_graph_params=CUDAGraphParams()
+        )
+        with self.assertLogs(level="WARNING") as log:
+            train(auto_unit, batches, max_epochs=1)
+        self.assertIn("CUDA graphs require a CUDA device", "".join(log.output))
+        self.assertIsNone(auto_unit._cuda_graph_runner)
+
+        # float learning rates would be frozen in the graph
+        auto_unit = DummyAutoUnit(
+            module=torch.nn.Linear(2, 2), cuda_graph_params=CUDAGraphParams()
+        )
+        auto_unit._cuda_graph_runner = FakeCUDAGraphRunner(auto_unit)
+        with self.assertLogs(level="WARNING") as log:
+            train(auto_unit, batches, max_epochs=1)
+        self.assertIn("tensor learning rates", "".join(log.output))
+        self.assertIsNone(auto_unit._cuda_graph_runner)
+
+        # capture errors, e.g. from synchronizing ops
+        auto_unit = CUDAGraphAutoUnit(
+            module=torch.nn.Linear(2, 2),
+            cuda_graph_params=CUDAGraphParams(warmup_steps=1),
+        )
+        runner = FakeCUDAGraphRunner(auto_unit, capture_error=RuntimeError("sync"))
+        auto_unit._cuda_graph_runner = runner
+        with self.assertLogs(level="WARNING") as log:
+            train(auto_unit, batches, max_epochs=1)
+        self.assertIn("capturing the train step failed", "".join(log.output))
+        self.assertIsNone(auto_unit._cuda_graph_runner)
+        self.assertEqual(auto_unit.train_progress.num_steps_completed, 4)
+
+        with self.assertRaisesRegex(ValueError, "warmup_steps"):
+            CUDAGraphAutoUnit(
+                module=torch.nn.Linear(2, 2),
+                cuda_graph_params=CUDAGraphParams(warmup_steps=0),
+            )
+
     @patch("torchtnt.framework.auto_unit.prepare_module")
     def test_global_mesh(self, mock_prepare_module: Mock) -> None:
         """
@@ -859,10 +1083,291 @@ class TestAutoUnit(unittest.TestCase):
             global_mesh=mock_global_mesh,
         )
 
+    def test_optimizer_in_backward(self) -> None:
+        torch.manual_seed(0)
+        module = torch.nn.Sequential(
+            torch.nn.Linear(2, 4), torch.nn.ReLU(), torch.nn.Linear(4, 2)
+        )
+        batches = [(torch.rand(2, 2), torch.randint(0, 2, (2,))) for _ in range(7)]
+
+        for kwargs in (
+            {},
+            {"gradient_accumulation_steps": 2},
+            {"gradient_accumulation_steps": 3, "gradient_accumulation_window": True},
+        ):
+            reference_unit = OptimizerInBackwardAutoUnit(
+                module=deepcopy(module), clip_grad_value=0.05, **kwargs
+            )
+            train(reference_unit, batches, max_epochs=2)
+
+            auto_unit = OptimizerInBackwardAutoUnit(
+                module=deepcopy(module),
+                clip_grad_value=0.05,
+                optimizer_in_backward=True,
+                **kwargs,
+            )
+            train(auto_unit, batches, max_epochs=2)
+
+            for p1, p2 in zip(
+                reference_unit.module.parameters(), auto_unit.module.parameters()
+            ):
+                torch.testing.assert_close(p1, p2)
+                # gradients were freed during the backward pass
+                self.assertIsNone(p2.grad)
+            # the optimizer holds the states of all parameters and the scheduled LR
+            torch.testing.assert_close(
+                reference_unit.optimizer.state_dict(), auto_unit.optimizer.state_dict()
+            )
+
+        # gradients are kept for inspection until the start of the next step
+        auto_unit = OptimizerInBackwardAutoUnit(
+            module=deepcopy(module),
+            optimizer_in_backward=True,
+            zero_grad_at_train_step_start=True,
+        )
+        train(auto_unit, batches, max_epochs=1)
+        for param in auto_unit.module.parameters():
+            self.assertIsNotNone(param.grad)
+
+    def test_optimizer_in_backward_unsupported(self) -> None:
+        with self.assertRaisesRegex(ValueError, "does not support clip_grad_norm"):
+            OptimizerInBackwardAutoUnit(
+                module=torch.nn.Linear(2, 2),
+                optimizer_in_backward=True,
+                clip_grad_norm=1.0,
+            )
+        with self.assertRaisesRegex(ValueError, "does not support grad scalers"):
+            OptimizerInBackwardAutoUnit(
+                module=torch.nn.Linear(2, 2),
+                optimizer_in_backward=True,
+                precision="fp16",
+            )
+
+    @skip_if_not_distributed
+    def test_optimizer_in_backward_ddp(self) -> None:
+        spawn_multi_process(2, "gloo", self._test_optimizer_in_backward_ddp)
+
+    @staticmethod
+    def _test_optimizer_in_backward_ddp() -> None:
+        torch.manual_seed(0)
+        module = torch.nn.Sequential(
+            torch.nn.Linear(2, 4), torch.nn.ReLU(), torch.nn.Linear(4, 2)
+        )
+        # different data on each rank so that the gradients must be all-reduced
+        torch.manual_seed(torch.distributed.get_rank())
+        batches = [(torch.rand(2, 2), torch.randint(0, 2, (2,))) for _ in range(5)]
+
+        reference_unit = OptimizerInBackwardAutoUnit(
+            module=deepcopy(module),
+            strategy=DDPStrategy(),
+            gradient_accumulation_steps=2,
+        )
+        train(reference_unit, batches, max_epochs=1)
+        auto_unit = OptimizerInBackwardAutoUnit(
+            module=deepcopy(module),
+            strategy=DDPStrategy(),
+            gradient_accumulation_steps=2,
+            optimizer_in_backward=True,
+        )
+        train(auto_unit, batches, max_epochs=1)
+
+        for p1, p2 in zip(
+            reference_unit.module.parameters(), auto_unit.module.parameters()
+        ):
+            torch.testing.assert_close(p1, p2)
+
+    def test_oom_recovery(self) -> None:
+        torch.manual_seed(0)
+        module = torch.nn.Linear(2, 2)
+        batches = [(torch.rand(8, 2), torch.randint(0, 2, (8,))) for _ in range(4)]
+
+        reference_unit = OOMAutoUnit(module=deepcopy(module), max_batch_size=8)
+        train(reference_unit, batches, max_epochs=1)
+
+        auto_unit = OOMAutoUnit(
+            module=deepcopy(module),
+            max_batch_size=3,
+            oom_recovery_params=OOMRecoveryParams(max_recovered_steps=2),
+        )
+        train(auto_unit, batches, max_epochs=1)
+
+        # the batch is split in 2, then 4 micro-batches, in the first two steps only
+        self.assertEqual(auto_unit.num_oom_recoveries, 4)
+        self.assertEqual(auto_unit.batch_sizes, [8, 4, 2, 2, 2, 2] * 2 + [2] * 8)
+        self.assertEqual(auto_unit.train_progress.num_steps_completed, 4)
+        for p1, p2 in zip(
+            reference_unit.module.parameters(), auto_unit.module.parameters()
+        ):
+            torch.testing.assert_close(p1, p2)
+        # outputs of the micro-batches are concatenated, and the loss is the loss of the batch
+        for reference_results, results in zip(
+            reference_unit.results, auto_unit.results
+        ):
+            self.assertEqual(results.outputs.shape, (8, 2))
+            torch.testing.assert_close(results.loss, reference_results.loss)
+
+        # errors which can't be recovered by splitting are raised
+        auto_unit = OOMAutoUnit(
+            module=deepcopy(module),
+            max_batch_size=1,
+            oom_recovery_params=OOMRecoveryParams(max_num_splits=4),
+        )
+        with self.assertRaisesRegex(RuntimeError, "CUDA out of memory"):
+            train(auto_unit, batches, max_epochs=1)
+        self.assertEqual(auto_unit.num_oom_recoveries, 2)
+
+        # an OOM in the backward pass can't be recovered when accumulating onto gradients of previous steps
+        auto_unit = OOMAutoUnit(
+            module=deepcopy(module),
+            max_batch_size=4,
+            oom_in_backward=True,
+            gradient_accumulation_steps=2,
+            oom_recovery_params=OOMRecoveryParams(),
+        )
+        with self.assertRaisesRegex(RuntimeError, "CUDA out of memory"):
+            train(auto_unit, batches, max_epochs=1)
+        self.assertEqual(auto_unit.num_oom_recoveries, 1)
+        self.assertEqual(auto_unit.train_progress.num_steps_completed, 1)
+
+        with self.assertRaisesRegex(ValueError, "not supported with"):
+            OOMAutoUnit(
+                module=deepcopy(module),
+                max_batch_size=1,
+                gradient_accumulation_window=True,
+                oom_recovery_params=OOMRecoveryParams(),
+            )
+
+    @patch("torchtnt.framework.auto_unit._is_fsdp2_module", return_value=True)
+    def test_oom_recovery_distributed_module(self, _) -> None:
+        # ranks would split their batches independently and issue mismatched collectives
+        with self.assertRaisesRegex(ValueError, "not supported with DDP or FSDP"):
+            OOMAutoUnit(
+                module=torch.nn.Linear(2, 2),
+                max_batch_size=4,
+                oom_recovery_params=OOMRecoveryParams(),
+            )
+
+    def test_train_step_metrics(self) -> None:
+        torch.manual_seed(0)
+        batches = [(torch.rand(2, 2), torch.randint(0, 2, (2,))) for _ in range(7)]
+        logger = InMemoryLogger()
+        auto_unit = ResultsRecordingAutoUnit(
+            module=torch.nn.Linear(2, 2),
+            clip_grad_norm=100.0,
+            gradient_accumulation_steps=2,
+            train_step_metrics_params=TrainStepMetricsParams(
+                log_every_n_steps=3, logger=logger
+            ),
+        )
+        train(auto_unit, batches, max_epochs=1)
+
+        # windows of 3 steps, and the remaining step flushed at the end of the epoch
+        self.assertEqual(list(logger.log_buffer.keys()), [3, 6, 7])
+        losses = [result.loss.item() for result in auto_unit.results]
+        grad_norms = [result.total_grad_norm for result in auto_unit.results]
+        for step, start, end in ((3, 0, 3), (6, 3, 6), (7, 6, 7)):
+            metrics = logger.log_buffer[step]
+            window_losses = losses[start:end]
+            self.assertAlmostEqual(
+                metrics["train/loss/mean"], sum(window_losses) / len(window_losses), 5
+            )
+            self.assertAlmostEqual(metrics["train/loss/min"], min(window_losses), 5)
+            self.assertAlmostEqual(metrics["train/loss/max"], max(window_losses), 5)
+            # gradients are only clipped in steps which update the weights
+            window_grad_norms = [
+                grad_norm.item()
+                for grad_norm in grad_norms[start:end]
+                if grad_norm is not None
+            ]
+            self.assertAlmostEqual(
+                metrics["train/total_grad_norm/mean"],
+                sum(window_grad_norms) / len(window_grad_norms),
+                5,
+            )
+        for name, value in auto_unit.train_step_metrics.items():
+            self.assertEqual(logger.log_buffer[7][f"train/{name}"], value)
+
+        with self.assertRaisesRegex(ValueError, "log_every_n_steps must be > 0"):
+            DummyAutoUnit(
+                module=torch.nn.Linear(2, 2),
+                train_step_metrics_params=TrainStepMetricsParams(log_every_n_steps=0),
+            )
+
 
 Batch = Tuple[torch.Tensor, torch.Tensor]
 
 
+class OptimizerInBackwardAutoUnit(AutoUnit[Batch]):
+    # pyre-fixme[2]: Parameter must be annotated.
+    def __init__(self, **kwargs) -> None:
+        super().__init__(device=torch.device("cpu"), step_lr_interval="step", **kwargs)
+
+    def compute_loss(
+        self, state: State, data: Batch
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        inputs, targets = data
+        outputs = self.module(inputs)
+        loss = torch.nn.functional.cross_entropy(outputs, targets)
+        return loss, outputs
+
+    def configure_optimizers_and_lr_scheduler(
+        self, module: torch.nn.Module
+    ) -> Tuple[torch.optim.Optimizer, TLRScheduler]:
+        optimizer = torch.optim.SGD(
+            module.parameters(), lr=0.5, momentum=0.9, weight_decay=0.01
+        )
+        lr_scheduler = torch.optim.lr_scheduler.ExponentialLR(optimizer, gamma=0.8)
+        return optimizer, lr_scheduler
+
+
+class OOMAutoUnit(DummyAutoUnit):
+    """Raises an out of memory error for micro-batches larger than ``max_batch_size``."""
+
+    # pyre-fixme[2]: Parameter must be annotated.
+    def __init__(
+        self, max_batch_size: int, oom_in_backward: bool = False, **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+        self.max_batch_size = max_batch_size
+        self.oom_in_backward = oom_in_backward
+        self.batch_sizes: list[int] = []
+        self.results: list[TrainStepResults] = []
+
+    def compute_loss(
+        self, state: State, data: Batch
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        batch_size = data[0].shape[0]
+        self.batch_sizes.append(batch_size)
+        loss, outputs = super().compute_loss(state, data)
+        if batch_size > self.max_batch_size:
+            if not self.oom_in_backward:
+                raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+
+            def raise_oom(grad: torch.Tensor) -> None:
+                raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+
+            # pyre-ignore[6]: the hook raises
+            outputs.register_hook(raise_oom)
+        return loss, outputs
+
+    def on_train_step_end(
+        self, state: State, data: Batch, step: int, results: TrainStepResults
+    ) -> None:
+        self.results.append(results)
+
+
+class ResultsRecordingAutoUnit(DummyAutoUnit):
+    # pyre-fixme[2]: Parameter must be annotated.
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.results: list[TrainStepResults] = []
+
+    def on_train_step_end(
+        self, state: State, data: Batch, step: int, results: TrainStepResults
+    ) -> None:
+        self.results.append(results)
+
+
 class DummyLRSchedulerAutoUnit(AutoUnit[Batch]):
     def __init__(
         self,
@@ -910,6 +1415,73 @@ class DummyComplexAutoUnit(AutoUnit[Batch]):
         return my_optimizer, my_lr_scheduler
 
 
+class CUDAGraphAutoUnit(AutoUnit[Batch]):
+    def compute_loss(
+        self, state: State, data: Batch
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        inputs, targets = data
+        outputs = self.module(inputs)
+        loss = torch.nn.functional.cross_entropy(outputs, targets)
+        return loss, outputs
+
+    def configure_optimizers_and_lr_scheduler(
+        self, module: torch.nn.Module
+    ) -> Tuple[torch.optim.Optimizer, TLRScheduler]:
+        # tensor learning rates are updated in place by the scheduler
+        my_optimizer = torch.optim.SGD(
+            module.parameters(), lr=torch.tensor(0.1), momentum=0.9
+        )
+        my_lr_scheduler = torch.optim.lr_scheduler.StepLR(
+            my_optimizer, step_size=2, gamma=0.5
+        )
+        return my_optimizer, my_lr_scheduler
+
+
+class FakeCUDAGraphRunner(_CUDAGraphRunner):
+    """
+    Emulates CUDA graphs on CPU: capturing records the step without applying it, and replaying
+    reruns the step on the static inputs, writing its results into the static outputs.
+    """
+
+    def __init__(
+        self, unit: AutoUnit[Batch], capture_error: Optional[Exception] = None
+    ) -> None:
+        super().__init__()
+        self.unit = unit
+        self.capture_error = capture_error
+        self.num_replays = 0
+
+    def get_unsupported_reason(self, device: torch.device) -> Optional[str]:
+        return None
+
+    def warmup_context(self) -> ContextManager[None]:
+        return nullcontext()
+
+    def _capture_graph(self, fn: Callable[[object], Any], static_data: object) -> Any:
+        if self.capture_error is not None:
+            raise self.capture_error
+        optimizer = none_throws(self.unit.optimizer)
+        module_state = deepcopy(self.unit.module.state_dict())
+        optimizer_state = deepcopy(optimizer.state_dict())
+        outputs = fn(static_data)
+        self.unit.module.load_state_dict(module_state)
+        optimizer.load_state_dict(optimizer_state)
+        self.fn = fn
+        self.static_data = static_data
+        return outputs
+
+    def _replay_graph(self) -> None:
+        self.num_replays += 1
+        # captured gradients are written, not accumulated
+        none_throws(self.unit.optimizer).zero_grad(set_to_none=True)
+        outputs = self.fn(self.static_data)
+        for static_output, output in zip(
+            tree_flatten(self._static_outputs)[0], tree_flatten(outputs)[0]
+        ):
+            if isinstance(static_output, torch.Tensor):
+                static_output.detach().copy_(output)
+
+
 class LastBatchAutoUnit(AutoUnit[Batch]):
     def __init__(self, module: torch.nn.Module, expected_steps_per_epoch: int) -> None:
         super().__init__(module=module)
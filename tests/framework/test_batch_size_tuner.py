@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import unittest
+from copy import deepcopy
+from typing import List, Tuple
+from unittest.mock import patch
+
+import torch
+from torchtnt.framework._test_utils import DummyAutoUnit
+from torchtnt.framework.auto_unit import OOMRecoveryParams, TrainStepMetricsParams
+from torchtnt.framework.batch_size_tuner import (
+    get_batch_size_tuning_summary,
+    tune_batch_size,
+)
+from torchtnt.framework.state import State
+
+Batch = Tuple[torch.Tensor, torch.Tensor]
+
+
+class OOMAutoUnit(DummyAutoUnit):
+    """Raises an out of memory error for micro-batches larger than ``max_batch_size``."""
+
+    # pyre-fixme[2]: Parameter must be annotated.
+    def __init__(self, max_batch_size: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.max_batch_size = max_batch_size
+        self.batch_sizes: List[int] = []
+
+    def compute_loss(self, state: State, data: Batch) -> Tuple[torch.Tensor, object]:
+        batch_size = data[0].shape[0]
+        self.batch_sizes.append(batch_size)
+        if batch_size > self.max_batch_size:
+            raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        return super().compute_loss(state, data)
+
+
+class BatchSizeTunerTest(unittest.TestCase):
+    def test_tune_batch_size(self) -> None:
+        module = torch.nn.Linear(2, 2)
+        auto_unit = OOMAutoUnit(
+            max_batch_size=13,
+            module=module,
+            device=torch.device("cpu"),
+            gradient_accumulation_steps=5,
+        )
+        original_state_dict = deepcopy(auto_unit.module.state_dict())
+        sample = (torch.rand(3, 2), torch.randint(0, 2, (3,)))
+
+        result = tune_batch_size(
+            auto_unit,
+            sample,
+            target_global_batch_size=48,
+            num_candidates=2,
+            num_warmup_steps=0,
+            num_steps=1,
+        )
+
+        self.assertEqual(result.max_batch_size, 13)
+        # the largest fitting divisors of the target batch size
+        self.assertEqual(set(result.throughputs.keys()), {12, 8})
+        self.assertIn(result.batch_size, (12, 8))
+        self.assertEqual(result.batch_size * result.gradient_accumulation_steps, 48)
+        self.assertEqual(result.global_batch_size, 48)
+        self.assertIn("Largest micro-batch size", get_batch_size_tuning_summary(result))
+
+        # the search doubles the batch size until it runs out of memory, then bisects
+        self.assertEqual(auto_unit.batch_sizes[:9], [1, 2, 4, 8, 16, 12, 14, 13, 12])
+        # the state of the unit is restored
+        self.assertEqual(auto_unit.gradient_accumulation_steps, 5)
+        self.assertEqual(auto_unit.optimizer.state_dict()["state"], {})
+        for name, tensor in auto_unit.module.state_dict().items():
+            torch.testing.assert_close(tensor, original_state_dict[name])
+
+    def test_tune_batch_size_disables_oom_recovery(self) -> None:
+        oom_recovery_params = OOMRecoveryParams(max_num_splits=4)
+        auto_unit = OOMAutoUnit(
+            max_batch_size=5,
+            module=torch.nn.Linear(2, 2),
+            device=torch.device("cpu"),
+            oom_recovery_params=oom_recovery_params,
+        )
+        result = tune_batch_size(
+            auto_unit,
+            (torch.rand(1, 2), torch.randint(0, 2, (1,))),
+            target_global_batch_size=8,
+            num_warmup_steps=0,
+            num_steps=1,
+        )
+        # out of memory errors weren't recovered from by splitting the batches
+        self.assertEqual(result.max_batch_size, 5)
+        self.assertIs(auto_unit.oom_recovery_params, oom_recovery_params)
+
+    def test_tune_batch_size_restores_progress_and_metrics(self) -> None:
+        auto_unit = OOMAutoUnit(
+            max_batch_size=5,
+            module=torch.nn.Linear(2, 2),
+            device=torch.device("cpu"),
+            train_step_metrics_params=TrainStepMetricsParams(log_every_n_steps=1),
+        )
+        tune_batch_size(
+            auto_unit,
+            (torch.rand(1, 2), torch.randint(0, 2, (1,))),
+            target_global_batch_size=8,
+            num_warmup_steps=0,
+            num_steps=1,
+        )
+        self.assertEqual(auto_unit.train_progress.num_steps_completed, 0)
+        # the synthetic steps are not aggregated into the train step metrics
+        self.assertEqual(auto_unit.train_step_metrics, {})
+        self.assertIsNotNone(auto_unit._train_step_metrics_accumulator)
+
+    @patch("torchtnt.framework.batch_size_tuner._is_fsdp2_module", return_value=True)
+    def test_tune_batch_size_distributed_module(self, _) -> None:
+        auto_unit = OOMAutoUnit(
+            max_batch_size=5, module=torch.nn.Linear(2, 2), device=torch.device("cpu")
+        )
+        with self.assertRaisesRegex(ValueError, "DDP or FSDP"):
+            tune_batch_size(
+                auto_unit,
+                (torch.rand(1, 2), torch.randint(0, 2, (1,))),
+                target_global_batch_size=8,
+            )
+
+    def test_tune_batch_size_bounds(self) -> None:
+        auto_unit = OOMAutoUnit(
+            max_batch_size=100, module=torch.nn.Linear(2, 2), device=torch.device("cpu")
+        )
+        sample = (torch.rand(1, 2), torch.randint(0, 2, (1,)))
+        result = tune_batch_size(
+            auto_unit, sample, target_global_batch_size=10, num_steps=1
+        )
+        # the search doesn't exceed the per-rank target batch size
+        self.assertEqual(result.max_batch_size, 10)
+        self.assertEqual(max(auto_unit.batch_sizes), 10)
+
+        auto_unit = OOMAutoUnit(
+            max_batch_size=1, module=torch.nn.Linear(2, 2), device=torch.device("cpu")
+        )
+        with self.assertRaisesRegex(RuntimeError, "minimum batch size 2"):
+            tune_batch_size(
+                auto_unit, sample, target_global_batch_size=8, min_batch_size=2
+            )
+
+        # errors other than out of memory errors are raised
+        with self.assertRaisesRegex(ValueError, "same leading batch dimension"):
+            tune_batch_size(
+                auto_unit,
+                (torch.rand(2, 2), torch.randint(0, 2, (3,))),
+                target_global_batch_size=8,
+            )
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import random
+import threading
+import unittest
+from concurrent.futures import Future
+from typing import Any, List, Tuple
+
+import torch
+from torch import nn
+from torchtnt.framework.auto_unit import AutoPredictUnit
+from torchtnt.framework.callback import Callback
+from torchtnt.framework.dynamic_batching import DynamicBatchingServer
+from torchtnt.framework.state import State
+from torchtnt.framework.unit import TPredictUnit
+
+
+class BatchShapeRecorder(Callback):
+    def __init__(self) -> None:
+        self.batch_sizes: List[int] = []
+
+    def on_predict_step_end(self, state: State, unit: TPredictUnit) -> None:
+        # pyre-ignore[16]: outputs are tensors
+        self.batch_sizes.append(state.predict_state.step_output.shape[0])
+
+
+class FailingModule(nn.Module):
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        raise ValueError("Forward failed")
+
+
+def _generate_requests(
+    server: DynamicBatchingServer,
+    num_requests: int,
+    max_rows: int,
+    seed: int,
+) -> List[Tuple[torch.Tensor, "Future[Any]"]]:
+    """Submits requests of random sizes, like clients of the server would."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(num_requests):
+        data = torch.randn(rng.randint(1, max_rows), 4)
+        requests.append((data, server.submit(data)))
+    return requests
+
+
+class DynamicBatchingServerTest(unittest.TestCase):
+    def test_serve(self) -> None:
+        module = nn.Linear(4, 2)
+        recorder = BatchShapeRecorder()
+        server = DynamicBatchingServer(
+            AutoPredictUnit(module=module),
+            max_batch_size=8,
+            max_latency_ms=50,
+            batch_size_buckets=[4, 8, 16],
+            callbacks=[recorder],
+        )
+        server.start()
+
+        # requests of several client threads
+        requests: List[Tuple[torch.Tensor, "Future[Any]"]] = []
+        threads = [
+            threading.Thread(
+                target=lambda seed=seed: requests.extend(
+                    _generate_requests(server, 20, 12, seed)
+                )
+            )
+            for seed in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        server.stop()
+
+        self.assertEqual(len(requests), 60)
+        with torch.no_grad():
+            for data, future in requests:
+                torch.testing.assert_close(future.result(), module(data))
+
+        # batches are padded to a bucket, requests larger than max_batch_size run alone
+        num_rows = sum(data.shape[0] for data, _ in requests)
+        self.assertTrue(all(size in (4, 8, 16) for size in recorder.batch_sizes))
+        self.assertLess(len(recorder.batch_sizes), len(requests))
+
+        stats = server.get_stats()
+        self.assertEqual(stats["batch_size/avg"] * len(recorder.batch_sizes), num_rows)
+        for key in (
+            "request_latency/p50.0",
+            "request_latency/p99.0",
+            "predict_iteration_time/p90.0",
+            "requests_per_second",
+            "rows_per_second",
+        ):
+            self.assertIn(key, stats)
+
+        with self.assertRaisesRegex(RuntimeError, "stopped server"):
+            server.submit(torch.randn(1, 4))
+
+    def test_coalesce_compatible_requests(self) -> None:
+        """Requests are batched with requests of the same trailing shapes only"""
+        recorder = BatchShapeRecorder()
+        server = DynamicBatchingServer(
+            AutoPredictUnit(module=nn.Identity()),
+            max_batch_size=16,
+            max_latency_ms=1000,
+            callbacks=[recorder],
+        )
+        futures = [
+            server.submit(torch.ones(2, 3)),
+            server.submit(torch.ones(3, 3)),
+            server.submit(torch.ones(2, 5)),
+        ]
+        # stopping before serving runs the pending requests without waiting for more
+        server.stop()
+        server.serve()
+
+        self.assertEqual(recorder.batch_sizes, [5, 2])
+        self.assertEqual([f.result().shape for f in futures], [(2, 3), (3, 3), (2, 5)])
+
+    def test_serve_error(self) -> None:
+        server = DynamicBatchingServer(
+            AutoPredictUnit(module=FailingModule()),
+            max_batch_size=4,
+            max_latency_ms=0,
+        )
+        server.start()
+        future = server.submit(torch.randn(2, 4))
+        with self.assertRaisesRegex(ValueError, "Forward failed"):
+            future.result()
+        with self.assertRaisesRegex(RuntimeError, "Serving requests failed"):
+            server.stop()
+
+    def test_invalid_args(self) -> None:
+        unit = AutoPredictUnit(module=nn.Identity())
+        with self.assertRaisesRegex(ValueError, "max_batch_size"):
+            DynamicBatchingServer(unit, max_batch_size=0, max_latency_ms=1)
+        with self.assertRaisesRegex(ValueError, "batch_size_buckets"):
+            DynamicBatchingServer(
+                unit, max_batch_size=8, max_latency_ms=1, batch_size_buckets=[2, 4]
+            )
+        with self.assertRaisesRegex(ValueError, "enable_prefetch=False"):
+            DynamicBatchingServer(
+                AutoPredictUnit(module=nn.Identity(), enable_prefetch=True),
+                max_batch_size=8,
+                max_latency_ms=1,
+            )
+        server = DynamicBatchingServer(unit, max_batch_size=8, max_latency_ms=1)
+        with self.assertRaisesRegex(ValueError, "same number of rows"):
+            server.submit((torch.ones(2), torch.ones(3)))
@@ -8,7 +8,7 @@
 # pyre-strict
 
 import unittest
-from typing import Any, Iterator, Mapping, Tuple
+from typing import Any, Iterator, List, Mapping, Tuple
 from unittest.mock import MagicMock
 
 import torch
@@ -192,6 +192,29 @@ class EvaluateTest(unittest.TestCase):
             callbacks=[check_timer_callback],
         )
 
+    def test_evaluate_inference_mode(self) -> None:
+        """
+        Test evaluate runs under torch.inference_mode() unless opted out
+        """
+
+        class InferenceModeCheckCallback(Callback):
+            def __init__(self) -> None:
+                self.inference_mode_enabled: List[bool] = []
+
+            def on_eval_step_end(self, state: State, unit: TEvalUnit) -> None:
+                self.inference_mode_enabled.append(torch.is_inference_mode_enabled())
+
+        dataloader = generate_random_dataloader(4, 2, 2)
+        for inference_mode in (True, False):
+            callback = InferenceModeCheckCallback()
+            evaluate(
+                DummyEvalUnit(2),
+                dataloader,
+                callbacks=[callback],
+                inference_mode=inference_mode,
+            )
+            self.assertEqual(callback.inference_mode_enabled, [inference_mode] * 2)
+
     def test_evaluate_timing(self) -> None:
         """
         Test timing in evaluate
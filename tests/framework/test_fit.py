@@ -8,17 +8,23 @@
 # pyre-strict
 
 import math
+import os
 import unittest
-from typing import Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from unittest.mock import MagicMock, patch
 
 import torch
+from pyre_extensions import none_throws
 from torch import nn
+from torch.utils.data import DataLoader, Dataset
+from torchtnt.framework._fit_eval import _wrap_fit_eval_dataloader
 from torchtnt.framework._test_utils import DummyFitUnit, generate_random_dataloader
 from torchtnt.framework.callback import Callback
 from torchtnt.framework.fit import fit
 from torchtnt.framework.state import ActivePhase, State
-from torchtnt.framework.unit import EvalUnit, TrainUnit, TTrainUnit
+from torchtnt.framework.unit import EvalUnit, TEvalUnit, TrainUnit, TTrainUnit
+from torchtnt.utils.progress import estimated_steps_in_epoch
+from torchtnt.utils.stateful import Stateful
 from torchtnt.utils.timer import Timer
 from torchtnt.utils.version import is_torch_version_geq
 
@@ -491,6 +497,154 @@ class FitTest(unittest.TestCase):
         self.assertEqual(mock_get_thread_name.call_count, 2)
         mock_set_thread_name.assert_called_once()
 
+    def test_fit_persistent_eval_iterator(self) -> None:
+        """
+        Test fit entry point reuses the workers of the eval dataloader across evaluations
+        """
+        for persistent_eval_iterator in (True, False):
+            with self.subTest(persistent_eval_iterator=persistent_eval_iterator):
+                unit = RecordingFitUnit()
+                fit(
+                    unit,
+                    train_dataloader=[0, 1, 2],
+                    eval_dataloader=DataLoader(
+                        WorkerPidDataset(), batch_size=2, num_workers=1
+                    ),
+                    max_epochs=1,
+                    evaluate_every_n_steps=1,
+                    evaluate_every_n_epochs=None,
+                    persistent_eval_iterator=persistent_eval_iterator,
+                )
+                self.assertEqual(unit.eval_progress.num_epochs_completed, 3)
+                self.assertEqual(len(unit.eval_batches), 6)
+                worker_pids = {
+                    pid for batch in unit.eval_batches for pid in batch.tolist()
+                }
+                self.assertEqual(len(worker_pids), 1 if persistent_eval_iterator else 3)
+
+    def test_fit_eval_cache_device(self) -> None:
+        """
+        Test fit entry point replays the eval subset cached during the first evaluation
+        """
+        unit = RecordingFitUnit()
+        eval_dataloader = CountingIterable(5)
+        overhead_recorder = EvalOverheadRecorder()
+        fit(
+            unit,
+            train_dataloader=[0, 1, 2, 3],
+            eval_dataloader=eval_dataloader,
+            max_epochs=1,
+            max_eval_steps_per_epoch=2,
+            evaluate_every_n_steps=2,
+            evaluate_every_n_epochs=None,
+            eval_cache_device=torch.device("cpu"),
+            callbacks=[overhead_recorder],
+        )
+        self.assertEqual(eval_dataloader.num_iter_calls, 1)
+        self.assertEqual([int(x) for x in unit.eval_batches], [0, 1, 0, 1])
+        self.assertIsNone(overhead_recorder.overheads[0])
+        eval_overhead = overhead_recorder.overheads[1]
+        self.assertIsNotNone(eval_overhead)
+        self.assertGreater(none_throws(eval_overhead), 0.0)
+
+    def test_fit_eval_dataloader_wrapper(self) -> None:
+        """
+        Test the eval dataloader wrapper of fit forwards the length and state of the dataloader
+        """
+        eval_dataloader = DataLoader(torch.arange(6), batch_size=2)
+        wrapper = _wrap_fit_eval_dataloader(
+            eval_dataloader, cache_device=torch.device("cpu")
+        )
+        self.assertEqual(len(wrapper), 3)
+        self.assertNotIsInstance(wrapper, Stateful)
+        self.assertEqual(
+            estimated_steps_in_epoch(
+                wrapper, num_steps_completed=0, max_steps=10, max_steps_per_epoch=None
+            ),
+            3,
+        )
+
+        # the cached subset is replayed after the first evaluation
+        data_iter = iter(wrapper)
+        next(data_iter)
+        iter(wrapper)
+        self.assertEqual(len(wrapper), 1)
+
+        unsized_wrapper = _wrap_fit_eval_dataloader(CountingIterable(5))
+        with self.assertRaises(TypeError):
+            len(unsized_wrapper)
+        self.assertEqual(
+            estimated_steps_in_epoch(
+                unsized_wrapper,
+                num_steps_completed=0,
+                max_steps=10,
+                max_steps_per_epoch=4,
+            ),
+            4,
+        )
+
+        stateful_dataloader = StatefulIterable(5)
+        stateful_wrapper = _wrap_fit_eval_dataloader(
+            stateful_dataloader, persistent_iterator=True
+        )
+        self.assertIsInstance(stateful_wrapper, Stateful)
+        self.assertEqual(stateful_wrapper.state_dict(), {"offset": 0})
+        stateful_wrapper.load_state_dict({"offset": 3})
+        self.assertEqual(stateful_dataloader.offset, 3)
+
+
+class StatefulIterable:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.offset = 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self.offset, self.size))
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"offset": self.offset}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        self.offset = state_dict["offset"]
+
+
+class WorkerPidDataset(Dataset[int]):
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, idx: int) -> int:
+        return os.getpid()
+
+
+class CountingIterable:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.num_iter_calls = 0
+
+    def __iter__(self) -> Iterator[torch.Tensor]:
+        self.num_iter_calls += 1
+        return iter(torch.arange(self.size))
+
+
+class RecordingFitUnit(TrainUnit[int], EvalUnit[torch.Tensor]):
+    def __init__(self) -> None:
+        super().__init__()
+        self.eval_batches: List[torch.Tensor] = []
+
+    def train_step(self, state: State, data: int) -> None:
+        pass
+
+    def eval_step(self, state: State, data: torch.Tensor) -> None:
+        self.eval_batches.append(data)
+
+
+class EvalOverheadRecorder(Callback):
+    def __init__(self) -> None:
+        self.overheads: List[Optional[float]] = []
+
+    def on_eval_start(self, state: State, unit: TEvalUnit) -> None:
+        self.overheads.append(state.eval_overhead)
+
 
 class UnitWithError(TrainUnit[int], EvalUnit[int]):
     def train_step(self, state: State, data: int) -> None:
@@ -153,6 +153,22 @@ class LoopUtilsTest(unittest.TestCase):
         self.assertTrue(module.training)
         self.assertTrue(loss_fn.training)
 
+    def test_reset_module_training_mode_submodules(self) -> None:
+        """
+        Test _reset_module_training_mode restores the modes of all submodules
+        """
+        module = nn.Sequential(nn.Linear(1, 1), nn.BatchNorm1d(1), nn.Dropout())
+        # frozen submodule kept in eval mode during training
+        module[1].eval()
+
+        prior_module_train_states = _set_module_training_mode({"module": module}, False)
+        self.assertFalse(any(m.training for m in module.modules()))
+
+        _reset_module_training_mode({"module": module}, prior_module_train_states)
+        self.assertEqual(
+            [m.training for m in module.modules()], [True, True, False, True]
+        )
+
     def test_is_done(self) -> None:
         p = Progress(
             num_epochs_completed=2,
@@ -248,6 +248,17 @@ class PredictTest(unittest.TestCase):
                 predict(unit, dataloader, callbacks=cast(List[Callback], callbacks))
                 mock_autograd_mode.assert_called_once()
 
+    def test_predict_inference_mode_opt_out(self) -> None:
+        unit = DummyPredictUnit(2)
+        dataloader = generate_random_dataloader(10, 2, 2)
+
+        with patch("torch.no_grad") as mock_no_grad, patch(
+            "torch.inference_mode"
+        ) as mock_inference_mode:
+            predict(unit, dataloader, inference_mode=False)
+            mock_no_grad.assert_called_once()
+            mock_inference_mode.assert_not_called()
+
     def test_predict_epoch_check(self) -> None:
         unit = MagicMock(wraps=DummyPredictUnit(2))
         unit.predict_progress = Progress(num_epochs_completed=1, num_steps_completed=5)
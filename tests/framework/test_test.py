@@ -194,6 +194,31 @@ class TestTest(unittest.TestCase):
 
         self.assertFalse(my_unit.grad_enabled)
 
+    def test_test_inference_mode(self) -> None:
+        """
+        Test that test_step runs under torch.inference_mode() unless opted out.
+        """
+
+        class InferenceModeCheckTestUnit(TestUnit[Tuple[torch.Tensor, torch.Tensor]]):
+            def __init__(self) -> None:
+                super().__init__()
+                self.inference_mode_enabled: bool = False
+
+            def test_step(
+                self, state: State, data: Tuple[torch.Tensor, torch.Tensor]
+            ) -> Any:
+                self.inference_mode_enabled = torch.is_inference_mode_enabled()
+                return None
+
+        dataloader = [(torch.randn(2, 2), torch.randint(0, 2, (2,)))]
+        my_unit = InferenceModeCheckTestUnit()
+        test(my_unit, dataloader)
+        self.assertTrue(my_unit.inference_mode_enabled)
+
+        my_unit = InferenceModeCheckTestUnit()
+        test(my_unit, dataloader, inference_mode=False)
+        self.assertFalse(my_unit.inference_mode_enabled)
+
     def test_test_exception_handling(self) -> None:
         """
         Test that exceptions during test are properly handled.
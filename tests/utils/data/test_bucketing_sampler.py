@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import unittest
+from collections import Counter
+from itertools import islice
+from typing import List
+
+import torch
+from torch.utils.data import BatchSampler, DataLoader, RandomSampler
+from torchtnt.utils.data.bucketing_sampler import (
+    benchmark_batch_sampler,
+    BucketBatchSampler,
+)
+
+
+def _get_lengths(num_samples: int = 500) -> List[int]:
+    generator = torch.Generator().manual_seed(0)
+    return torch.randint(1, 100, (num_samples,), generator=generator).tolist()
+
+
+class BucketBatchSamplerTest(unittest.TestCase):
+    def test_token_budget(self) -> None:
+        lengths = _get_lengths()
+        for bucket_boundaries in (None, [10, 30, 60]):
+            with self.subTest(bucket_boundaries=bucket_boundaries):
+                sampler = BucketBatchSampler(
+                    lengths,
+                    max_tokens=400,
+                    bucket_boundaries=bucket_boundaries,
+                    max_batch_size=32,
+                )
+                batches = list(sampler)
+                self.assertEqual(len(batches), len(sampler))
+                # every sample is yielded once
+                self.assertEqual(
+                    sorted(i for batch in batches for i in batch),
+                    list(range(len(lengths))),
+                )
+                for batch in batches:
+                    batch_lengths = [lengths[i] for i in batch]
+                    self.assertLessEqual(len(batch) * max(batch_lengths), 400)
+                    self.assertLessEqual(len(batch), 32)
+                    if bucket_boundaries is not None:
+                        buckets = torch.bucketize(
+                            torch.tensor(batch_lengths),
+                            torch.tensor(bucket_boundaries),
+                            right=True,
+                        )
+                        self.assertEqual(len(set(buckets.tolist())), 1)
+
+    def test_epochs(self) -> None:
+        lengths = _get_lengths()
+        sampler = BucketBatchSampler(lengths, max_tokens=400, seed=1)
+        epoch_0 = list(sampler)
+        epoch_1 = list(sampler)
+        self.assertNotEqual(epoch_0, epoch_1)
+
+        other_sampler = BucketBatchSampler(lengths, max_tokens=400, seed=1)
+        self.assertEqual(list(other_sampler), epoch_0)
+        other_sampler.set_epoch(1)
+        self.assertEqual(list(other_sampler), epoch_1)
+
+        # batches in order of increasing lengths
+        sampler = BucketBatchSampler(lengths, max_tokens=400, shuffle=False)
+        flattened_lengths = [lengths[i] for batch in sampler for i in batch]
+        self.assertEqual(flattened_lengths, sorted(lengths))
+
+    def test_distributed(self) -> None:
+        lengths = _get_lengths(101)
+        all_batches = list(BucketBatchSampler(lengths, max_tokens=200, seed=3))
+
+        for drop_last in (False, True):
+            with self.subTest(drop_last=drop_last):
+                rank_batches = [
+                    list(
+                        BucketBatchSampler(
+                            lengths,
+                            max_tokens=200,
+                            seed=3,
+                            num_replicas=3,
+                            rank=rank,
+                            drop_last=drop_last,
+                        )
+                    )
+                    for rank in range(3)
+                ]
+                self.assertEqual(len({len(batches) for batches in rank_batches}), 1)
+                counts = Counter(
+                    tuple(batch) for batches in rank_batches for batch in batches
+                )
+                if drop_last:
+                    self.assertEqual(sum(counts.values()), len(all_batches) // 3 * 3)
+                    self.assertTrue(all(count == 1 for count in counts.values()))
+                else:
+                    self.assertEqual(set(counts), {tuple(b) for b in all_batches})
+
+        with self.assertRaisesRegex(ValueError, "rank must be"):
+            BucketBatchSampler(lengths, max_tokens=200, num_replicas=2, rank=2)
+
+    def test_resume(self) -> None:
+        lengths = _get_lengths()
+        sampler = BucketBatchSampler(lengths, max_tokens=400)
+        list(sampler)
+        batches = list(sampler)
+        sampler.set_epoch(1)
+        list(islice(iter(sampler), 5))
+        state_dict = sampler.state_dict()
+        self.assertEqual(state_dict, {"epoch": 1, "num_batches_yielded": 5})
+
+        restored_sampler = BucketBatchSampler(lengths, max_tokens=400)
+        restored_sampler.load_state_dict(state_dict)
+        self.assertEqual(list(restored_sampler), batches[5:])
+        self.assertEqual(
+            restored_sampler.state_dict(), {"epoch": 2, "num_batches_yielded": 0}
+        )
+
+    def test_invalid_args(self) -> None:
+        with self.assertRaisesRegex(ValueError, "longer than max_tokens"):
+            BucketBatchSampler([10, 300], max_tokens=200)
+        with self.assertRaisesRegex(ValueError, "strictly increasing"):
+            BucketBatchSampler([10], max_tokens=200, bucket_boundaries=[20, 10])
+
+    def test_dataloader(self) -> None:
+        lengths = _get_lengths(50)
+        dataset = [torch.ones(length) for length in lengths]
+        dataloader = DataLoader(
+            dataset,
+            batch_sampler=BucketBatchSampler(lengths, max_tokens=256),
+            collate_fn=lambda samples: torch.nn.utils.rnn.pad_sequence(
+                samples, batch_first=True
+            ),
+        )
+        for batch in dataloader:
+            self.assertLessEqual(batch.numel(), 256)
+
+    def test_benchmark_batch_sampler(self) -> None:
+        lengths = _get_lengths()
+        bucketing_result = benchmark_batch_sampler(
+            BucketBatchSampler(lengths, max_tokens=800), lengths
+        )
+        self.assertEqual(bucketing_result.num_samples, len(lengths))
+        self.assertEqual(bucketing_result.num_tokens, sum(lengths))
+
+        fixed_result = benchmark_batch_sampler(
+            BatchSampler(RandomSampler(lengths), batch_size=8, drop_last=False),
+            lengths,
+            max_steps=20,
+        )
+        self.assertEqual(fixed_result.num_batches, 20)
+        self.assertGreater(
+            bucketing_result.padding_efficiency, fixed_result.padding_efficiency
+        )
+        self.assertGreater(bucketing_result.padding_efficiency, 0.9)
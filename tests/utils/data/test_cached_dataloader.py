@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import os
+import shutil
+import tempfile
+import unittest
+from typing import Dict, Iterator, List
+from unittest.mock import patch
+
+import torch
+from torchtnt.utils.data.cached_dataloader import _get_size_bytes, CachedDataLoader
+
+
+class CountingIterable:
+    def __init__(self, batches: List[Dict[str, object]]) -> None:
+        self.batches = batches
+        self.num_iters = 0
+
+    def __iter__(self) -> Iterator[Dict[str, object]]:
+        self.num_iters += 1
+        return iter(self.batches)
+
+    def __len__(self) -> int:
+        return len(self.batches)
+
+
+def _make_batches(num_batches: int) -> List[Dict[str, object]]:
+    return [
+        {
+            "x": torch.arange(6, dtype=torch.float32).reshape(2, 3) + i,
+            "y": (torch.tensor([i], dtype=torch.bfloat16), torch.tensor(i % 2 == 0)),
+            "id": i,
+        }
+        for i in range(num_batches)
+    ]
+
+
+class CachedDataLoaderTest(unittest.TestCase):
+    def test_cache(self) -> None:
+        batches = _make_batches(4)
+        iterable = CountingIterable(batches)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataloader = CachedDataLoader(iterable, cache_dir, "train")
+            self.assertFalse(dataloader.is_cached)
+            for _ in range(3):
+                torch.testing.assert_close(list(dataloader), batches)
+            self.assertTrue(dataloader.is_cached)
+            self.assertEqual(iterable.num_iters, 1)
+            self.assertEqual(len(dataloader), 4)
+
+            # the cache is reused by new instances
+            iterable = CountingIterable(batches)
+            dataloader = CachedDataLoader(iterable, cache_dir, "train")
+            self.assertTrue(dataloader.is_cached)
+            torch.testing.assert_close(list(dataloader), batches)
+            self.assertEqual(iterable.num_iters, 0)
+
+    def test_incomplete_pass_is_not_cached(self) -> None:
+        batches = _make_batches(4)
+        iterable = CountingIterable(batches)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataloader = CachedDataLoader(iterable, cache_dir, "train")
+            data_iter = iter(dataloader)
+            next(data_iter)
+            del data_iter
+            self.assertFalse(dataloader.is_cached)
+            self.assertFalse(os.path.exists(os.path.join(cache_dir, "train")))
+            torch.testing.assert_close(list(dataloader), batches)
+            self.assertTrue(dataloader.is_cached)
+
+    def test_shuffle(self) -> None:
+        batches = _make_batches(8)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            dataloader = CachedDataLoader(
+                batches, cache_dir, "train", shuffle=True, seed=3
+            )
+            # the first epoch comes from the dataloader, in order
+            self.assertEqual([b["id"] for b in dataloader], [b["id"] for b in batches])
+            epoch_1 = [b["id"] for b in dataloader]
+            epoch_2 = [b["id"] for b in dataloader]
+            self.assertNotEqual(epoch_1, epoch_2)
+            self.assertEqual(sorted(epoch_1), sorted(b["id"] for b in batches))
+
+            # the order only depends on the seed and the epoch
+            other = CachedDataLoader(batches, cache_dir, "train", shuffle=True, seed=3)
+            list(other)
+            self.assertEqual([b["id"] for b in other], epoch_1)
+
+    def test_state_dict(self) -> None:
+        batches = _make_batches(6)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for shuffle in (False, True):
+                # resume during the first pass, from the dataloader
+                dataloader = CachedDataLoader(
+                    batches, cache_dir, f"uncached_{shuffle}", shuffle=shuffle
+                )
+                data_iter = iter(dataloader)
+                next(data_iter)
+                next(data_iter)
+                state_dict = dataloader.state_dict()
+                expected = [b["id"] for b in data_iter]
+
+                restored = CachedDataLoader(
+                    batches, cache_dir, f"uncached_{shuffle}", shuffle=shuffle
+                )
+                restored.load_state_dict(state_dict)
+                self.assertEqual([b["id"] for b in restored], expected)
+
+                # resume from the cache, mid-epoch
+                list(dataloader)
+                self.assertTrue(dataloader.is_cached)
+                data_iter = iter(dataloader)
+                next(data_iter)
+                state_dict = dataloader.state_dict()
+                self.assertEqual(
+                    state_dict,
+                    {"epoch": 2, "num_batches_yielded": 1, "from_cache": True},
+                )
+                expected = [b["id"] for b in data_iter]
+
+                restored = CachedDataLoader(
+                    batches, cache_dir, f"uncached_{shuffle}", shuffle=shuffle
+                )
+                restored.load_state_dict(state_dict)
+                self.assertEqual([b["id"] for b in restored], expected)
+
+    def test_max_cache_bytes(self) -> None:
+        batches = _make_batches(4)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = CachedDataLoader(batches, cache_dir, "first")
+            list(first)
+            cache_bytes = sum(
+                os.path.getsize(os.path.join(cache_dir, "first", f))
+                for f in os.listdir(os.path.join(cache_dir, "first"))
+            )
+
+            # the least recently used cache is evicted to make room
+            second = CachedDataLoader(
+                batches, cache_dir, "second", max_cache_bytes=cache_bytes + 100
+            )
+            list(second)
+            self.assertTrue(second.is_cached)
+            self.assertEqual(os.listdir(cache_dir), ["second"])
+
+            # a cache that can't fit is abandoned
+            iterable = CountingIterable(batches)
+            third = CachedDataLoader(iterable, cache_dir, "third", max_cache_bytes=100)
+            torch.testing.assert_close(list(third), batches)
+            torch.testing.assert_close(list(third), batches)
+            self.assertFalse(third.is_cached)
+            self.assertEqual(iterable.num_iters, 2)
+            self.assertNotIn("third", os.listdir(cache_dir))
+
+            with self.assertRaisesRegex(ValueError, "max_cache_bytes"):
+                CachedDataLoader(batches, cache_dir, "fourth", max_cache_bytes=0)
+
+    def test_evicted_cache_is_rebuilt(self) -> None:
+        batches: List[Dict[str, object]] = [
+            {"x": torch.full((1024,), float(i))} for i in range(4)
+        ]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            list(CachedDataLoader(batches, cache_dir, "probe"))
+            cache_bytes = _get_size_bytes(os.path.join(cache_dir, "probe"))
+            shutil.rmtree(os.path.join(cache_dir, "probe"))
+
+            # the two caches don't fit together, so each evicts the other
+            iterable = CountingIterable(batches)
+            first = CachedDataLoader(
+                iterable, cache_dir, "first", max_cache_bytes=cache_bytes * 3 // 2
+            )
+            second = CachedDataLoader(
+                batches, cache_dir, "second", max_cache_bytes=cache_bytes * 3 // 2
+            )
+            list(first)
+            list(first)
+            self.assertEqual(iterable.num_iters, 1)
+            list(second)
+            self.assertNotIn("first", os.listdir(cache_dir))
+
+            torch.testing.assert_close(list(first), batches)
+            self.assertEqual(iterable.num_iters, 2)
+            self.assertTrue(first.is_cached)
+            torch.testing.assert_close(list(first), batches)
+            self.assertEqual(iterable.num_iters, 2)
+
+    def test_max_cache_bytes_scans_other_caches_once(self) -> None:
+        batches = _make_batches(8)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            list(CachedDataLoader(batches, cache_dir, "first"))
+            dataloader = CachedDataLoader(
+                batches, cache_dir, "second", max_cache_bytes=10**9
+            )
+            with patch(
+                "torchtnt.utils.data.cached_dataloader._get_size_bytes",
+                wraps=_get_size_bytes,
+            ) as get_size_bytes:
+                list(dataloader)
+            self.assertTrue(dataloader.is_cached)
+            # the other caches fit, so they are only sized before writing
+            get_size_bytes.assert_called_once_with(os.path.join(cache_dir, "first"))
@@ -6,9 +6,20 @@
 
 # pyre-strict
 
+import random
 import unittest
+from collections import Counter
+from typing import Dict, List
 
-from torchtnt.utils.data.iterators import StoppingMechanism
+from torch import distributed as dist
+from torchtnt.utils.data.iterators import (
+    _AliasTable,
+    RandomizedBatchSampler,
+    RandomizedBatchSamplerIterator,
+    StoppingMechanism,
+)
+from torchtnt.utils.distributed import spawn_multi_process
+from torchtnt.utils.test_utils import skip_if_not_distributed
 
 
 class TestIterators(unittest.TestCase):
@@ -28,3 +39,54 @@ class TestIterators(unittest.TestCase):
             StoppingMechanism.ALL_DATASETS_EXHAUSTED
             == StoppingMechanism.SMALLEST_DATASET_EXHAUSTED
         )
+
+    def test_alias_table(self) -> None:
+        alias_table = _AliasTable([3, 5, 7], [1.0, 0.0, 3.0])
+        rng = random.Random(0)
+        counts = Counter(alias_table.sample(rng) for _ in range(10000))
+        self.assertEqual(set(counts.keys()), {3, 7})
+        self.assertAlmostEqual(counts[7] / 10000, 0.75, delta=0.02)
+
+        with self.assertRaisesRegex(ValueError, "greater than zero"):
+            _AliasTable([0], [0.0])
+
+    def test_randomized_batch_sampler_rebuilds_on_exhaustion(self) -> None:
+        dataloaders: Dict[str, List[int]] = {"a": [0], "b": list(range(10))}
+        iterator = RandomizedBatchSamplerIterator(
+            dataloaders, RandomizedBatchSampler(weights={"a": 1000.0, "b": 1.0})
+        )
+        batches = list(iterator)
+        self.assertEqual(len(batches), 11)
+        self.assertEqual(sum(1 for batch in batches if "a" in batch), 1)
+
+    def test_randomized_batch_sampler_state_dict_is_a_snapshot(self) -> None:
+        dataloaders: Dict[str, List[int]] = {"a": [0], "b": list(range(10))}
+        iterator = RandomizedBatchSamplerIterator(
+            dataloaders, RandomizedBatchSampler(weights={"a": 1.0, "b": 1.0})
+        )
+        state_dict = iterator.state_dict()
+        expected_is_exhausted = list(state_dict["iterator_is_exhausted"])
+        list(iterator)
+        # exhausting the iterators later doesn't change the saved state
+        self.assertEqual(state_dict["iterator_is_exhausted"], expected_is_exhausted)
+
+    @skip_if_not_distributed
+    def test_randomized_batch_sampler_same_schedule_across_ranks(self) -> None:
+        schedules = spawn_multi_process(2, "gloo", self._get_randomized_schedule)
+        self.assertEqual(schedules[0], schedules[1])
+
+    @staticmethod
+    def _get_randomized_schedule() -> List[str]:
+        # seed each rank differently so only the broadcast seed can align them
+        random.seed(dist.get_rank())
+        dataloaders: Dict[str, List[int]] = {
+            "a": list(range(20)),
+            "b": list(range(20)),
+        }
+        iterator = RandomizedBatchSamplerIterator(
+            dataloaders,
+            RandomizedBatchSampler(
+                weights={"a": 1.0, "b": 1.0}, enforce_same_loader_across_ranks=True
+            ),
+        )
+        return [next(iter(batch.keys())) for batch in iterator]
@@ -10,6 +10,7 @@
 import random
 import unittest
 from collections import Counter
+from itertools import islice
 from typing import Any, cast, Dict, Iterable, Iterator, List, Mapping, Union
 
 import torch
@@ -514,7 +515,14 @@ class TestMultiDataLoader(unittest.TestCase):
         self.assertTrue("iterator_state" in multi_dl_state_dict)
         self.assertEqual(
             multi_dl_state_dict["iterator_state"],
-            {"cur_dataloader": "1", "finished_dataloaders": []},
+            {
+                "cur_dataloader": "1",
+                "finished_dataloaders": [],
+                "dataloaders": {
+                    "1": {"num_batches_consumed": 0},
+                    "2": {"num_batches_consumed": 0},
+                },
+            },
         )
         next(multi_dl_iter)  # should return batch from 1
         next(multi_dl_iter)  # should return batch from 2
@@ -525,7 +533,11 @@ class TestMultiDataLoader(unittest.TestCase):
         self.assertTrue("iterator_state" in multi_dl_state_dict)
         self.assertEqual(
             multi_dl_state_dict["iterator_state"],
-            {"cur_dataloader": "2", "finished_dataloaders": ["1"]},
+            {
+                "cur_dataloader": "2",
+                "finished_dataloaders": ["1"],
+                "dataloaders": {"2": {"num_batches_consumed": 2}},
+            },
         )
 
         # create fresh dl and load state dict. assert that the initial values are updated.
@@ -613,6 +625,10 @@ class TestMultiDataLoader(unittest.TestCase):
             {
                 "iterators_finished": 0,
                 "cur_iterator": "dataloader_1",
+                "dataloader": {
+                    "num_batches_consumed": 2,
+                    "state_dict": {"current_batch": 1},
+                },
             },
         )
 
@@ -625,6 +641,10 @@ class TestMultiDataLoader(unittest.TestCase):
             {
                 "iterators_finished": 1,
                 "cur_iterator": "dataloader_2",
+                "dataloader": {
+                    "num_batches_consumed": 1,
+                    "state_dict": {"current_batch": 1},
+                },
             },
         )
 
@@ -639,7 +659,7 @@ class TestMultiDataLoader(unittest.TestCase):
         self.assertEqual(in_order_iter.iterators_finished, 1)
 
         # Calling next should update the currrent iterator
-        # individual dl is not stateful
+        # individual dl is stateful, so its own (no-op) load_state_dict is trusted to restore the position
         self.assertEqual(next(in_order_iter)["dataloader_2"], [torch.tensor([3])])
         self.assertEqual(in_order_iter.cur_iterator, "dataloader_2")
 
@@ -648,3 +668,152 @@ class TestMultiDataLoader(unittest.TestCase):
         self.assertEqual(in_order_iter_2.cur_iterator, "dataloader_1")
         self.assertEqual(in_order_iter_2.iterators_finished, 0)
         self.assertEqual(next(in_order_iter_2)["dataloader_1"], [torch.tensor([1])])
+
+    def test_prefetch_preserves_order(self) -> None:
+        dataloaders: Dict[str, Iterable[int]] = {
+            "a": list(range(3)),
+            "b": list(range(10, 17)),
+            "c": list(range(20, 25)),
+        }
+        for strategy in (
+            RoundRobin(),
+            InOrder(),
+            AllDatasetBatches(
+                stopping_mechanism=StoppingMechanism.RESTART_UNTIL_ALL_DATASETS_EXHAUSTED
+            ),
+        ):
+            expected = list(MultiDataLoader(dataloaders, strategy))
+            # iterate twice to check that prefetching restarts with each new iterator
+            multi_dataloader = MultiDataLoader(
+                dataloaders, strategy, num_prefetch_batches=2
+            )
+            self.assertEqual(list(multi_dataloader), expected)
+            self.assertEqual(list(multi_dataloader), expected)
+
+    def test_prefetch_state_dict(self) -> None:
+        class CountingIterable:
+            def __init__(self, length: int) -> None:
+                self.length = length
+                self.num_read = 0
+
+            def __iter__(self) -> Iterator[int]:
+                while self.num_read < self.length:
+                    self.num_read += 1
+                    yield self.num_read
+
+            def state_dict(self) -> Dict[str, Any]:
+                return {"num_read": self.num_read}
+
+            def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+                self.num_read = state_dict["num_read"]
+
+        iterable = CountingIterable(length=10)
+        multi_dataloader = MultiDataLoader(
+            {"foo": iterable}, InOrder(), num_prefetch_batches=4
+        )
+        iterable.num_read = 0
+        multi_iterator = iter(multi_dataloader)
+        self.assertEqual(next(multi_iterator), {"foo": 1})
+        self.assertEqual(next(multi_iterator), {"foo": 2})
+
+        # the background thread reads ahead, but the state reflects consumed batches only
+        self.assertEqual(
+            multi_dataloader.state_dict()["iterator_state"]["dataloader"]["state_dict"],
+            {"num_read": 2},
+        )
+
+        multi_dataloader.load_state_dict(multi_dataloader.state_dict())
+        self.assertEqual(
+            [batch["foo"] for batch in multi_dataloader], list(range(3, 11))
+        )
+
+    def test_prefetch_propagates_errors(self) -> None:
+        class FailingIterable:
+            def __iter__(self) -> Iterator[int]:
+                yield 1
+                raise RuntimeError("failed to read")
+
+        multi_dataloader = MultiDataLoader(
+            {"foo": FailingIterable()}, RoundRobin(), num_prefetch_batches=1
+        )
+        multi_iterator = iter(multi_dataloader)
+        self.assertEqual(next(multi_iterator), {"foo": 1})
+        with self.assertRaisesRegex(RuntimeError, "failed to read"):
+            next(multi_iterator)
+
+        with self.assertRaisesRegex(ValueError, "num_prefetch_batches"):
+            MultiDataLoader({"foo": [1]}, RoundRobin(), num_prefetch_batches=-1)
+
+    def test_exact_resume(self) -> None:
+        dataloaders: Dict[str, Iterable[int]] = {
+            "a": list(range(5)),
+            "b": list(range(10, 17)),
+            "c": list(range(20, 23)),
+        }
+        for strategy in (
+            RoundRobin(),
+            InOrder(),
+            AllDatasetBatches(
+                stopping_mechanism=StoppingMechanism.RESTART_UNTIL_ALL_DATASETS_EXHAUSTED
+            ),
+            RandomizedBatchSampler(weights={"a": 1.0, "b": 2.0, "c": 1.0}),
+            RandomizedBatchSampler(
+                stopping_mechanism=StoppingMechanism.WRAP_AROUND_UNTIL_KILLED
+            ),
+        ):
+            multi_dataloader = MultiDataLoader(dataloaders, strategy)
+            multi_iterator = iter(multi_dataloader)
+            for _ in range(4):
+                next(multi_iterator)
+            state_dict = multi_dataloader.state_dict()
+            expected = list(islice(multi_iterator, 6))
+
+            restored_multi_dataloader = MultiDataLoader(dataloaders, strategy)
+            restored_multi_dataloader.load_state_dict(state_dict)
+            restored_iterator = iter(restored_multi_dataloader)
+            self.assertEqual(
+                list(islice(restored_iterator, 6)), expected, str(strategy)
+            )
+
+    def test_stateful_dataloader_state_is_saved_once(self) -> None:
+        class CountingIterable:
+            def __init__(self, length: int) -> None:
+                self.length = length
+                self.num_read = 0
+                self.num_loads = 0
+
+            def __iter__(self) -> Iterator[int]:
+                while self.num_read < self.length:
+                    self.num_read += 1
+                    yield self.num_read
+
+            def state_dict(self) -> Dict[str, Any]:
+                return {"num_read": self.num_read}
+
+            def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+                self.num_read = state_dict["num_read"]
+                self.num_loads += 1
+
+        for strategy in (RoundRobin(), InOrder()):
+            multi_dataloader = MultiDataLoader(
+                {"foo": CountingIterable(length=10)}, strategy
+            )
+            cast(
+                CountingIterable, multi_dataloader.individual_dataloaders["foo"]
+            ).num_read = 0
+            multi_iterator = iter(multi_dataloader)
+            next(multi_iterator)
+            next(multi_iterator)
+            state_dict = multi_dataloader.state_dict()
+            # the state of foo is only saved in the iterator state
+            self.assertNotIn("foo", state_dict, str(strategy))
+
+            iterable = CountingIterable(length=10)
+            restored_multi_dataloader = MultiDataLoader({"foo": iterable}, strategy)
+            restored_multi_dataloader.load_state_dict(state_dict)
+            self.assertEqual(
+                [batch["foo"] for batch in restored_multi_dataloader],
+                list(range(3, 11)),
+                str(strategy),
+            )
+            self.assertEqual(iterable.num_loads, 1, str(strategy))
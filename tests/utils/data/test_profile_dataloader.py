@@ -7,14 +7,25 @@
 
 # pyre-strict
 
+import time
 import unittest
-from typing import Iterator
+from typing import Iterator, List
 
 import torch
+from pyre_extensions import none_throws
 
 # pyre-fixme[21]: Could not find name `ProfilerActivity` in `torch.profiler`.
 from torch.profiler import ProfilerActivity
-from torchtnt.utils.data.profile_dataloader import profile_dataloader
+from torch.utils.data import Dataset, IterableDataset, TensorDataset
+from torchtnt.utils.data.profile_dataloader import (
+    _select_recommended,
+    benchmark_dataloader,
+    DataLoaderConfig,
+    DataLoaderProfileResult,
+    get_dataloader_sweep_summary,
+    profile_dataloader,
+    sweep_dataloader_configs,
+)
 from torchtnt.utils.env import init_from_env
 
 
@@ -27,6 +38,33 @@ class DummyIterable:
             yield i
 
 
+class SlowDataset(Dataset):
+    def __init__(self, count: int, delay: float) -> None:
+        self.count = count
+        self.delay = delay
+
+    def __getitem__(self, index: int) -> torch.Tensor:
+        time.sleep(self.delay)
+        return torch.tensor([index])
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class RangeIterableDataset(IterableDataset):
+    def __init__(self, count: int) -> None:
+        self.count = count
+
+    def __iter__(self) -> Iterator[torch.Tensor]:
+        for i in range(self.count):
+            yield torch.tensor([i])
+
+
+def slow_collate(samples: List[torch.Tensor]) -> torch.Tensor:
+    time.sleep(0.01)
+    return torch.stack(samples)
+
+
 class ProfileDataLoaderTest(unittest.TestCase):
     def test_profile_dataloader(self) -> None:
         max_length = 10
@@ -61,6 +99,101 @@ class ProfileDataLoaderTest(unittest.TestCase):
             len(timer.recorded_durations["copy_data_to_device"]), max_length
         )
 
+    def test_benchmark_dataloader_iterable(self) -> None:
+        iterable = [torch.ones(4, 2) for _ in range(5)]
+        result = benchmark_dataloader(iterable, max_steps=3)
+        self.assertIsNone(result.config)
+        self.assertEqual(result.num_batches, 3)
+        self.assertEqual(result.num_samples, 12)
+        self.assertGreater(result.samples_per_sec, 0)
+        self.assertIn("next(iter)", result.stage_latencies)
+        self.assertIn("p50.0", result.stage_latencies["next(iter)"])
+        # worker stages can't be measured on arbitrary iterables
+        self.assertNotIn("fetch", result.stage_latencies)
+        self.assertIsNone(result.bottleneck)
+
+        result = benchmark_dataloader(iterable, device=torch.device("cpu"))
+        self.assertEqual(result.num_batches, 5)
+        self.assertEqual(result.bottleneck, "h2d")
+
+    def test_sweep_dataloader_configs(self) -> None:
+        dataset = TensorDataset(torch.arange(32).float())
+        report = sweep_dataloader_configs(
+            dataset,
+            batch_sizes=[4, 8],
+            num_workers=[0, 2],
+            prefetch_factors=[2, 4],
+            pin_memory=[False],
+        )
+        # prefetch factor only applies with workers
+        self.assertEqual(
+            [result.config for result in report.results],
+            [
+                DataLoaderConfig(batch_size=4),
+                DataLoaderConfig(batch_size=4, num_workers=2, prefetch_factor=2),
+                DataLoaderConfig(batch_size=4, num_workers=2, prefetch_factor=4),
+                DataLoaderConfig(batch_size=8),
+                DataLoaderConfig(batch_size=8, num_workers=2, prefetch_factor=2),
+                DataLoaderConfig(batch_size=8, num_workers=2, prefetch_factor=4),
+            ],
+        )
+        for result in report.results:
+            self.assertEqual(result.num_samples, 32)
+            self.assertEqual(
+                result.num_batches, 32 // none_throws(result.config).batch_size
+            )
+            self.assertIn("fetch", result.stage_latencies)
+            self.assertIn("collate", result.stage_latencies)
+            self.assertIsNotNone(result.bottleneck)
+        self.assertIn(report.recommended, [r.config for r in report.results])
+        summary = get_dataloader_sweep_summary(report)
+        self.assertIn("samples/sec", summary)
+
+        with self.assertRaisesRegex(ValueError, "non-negative"):
+            sweep_dataloader_configs(dataset, batch_sizes=[4], tolerance=-1)
+
+    def test_sweep_dataloader_configs_bottleneck(self) -> None:
+        report = sweep_dataloader_configs(SlowDataset(8, delay=0.01), batch_sizes=[4])
+        self.assertEqual(report.results[0].bottleneck, "fetch")
+        self.assertGreaterEqual(
+            report.results[0].stage_latencies["fetch"]["avg"], 4 * 0.01
+        )
+
+        report = sweep_dataloader_configs(
+            RangeIterableDataset(8),
+            batch_sizes=[4],
+            collate_fn=slow_collate,
+            max_steps=1,
+        )
+        self.assertEqual(report.results[0].num_batches, 1)
+        self.assertEqual(report.results[0].bottleneck, "collate")
+
+    def test_select_recommended(self) -> None:
+        def make_result(
+            config: DataLoaderConfig, samples_per_sec: float
+        ) -> DataLoaderProfileResult:
+            return DataLoaderProfileResult(
+                config=config,
+                num_batches=1,
+                num_samples=1,
+                elapsed_time_sec=1.0,
+                samples_per_sec=samples_per_sec,
+                worker_cpu_utilization=1.0,
+                peak_rss_delta_bytes=0,
+                stage_latencies={},
+                bottleneck=None,
+            )
+
+        cheap = DataLoaderConfig(batch_size=8, num_workers=2, prefetch_factor=2)
+        fast = DataLoaderConfig(batch_size=8, num_workers=8, prefetch_factor=2)
+        results = [
+            make_result(DataLoaderConfig(batch_size=8), 10.0),
+            make_result(cheap, 98.0),
+            make_result(fast, 100.0),
+        ]
+        self.assertEqual(_select_recommended(results, tolerance=0.05), cheap)
+        self.assertEqual(_select_recommended(results, tolerance=0.0), fast)
+
 
 def _get_torch_profiler() -> torch.profiler.profile:
     profiler_schedule = torch.profiler.schedule(
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import unittest
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+import torch
+from torchtnt.utils.data.synthetic_data import (
+    AbstractRandomDataset,
+    generate_random_square_image_tensor,
+    get_synthetic_dataloader,
+)
+
+
+@dataclass
+class RandomImageDataset(AbstractRandomDataset[Dict[str, torch.Tensor]]):
+    def _generate_random_item(self) -> Dict[str, torch.Tensor]:
+        return {
+            "image": generate_random_square_image_tensor(3, 4),
+            "label": torch.randint(10, ()),
+        }
+
+    def _generate_random_batch(
+        self, batch_size: int, generator: torch.Generator
+    ) -> Dict[str, torch.Tensor]:
+        return {
+            "image": generate_random_square_image_tensor(
+                3, 4, batch_size=batch_size, generator=generator
+            ),
+            "label": torch.randint(10, (batch_size,), generator=generator),
+        }
+
+
+@dataclass
+class ItemOnlyDataset(AbstractRandomDataset[torch.Tensor]):
+    def _generate_random_item(self) -> torch.Tensor:
+        return torch.rand(2)
+
+
+class SyntheticDataTest(unittest.TestCase):
+    def test_generate_random_square_image_tensor(self) -> None:
+        self.assertEqual(generate_random_square_image_tensor(3, 4).shape, (3, 4, 4))
+        generator = torch.Generator().manual_seed(0)
+        images = generate_random_square_image_tensor(
+            3, 4, batch_size=5, generator=generator
+        )
+        self.assertEqual(images.shape, (5, 3, 4, 4))
+        torch.testing.assert_close(
+            images,
+            generate_random_square_image_tensor(
+                3, 4, batch_size=5, generator=torch.Generator().manual_seed(0)
+            ),
+        )
+        with self.assertRaisesRegex(ValueError, "batch_size"):
+            generate_random_square_image_tensor(3, 4, batch_size=0)
+
+    def test_batch_indexing(self) -> None:
+        dataset = RandomImageDataset(size=10)
+        batch = dataset[[0, 1, 2]]
+        self.assertEqual(batch["image"].shape, (3, 3, 4, 4))
+        self.assertEqual(batch["label"].shape, (3,))
+        self.assertEqual(dataset[0]["image"].shape, (3, 4, 4))
+        with self.assertRaises(IndexError):
+            dataset[[8, 9, 10]]
+
+        # subclasses implementing only single items are collated
+        self.assertEqual(ItemOnlyDataset(size=10)[[0, 1, 2]].shape, (3, 2))
+
+    def test_integer_like_indexing(self) -> None:
+        dataset = RandomImageDataset(size=10, seed=7)
+        # numpy integers and 0-d tensors index single items
+        for idx in (np.int64(4), torch.tensor(4)):
+            torch.testing.assert_close(dataset[idx], dataset[4])
+        torch.testing.assert_close(
+            dataset[np.array([2, 3])], dataset[torch.tensor([2, 3])]
+        )
+        torch.testing.assert_close(dataset[torch.tensor([2, 3])], dataset[[2, 3]])
+        with self.assertRaises(IndexError):
+            dataset[np.int64(10)]
+
+    def test_seed(self) -> None:
+        dataset = RandomImageDataset(size=10, seed=7)
+        other = RandomImageDataset(size=10, seed=7)
+        torch.testing.assert_close(dataset[[2, 3]], other[[2, 3]])
+        torch.testing.assert_close(dataset[4], other[4])
+        self.assertFalse(
+            torch.equal(dataset[[2, 3]]["image"], dataset[[4, 5]]["image"])
+        )
+        self.assertFalse(
+            torch.equal(
+                dataset[[2, 3]]["image"],
+                RandomImageDataset(size=10, seed=8)[[2, 3]]["image"],
+            )
+        )
+
+        # items are the same whether fetched alone or in any batch
+        batch = dataset[[5, 2, 3]]
+        for i, idx in enumerate([5, 2, 3]):
+            torch.testing.assert_close(
+                {key: value[i] for key, value in batch.items()}, dataset[idx]
+            )
+        torch.testing.assert_close(dataset[[2, 3]]["image"], batch["image"][1:])
+
+        # the default batch generation draws from the seeded generator
+        item_only = ItemOnlyDataset(size=10, seed=7)
+        torch.testing.assert_close(
+            item_only[[2, 3]], ItemOnlyDataset(size=10, seed=7)[[2, 3]]
+        )
+        torch.testing.assert_close(item_only[[2, 3]][0], item_only[2])
+        self.assertFalse(torch.equal(item_only[2], item_only[3]))
+
+    def test_pool(self) -> None:
+        dataset = RandomImageDataset(size=10, seed=0, pool_size=4)
+        pool = dataset._pool
+        assert pool is not None
+        self.assertTrue(pool["image"].is_shared())
+
+        # contiguous indices are views of the pool
+        batch = dataset[[1, 2, 3]]
+        self.assertEqual(
+            batch["image"].untyped_storage().data_ptr(),
+            pool["image"].untyped_storage().data_ptr(),
+        )
+        torch.testing.assert_close(batch["image"], pool["image"][1:4])
+
+        # other indices wrap around the pool
+        torch.testing.assert_close(
+            dataset[[3, 4, 9]]["image"], pool["image"][[3, 0, 1]]
+        )
+        torch.testing.assert_close(dataset[6]["image"], pool["image"][2])
+
+        with self.assertRaisesRegex(ValueError, "Pool size"):
+            RandomImageDataset(size=10, pool_size=0)
+
+    def test_get_synthetic_dataloader(self) -> None:
+        dataset = RandomImageDataset(size=10, seed=0)
+        dataloader = get_synthetic_dataloader(dataset, batch_size=4)
+        batches = list(dataloader)
+        self.assertEqual([b["image"].shape[0] for b in batches], [4, 4, 2])
+        for batch, expected in zip(batches, [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]):
+            torch.testing.assert_close(batch, dataset[expected])
+
+        dataloader = get_synthetic_dataloader(
+            dataset, batch_size=4, drop_last=True, num_workers=2
+        )
+        worker_batches = list(dataloader)
+        self.assertEqual(len(worker_batches), 2)
+        torch.testing.assert_close(worker_batches, batches[:2])
@@ -8,8 +8,9 @@
 # pyre-strict
 
 import os
+import time
 import unittest
-from typing import Callable, cast, Literal, Optional, Union
+from typing import Callable, cast, Dict, Literal, Optional, Union
 from unittest.mock import MagicMock, patch
 from urllib.parse import parse_qs, urlparse
 
@@ -22,8 +23,10 @@ from torchtnt.utils.distributed import (
     _validate_global_rank_world_size,
     all_gather_str,
     all_gather_tensors,
+    barrier,
     broadcast_str,
     destroy_process_group,
+    gather_pytree,
     get_file_init_method,
     get_global_rank,
     get_local_rank,
@@ -32,6 +35,7 @@ from torchtnt.utils.distributed import (
     get_process_group_backend_from_device,
     get_tcp_init_method,
     get_world_size,
+    init_hierarchical_process_groups,
     local_rank_zero_fn,
     PGWrapper,
     rank_zero_fn,
@@ -701,3 +705,124 @@ class DistributedTest(unittest.TestCase):
         tc = unittest.TestCase()
         tc.assertEqual(vals[0], "foo")
         tc.assertEqual(vals[1], "barzoo")
+
+    def test_gather_pytree_single_process(self) -> None:
+        tree = {"a": torch.ones(2), "b": [1, "c"]}
+        self.assertEqual(gather_pytree(tree), [tree])
+
+    @skip_if_not_distributed
+    def test_gather_pytree(self) -> None:
+        spawn_multi_process(2, "gloo", self._test_gather_pytree)
+
+    @staticmethod
+    def _test_gather_pytree() -> None:
+        rank = dist.get_rank()
+
+        def get_tree(rank: int) -> Dict[str, object]:
+            # structures and shapes differ across ranks
+            return {
+                "sum": torch.tensor(rank + 0.5, dtype=torch.float64),
+                "mask": torch.tensor([True, False] * (rank + 1)),
+                "values": [torch.full((rank + 1, 2), rank)] * (rank + 1),
+                "count": rank,
+                "empty": torch.empty(0, 3),
+            }
+
+        tc = unittest.TestCase()
+        gathered = gather_pytree(get_tree(rank))
+        for dst in (0, 1):
+            gathered_to_dst = gather_pytree(get_tree(rank), dst=dst)
+            if rank == dst:
+                tc.assertEqual(len(none_throws(gathered_to_dst)), 2)
+            else:
+                tc.assertIsNone(gathered_to_dst)
+
+        tc.assertEqual(len(none_throws(gathered)), 2)
+        for gathered_rank, tree in enumerate(none_throws(gathered)):
+            expected = get_tree(gathered_rank)
+            tc.assertEqual(tree.keys(), expected.keys())
+            tc.assertEqual(tree["count"], gathered_rank)
+            tc.assertEqual(len(tree["values"]), gathered_rank + 1)
+            for key in ("sum", "mask", "empty"):
+                tc.assertEqual(tree[key].dtype, expected[key].dtype)
+                tc.assertTrue(torch.equal(tree[key], expected[key]))
+            for value, expected_value in zip(tree["values"], expected["values"]):
+                tc.assertTrue(torch.equal(value, expected_value))
+
+    @skip_if_not_distributed
+    def test_hierarchical_collectives(self) -> None:
+        spawn_multi_process(4, "gloo", self._test_hierarchical_collectives)
+
+    @staticmethod
+    def _test_hierarchical_collectives() -> None:
+        tc = unittest.TestCase()
+        rank = dist.get_rank()
+
+        # emulate 2 nodes with 2 ranks each
+        hier_pgs = none_throws(init_hierarchical_process_groups(local_world_size=2))
+        tc.assertEqual(hier_pgs.num_nodes, 2)
+        tc.assertEqual(hier_pgs.local_leader, (rank // 2) * 2)
+        tc.assertEqual(hier_pgs.leaders_pg is not None, rank % 2 == 0)
+
+        barrier()
+        tc.assertTrue(sync_bool(rank == 3, coherence_mode="any"))
+        tc.assertFalse(sync_bool(rank != 3, coherence_mode="all"))
+        tc.assertTrue(sync_bool(rank < 2, coherence_mode=2))
+        tc.assertFalse(sync_bool(rank < 2, coherence_mode=0.75))
+        tc.assertTrue(sync_bool(rank == 0, coherence_mode="rank_zero"))
+
+        tc.assertEqual(broadcast_str("foo" if rank == 0 else None), "foo")
+        tc.assertEqual(
+            broadcast_str("foo" if rank == 0 else None, fixed_buffer_size=8), "foo"
+        )
+
+        obj_list = ["foo" if rank == 0 else None]
+        PGWrapper(None).broadcast_object_list(obj_list)
+        tc.assertEqual(obj_list[0], "foo")
+
+    @skip_if_not_distributed
+    def test_hierarchical_collectives_benchmark(self) -> None:
+        latencies = spawn_multi_process(
+            4, "gloo", self._benchmark_control_collectives, num_iters=20
+        )
+        for rank_latencies in latencies:
+            self.assertEqual(
+                set(rank_latencies.keys()),
+                {
+                    "flat/barrier",
+                    "flat/sync_bool",
+                    "flat/broadcast_str",
+                    "hierarchical/barrier",
+                    "hierarchical/sync_bool",
+                    "hierarchical/broadcast_str",
+                },
+            )
+            self.assertTrue(all(v > 0 for v in rank_latencies.values()))
+
+    @staticmethod
+    def _benchmark_control_collectives(num_iters: int) -> Dict[str, float]:
+        """
+        Returns the mean latency in seconds of each control-plane collective,
+        first over the global process group and then routed hierarchically.
+        """
+        rank = dist.get_rank()
+        collectives = {
+            "barrier": lambda: barrier(),
+            "sync_bool": lambda: sync_bool(rank == 0),
+            "broadcast_str": lambda: broadcast_str("foo" if rank == 0 else None),
+        }
+
+        latencies = {}
+        for topology in ("flat", "hierarchical"):
+            if topology == "hierarchical":
+                init_hierarchical_process_groups(local_world_size=2)
+            for name, fn in collectives.items():
+                # warmup
+                fn()
+                start = time.perf_counter()
+                for _ in range(num_iters):
+                    fn()
+                latencies[f"{topology}/{name}"] = (
+                    time.perf_counter() - start
+                ) / num_iters
+        return latencies
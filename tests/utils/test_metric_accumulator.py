@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import unittest
+
+import torch
+from torchtnt.utils.metric_accumulator import MetricAccumulator
+
+
+class MetricAccumulatorTest(unittest.TestCase):
+    def test_metric_accumulator(self) -> None:
+        accumulator = MetricAccumulator(["loss", "grad_norm"], torch.device("cpu"))
+        self.assertIsNone(accumulator.poll())
+
+        for value in (2.0, 1.0, 6.0):
+            accumulator.update("loss", torch.tensor(value, requires_grad=True))
+        accumulator.update("grad_norm", torch.tensor([0.5], dtype=torch.float64))
+        accumulator.stage()
+        self.assertTrue(accumulator.is_staged)
+
+        with self.assertRaisesRegex(RuntimeError, "before staging again"):
+            accumulator.stage()
+
+        # values added after staging belong to the next window
+        accumulator.update("loss", torch.tensor(10.0))
+        self.assertEqual(
+            accumulator.poll(),
+            {
+                "loss/mean": 3.0,
+                "loss/min": 1.0,
+                "loss/max": 6.0,
+                "grad_norm/mean": 0.5,
+                "grad_norm/min": 0.5,
+                "grad_norm/max": 0.5,
+            },
+        )
+        self.assertFalse(accumulator.is_staged)
+        self.assertIsNone(accumulator.poll())
+
+        accumulator.stage()
+        # metrics without values are omitted
+        self.assertEqual(
+            accumulator.poll(block=True),
+            {"loss/mean": 10.0, "loss/min": 10.0, "loss/max": 10.0},
+        )
+
+        # staging without values is a no-op
+        accumulator.stage()
+        self.assertFalse(accumulator.is_staged)
+        self.assertIsNone(accumulator.poll(block=True))
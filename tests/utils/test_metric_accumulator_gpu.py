@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+import torch
+from torchtnt.utils.metric_accumulator import MetricAccumulator
+from torchtnt.utils.test_utils import skip_if_not_gpu
+
+
+class MetricAccumulatorGPUTest(unittest.TestCase):
+    @skip_if_not_gpu
+    @patch("torch.cuda.synchronize")
+    def test_metric_accumulator_no_sync(self, mock_synchronize: MagicMock) -> None:
+        device = torch.device("cuda")
+        accumulator = MetricAccumulator(["loss"], device)
+        self.assertTrue(accumulator._staged_stats.is_pinned())
+
+        with patch.object(
+            torch.Tensor, "item", side_effect=AssertionError("item was called")
+        ):
+            for value in (3.0, 1.0, 2.0):
+                accumulator.update("loss", torch.tensor(value, device=device))
+            accumulator.stage()
+
+        metrics = accumulator.poll(block=True)
+        self.assertEqual(metrics, {"loss/mean": 2.0, "loss/min": 1.0, "loss/max": 3.0})
+        mock_synchronize.assert_not_called()
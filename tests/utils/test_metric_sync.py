@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import unittest
+from typing import Any, Dict, Iterable, List
+
+import torch
+import torch.distributed as dist
+from pyre_extensions import none_throws
+from torchtnt.utils.distributed import spawn_multi_process
+from torchtnt.utils.metric_sync import sync_and_compute_metrics
+from torchtnt.utils.test_utils import skip_if_not_distributed
+
+
+class SumMetric:
+    def __init__(self) -> None:
+        self.total = torch.tensor(0.0)
+
+    def update(self, x: torch.Tensor) -> None:
+        self.total += x.sum()
+
+    def compute(self) -> torch.Tensor:
+        return self.total
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"total": self.total}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        self.total = state_dict["total"].clone()
+
+    def merge_state(self, metrics: Iterable["SumMetric"]) -> "SumMetric":
+        for metric in metrics:
+            self.total += metric.total
+        return self
+
+
+class CatMetric(SumMetric):
+    """Keeps every input, in a list state whose length differs across ranks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.inputs: List[torch.Tensor] = []
+
+    def update(self, x: torch.Tensor) -> None:
+        self.inputs.append(x)
+
+    def compute(self) -> torch.Tensor:
+        return torch.cat(self.inputs).sort().values
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"inputs": self.inputs}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        self.inputs = list(state_dict["inputs"])
+
+    def merge_state(self, metrics: Iterable["SumMetric"]) -> "CatMetric":
+        for metric in metrics:
+            assert isinstance(metric, CatMetric)
+            self.inputs.extend(metric.inputs)
+        return self
+
+
+class NotMergeableMetric:
+    def update(self, x: torch.Tensor) -> None:
+        pass
+
+    def compute(self) -> None:
+        pass
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        pass
+
+
+class MetricSyncTest(unittest.TestCase):
+    def test_single_process(self) -> None:
+        metric = SumMetric()
+        metric.update(torch.arange(4.0))
+        self.assertEqual(sync_and_compute_metrics({"sum": metric}), {"sum": 6.0})
+
+        with self.assertRaisesRegex(TypeError, "merge_state"):
+            # pyre-ignore[6]: testing an invalid metric
+            sync_and_compute_metrics({"metric": NotMergeableMetric()})
+
+    @skip_if_not_distributed
+    def test_sync_and_compute_metrics(self) -> None:
+        spawn_multi_process(2, "gloo", self._test_sync_and_compute_metrics)
+
+    @staticmethod
+    def _test_sync_and_compute_metrics() -> None:
+        rank = dist.get_rank()
+        sum_metric = SumMetric()
+        cat_metric = CatMetric()
+        for i in range(rank + 1):
+            x = torch.tensor([10.0 * rank + i, -1.0])
+            sum_metric.update(x)
+            cat_metric.update(x)
+        metrics = {"sum": sum_metric, "cat": cat_metric}
+
+        tc = unittest.TestCase()
+        # rank 0: [0, -1], rank 1: [10, -1], [11, -1]
+        results = none_throws(sync_and_compute_metrics(metrics))
+        tc.assertEqual(float(results["sum"]), 18.0)
+        tc.assertEqual(results["cat"].tolist(), [-1.0, -1.0, -1.0, 0.0, 10.0, 11.0])
+        # the metrics keep their local states
+        tc.assertEqual(float(sum_metric.compute()), 19.0 if rank == 1 else -1.0)
+
+        results = sync_and_compute_metrics(metrics, rank_zero_only=True)
+        if rank == 0:
+            tc.assertEqual(float(none_throws(results)["sum"]), 18.0)
+        else:
+            tc.assertIsNone(results)
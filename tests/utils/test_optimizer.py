@@ -7,11 +7,19 @@
 
 # pyre-strict
 
+import math
 import unittest
+from typing import List
 
 import torch
+import torch.distributed as dist
+from pyre_extensions import none_throws
+from torch.distributed.device_mesh import init_device_mesh
+from torch.distributed.tensor import distribute_tensor, DTensor, Replicate, Shard
+from torchtnt.utils.distributed import spawn_multi_process
 from torchtnt.utils.env import init_from_env
-from torchtnt.utils.optimizer import init_optim_state
+from torchtnt.utils.optimizer import GradientClipper, init_optim_state
+from torchtnt.utils.test_utils import skip_if_not_distributed
 
 
 class OptimizerTest(unittest.TestCase):
@@ -41,3 +49,106 @@ class OptimizerTest(unittest.TestCase):
                 module.state_dict()["bias"],
             )
         )
+
+    def test_gradient_clipper_matches_torch(self) -> None:
+        for norm_type in (2.0, 1.0, math.inf):
+            params = _get_params_with_grads()
+            expected_params = _get_params_with_grads()
+
+            total_norm = GradientClipper(params, norm_type=norm_type).clip_grad_norm_(
+                max_norm=0.5
+            )
+            expected_total_norm = torch.nn.utils.clip_grad_norm_(
+                expected_params, max_norm=0.5, norm_type=norm_type
+            )
+
+            torch.testing.assert_close(
+                total_norm, expected_total_norm.float(), atol=1e-3, rtol=1e-3
+            )
+            for param, expected_param in zip(params, expected_params):
+                torch.testing.assert_close(param.grad, expected_param.grad)
+
+    def test_gradient_clipper_clip_value(self) -> None:
+        params = _get_params_with_grads()
+        expected_params = _get_params_with_grads()
+
+        GradientClipper(params).clip_grad_value_(clip_value=0.1)
+        torch.nn.utils.clip_grad_value_(expected_params, clip_value=0.1)
+
+        for param, expected_param in zip(params, expected_params):
+            torch.testing.assert_close(param.grad, expected_param.grad)
+
+    def test_gradient_clipper_groups_params_once(self) -> None:
+        params = _get_params_with_grads()
+        grad_clipper = GradientClipper(iter(params))
+        # groups are built from the generator at construction, and skip parameters without gradients
+        self.assertEqual(len(grad_clipper._groups), 2)
+        first_norm = grad_clipper.clip_grad_norm_(max_norm=100.0)
+        second_norm = grad_clipper.clip_grad_norm_(max_norm=100.0)
+        torch.testing.assert_close(first_norm, second_norm)
+
+        no_grad_clipper = GradientClipper([torch.nn.Parameter(torch.ones(2))])
+        torch.testing.assert_close(
+            no_grad_clipper.clip_grad_norm_(max_norm=1.0), torch.tensor(0.0)
+        )
+
+    def test_gradient_clipper_device_without_grads(self) -> None:
+        # ranks without local gradients reduce the norm on the device of the parameters
+        params = [torch.nn.Parameter(torch.ones(2, device="meta"))]
+        total_norm = GradientClipper(params).clip_grad_norm_(max_norm=1.0)
+        self.assertEqual(total_norm.device, torch.device("meta"))
+
+    @skip_if_not_distributed
+    def test_gradient_clipper_sharded(self) -> None:
+        spawn_multi_process(2, "gloo", self._test_gradient_clipper_sharded)
+
+    @staticmethod
+    def _test_gradient_clipper_sharded() -> None:
+        device_mesh = init_device_mesh("cpu", (dist.get_world_size(),))
+        torch.manual_seed(0)
+        full_params = [torch.randn(4, 3), torch.randn(5), torch.randn(2, 2)]
+        full_grads = [torch.randn_like(param) for param in full_params]
+
+        placements = [[Shard(0)], [Shard(0)], [Replicate()]]
+        params: List[torch.Tensor] = []
+        for param, grad, placement in zip(full_params, full_grads, placements):
+            sharded_param = torch.nn.Parameter(
+                distribute_tensor(param, device_mesh, placement)
+            )
+            sharded_param.grad = distribute_tensor(grad, device_mesh, placement)
+            params.append(sharded_param)
+        expected_params = [torch.nn.Parameter(param.clone()) for param in full_params]
+        for param, grad in zip(expected_params, full_grads):
+            param.grad = grad.clone()
+
+        tc = unittest.TestCase()
+        for norm_type in (2.0, math.inf):
+            total_norm = GradientClipper(params, norm_type=norm_type).clip_grad_norm_(
+                max_norm=1.0
+            )
+            expected_total_norm = torch.nn.utils.clip_grad_norm_(
+                expected_params, max_norm=1.0, norm_type=norm_type
+            )
+            tc.assertNotIsInstance(total_norm, DTensor)
+            torch.testing.assert_close(total_norm, expected_total_norm)
+            for param, expected_param in zip(params, expected_params):
+                torch.testing.assert_close(
+                    none_throws(param.grad).full_tensor(), expected_param.grad
+                )
+
+
+def _get_params_with_grads() -> List[torch.Tensor]:
+    generator = torch.Generator().manual_seed(0)
+    params = []
+    for shape, dtype in (
+        ((4, 3), torch.float32),
+        ((7,), torch.float64),
+        ((2, 2), torch.float32),
+        ((3,), torch.float32),
+    ):
+        param = torch.nn.Parameter(torch.zeros(shape, dtype=dtype))
+        param.grad = torch.randn(shape, generator=generator).to(dtype)
+        params.append(param)
+    # a parameter which did not receive gradients
+    params.append(torch.nn.Parameter(torch.zeros(5)))
+    return params
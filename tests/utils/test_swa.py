@@ -7,9 +7,11 @@
 # pyre-strict
 
 import itertools
+import time
 import unittest
 from copy import deepcopy
 from typing import List, Tuple
+from unittest.mock import patch
 
 import torch
 from torchtnt.utils.swa import _AVERAGED_MODEL_AVAIL, AveragedModel
@@ -228,3 +230,243 @@ class TestSWA(unittest.TestCase):
 
         for p_avg, p_swa in zip(averaged_params, averaged_model.parameters()):
             torch.testing.assert_close(p_avg, p_swa, check_device=False)
+
+    def test_ema_steps_per_update(self) -> None:
+        model = torch.nn.Linear(10, 10)
+        ema_decay = 0.9
+        averaged_model = AveragedModel(
+            model, averaging_method="ema", ema_decay=ema_decay, ema_steps_per_update=3
+        )
+
+        averaged_params = [p.detach().clone() for p in model.parameters()]
+        averaged_model.update_parameters(model)
+        for _ in range(5):
+            for p, p_avg in zip(model.parameters(), averaged_params):
+                p.detach().add_(torch.randn_like(p))
+                p_avg.mul_(ema_decay**3).add_(p.detach() * (1 - ema_decay**3))
+            averaged_model.update_parameters(model)
+
+        for p_avg, p_swa in zip(averaged_params, averaged_model.parameters()):
+            torch.testing.assert_close(p_avg, p_swa)
+
+        with self.assertRaisesRegex(ValueError, "only supported for EMA"):
+            AveragedModel(model, averaging_method="swa", ema_steps_per_update=2)
+        with self.assertRaisesRegex(ValueError, "must be a positive integer"):
+            AveragedModel(model, ema_steps_per_update=0)
+
+    def test_mixed_dtypes(self) -> None:
+        model = torch.nn.Sequential(
+            torch.nn.Linear(4, 4), torch.nn.Linear(4, 4).double()
+        )
+        averaged_model = AveragedModel(model, averaging_method="swa")
+        # the averaged copy of the first layer is kept in a different dtype
+        averaged_model.module[0].double()
+
+        averaged_params = [torch.zeros_like(p) for p in model.parameters()]
+        n_updates = 4
+        for _ in range(n_updates):
+            for p, p_avg in zip(model.parameters(), averaged_params):
+                p.detach().add_(torch.randn_like(p))
+                p_avg += p.detach() / n_updates
+            averaged_model.update_parameters(model)
+
+        for p_avg, p_swa in zip(averaged_params, averaged_model.parameters()):
+            self.assertEqual(p_swa.dtype, torch.float64)
+            torch.testing.assert_close(p_avg, p_swa, check_dtype=False)
+
+    def test_load_state_dict_resets_pairs(self) -> None:
+        model = torch.nn.Linear(2, 2)
+        averaged_model = AveragedModel(model, averaging_method="swa")
+        averaged_model.update_parameters(model)
+        averaged_model.update_parameters(model)
+
+        averaged_model2 = AveragedModel(model, averaging_method="swa")
+        averaged_model2.update_parameters(model)
+        # replaces the averaged tensors and n_averaged
+        averaged_model2.load_state_dict(
+            deepcopy(averaged_model.state_dict()), assign=True
+        )
+        with torch.no_grad():
+            model.weight.add_(3)
+        averaged_model.update_parameters(model)
+        averaged_model2.update_parameters(model)
+
+        self.assertEqual(int(averaged_model2.n_averaged), 3)
+        for p_swa, p_swa2 in zip(
+            averaged_model.parameters(), averaged_model2.parameters()
+        ):
+            torch.testing.assert_close(p_swa, p_swa2)
+
+    @unittest.skipUnless(torch.cuda.is_available(), "CUDA is required")
+    def test_update_stream(self) -> None:
+        model = torch.nn.Linear(8, 8, device="cuda")
+        averaged_model = AveragedModel(
+            model,
+            averaging_method="ema",
+            ema_decay=0.5,
+            update_stream=torch.cuda.Stream(),
+        )
+        expected = model.weight.detach().clone()
+        averaged_model.update_parameters(model)
+        for _ in range(3):
+            averaged_model.wait_for_update()
+            with torch.no_grad():
+                model.weight.add_(1)
+            expected.lerp_(model.weight.detach(), 0.5)
+            averaged_model.update_parameters(model)
+
+        torch.testing.assert_close(
+            averaged_model.state_dict()["module.weight"], expected
+        )
+
+    def test_offload_to_cpu(self) -> None:
+        for averaging_method, use_buffers in itertools.product(
+            ["ema", "swa"], [True, False]
+        ):
+            dnn = torch.nn.Sequential(
+                torch.nn.Linear(4, 4),
+                torch.nn.BatchNorm1d(4),
+                torch.nn.Linear(4, 2),
+            )
+            averaged_dnn = AveragedModel(
+                dnn,
+                averaging_method=averaging_method,
+                ema_decay=0.8,
+                use_buffers=use_buffers,
+            )
+            offloaded_dnn = AveragedModel(
+                dnn,
+                averaging_method=averaging_method,
+                ema_decay=0.8,
+                use_buffers=use_buffers,
+                offload_to_cpu=True,
+            )
+            for _ in range(5):
+                for p in dnn.parameters():
+                    p.detach().add_(torch.randn_like(p))
+                dnn(torch.randn(3, 4))
+                averaged_dnn.update_parameters(dnn)
+                offloaded_dnn.update_parameters(dnn)
+
+            for (name, t_avg), (offloaded_name, t_offloaded) in zip(
+                averaged_dnn.state_dict().items(), offloaded_dnn.state_dict().items()
+            ):
+                self.assertEqual(name, offloaded_name)
+                torch.testing.assert_close(t_avg, t_offloaded)
+            x = torch.randn(3, 4)
+            torch.testing.assert_close(averaged_dnn(x), offloaded_dnn(x))
+
+    def test_offload_to_cpu_state_dict(self) -> None:
+        model = torch.nn.Linear(3, 3)
+        offloaded_model = AveragedModel(model, offload_to_cpu=True)
+        offloaded_model.update_parameters(model)
+        with torch.no_grad():
+            model.weight.add_(1)
+        offloaded_model.update_parameters(model)
+
+        # checkpoints of offloaded models can be loaded into regular ones and vice versa
+        averaged_model = AveragedModel(model)
+        averaged_model.load_state_dict(offloaded_model.state_dict())
+        offloaded_model2 = AveragedModel(model, offload_to_cpu=True)
+        offloaded_model2.load_state_dict(averaged_model.state_dict())
+        copied_model = deepcopy(offloaded_model2)
+        for averaged in (averaged_model, offloaded_model2, copied_model):
+            torch.testing.assert_close(
+                averaged.state_dict(), offloaded_model.state_dict()
+            )
+
+        offloaded_model2.update_parameters(model)
+        copied_model.update_parameters(model)
+        self.assertEqual(int(offloaded_model2.state_dict()["n_averaged"]), 3)
+        torch.testing.assert_close(
+            copied_model.state_dict(), offloaded_model2.state_dict()
+        )
+
+    def test_offload_to_cpu_wait_for_update(self) -> None:
+        model = torch.nn.Linear(3, 3)
+        offloaded_model = AveragedModel(
+            model, averaging_method="ema", ema_decay=0.5, offload_to_cpu=True
+        )
+        # the averaged model is a separate copy
+        self.assertNotEqual(
+            offloaded_model.module.weight.data_ptr(), model.weight.data_ptr()
+        )
+        offloaded_model.update_parameters(model)
+
+        update_tensors = offloaded_model._update_tensors
+
+        def slow_update_tensors(*args: object) -> None:
+            time.sleep(0.1)
+            update_tensors(*args)  # pyre-ignore[6]
+
+        expected = model.weight.detach().clone()
+        with torch.no_grad():
+            model.weight.add_(1)
+        expected.lerp_(model.weight.detach(), 0.5)
+        with patch.object(
+            offloaded_model, "_update_tensors", side_effect=slow_update_tensors
+        ):
+            offloaded_model.update_parameters(model)
+            offloaded_model.wait_for_update()
+            torch.testing.assert_close(offloaded_model.module.weight.detach(), expected)
+
+    def test_offload_to_cpu_errors(self) -> None:
+        model = torch.nn.Linear(3, 3)
+        with self.assertRaisesRegex(ValueError, "not supported with skip_deepcopy"):
+            AveragedModel(model, skip_deepcopy=True, offload_to_cpu=True)
+
+        offloaded_model = AveragedModel(model, offload_to_cpu=True)
+        with patch.object(
+            offloaded_model, "_update_tensors", side_effect=ValueError("foo")
+        ):
+            offloaded_model.update_parameters(model)
+        with self.assertRaisesRegex(RuntimeError, "offloaded averaged model failed"):
+            offloaded_model.state_dict()
+
+    @unittest.skipUnless(torch.cuda.is_available(), "CUDA is required")
+    def test_offload_to_cpu_cuda(self) -> None:
+        model = torch.nn.Linear(8, 8, device="cuda")
+        offloaded_model = AveragedModel(
+            model,
+            device=torch.device("cuda"),
+            averaging_method="ema",
+            ema_decay=0.5,
+            offload_to_cpu=True,
+        )
+        self.assertTrue(offloaded_model.module.weight.is_pinned())
+        expected = model.weight.detach().clone()
+        offloaded_model.update_parameters(model)
+        for _ in range(3):
+            with torch.no_grad():
+                model.weight.add_(1)
+            expected.lerp_(model.weight.detach(), 0.5)
+            offloaded_model.update_parameters(model)
+
+        x = torch.randn(2, 8, device="cuda")
+        torch.testing.assert_close(
+            offloaded_model(x), torch.nn.functional.linear(x, expected, model.bias)
+        )
+        self.assertTrue(offloaded_model.module.weight.is_cuda)
+        offloaded_model.update_parameters(model)
+        self.assertTrue(offloaded_model.module.weight.is_cpu)
+
+    def test_dtype(self) -> None:
+        model = torch.nn.Linear(4, 4)
+        averaged_model = AveragedModel(
+            model, averaging_method="ema", ema_decay=0.5, dtype=torch.float64
+        )
+        self.assertEqual(averaged_model.module.weight.dtype, torch.float64)
+
+        expected = model.weight.detach().double()
+        averaged_model.update_parameters(model)
+        for _ in range(3):
+            with torch.no_grad():
+                model.weight.add_(1)
+            expected = expected.lerp(model.weight.detach().double(), 0.5)
+            averaged_model.update_parameters(model)
+        torch.testing.assert_close(averaged_model.module.weight, expected)
+
+        with self.assertRaisesRegex(ValueError, "not supported with skip_deepcopy"):
+            AveragedModel(model, skip_deepcopy=True, dtype=torch.bfloat16)
+        with self.assertRaisesRegex(ValueError, "must be a floating point dtype"):
+            AveragedModel(model, dtype=torch.int64)
@@ -0,0 +1,94 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import contextlib
+from typing import Any, Callable, Generator, List, Optional, Tuple
+
+import torch
+from pyre_extensions import none_throws
+from torch.utils._pytree import tree_flatten, tree_map, TreeSpec
+
+
+def _get_signature(data: object) -> Tuple[TreeSpec, List[object]]:
+    leaves, treespec = tree_flatten(data)
+    return treespec, [
+        (
+            (leaf.shape, leaf.dtype, leaf.device)
+            if isinstance(leaf, torch.Tensor)
+            else leaf
+        )
+        for leaf in leaves
+    ]
+
+
+class _CUDAGraphRunner:
+    """
+    Captures a function of a batch into a CUDA graph and replays it on new batches.
+
+    The batch used for capture is cloned into static input buffers. Replaying copies a new batch
+    into these buffers, so it must have the same structure, shapes, dtypes and devices, and the
+    same non-tensor values. The outputs returned by :meth:`replay` are the static outputs of the
+    graph, which are overwritten by the next replay.
+
+    The methods interacting with CUDA are isolated so that they can be substituted in tests.
+    """
+
+    def __init__(self) -> None:
+        self._graph: Optional[torch.cuda.CUDAGraph] = None
+        self._signature: Optional[Tuple[TreeSpec, List[object]]] = None
+        self._static_inputs: List[object] = []
+        self._static_outputs: Any = None
+
+    @property
+    def is_captured(self) -> bool:
+        return self._signature is not None
+
+    def get_unsupported_reason(self, device: torch.device) -> Optional[str]:
+        if device.type != "cuda":
+            return f"CUDA graphs require a CUDA device, got device type {device.type}"
+        return None
+
+    @contextlib.contextmanager
+    def warmup_context(self) -> Generator[None, None, None]:
+        """Runs eager warmup steps on a side stream, as required before capturing."""
+        stream = torch.cuda.Stream()
+        stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(stream):
+            yield
+        torch.cuda.current_stream().wait_stream(stream)
+
+    def matches(self, data: object) -> bool:
+        """Whether the batch can be processed by replaying the captured graph."""
+        return self._signature == _get_signature(data)
+
+    def capture(self, fn: Callable[[object], Any], data: object) -> None:
+        """Captures ``fn`` applied to a static copy of ``data``. The captured work is not executed."""
+        static_data = tree_map(
+            lambda x: x.clone() if isinstance(x, torch.Tensor) else x, data
+        )
+        self._static_outputs = self._capture_graph(fn, static_data)
+        self._static_inputs = tree_flatten(static_data)[0]
+        self._signature = _get_signature(data)
+
+    def replay(self, data: object) -> Any:
+        """Copies the batch into the static inputs, replays the graph and returns the static outputs."""
+        for static_input, leaf in zip(self._static_inputs, tree_flatten(data)[0]):
+            if isinstance(static_input, torch.Tensor):
+                static_input.copy_(leaf, non_blocking=True)
+        self._replay_graph()
+        return self._static_outputs
+
+    def _capture_graph(self, fn: Callable[[object], Any], static_data: object) -> Any:
+        graph = torch.cuda.CUDAGraph()
+        with torch.cuda.graph(graph):
+            outputs = fn(static_data)
+        self._graph = graph
+        return outputs
+
+    def _replay_graph(self) -> None:
+        none_throws(self._graph).replay()
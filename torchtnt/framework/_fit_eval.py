@@ -0,0 +1,135 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import logging
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+import torch
+from pyre_extensions import none_throws
+from torch.utils.data import DataLoader
+from torch.utils.data.dataloader import _MultiProcessingDataLoaderIter
+from torchtnt.utils.device import copy_data_to_device
+from torchtnt.utils.stateful import Stateful
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _FitEvalDataLoader(Generic[T]):
+    """
+    Wraps the eval dataloader of ``fit`` to make repeated evaluations cheaper.
+
+    Args:
+        dataloader: the eval dataloader.
+        persistent_iterator: whether to keep the worker processes of a multi-process DataLoader alive across
+            evaluations, by resetting its iterator instead of creating a new one.
+        cache_device: if set, the batches of the first evaluation are copied to this device and replayed in the
+            following evaluations instead of iterating the dataloader again.
+    """
+
+    def __init__(
+        self,
+        dataloader: Iterable[T],
+        *,
+        persistent_iterator: bool = False,
+        cache_device: Optional[torch.device] = None,
+    ) -> None:
+        self.dataloader = dataloader
+        self.persistent_iterator = persistent_iterator
+        self.cache_device = cache_device
+
+        self._iterator: Optional[_MultiProcessingDataLoaderIter] = None
+        # batches of the first evaluation, complete once the next evaluation starts
+        self._cached_batches: Optional[List[T]] = None
+        self._cache_complete = False
+
+    def __iter__(self) -> Iterator[T]:
+        if self._cached_batches is not None:
+            # evaluations stopped by max_eval_steps_per_epoch don't exhaust the first pass,
+            # so the batches cached up to here are the fixed eval subset
+            if not self._cache_complete:
+                self._complete_cache()
+            return iter(self._cached_batches)
+
+        data_iter = self._get_iterator()
+        if self.cache_device is None:
+            return data_iter
+        self._cached_batches = []
+        return self._iter_and_cache(data_iter, self._cached_batches)
+
+    def __len__(self) -> int:
+        if self._cache_complete:
+            return len(none_throws(self._cached_batches))
+        # raises TypeError if the dataloader has no length
+        return len(self.dataloader)  # pyre-ignore[6]
+
+    def _get_iterator(self) -> Iterator[T]:
+        dataloader = self.dataloader
+        data_iter = self._iterator
+        if data_iter is not None:
+            data_iter._reset(dataloader)
+            return data_iter
+
+        data_iter = iter(dataloader)
+        if (
+            self.persistent_iterator
+            and isinstance(dataloader, DataLoader)
+            and isinstance(data_iter, _MultiProcessingDataLoaderIter)
+            # the DataLoader already reuses the iterator of persistent workers
+            and not dataloader.persistent_workers
+        ):
+            # keeps the workers alive once the iterator is exhausted, until it is reset
+            data_iter._persistent_workers = True
+            self._iterator = data_iter
+        return data_iter
+
+    def _iter_and_cache(self, data_iter: Iterator[T], batches: List[T]) -> Iterator[T]:
+        device = none_throws(self.cache_device)
+        for batch in data_iter:
+            batch = copy_data_to_device(batch, device)
+            batches.append(batch)
+            yield batch
+        self._complete_cache()
+
+    def _complete_cache(self) -> None:
+        self._cache_complete = True
+        logger.info(
+            f"Cached {len(none_throws(self._cached_batches))} eval batches on {self.cache_device}"
+        )
+
+
+class _StatefulFitEvalDataLoader(_FitEvalDataLoader[T]):
+    """
+    A :class:`_FitEvalDataLoader` of a Stateful dataloader, forwarding its state so that it's still checkpointed.
+    """
+
+    def state_dict(self) -> Dict[str, Any]:
+        # pyre-ignore[16]: the dataloader is Stateful
+        return self.dataloader.state_dict()
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        # pyre-ignore[16]: the dataloader is Stateful
+        self.dataloader.load_state_dict(state_dict)
+
+
+def _wrap_fit_eval_dataloader(
+    dataloader: Iterable[T],
+    *,
+    persistent_iterator: bool = False,
+    cache_device: Optional[torch.device] = None,
+) -> _FitEvalDataLoader[T]:
+    """Wraps the eval dataloader of ``fit`` in a :class:`_FitEvalDataLoader`, which is Stateful if the dataloader is."""
+    cls = (
+        _StatefulFitEvalDataLoader
+        if isinstance(dataloader, Stateful)
+        else _FitEvalDataLoader
+    )
+    return cls(
+        dataloader, persistent_iterator=persistent_iterator, cache_device=cache_device
+    )
@@ -7,7 +7,16 @@
 # pyre-strict
 
 import logging
-from typing import Dict, Iterable, Optional, Protocol, runtime_checkable, TypeVar
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    runtime_checkable,
+    Tuple,
+    TypeVar,
+)
 
 import torch
 import torch.nn as nn
@@ -98,11 +107,47 @@ def _maybe_set_distributed_sampler_epoch(
             dataloader.batch_sampler.set_epoch(current_epoch)
 
 
+# implementations of ``train`` which only set the training mode of the module and its children
+_DEFAULT_TRAIN_METHODS = (nn.Module.train, DistributedDataParallel.train)
+
+
+class _TrainingModes(Dict[str, bool]):
+    """
+    Training modes of tracked modules, along with the training modes of all their submodules, so that resetting
+    restores them exactly without walking the submodules again.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.submodule_modes: Dict[str, List[Tuple[nn.Module, bool]]] = {}
+
+
+def _set_submodule_training_modes(
+    module: nn.Module, mode: bool
+) -> Optional[List[Tuple[nn.Module, bool]]]:
+    """
+    Sets the training mode of ``module`` in a single pass over its submodules, and returns their prior modes.
+    Returns None without changing modes if a submodule customizes ``train`` or ``__setattr__``.
+    """
+    submodules = list(module.modules())
+    if not all(
+        type(m).train in _DEFAULT_TRAIN_METHODS
+        and type(m).__setattr__ is nn.Module.__setattr__
+        for m in submodules
+    ):
+        return None
+    prior_modes = [(m, m.training) for m in submodules]
+    for m in submodules:
+        # equivalent to ``module.train(mode)`` without the overhead of Module.__setattr__
+        object.__setattr__(m, "training", mode)
+    return prior_modes
+
+
 def _set_module_training_mode(
     modules: Dict[str, nn.Module], mode: bool
 ) -> Dict[str, bool]:
     """Returns states to allow for a reset at the end of the loop."""
-    prior_module_train_states = {}
+    prior_module_train_states = _TrainingModes()
     for name, module in modules.items():
         prior_module_train_states[name] = module.training
         is_ddp = isinstance(module, DistributedDataParallel)
@@ -125,7 +170,11 @@ def _set_module_training_mode(
                 # pyre-fixme[16]: `Tensor` has no attribute `training`.
                 module.module.training = mode
         else:
-            module.train(mode)
+            submodule_modes = _set_submodule_training_modes(module, mode)
+            if submodule_modes is not None:
+                prior_module_train_states.submodule_modes[name] = submodule_modes
+            else:
+                module.train(mode)
 
     return prior_module_train_states
 
@@ -136,8 +185,14 @@ def _reset_module_training_mode(
     # Reset training mode for modules at the end of the epoch
     # This ensures that side-effects made by the loop are reset before
     # returning back to the user
+    submodule_modes = (
+        prior_modes.submodule_modes if isinstance(prior_modes, _TrainingModes) else {}
+    )
     for name, module in modules.items():
-        if name in prior_modes:
+        if name in submodule_modes:
+            for submodule, training in submodule_modes[name]:
+                object.__setattr__(submodule, "training", training)
+        elif name in prior_modes:
             is_ddp = isinstance(module, DistributedDataParallel)
 
             if _EXPORT_UTILS_AVAIL and model_is_exported(
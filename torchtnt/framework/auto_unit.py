@@ -8,6 +8,7 @@
 
 
 import contextlib
+import gc
 import logging
 from abc import ABCMeta, abstractmethod
 from copy import deepcopy
@@ -17,6 +18,7 @@ from typing import (
     Callable,
     cast,
     ContextManager,
+    Dict,
     Generic,
     Iterator,
     List,
@@ -28,11 +30,14 @@ from typing import (
 
 import torch
 from pyre_extensions import none_throws
+from torch.distributed import GradBucket, ProcessGroup
+from torch.distributed.algorithms.ddp_comm_hooks.default_hooks import allreduce_hook
 from torch.distributed.fsdp import FSDPModule, FullyShardedDataParallel as FSDP
-from torch.distributed.tensor import DTensor
 from torch.distributed.tensor.parallel.loss import loss_parallel
 from torch.nn.parallel import DistributedDataParallel as DDP
 from torch.optim.swa_utils import SWALR
+from torch.utils._pytree import tree_flatten, tree_unflatten
+from torchtnt.framework._cuda_graph import _CUDAGraphRunner
 from torchtnt.framework.state import ActivePhase, EntryPoint, State
 from torchtnt.framework.unit import (
     EvalUnit,
@@ -45,7 +50,11 @@ from torchtnt.framework.utils import get_timing_context
 from torchtnt.utils.device import copy_data_to_device
 from torchtnt.utils.device_mesh import GlobalMeshCoordinator
 from torchtnt.utils.env import init_from_env
+from torchtnt.utils.loggers.logger import MetricLogger
 from torchtnt.utils.lr_scheduler import TLRScheduler
+from torchtnt.utils.metric_accumulator import MetricAccumulator
+from torchtnt.utils.oom import is_out_of_memory_error
+from torchtnt.utils.optimizer import GradientClipper
 from torchtnt.utils.precision import (
     convert_precision_str_to_dtype,
     get_grad_scaler_from_precision,
@@ -55,6 +64,7 @@ from torchtnt.utils.prepare_module import (
     _is_fsdp1_module,
     _is_fsdp2_module,
     ActivationCheckpointParams,
+    DDPStrategy,
     FSDPStrategy,
     prepare_fsdp,
     prepare_module,
@@ -65,6 +75,18 @@ from torchtnt.utils.prepare_module import (
 from torchtnt.utils.swa import AveragedModel
 from typing_extensions import Literal
 
+try:
+    from torch._dynamo.utils import maybe_enable_compiled_autograd
+except ImportError:
+
+    def maybe_enable_compiled_autograd(
+        val: bool,
+        # pyre-fixme[24]: Generic type `ContextManager` expects 1 type
+        #  parameter.
+    ) -> ContextManager:
+        return contextlib.nullcontext()
+
+
 _logger: logging.Logger = logging.getLogger(__name__)
 
 
@@ -110,6 +132,16 @@ class SWAParams:
             number of updates. The EMA decay will start small and will approach the
             specified ema_decay as more updates occur. The ``averaging_method`` must be
             set to ema.
+        ema_decay_per_step: if True, ``ema_decay`` is the decay per step (or epoch) rather than per update, and is
+            compensated when updating every ``step_or_epoch_update_freq`` steps, so that the averaging horizon doesn't
+            depend on the update frequency. The ``averaging_method`` must be set to ema.
+        update_on_side_stream: if True and training on GPU, the averaged model is updated on a separate CUDA stream,
+            overlapping with the next forward and backward passes. The next optimizer step waits for the update.
+        offload_to_cpu: if True, the averaged model is kept in pinned CPU memory and updated on the CPU in a worker
+            thread, saving the device memory of a copy of the model. It's only uploaded to the device when called,
+            e.g. ``self.swa_model(inputs)``. Not supported with :class:`~torchtnt.utils.prepare_module.FSDPStrategy`.
+        ema_dtype: an optional floating point dtype to keep the averaged model in, e.g. ``torch.bfloat16`` to halve
+            its memory. Not supported with :class:`~torchtnt.utils.prepare_module.FSDPStrategy`.
         swalr_params: params for SWA learning rate scheduler
 
         Note: Whether steps or epochs is used based on what `step_lr_interval` is set on the AutoUnit.
@@ -124,9 +156,83 @@ class SWAParams:
     averaging_method: Literal["ema", "swa"] = "ema"
     ema_decay: float = 0.999
     use_lit: bool = False
+    ema_decay_per_step: bool = False
+    update_on_side_stream: bool = False
+    offload_to_cpu: bool = False
+    ema_dtype: Optional[torch.dtype] = None
     swalr_params: Optional[SWALRParams] = None
 
 
+@dataclass
+class CUDAGraphParams:
+    """
+    Dataclass to store parameters for capturing the train step into a CUDA graph.
+
+    After warmup, the whole train step (forward, backward, gradient clipping, optimizer step and
+    grad scaler update) is captured once, then replayed for every batch with the same structure,
+    shapes and dtypes as the captured one. Other batches, such as a smaller last batch, run eagerly.
+    If the configuration can't be captured, or capturing fails, training continues eagerly with a warning.
+
+    Args:
+        warmup_steps: number of eager train steps to run on a side stream before capturing.
+
+        Note: Capturing requires a CUDA device, no gradient accumulation, no DDP/FSDP wrapping, an optimizer
+        created with ``capturable=True`` if it has that option, tensor learning rates if an LR scheduler is used,
+        and an optimizer which supports AMP scaling (e.g. ``fused=True``) if a grad scaler is used.
+
+        Note: The loss and outputs of replayed steps are static tensors overwritten by the next replay.
+        Clone them to keep them across steps.
+    """
+
+    warmup_steps: int = 3
+
+
+@dataclass
+class TrainStepMetricsParams:
+    """
+    Dataclass to store parameters for aggregating the loss and total gradient norm of train steps without host syncs.
+
+    The loss and total gradient norm (if gradient norm clipping is enabled) of every train step are aggregated on
+    device. Every ``log_every_n_steps`` steps and at the end of every epoch, their mean, min and max are copied to
+    pinned host memory asynchronously. Once the copy has completed, they are written to ``AutoUnit.train_step_metrics``
+    and logged to ``logger`` with the step at which they were copied. This replaces calling ``.item()`` on the results
+    in ``on_train_step_end``, which synchronizes the device in every step.
+
+    Args:
+        log_every_n_steps: number of train steps over which the metrics are aggregated.
+        logger: optional logger to which the metrics are logged, with keys prefixed by ``train/``.
+    """
+
+    log_every_n_steps: int
+    logger: Optional[MetricLogger] = None
+
+
+@dataclass
+class OOMRecoveryParams:
+    """
+    Dataclass to store parameters for recovering from out of memory errors in the train step.
+
+    When the train step raises an out of memory error, the memory is freed and the batch is split into twice as many
+    micro-batches along the leading dimension of its tensors. Their gradients are accumulated, so that the step still
+    counts as a single step with a single optimizer step. Each OOM is logged as a warning and counted in
+    ``AutoUnit.num_oom_recoveries``.
+
+    Args:
+        max_num_splits: maximum number of micro-batches a batch can be split into before the error is raised.
+        max_recovered_steps: number of steps which may recover from an OOM. After that many steps, every later batch is
+            split into as many micro-batches as the last recovered step used, instead of trying the full batch first.
+
+    Note: Only errors raised during the forward pass, or during the backward pass of a step which does not accumulate
+        onto gradients of previous steps, can be recovered. Errors raised later, e.g. in the optimizer step, are raised.
+
+    Note: Not supported with DDP or FSDP modules. Each rank recovers on its own, so a rank splitting its batch would
+        issue a different number of collectives than the other ranks and the job would hang.
+    """
+
+    max_num_splits: int = 8
+    max_recovered_steps: int = 3
+
+
 @dataclass
 class TrainStepResults:
     """
@@ -166,6 +272,9 @@ class _ConfigureOptimizersCaller(ABCMeta):
                     anneal_strategy=swalr_params.anneal_strategy,
                 )
 
+            if x.optimizer_in_backward:
+                x._register_optimizer_in_backward()
+
         return x
 
 
@@ -482,6 +591,13 @@ class AutoUnit(
             This uses more communication but significantly less memory — recommended for large models.
             If False (default), synchronization is skipped during accumulation micro-batches using ``no_sync`` / ``set_requires_gradient_sync(False)``,
             which reduces communication but keeps full unsharded gradients in memory.
+        gradient_accumulation_window: if True, each ``train_step`` processes a full window of ``gradient_accumulation_steps`` micro-batches
+            in a tight loop and updates the weights once, entering the sync, anomaly detection and compiled autograd contexts once per window.
+            ``get_next_train_batch`` returns the list of micro-batches of the window, and ``on_train_step_end`` is called once per window
+            with the summed normalized loss and the list of outputs.
+        gradient_accumulation_window_progress: whether train progress counts ``optimizer_step`` s (one step per window) or ``micro_step`` s
+            when ``gradient_accumulation_window`` is enabled. With ``micro_step``, callbacks still run once per window, so step-based
+            callback intervals should be multiples of ``gradient_accumulation_steps``.
         detect_anomaly: whether to enable anomaly detection for the autograd engine https://pytorch.org/docs/stable/autograd.html#anomaly-detection
         clip_grad_norm: max norm of the gradients for clipping https://pytorch.org/docs/stable/generated/torch.nn.utils.clip_grad_norm_.html
         clip_grad_value: max value of the gradients for clipping https://pytorch.org/docs/stable/generated/torch.nn.utils.clip_grad_value_.html
@@ -498,6 +614,15 @@ class AutoUnit(
         zero_grad_at_train_step_start: if True, the optimizer's gradients will be zeroed at the start of each train step, rather than at the end. Useful if you want to inspect/log the gradients via custom callback.
         global_mesh: an instance of :class:`~torchtnt.utils.device_mesh.GlobalMeshCoordinator` which defines the global mesh topology. Needed to configure TP or 2D parallelism strategies.
         enable_loss_parallel: if True, the loss will be computed in parallel across all ranks. This is only supported for TP strategy + cross entropy loss.
+        cuda_graph_params: params for capturing the train step into a CUDA graph, see :class:`CUDAGraphParams`.
+        optimizer_in_backward: if True, the optimizer step is applied to each parameter as soon as its gradient is ready during
+            the backward pass of steps which update the weights, overlapping it with the rest of the backward pass. Gradients are
+            freed right after their step, unless ``zero_grad_at_train_step_start`` is set. For DDP modules, parameters are stepped
+            when the all-reduce of their bucket completes. Gradient value clipping is applied per parameter, while gradient norm
+            clipping, grad scalers (``fp16`` precision), FSDP, and DDP communication hooks are not supported.
+        oom_recovery_params: params for recovering from out of memory errors in the train step by splitting the batch, see :class:`OOMRecoveryParams`.
+            Not supported with ``gradient_accumulation_window``, ``cuda_graph_params``, ``optimizer_in_backward``, DDP or FSDP.
+        train_step_metrics_params: params for aggregating the loss and total gradient norm without host syncs, see :class:`TrainStepMetricsParams`.
 
     Note:
         Certain strategies, like :class:`~torchtnt.utils.prepare_module.FSDPStrategy` also support mixed precision as an argument, so can be configured through that class as well.
@@ -524,6 +649,10 @@ class AutoUnit(
         precision: Optional[Union[str, torch.dtype]] = None,
         gradient_accumulation_steps: int = 1,
         gradient_accumulation_sync: bool = False,
+        gradient_accumulation_window: bool = False,
+        gradient_accumulation_window_progress: Literal[
+            "optimizer_step", "micro_step"
+        ] = "optimizer_step",
         detect_anomaly: Optional[bool] = None,
         clip_grad_norm: Optional[float] = None,
         clip_grad_value: Optional[float] = None,
@@ -537,6 +666,10 @@ class AutoUnit(
         zero_grad_at_train_step_start: bool = False,
         global_mesh: Optional[GlobalMeshCoordinator] = None,
         enable_loss_parallel: bool = False,
+        cuda_graph_params: Optional[CUDAGraphParams] = None,
+        train_step_metrics_params: Optional[TrainStepMetricsParams] = None,
+        optimizer_in_backward: bool = False,
+        oom_recovery_params: Optional[OOMRecoveryParams] = None,
     ) -> None:
         super().__init__(
             module=module,
@@ -551,6 +684,13 @@ class AutoUnit(
             raise ValueError(
                 f"gradient_accumulation_steps must be > 0. Got {gradient_accumulation_steps}"
             )
+        if gradient_accumulation_window_progress not in (
+            "optimizer_step",
+            "micro_step",
+        ):
+            raise ValueError(
+                f"gradient_accumulation_window_progress must be one of 'optimizer_step' or 'micro_step'. Got {gradient_accumulation_window_progress}"
+            )
 
         self.swa_params: Optional[SWAParams] = swa_params
         self.swa_model: Optional[AveragedModel] = None
@@ -572,6 +712,18 @@ class AutoUnit(
                 ema_decay=swa_params.ema_decay,
                 skip_deepcopy=skip_deepcopy,
                 use_lit=swa_params.use_lit,
+                ema_steps_per_update=(
+                    swa_params.step_or_epoch_update_freq
+                    if swa_params.ema_decay_per_step
+                    else 1
+                ),
+                update_stream=(
+                    torch.cuda.Stream(self.device)
+                    if swa_params.update_on_side_stream and self.device.type == "cuda"
+                    else None
+                ),
+                offload_to_cpu=swa_params.offload_to_cpu,
+                dtype=swa_params.ema_dtype,
             )
 
         self.module: torch.nn.Module = prepare_module(
@@ -595,9 +747,15 @@ class AutoUnit(
 
         self.gradient_accumulation_steps = gradient_accumulation_steps
         self.gradient_accumulation_sync = gradient_accumulation_sync
+        self.gradient_accumulation_window = gradient_accumulation_window
+        self.gradient_accumulation_window_progress: Literal[
+            "optimizer_step", "micro_step"
+        ] = gradient_accumulation_window_progress
 
         self.clip_grad_norm = clip_grad_norm
         self.clip_grad_value = clip_grad_value
+        # parameters are grouped for clipping once, the first time gradients are clipped
+        self._grad_clipper: Optional[GradientClipper] = None
 
         # create autocast context based on precision and device type
 
@@ -617,6 +775,92 @@ class AutoUnit(
             loss_parallel if enable_loss_parallel else contextlib.nullcontext
         )
 
+        self.optimizer_in_backward = optimizer_in_backward
+        if optimizer_in_backward:
+            if clip_grad_norm:
+                raise ValueError(
+                    "optimizer_in_backward does not support clip_grad_norm, which requires all gradients."
+                )
+            if self.grad_scaler is not None:
+                raise ValueError(
+                    "optimizer_in_backward does not support grad scalers, which check all gradients for infs before stepping."
+                )
+            if isinstance(self.module, FSDP) or _is_fsdp2_module(self.module):
+                raise ValueError("optimizer_in_backward does not support FSDP.")
+            if isinstance(strategy, DDPStrategy) and strategy.comm_hook is not None:
+                raise ValueError(
+                    "optimizer_in_backward does not support DDP communication hooks."
+                )
+        # per-parameter optimizers sharing the state of the optimizer, with the param group of each parameter
+        self._optimizers_in_backward: Dict[
+            torch.Tensor, Tuple[torch.optim.Optimizer, Dict[str, Any]]
+        ] = {}
+        # whether the optimizer step should be applied during the current backward pass
+        self._optimizer_in_backward_should_step = False
+
+        if oom_recovery_params is not None:
+            if oom_recovery_params.max_num_splits < 2:
+                raise ValueError(
+                    f"oom_recovery_params.max_num_splits must be > 1. Got {oom_recovery_params.max_num_splits}"
+                )
+            if (
+                gradient_accumulation_window
+                or cuda_graph_params is not None
+                or optimizer_in_backward
+            ):
+                raise ValueError(
+                    "oom_recovery_params is not supported with gradient_accumulation_window, cuda_graph_params or optimizer_in_backward."
+                )
+            if isinstance(self.module, (DDP, FSDP)) or _is_fsdp2_module(self.module):
+                raise ValueError(
+                    "oom_recovery_params is not supported with DDP or FSDP, since ranks would split their batches independently."
+                )
+        self.oom_recovery_params: Optional[OOMRecoveryParams] = oom_recovery_params
+        self.num_oom_recoveries = 0
+        self._num_oom_recovered_steps = 0
+        # number of micro-batches each batch is split into, set after falling back permanently
+        self._oom_num_splits = 1
+        # last phase reached by the current train step, to tell whether an OOM can be recovered
+        self._train_step_phase: Literal["forward", "backward", "update"] = "forward"
+
+        if cuda_graph_params is not None and cuda_graph_params.warmup_steps < 1:
+            raise ValueError(
+                f"cuda_graph_params.warmup_steps must be > 0. Got {cuda_graph_params.warmup_steps}"
+            )
+        self.cuda_graph_params: Optional[CUDAGraphParams] = cuda_graph_params
+        self._cuda_graph_runner: Optional[_CUDAGraphRunner] = (
+            _CUDAGraphRunner() if cuda_graph_params is not None else None
+        )
+        self._cuda_graph_warmup_steps_completed = 0
+        self._cuda_graph_shape_change_logged = False
+        # autocast caching must be disabled when capturing graphs
+        self._cuda_graph_autocast = torch.autocast(
+            device_type=self.device.type,
+            dtype=self.precision,
+            enabled=self.precision is not None,
+            cache_enabled=False,
+        )
+
+        if (
+            train_step_metrics_params is not None
+            and train_step_metrics_params.log_every_n_steps < 1
+        ):
+            raise ValueError(
+                f"train_step_metrics_params.log_every_n_steps must be > 0. Got {train_step_metrics_params.log_every_n_steps}"
+            )
+        self.train_step_metrics_params: Optional[TrainStepMetricsParams] = (
+            train_step_metrics_params
+        )
+        self._train_step_metrics_accumulator: Optional[MetricAccumulator] = (
+            MetricAccumulator(["loss", "total_grad_norm"], self.device)
+            if train_step_metrics_params is not None
+            else None
+        )
+        # step at which the metrics being copied to the host were staged
+        self._train_step_metrics_step = 0
+        # latest aggregated train step metrics available on the host
+        self.train_step_metrics: Dict[str, float] = {}
+
     def __setattr__(self, name: str, value: object) -> None:
         if isinstance(value, torch.nn.Module):
             self._validate_module_attr(name, value)
@@ -688,6 +932,15 @@ class AutoUnit(
         ...
 
     def train_step(self, state: State, data: TData) -> Tuple[torch.Tensor, Any]:
+        if self.gradient_accumulation_window:
+            return self._train_accumulation_window(state, cast(List[TData], data))
+        if self._cuda_graph_runner is not None:
+            return self._cuda_graph_train_step(state, data)
+        if self.oom_recovery_params is not None:
+            return self._oom_resilient_train_step(state, data)
+        return self._eager_train_step(state, data)
+
+    def _eager_train_step(self, state: State, data: TData) -> Tuple[torch.Tensor, Any]:
         should_update_weights = (
             self.train_progress.num_steps_completed_in_epoch + 1
         ) % self.gradient_accumulation_steps == 0 or self._is_last_batch
@@ -740,17 +993,8 @@ class AutoUnit(
             # normalize loss to account for gradient accumulation
             loss = self._normalize_loss_for_gradient_accumulation(loss)
 
-            try:
-                from torch._dynamo.utils import maybe_enable_compiled_autograd
-            except ImportError:
-
-                def maybe_enable_compiled_autograd(
-                    val: bool,
-                    # pyre-fixme[24]: Generic type `ContextManager` expects 1 type
-                    #  parameter.
-                ) -> ContextManager:
-                    return contextlib.nullcontext()
-
+            self._optimizer_in_backward_should_step = should_update_weights
+            self._train_step_phase = "backward"
             with maybe_enable_compiled_autograd(self.enable_compiled_autograd):
                 if grad_scaler:
                     scaled_loss = grad_scaler.scale(loss)
@@ -772,9 +1016,255 @@ class AutoUnit(
 
         step = self.train_progress.num_steps_completed
         results = TrainStepResults(loss, total_grad_norm, outputs)
+        self._update_train_step_metrics(step, results)
         self.on_train_step_end(state, data, step, results)
         return loss, outputs
 
+    def _train_accumulation_window(
+        self, state: State, window: List[TData]
+    ) -> Tuple[torch.Tensor, Any]:
+        """
+        Runs forward and backward on every micro-batch of the window, then updates the weights once.
+        """
+        if self._weight_updated_in_prev_step and self.zero_grad_at_train_step_start:
+            self.zero_grad(state)
+            self._weight_updated_in_prev_step = False
+
+        module = self.module
+        # gradient sync is only needed for the last micro-batch of the window
+        skip_sync = len(window) > 1 and not self.gradient_accumulation_sync
+        is_fsdp2_module = _is_fsdp2_module(module)
+        maybe_no_sync = (
+            module.no_sync()
+            if skip_sync and (isinstance(module, DDP) or isinstance(module, FSDP))
+            else contextlib.nullcontext()
+        )
+        detect_anomaly = self.detect_anomaly
+        maybe_detect_anomaly = (
+            torch.autograd.set_detect_anomaly(detect_anomaly)
+            if detect_anomaly is not None
+            else contextlib.nullcontext()
+        )
+
+        losses = []
+        outputs = []
+        with get_timing_context(
+            state, f"{self.__class__.__name__}.accumulation_window"
+        ):
+            with maybe_detect_anomaly, self.maybe_loss_parallel():
+                with maybe_enable_compiled_autograd(self.enable_compiled_autograd):
+                    if skip_sync and is_fsdp2_module:
+                        cast(FSDPModule, module).set_requires_gradient_sync(False)
+                    # leave the no-sync region for the last micro-batch
+                    num_no_sync_micro_batches = (
+                        len(window) - 1 if skip_sync else len(window)
+                    )
+                    with maybe_no_sync:
+                        for i, micro_batch in enumerate(
+                            window[:num_no_sync_micro_batches]
+                        ):
+                            self._optimizer_in_backward_should_step = (
+                                i == len(window) - 1
+                            )
+                            loss, micro_batch_outputs = self._accumulate_micro_batch(
+                                state, micro_batch
+                            )
+                            losses.append(loss)
+                            outputs.append(micro_batch_outputs)
+
+                    if skip_sync:
+                        if is_fsdp2_module:
+                            cast(FSDPModule, module).set_requires_gradient_sync(True)
+                        self._optimizer_in_backward_should_step = True
+                        loss, micro_batch_outputs = self._accumulate_micro_batch(
+                            state, window[-1]
+                        )
+                        losses.append(loss)
+                        outputs.append(micro_batch_outputs)
+
+        if self.gradient_accumulation_window_progress == "micro_step":
+            # the train loop increments progress once per train_step
+            for _ in range(len(window) - 1):
+                self.train_progress.increment_step()
+
+        total_grad_norm = self._update_weights(state)
+
+        window_loss = torch.stack(losses).sum()
+        step = self.train_progress.num_steps_completed
+        results = TrainStepResults(window_loss, total_grad_norm, outputs)
+        self._update_train_step_metrics(step, results)
+        self.on_train_step_end(state, cast(TData, window), step, results)
+        return window_loss, outputs
+
+    def _accumulate_micro_batch(
+        self, state: State, micro_batch: TData, loss_weight: float = 1.0
+    ) -> Tuple[torch.Tensor, Any]:
+        with self.maybe_autocast_precision:
+            with get_timing_context(state, f"{self.__class__.__name__}.compute_loss"):
+                loss, outputs = self.compute_loss(state, micro_batch)
+        loss = self._normalize_loss_for_gradient_accumulation(loss)
+        if loss_weight != 1.0:
+            loss = loss * loss_weight
+        self._train_step_phase = "backward"
+        grad_scaler = self.grad_scaler
+        with get_timing_context(state, f"{self.__class__.__name__}.backward"):
+            if grad_scaler:
+                grad_scaler.scale(loss).backward(
+                    retain_graph=self.loss_backward_retain_graph
+                )
+            else:
+                loss.backward(retain_graph=self.loss_backward_retain_graph)
+        return loss.detach(), outputs
+
+    def _oom_resilient_train_step(
+        self, state: State, data: TData
+    ) -> Tuple[torch.Tensor, Any]:
+        oom_recovery_params = none_throws(self.oom_recovery_params)
+        num_splits = self._oom_num_splits
+        # gradients of previous steps can't be told apart from partial gradients of this step
+        accumulates_on_previous_grads = (
+            self.train_progress.num_steps_completed_in_epoch
+            % self.gradient_accumulation_steps
+            != 0
+        )
+        while True:
+            self._train_step_phase = "forward"
+            try:
+                if num_splits == 1:
+                    return self._eager_train_step(state, data)
+                results = self._split_train_step(state, data, num_splits)
+                break
+            except Exception as e:
+                if not (
+                    is_out_of_memory_error(e)
+                    and (
+                        self._train_step_phase == "forward"
+                        or (
+                            self._train_step_phase == "backward"
+                            and not accumulates_on_previous_grads
+                        )
+                    )
+                    and num_splits * 2 <= oom_recovery_params.max_num_splits
+                    and num_splits < _get_batch_size(data)
+                ):
+                    raise
+            # recover outside of the except block, which references the tensors of the failed attempt
+            num_splits *= 2
+            self.num_oom_recoveries += 1
+            _logger.warning(
+                f"Out of memory in the train step, retrying with the batch split into {num_splits} micro-batches. "
+                f"Recovered from {self.num_oom_recoveries} out of memory errors so far."
+            )
+            if not accumulates_on_previous_grads:
+                none_throws(self.optimizer).zero_grad(set_to_none=True)
+            gc.collect()
+            if self.device.type == "cuda":
+                torch.cuda.empty_cache()
+
+        if num_splits > self._oom_num_splits:
+            self._num_oom_recovered_steps += 1
+            if self._num_oom_recovered_steps >= oom_recovery_params.max_recovered_steps:
+                _logger.warning(
+                    f"Recovered from out of memory errors in {self._num_oom_recovered_steps} steps, "
+                    f"splitting every batch into {num_splits} micro-batches from now on."
+                )
+                self._oom_num_splits = num_splits
+        return results
+
+    def _split_train_step(
+        self, state: State, data: TData, num_splits: int
+    ) -> Tuple[torch.Tensor, Any]:
+        """
+        Runs forward and backward on micro-batches of the batch, then updates the weights like a single train step.
+        """
+        should_update_weights = (
+            self.train_progress.num_steps_completed_in_epoch + 1
+        ) % self.gradient_accumulation_steps == 0 or self._is_last_batch
+
+        if self._weight_updated_in_prev_step and self.zero_grad_at_train_step_start:
+            self.zero_grad(state)
+            self._weight_updated_in_prev_step = False
+
+        module = self.module
+        micro_batches = _split_batch(data, num_splits)
+        batch_size = sum(size for _, size in micro_batches)
+        # gradient sync is only needed for the last micro-batch of a step which updates the weights
+        skip_sync = not self.gradient_accumulation_sync
+        sync_last_micro_batch = skip_sync and should_update_weights
+        is_fsdp2_module = _is_fsdp2_module(module)
+        detect_anomaly = self.detect_anomaly
+        maybe_detect_anomaly = (
+            torch.autograd.set_detect_anomaly(detect_anomaly)
+            if detect_anomaly is not None
+            else contextlib.nullcontext()
+        )
+
+        losses = []
+        outputs = []
+        with maybe_detect_anomaly, self.maybe_loss_parallel():
+            with maybe_enable_compiled_autograd(self.enable_compiled_autograd):
+                for i, (micro_batch, size) in enumerate(micro_batches):
+                    is_last_micro_batch = i == len(micro_batches) - 1
+                    sync = not skip_sync or (
+                        is_last_micro_batch and sync_last_micro_batch
+                    )
+                    if is_fsdp2_module and skip_sync:
+                        cast(FSDPModule, module).set_requires_gradient_sync(sync)
+                    maybe_no_sync = (
+                        module.no_sync()
+                        if not sync and isinstance(module, (DDP, FSDP))
+                        else contextlib.nullcontext()
+                    )
+                    with maybe_no_sync:
+                        loss, micro_batch_outputs = self._accumulate_micro_batch(
+                            state, micro_batch, loss_weight=size / batch_size
+                        )
+                    losses.append(loss)
+                    outputs.append(micro_batch_outputs)
+
+        total_grad_norm = None
+        if should_update_weights:
+            total_grad_norm = self._update_weights(state)
+
+        loss = torch.stack(losses).sum()
+        merged_outputs = _concat_outputs(outputs)
+        step = self.train_progress.num_steps_completed
+        results = TrainStepResults(loss, total_grad_norm, merged_outputs)
+        self._update_train_step_metrics(step, results)
+        self.on_train_step_end(state, data, step, results)
+        return loss, merged_outputs
+
+    def _get_next_accumulation_window(
+        self, state: State, data_iter: Iterator[TData]
+    ) -> List[TData]:
+        window_size = self.gradient_accumulation_steps
+        if self.gradient_accumulation_window_progress == "micro_step":
+            # don't run past the step limits of the train loop
+            train_state = none_throws(state.train_state)
+            progress = self.train_progress
+            if train_state.max_steps_per_epoch is not None:
+                window_size = min(
+                    window_size,
+                    train_state.max_steps_per_epoch
+                    - progress.num_steps_completed_in_epoch,
+                )
+            if train_state.max_steps is not None:
+                window_size = min(
+                    window_size, train_state.max_steps - progress.num_steps_completed
+                )
+
+        window = []
+        for _ in range(window_size):
+            try:
+                window.append(self._get_next_batch(state, data_iter))
+            except StopIteration:
+                break
+            if self._is_last_batch:
+                break
+        if not window:
+            raise StopIteration
+        return window
+
     def _normalize_loss_for_gradient_accumulation(
         self, loss: torch.Tensor
     ) -> torch.Tensor:
@@ -803,6 +1293,47 @@ class AutoUnit(
         """
         pass
 
+    def _update_train_step_metrics(self, step: int, results: TrainStepResults) -> None:
+        accumulator = self._train_step_metrics_accumulator
+        if accumulator is None:
+            return
+        accumulator.update("loss", results.loss)
+        if results.total_grad_norm is not None:
+            accumulator.update("total_grad_norm", results.total_grad_norm)
+
+        self._publish_train_step_metrics(accumulator.poll())
+        # progress is incremented after the train step
+        num_steps_completed = step + 1
+        if (
+            num_steps_completed
+            % none_throws(self.train_step_metrics_params).log_every_n_steps
+            == 0
+        ):
+            # the previous copy completed long ago, so this doesn't wait for the current step
+            self._publish_train_step_metrics(accumulator.poll(block=True))
+            accumulator.stage()
+            self._train_step_metrics_step = num_steps_completed
+
+    def _flush_train_step_metrics(self) -> None:
+        accumulator = self._train_step_metrics_accumulator
+        if accumulator is None:
+            return
+        self._publish_train_step_metrics(accumulator.poll(block=True))
+        accumulator.stage()
+        self._train_step_metrics_step = self.train_progress.num_steps_completed
+        self._publish_train_step_metrics(accumulator.poll(block=True))
+
+    def _publish_train_step_metrics(self, metrics: Optional[Dict[str, float]]) -> None:
+        if metrics is None:
+            return
+        self.train_step_metrics = metrics
+        logger = none_throws(self.train_step_metrics_params).logger
+        if logger is not None:
+            logger.log_dict(
+                {f"train/{name}": value for name, value in metrics.items()},
+                self._train_step_metrics_step,
+            )
+
     def on_train_epoch_end(self, state: State) -> None:
         """
         Note: if overriding ``on_train_epoch_end``, remember to call ``super().on_train_epoch_end()``
@@ -811,6 +1342,7 @@ class AutoUnit(
             # number of epochs is incremented before calling this, so we're offsetting by 1
             self._update_lr_and_swa(state, self.train_progress.num_epochs_completed - 1)
 
+        self._flush_train_step_metrics()
         self._is_last_batch = False
 
     def eval_step(self, state: State, data: TData) -> Tuple[torch.Tensor, Any]:
@@ -939,6 +1471,32 @@ class AutoUnit(
         """
         Updates weights of the module, handles clip gradient norm, etc.
 
+        Returns total norm of the parameter gradients, if gradient norm clipping is enabled.
+        """
+        self._train_step_phase = "update"
+        total_grad_norm = None
+        # with optimizer_in_backward, the weights were updated during the backward pass
+        if not self.optimizer_in_backward:
+            total_grad_norm = self._clip_gradients_and_step_optimizer(state)
+
+        if self.zero_grad_at_train_step_start:
+            # mark that weights were updated in this step
+            # so in next step we know to zero the gradients
+            self._weight_updated_in_prev_step = True
+        else:
+            self.zero_grad(state)
+
+        if self.step_lr_interval == "step":
+            self._update_lr_and_swa(state, self.train_progress.num_steps_completed)
+
+        return total_grad_norm
+
+    def _clip_gradients_and_step_optimizer(
+        self, state: State
+    ) -> Optional[torch.Tensor]:
+        """
+        Clips gradients and steps the optimizer and grad scaler.
+
         Returns total norm of the parameter gradients, if gradient norm clipping is enabled.
         """
         module = self.module
@@ -965,25 +1523,19 @@ class AutoUnit(
                 with get_timing_context(
                     state, f"{self.__class__.__name__}.clip_grad_norm"
                 ):
-                    total_grad_norm = torch.nn.utils.clip_grad_norm_(
-                        parameters=module.parameters(),
-                        max_norm=clip_grad_norm,
+                    total_grad_norm = self._get_grad_clipper().clip_grad_norm_(
+                        max_norm=clip_grad_norm
                     )
-                    # If sharded, collect the DTensor here
-                    if isinstance(total_grad_norm, DTensor):
-                        total_grad_norm = total_grad_norm.full_tensor()
 
         # gradient value clipping
         if clip_grad_value:
             with get_timing_context(
                 state, f"{self.__class__.__name__}.clip_grad_value"
             ):
-                torch.nn.utils.clip_grad_value_(
-                    parameters=module.parameters(),
-                    clip_value=clip_grad_value,
-                )
+                self._get_grad_clipper().clip_grad_value_(clip_value=clip_grad_value)
 
         with get_timing_context(state, f"{self.__class__.__name__}.optimizer_step"):
+            self._wait_for_swa_update()
             if grad_scaler:
                 grad_scaler.step(optimizer)
                 # update the scale for next iteration
@@ -991,17 +1543,196 @@ class AutoUnit(
             else:
                 optimizer.step()
 
-        if self.zero_grad_at_train_step_start:
-            # mark that weights were updated in this step
-            # so in next step we know to zero the gradients
-            self._weight_updated_in_prev_step = True
+        return total_grad_norm
+
+    def _register_optimizer_in_backward(self) -> None:
+        optimizer = none_throws(self.optimizer)
+        for group in optimizer.param_groups:
+            for param in group["params"]:
+                param_optimizer = type(optimizer)(
+                    [{**group, "params": [param]}], **optimizer.defaults
+                )
+                # share the state so that the optimizer's state dict includes the states of all parameters
+                param_optimizer.state = optimizer.state
+                self._optimizers_in_backward[param] = (param_optimizer, group)
+
+        module = self.module
+        if isinstance(module, DDP):
+            # gradients must be all-reduced before stepping
+            module.register_comm_hook(
+                state=module.process_group, hook=self._optimizer_in_backward_comm_hook
+            )
         else:
-            self.zero_grad(state)
+            for param in self._optimizers_in_backward:
+                param.register_post_accumulate_grad_hook(
+                    self._optimizer_in_backward_hook
+                )
+
+    def _optimizer_in_backward_hook(self, param: torch.Tensor) -> None:
+        if not self._optimizer_in_backward_should_step:
+            return
+        self._step_parameter(param)
+        if not self.zero_grad_at_train_step_start:
+            # free the gradient as early as possible
+            param.grad = None
+
+    def _optimizer_in_backward_comm_hook(
+        self, process_group: ProcessGroup, bucket: GradBucket
+    ) -> torch.futures.Future[torch.Tensor]:
+        def step(fut: torch.futures.Future[torch.Tensor]) -> torch.Tensor:
+            if self._optimizer_in_backward_should_step:
+                for param, grad in zip(bucket.parameters(), bucket.gradients()):
+                    if param in self._optimizers_in_backward:
+                        # DDP writes the bucket to the gradients only at the end of the backward pass
+                        param.grad = grad
+                        self._step_parameter(param)
+            return fut.value()
+
+        return allreduce_hook(process_group, bucket).then(step)
+
+    def _step_parameter(self, param: torch.Tensor) -> None:
+        self._wait_for_swa_update()
+        param_optimizer, group = self._optimizers_in_backward[param]
+        clip_grad_value = self.clip_grad_value
+        if clip_grad_value:
+            none_throws(param.grad).clamp_(-clip_grad_value, clip_grad_value)
+        # pick up changes to the param group, e.g. from the LR scheduler
+        param_group = param_optimizer.param_groups[0]
+        for key, value in group.items():
+            if key != "params":
+                param_group[key] = value
+        param_optimizer.step()
+
+    def _get_grad_clipper(self) -> GradientClipper:
+        grad_clipper = self._grad_clipper
+        if grad_clipper is None:
+            grad_clipper = GradientClipper(self.module.parameters())
+            self._grad_clipper = grad_clipper
+        return grad_clipper
+
+    def _cuda_graph_train_step(
+        self, state: State, data: TData
+    ) -> Tuple[torch.Tensor, Any]:
+        # wait outside of the graph, which updates the weights in place
+        self._wait_for_swa_update()
+        runner = none_throws(self._cuda_graph_runner)
+        if runner.is_captured:
+            if runner.matches(data):
+                return self._replay_cuda_graph(state, data)
+            if not self._cuda_graph_shape_change_logged:
+                _logger.warning(
+                    "Batch does not match the batch captured in the CUDA graph, running the train step eagerly. "
+                    "This is logged only once."
+                )
+                self._cuda_graph_shape_change_logged = True
+            # gradients of the graph are written, not accumulated, so clear them for the eager step
+            none_throws(self.optimizer).zero_grad(set_to_none=False)
+            self._weight_updated_in_prev_step = False
+            return self._eager_train_step(state, data)
+
+        unsupported_reason = self._get_cuda_graph_unsupported_reason()
+        if unsupported_reason is not None:
+            self._disable_cuda_graph(unsupported_reason)
+            return self._eager_train_step(state, data)
+
+        if (
+            self._cuda_graph_warmup_steps_completed
+            < none_throws(self.cuda_graph_params).warmup_steps
+        ):
+            with runner.warmup_context():
+                results = self._eager_train_step(state, data)
+            self._cuda_graph_warmup_steps_completed += 1
+            return results
+
+        # gradients must be unset so that the graph allocates and writes them
+        optimizer = none_throws(self.optimizer)
+        optimizer.zero_grad(set_to_none=True)
+        self._weight_updated_in_prev_step = False
+        # timers may synchronize the device, which is not allowed while capturing
+        timer = state._timer
+        state._timer = None
+        try:
+            with get_timing_context(
+                state, f"{self.__class__.__name__}.cuda_graph_capture"
+            ):
+                runner.capture(lambda x: self._graphed_train_step(state, x), data)
+        except Exception as e:
+            optimizer.zero_grad(set_to_none=True)
+            self._disable_cuda_graph(f"capturing the train step failed with: {e}")
+            return self._eager_train_step(state, data)
+        finally:
+            state._timer = timer
+
+        # capturing only records the step, replay it to run it
+        return self._replay_cuda_graph(state, data)
+
+    def _graphed_train_step(
+        self, state: State, data: TData
+    ) -> Tuple[torch.Tensor, Any, Optional[torch.Tensor]]:
+        with self._cuda_graph_autocast:
+            loss, outputs = self.compute_loss(state, data)
+        loss = self._normalize_loss_for_gradient_accumulation(loss)
+        grad_scaler = self.grad_scaler
+        if grad_scaler:
+            grad_scaler.scale(loss).backward(
+                retain_graph=self.loss_backward_retain_graph
+            )
+        else:
+            loss.backward(retain_graph=self.loss_backward_retain_graph)
+        total_grad_norm = self._clip_gradients_and_step_optimizer(state)
+        return loss, outputs, total_grad_norm
 
+    def _replay_cuda_graph(self, state: State, data: TData) -> Tuple[torch.Tensor, Any]:
+        runner = none_throws(self._cuda_graph_runner)
+        with get_timing_context(state, f"{self.__class__.__name__}.cuda_graph_replay"):
+            loss, outputs, total_grad_norm = runner.replay(data)
+
+        # gradients are overwritten by every replay, so they are not zeroed
         if self.step_lr_interval == "step":
             self._update_lr_and_swa(state, self.train_progress.num_steps_completed)
 
-        return total_grad_norm
+        step = self.train_progress.num_steps_completed
+        results = TrainStepResults(loss, total_grad_norm, outputs)
+        self._update_train_step_metrics(step, results)
+        self.on_train_step_end(state, data, step, results)
+        return loss, outputs
+
+    def _get_cuda_graph_unsupported_reason(self) -> Optional[str]:
+        reason = none_throws(self._cuda_graph_runner).get_unsupported_reason(
+            self.device
+        )
+        if reason is not None:
+            return reason
+        if self.gradient_accumulation_steps > 1:
+            return "gradient accumulation is not supported"
+        if self.detect_anomaly:
+            return "anomaly detection is not supported"
+        if self.enable_compiled_autograd:
+            return "compiled autograd is not supported"
+        if self.optimizer_in_backward:
+            return "optimizer in backward is not supported"
+        module = self.module
+        if isinstance(module, (DDP, FSDP)) or _is_fsdp2_module(module):
+            return "DDP and FSDP modules are not supported"
+        optimizer = none_throws(self.optimizer)
+        if optimizer.defaults.get("capturable") is False:
+            return "the optimizer must be created with capturable=True"
+        if self.grad_scaler and not getattr(
+            optimizer, "_step_supports_amp_scaling", False
+        ):
+            return "a grad scaler requires an optimizer which supports AMP scaling, e.g. with fused=True"
+        if (self.lr_scheduler or self.swa_scheduler) and any(
+            not isinstance(group["lr"], torch.Tensor)
+            for group in optimizer.param_groups
+        ):
+            return "LR schedulers require tensor learning rates, otherwise the learning rate is frozen in the graph"
+        return None
+
+    def _disable_cuda_graph(self, reason: str) -> None:
+        _logger.warning(
+            f"Disabling CUDA graph capture of the train step and running it eagerly: {reason}"
+        )
+        self._cuda_graph_runner = None
 
     # pyrefly: ignore [bad-override]
     def get_next_train_batch(
@@ -1010,6 +1741,8 @@ class AutoUnit(
         # Override the default behavior from PredictUnit in order to enable prefetching if possible.
         if self._train_step_requires_iterator:
             return data_iter
+        if self.gradient_accumulation_window:
+            return cast(TData, self._get_next_accumulation_window(state, data_iter))
         return self._get_next_batch(state, data_iter)
 
     # pyrefly: ignore [bad-override]
@@ -1062,6 +1795,12 @@ class AutoUnit(
         ):
             none_throws(self.swa_model).update_parameters(self.module)
 
+    def _wait_for_swa_update(self) -> None:
+        # the averaged model may still be reading the weights on its update stream
+        swa_model = self.swa_model
+        if swa_model is not None:
+            swa_model.wait_for_update(source_only=True)
+
     def _update_lr_and_swa(self, state: State, number_of_steps_or_epochs: int) -> None:
         if self._should_update_swa():
             self._update_swa(state)
@@ -1081,3 +1820,62 @@ class AutoUnit(
                     state, f"{self.__class__.__name__}.lr_scheduler_step"
                 ):
                     self.step_lr_scheduler()
+
+
+def _get_batch_size(data: object) -> int:
+    for leaf in tree_flatten(data)[0]:
+        if isinstance(leaf, torch.Tensor) and leaf.dim() > 0:
+            return leaf.shape[0]
+    return 1
+
+
+def _split_batch(data: TData, num_splits: int) -> List[Tuple[TData, int]]:
+    """
+    Splits the tensors of a batch along their leading dimension into at most ``num_splits`` micro-batches,
+    returned with their sizes. Tensors whose leading dimension differs from the batch size, and other leaves,
+    are shared by all micro-batches.
+    """
+    leaves, treespec = tree_flatten(data)
+    batch_size = _get_batch_size(data)
+    split_leaves = [
+        (
+            torch.tensor_split(leaf, num_splits)
+            if isinstance(leaf, torch.Tensor)
+            and leaf.dim() > 0
+            and leaf.shape[0] == batch_size
+            else None
+        )
+        for leaf in leaves
+    ]
+    sizes = [
+        len(split) for split in torch.tensor_split(torch.arange(batch_size), num_splits)
+    ]
+    micro_batches = []
+    for i, size in enumerate(sizes):
+        if size == 0:
+            continue
+        micro_batch_leaves = [
+            leaf if split is None else split[i]
+            for leaf, split in zip(leaves, split_leaves)
+        ]
+        micro_batches.append((tree_unflatten(micro_batch_leaves, treespec), size))
+    return micro_batches
+
+
+def _concat_outputs(outputs: List[Any]) -> Any:
+    """
+    Concatenates the outputs of micro-batches into the outputs of the batch if they are pytrees of tensors with the
+    same structure, otherwise returns the list of outputs.
+    """
+    flat_outputs = [tree_flatten(output) for output in outputs]
+    treespec = flat_outputs[0][1]
+    if any(spec != treespec for _, spec in flat_outputs) or not all(
+        isinstance(leaf, torch.Tensor) and leaf.dim() > 0
+        for leaves, _ in flat_outputs
+        for leaf in leaves
+    ):
+        return outputs
+    return tree_unflatten(
+        [torch.cat(leaves) for leaves in zip(*(leaves for leaves, _ in flat_outputs))],
+        treespec,
+    )
@@ -0,0 +1,328 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import gc
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, TypeVar
+
+import torch
+from torch.distributed.fsdp import FullyShardedDataParallel as FSDP
+from torch.nn.parallel import DistributedDataParallel as DDP
+from torch.utils._pytree import tree_flatten, tree_map
+from torchtnt.framework.auto_unit import AutoUnit
+from torchtnt.framework.state import EntryPoint, PhaseState, State
+from torchtnt.utils.device import copy_data_to_device
+from torchtnt.utils.distributed import get_world_size, sync_bool
+from torchtnt.utils.oom import is_out_of_memory_error
+from torchtnt.utils.prepare_module import _is_fsdp2_module
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+TData = TypeVar("TData")
+
+
+@dataclass
+class BatchSizeTuningResult:
+    """
+    Result of :func:`tune_batch_size`.
+
+    Args:
+        batch_size: the selected per-rank micro-batch size.
+        gradient_accumulation_steps: number of micro-batches to accumulate to reach the target global batch size.
+        global_batch_size: the global batch size obtained with ``batch_size`` and ``gradient_accumulation_steps``.
+        max_batch_size: the largest micro-batch size for which a train step fits in memory.
+        throughputs: samples per second of a rank for every measured micro-batch size.
+    """
+
+    batch_size: int
+    gradient_accumulation_steps: int
+    global_batch_size: int
+    max_batch_size: int
+    throughputs: Dict[int, float] = field(default_factory=dict)
+
+
+def tune_batch_size(
+    auto_unit: AutoUnit[TData],
+    sample: TData,
+    *,
+    target_global_batch_size: int,
+    min_batch_size: int = 1,
+    max_batch_size: Optional[int] = None,
+    num_candidates: int = 3,
+    num_warmup_steps: int = 1,
+    num_steps: int = 3,
+) -> BatchSizeTuningResult:
+    """
+    Finds the micro-batch size and number of gradient accumulation steps which maximize the throughput of the train
+    step of ``auto_unit`` for a target global batch size, without running out of memory.
+
+    Synthetic batches of any size are built by repeating the rows of ``sample`` along the batch dimension. The tuner
+    binary-searches the largest micro-batch size for which a train step doesn't raise an out of memory error, measures
+    the throughput of the ``num_candidates`` largest fitting micro-batch sizes which divide the per-rank target batch
+    size, and selects the fastest one. All ranks must call this function with the same arguments, and the selected
+    sizes must be applied by the caller, e.g. to the dataloader and the ``gradient_accumulation_steps`` of the AutoUnit.
+
+    The module, optimizer and LR scheduler states and the progress of the AutoUnit are restored after tuning, but the
+    train steps still run the ``on_train_step_end`` hook. OOM recovery and CUDA graph capture are disabled while
+    tuning, since the search relies on out of memory errors and on batches of varying sizes, and the train step
+    metrics are not aggregated.
+
+    DDP and FSDP modules are not supported: a rank running out of memory in the middle of a train step would skip
+    collectives which the other ranks wait for. Modules whose train step runs no collectives can be tuned on several
+    ranks, an out of memory error on any rank rules the micro-batch size out on all ranks.
+
+    Args:
+        auto_unit: the AutoUnit whose train step is tuned.
+        sample: a batch whose leading dimension is the batch dimension of every tensor.
+        target_global_batch_size: global batch size to reach across all ranks and accumulated micro-batches.
+            Must be divisible by the world size.
+        min_batch_size: smallest micro-batch size to try.
+        max_batch_size: largest micro-batch size to try. Defaults to the per-rank target batch size.
+        num_candidates: number of micro-batch sizes whose throughput is measured.
+        num_warmup_steps: number of untimed train steps run before measuring the throughput of a micro-batch size.
+        num_steps: number of timed train steps per micro-batch size.
+
+    Raises:
+        RuntimeError: if a train step with ``min_batch_size`` runs out of memory.
+        ValueError: if the module of the AutoUnit is wrapped with DDP or FSDP.
+
+    Example::
+
+        result = tune_batch_size(my_auto_unit, next(iter(dataloader)), target_global_batch_size=1024)
+        dataloader = DataLoader(dataset, batch_size=result.batch_size)
+        my_auto_unit.gradient_accumulation_steps = result.gradient_accumulation_steps
+    """
+    module = auto_unit.module
+    if isinstance(module, (DDP, FSDP)) or _is_fsdp2_module(module):
+        raise ValueError(
+            "tune_batch_size doesn't support DDP or FSDP modules, whose train step runs collectives."
+        )
+    world_size = get_world_size()
+    if target_global_batch_size % world_size != 0:
+        raise ValueError(
+            f"target_global_batch_size must be divisible by the world size {world_size}. Got {target_global_batch_size}."
+        )
+    per_rank_batch_size = target_global_batch_size // world_size
+    max_batch_size = max_batch_size or per_rank_batch_size
+    if not 0 < min_batch_size <= max_batch_size:
+        raise ValueError(
+            f"min_batch_size must be > 0 and <= max_batch_size. Got {min_batch_size} and {max_batch_size}."
+        )
+    if num_candidates < 1 or num_steps < 1:
+        raise ValueError(
+            f"num_candidates and num_steps must be > 0. Got {num_candidates} and {num_steps}."
+        )
+
+    state = State(
+        entry_point=EntryPoint.TRAIN,
+        train_state=PhaseState(dataloader=[]),
+        timer=None,
+    )
+    snapshot = _snapshot_app_state(auto_unit)
+    gradient_accumulation_steps = auto_unit.gradient_accumulation_steps
+    oom_recovery_params = auto_unit.oom_recovery_params
+    cuda_graph_runner = auto_unit._cuda_graph_runner
+    train_step_metrics_accumulator = auto_unit._train_step_metrics_accumulator
+    # every train step runs forward, backward and the optimizer step
+    auto_unit.gradient_accumulation_steps = 1
+    # out of memory errors must be raised, and batches of every size run eagerly
+    auto_unit.oom_recovery_params = None
+    auto_unit._cuda_graph_runner = None
+    # the synthetic steps must not be aggregated with the steps of training
+    auto_unit._train_step_metrics_accumulator = None
+    try:
+        max_fitting_batch_size = _search_max_batch_size(
+            auto_unit, state, sample, min_batch_size, max_batch_size
+        )
+        candidates = _get_candidates(max_fitting_batch_size, per_rank_batch_size)[
+            :num_candidates
+        ]
+        throughputs = {}
+        for batch_size in candidates:
+            throughputs[batch_size] = _measure_throughput(
+                auto_unit, state, sample, batch_size, num_warmup_steps, num_steps
+            )
+    finally:
+        auto_unit.gradient_accumulation_steps = gradient_accumulation_steps
+        auto_unit.oom_recovery_params = oom_recovery_params
+        auto_unit._cuda_graph_runner = cuda_graph_runner
+        auto_unit._train_step_metrics_accumulator = train_step_metrics_accumulator
+        _restore_app_state(auto_unit, snapshot)
+
+    # prefer larger batches when throughputs are equal
+    batch_size = max(throughputs, key=lambda b: (throughputs[b], b))
+    result = BatchSizeTuningResult(
+        batch_size=batch_size,
+        gradient_accumulation_steps=per_rank_batch_size // batch_size,
+        global_batch_size=target_global_batch_size,
+        max_batch_size=max_fitting_batch_size,
+        throughputs=throughputs,
+    )
+    logger.info(get_batch_size_tuning_summary(result))
+    return result
+
+
+def get_batch_size_tuning_summary(result: BatchSizeTuningResult) -> str:
+    """Formats the result of :func:`tune_batch_size` as a table of the measured throughputs."""
+    lines = [
+        f"Largest micro-batch size which fits in memory: {result.max_batch_size}",
+        f"{'batch size':>12} {'grad accum steps':>18} {'samples/s':>12}",
+    ]
+    per_rank_batch_size = result.batch_size * result.gradient_accumulation_steps
+    for batch_size, throughput in result.throughputs.items():
+        selected = " *" if batch_size == result.batch_size else ""
+        lines.append(
+            f"{batch_size:>12} {per_rank_batch_size // batch_size:>18} {throughput:>12.1f}{selected}"
+        )
+    lines.append(
+        f"Selected batch_size={result.batch_size}, gradient_accumulation_steps={result.gradient_accumulation_steps} "
+        f"for a global batch size of {result.global_batch_size}"
+    )
+    return "\n".join(lines)
+
+
+def _search_max_batch_size(
+    auto_unit: AutoUnit[TData],
+    state: State,
+    sample: TData,
+    min_batch_size: int,
+    max_batch_size: int,
+) -> int:
+    if not _fits_in_memory(auto_unit, state, sample, min_batch_size):
+        raise RuntimeError(
+            f"A train step with the minimum batch size {min_batch_size} runs out of memory."
+        )
+    # grow exponentially to bound the search, then bisect
+    fits, does_not_fit = min_batch_size, max_batch_size + 1
+    batch_size = min_batch_size * 2
+    while batch_size < does_not_fit:
+        if not _fits_in_memory(auto_unit, state, sample, batch_size):
+            does_not_fit = batch_size
+            break
+        fits = batch_size
+        batch_size *= 2
+    while does_not_fit - fits > 1:
+        batch_size = (fits + does_not_fit) // 2
+        if _fits_in_memory(auto_unit, state, sample, batch_size):
+            fits = batch_size
+        else:
+            does_not_fit = batch_size
+    return fits
+
+
+def _fits_in_memory(
+    auto_unit: AutoUnit[TData], state: State, sample: TData, batch_size: int
+) -> bool:
+    try:
+        _train_step(auto_unit, state, _get_synthetic_batch(sample, batch_size))
+        fits = True
+    except Exception as e:
+        if not is_out_of_memory_error(e):
+            raise
+        fits = False
+    # an out of memory error on any rank rules the batch size out on all ranks
+    fits = sync_bool(fits, coherence_mode="all")
+    _free_memory(auto_unit)
+    if not fits:
+        logger.info(f"Micro-batch size {batch_size} runs out of memory")
+    return fits
+
+
+def _measure_throughput(
+    auto_unit: AutoUnit[TData],
+    state: State,
+    sample: TData,
+    batch_size: int,
+    num_warmup_steps: int,
+    num_steps: int,
+) -> float:
+    batch = _get_synthetic_batch(sample, batch_size)
+    for _ in range(num_warmup_steps):
+        _train_step(auto_unit, state, batch)
+    _synchronize(auto_unit.device)
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        _train_step(auto_unit, state, batch)
+    _synchronize(auto_unit.device)
+    elapsed = time.perf_counter() - start
+    _free_memory(auto_unit)
+    return batch_size * num_steps / max(elapsed, 1e-9)
+
+
+def _train_step(auto_unit: AutoUnit[TData], state: State, batch: TData) -> None:
+    batch = copy_data_to_device(batch, auto_unit.device)
+    # pyre-ignore[6]: window mode takes the list of micro-batches
+    auto_unit.train_step(
+        state, [batch] if auto_unit.gradient_accumulation_window else batch
+    )
+
+
+def _get_synthetic_batch(sample: TData, batch_size: int) -> TData:
+    """Repeats the rows of every tensor of ``sample`` to ``batch_size`` rows."""
+    leaves, _ = tree_flatten(sample)
+    sample_sizes = {
+        leaf.shape[0]
+        for leaf in leaves
+        if isinstance(leaf, torch.Tensor) and leaf.dim()
+    }
+    if len(sample_sizes) != 1:
+        raise ValueError(
+            f"All tensors of the sample must have the same leading batch dimension. Got sizes {sample_sizes}."
+        )
+    indices = torch.arange(batch_size) % sample_sizes.pop()
+    return tree_map(
+        lambda x: (
+            x[indices.to(x.device)] if isinstance(x, torch.Tensor) and x.dim() else x
+        ),
+        sample,
+    )
+
+
+def _free_memory(auto_unit: AutoUnit[TData]) -> None:
+    optimizer = auto_unit.optimizer
+    if optimizer is not None:
+        optimizer.zero_grad(set_to_none=True)
+    auto_unit._weight_updated_in_prev_step = False
+    gc.collect()
+    if auto_unit.device.type == "cuda":
+        torch.cuda.empty_cache()
+
+
+def _synchronize(device: torch.device) -> None:
+    if device.type == "cuda":
+        torch.cuda.synchronize(device)
+
+
+def _snapshot_app_state(auto_unit: AutoUnit[TData]) -> Dict[str, Any]:
+    # kept on the CPU so that the snapshot doesn't take device memory
+    return {
+        key: tree_map(
+            lambda x: (
+                x.detach().to("cpu", copy=True) if isinstance(x, torch.Tensor) else x
+            ),
+            stateful.state_dict(),
+        )
+        for key, stateful in auto_unit.app_state().items()
+    }
+
+
+def _restore_app_state(auto_unit: AutoUnit[TData], snapshot: Dict[str, Any]) -> None:
+    app_state = auto_unit.app_state()
+    for key, state_dict in snapshot.items():
+        app_state[key].load_state_dict(state_dict)
+    _free_memory(auto_unit)
+
+
+def _get_candidates(max_batch_size: int, per_rank_batch_size: int) -> List[int]:
+    return [
+        batch_size
+        for batch_size in range(max_batch_size, 0, -1)
+        if per_rank_batch_size % batch_size == 0
+    ]
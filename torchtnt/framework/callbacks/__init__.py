@@ -6,7 +6,9 @@
 
 # pyre-strict
 
+from .async_evaluator import AsyncEvalResult, AsyncEvaluator
 from .base_csv_writer import BaseCSVWriter
+from .columnar_prediction_writer import ColumnarPredictionWriter
 from .dcp_saver import DistributedCheckpointSaver
 from .early_stopping import EarlyStopping
 from .empty_cuda_cache import EmptyCudaCache
@@ -29,10 +31,14 @@ from .time_wait_for_batch_logger import TimeWaitForBatchLogger
 from .torch_compile import TorchCompile
 from .torchsnapshot_saver import TorchSnapshotSaver
 from .tqdm_progress_bar import TQDMProgressBar
+from .tracked_metrics_sync import TrackedMetricsSync
 from .train_progress_monitor import TrainProgressMonitor
 
 __all__ = [
+    "AsyncEvalResult",
+    "AsyncEvaluator",
     "BaseCSVWriter",
+    "ColumnarPredictionWriter",
     "EarlyStopping",
     "EmptyCudaCache",
     "EnableTensorFloat32",
@@ -54,6 +60,7 @@ __all__ = [
     "TorchCompile",
     "TorchSnapshotSaver",
     "TQDMProgressBar",
+    "TrackedMetricsSync",
     "TrainProgressMonitor",
     "DistributedCheckpointSaver",
 ]
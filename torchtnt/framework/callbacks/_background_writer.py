@@ -0,0 +1,70 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import queue
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+_STOP = object()
+
+
+class _BackgroundWriter(Generic[T]):
+    """
+    Applies ``write_fn`` to submitted items in order on a background thread.
+
+    The queue of pending items is bounded, so that :meth:`submit` blocks when the writer falls behind instead of
+    accumulating unbounded memory. An error raised by ``write_fn`` stops the writer and is raised by the next call to
+    :meth:`submit` or :meth:`close`.
+    """
+
+    def __init__(self, write_fn: Callable[[T], None], max_queue_size: int) -> None:
+        self._write_fn = write_fn
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue_size)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: T) -> None:
+        self._raise_error()
+        self._queue.put(item)
+
+    def wait(self) -> None:
+        """Waits for the pending items to be written."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Waits for the pending items to be written and stops the thread."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._raise_error()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            try:
+                if self._error is None:
+                    # pyre-ignore[6]: items other than the sentinel are submitted items
+                    self._write_fn(item)
+                # otherwise the queue is drained so that producers don't block
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        error = self._error
+        if error is not None:
+            self._error = None
+            raise RuntimeError("Background writer failed") from error
@@ -0,0 +1,293 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import contextlib
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import torch
+from pyre_extensions import none_throws
+from torch import nn
+from torch.nn.parallel import DistributedDataParallel
+from torchtnt.framework.callback import Callback
+from torchtnt.framework.callbacks.base_checkpointer import BaseCheckpointer
+from torchtnt.framework.state import State
+from torchtnt.framework.unit import TEvalUnit, TPredictUnit, TTestUnit, TTrainUnit
+from torchtnt.utils.loggers.logger import MetricLogger
+from torchtnt.utils.swa import AveragedModel
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AsyncEvalResult:
+    """
+    Metrics of an evaluation run by :class:`AsyncEvaluator`.
+
+    Args:
+        train_step: number of train steps completed when the weights were copied.
+        train_epoch: number of train epochs completed when the weights were copied.
+        metrics: the metrics returned by ``metrics_fn`` after the evaluation.
+    """
+
+    train_step: int
+    train_epoch: int
+    metrics: Dict[str, float]
+
+
+class AsyncEvaluator(Callback):
+    """
+    A callback to evaluate a copy of the model while training continues, instead of stopping training for the whole eval epoch.
+
+    Every ``evaluate_every_n_steps`` train steps, the parameters and buffers of the train module, or of its SWA/EMA
+    :class:`~torchtnt.utils.swa.AveragedModel`, are copied into the module of ``eval_unit``, which must be a separate copy of
+    the model. The :py:func:`~torchtnt.framework.evaluate` loop then runs ``eval_unit`` on a background thread, on a separate
+    CUDA stream if the module is on GPU. At most one evaluation runs at a time: the result of an evaluation is collected before
+    the next one starts, waiting for it if needed, and at the end of training. Collecting results at the same steps on every
+    rank keeps any collective they run in sync.
+
+    The metrics returned by ``metrics_fn`` are tagged with the train step of the copied weights, logged with ``metric_logger``
+    and available in :attr:`results`. If ``checkpointer`` is set, the metric monitored by its ``best_checkpoint_config`` is
+    reported to it with :meth:`~torchtnt.framework.callbacks.BaseCheckpointer.record_delayed_metric`, so the checkpoint saved
+    at the train step of the weights is tracked for optimality.
+
+    Args:
+        eval_unit: the unit evaluating the copy of the model.
+        eval_dataloader: dataloader to be used during evaluation.
+        evaluate_every_n_steps: how often to start an evaluation in terms of training steps.
+        metrics_fn: function returning the metrics of ``eval_unit`` once an evaluation is done. It runs on the background thread.
+        source_module_fn: function returning the module whose weights are evaluated from the train unit. Defaults to the
+            ``swa_model`` of the unit if it is set, e.g. for an :class:`~torchtnt.framework.auto_unit.AutoUnit` using SWA or EMA,
+            and otherwise to its ``module``.
+        eval_module_fn: function returning the module into which the weights are copied from ``eval_unit``. Defaults to its
+            ``module``.
+        max_steps_per_epoch: the max number of steps to run per evaluation. None means evaluate until the dataloader is exhausted.
+        checkpointer: an optional checkpointer tracking the best checkpoints with the metric of its ``best_checkpoint_config``.
+        metric_logger: an optional logger to log the metrics to at the train step of the evaluated weights.
+
+    Note:
+        The weights are copied tensor by tensor, so both modules must have the same parameters and buffers, which must not be
+        sharded, e.g. with FSDP. The evaluation runs concurrently with the training loop in the same process, so ``eval_unit``
+        should not run collectives on the process group used by training.
+
+    Example::
+
+        eval_unit = MyEvalUnit(module=copy.deepcopy(module))
+        async_evaluator = AsyncEvaluator(
+            eval_unit,
+            eval_dataloader,
+            evaluate_every_n_steps=1000,
+            metrics_fn=lambda unit: {"val_loss": unit.compute_loss()},
+            checkpointer=checkpointer,
+        )
+        train(train_unit, train_dataloader, callbacks=[async_evaluator, checkpointer])
+    """
+
+    def __init__(
+        self,
+        eval_unit: TEvalUnit,
+        eval_dataloader: Iterable[Any],
+        *,
+        evaluate_every_n_steps: int,
+        metrics_fn: Callable[[TEvalUnit], Mapping[str, Union[float, torch.Tensor]]],
+        source_module_fn: Optional[Callable[[TTrainUnit], nn.Module]] = None,
+        eval_module_fn: Optional[Callable[[TEvalUnit], nn.Module]] = None,
+        max_steps_per_epoch: Optional[int] = None,
+        checkpointer: Optional[BaseCheckpointer] = None,
+        metric_logger: Optional[MetricLogger] = None,
+    ) -> None:
+        if evaluate_every_n_steps <= 0:
+            raise ValueError(
+                f"Invalid value passed for evaluate_every_n_steps. Expected to receive a positive number, but received {evaluate_every_n_steps}"
+            )
+        self.eval_unit = eval_unit
+        self.eval_dataloader = eval_dataloader
+        self.evaluate_every_n_steps = evaluate_every_n_steps
+        self.metrics_fn = metrics_fn
+        self.source_module_fn: Callable[[TTrainUnit], nn.Module] = (
+            source_module_fn or _get_source_module
+        )
+        self.eval_module_fn: Callable[[TEvalUnit], nn.Module] = eval_module_fn or (
+            lambda unit: unit.module
+        )
+        self.max_steps_per_epoch = max_steps_per_epoch
+        self.checkpointer = checkpointer
+        self.metric_logger = metric_logger
+        if checkpointer is not None:
+            checkpointer.expect_delayed_metrics()
+
+        self.results: List[AsyncEvalResult] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional["Future[AsyncEvalResult]"] = None
+        # pairs of source and eval tensors, computed on the first copy
+        self._tensor_pairs: Optional[Tuple[List[torch.Tensor], List[torch.Tensor]]] = (
+            None
+        )
+        self._stream: Optional[torch.cuda.Stream] = None
+
+    def on_train_step_end(self, state: State, unit: TTrainUnit) -> None:
+        train_progress = unit.train_progress
+        if train_progress.num_steps_completed % self.evaluate_every_n_steps != 0:
+            return
+        self._collect_result()
+        self._copy_weights(unit)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="async_eval"
+            )
+        self._pending = self._executor.submit(
+            self._evaluate,
+            train_progress.num_steps_completed,
+            train_progress.num_epochs_completed,
+        )
+
+    def on_train_end(self, state: State, unit: TTrainUnit) -> None:
+        self._collect_result()
+        self._shutdown()
+
+    def on_exception(
+        self,
+        state: State,
+        unit: Union[TTrainUnit, TEvalUnit, TPredictUnit, TTestUnit],
+        exc: BaseException,
+    ) -> None:
+        self._shutdown()
+
+    @torch.no_grad()
+    def _copy_weights(self, unit: TTrainUnit) -> None:
+        source_module = self.source_module_fn(unit)
+        if isinstance(source_module, AveragedModel):
+            # the averaged tensors may still be updated on the update stream or in the offload worker thread
+            source_module.wait_for_update()
+
+        tensor_pairs = self._tensor_pairs
+        if tensor_pairs is None:
+            eval_module = _unwrap(self.eval_module_fn(self.eval_unit))
+            tensor_pairs = _get_tensor_pairs(_unwrap(source_module), eval_module)
+            self._tensor_pairs = tensor_pairs
+            if tensor_pairs[1] and tensor_pairs[1][0].is_cuda:
+                self._stream = torch.cuda.Stream(device=tensor_pairs[1][0].device)
+
+        source_tensors, eval_tensors = tensor_pairs
+        stream = self._stream
+        if stream is None:
+            torch._foreach_copy_(eval_tensors, source_tensors)
+            return
+        current_stream = torch.cuda.current_stream(stream.device)
+        stream.wait_stream(current_stream)
+        with torch.cuda.stream(stream):
+            torch._foreach_copy_(eval_tensors, source_tensors, non_blocking=True)
+        # the next optimizer step only waits for the copy, not for the evaluation queued after it
+        current_stream.wait_stream(stream)
+
+    def _evaluate(self, train_step: int, train_epoch: int) -> AsyncEvalResult:
+        # imported here since the entry points import the callbacks package
+        from torchtnt.framework.evaluate import evaluate
+
+        stream = self._stream
+        stream_context: ContextManager[object] = (
+            torch.cuda.stream(stream)
+            if stream is not None
+            else contextlib.nullcontext()
+        )
+        with stream_context:
+            evaluate(
+                self.eval_unit,
+                self.eval_dataloader,
+                max_steps_per_epoch=self.max_steps_per_epoch,
+            )
+            metrics = {
+                name: float(value)
+                for name, value in self.metrics_fn(self.eval_unit).items()
+            }
+        return AsyncEvalResult(
+            train_step=train_step, train_epoch=train_epoch, metrics=metrics
+        )
+
+    def _collect_result(self) -> None:
+        pending = self._pending
+        if pending is None:
+            return
+        self._pending = None
+        try:
+            result = pending.result()
+        except Exception as e:
+            raise RuntimeError("Asynchronous evaluation failed") from e
+
+        logger.info(
+            f"Asynchronous evaluation of train step {result.train_step}: {result.metrics}"
+        )
+        self.results.append(result)
+        if self.metric_logger is not None:
+            self.metric_logger.log_dict(result.metrics, result.train_step)
+        checkpointer = self.checkpointer
+        if checkpointer is not None:
+            monitored_metric = none_throws(
+                checkpointer._best_checkpoint_config
+            ).monitored_metric
+            if monitored_metric in result.metrics:
+                checkpointer.record_delayed_metric(
+                    result.train_step, result.metrics[monitored_metric]
+                )
+            else:
+                logger.error(
+                    f"Metrics of asynchronous evaluation don't include monitored metric {monitored_metric}."
+                )
+
+    def _shutdown(self) -> None:
+        executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _get_source_module(unit: TTrainUnit) -> nn.Module:
+    swa_model = getattr(unit, "swa_model", None)
+    if swa_model is not None:
+        return swa_model
+    return unit.module
+
+
+def _unwrap(module: nn.Module) -> nn.Module:
+    while isinstance(module, (DistributedDataParallel, AveragedModel)):
+        module = module.module
+    return module
+
+
+def _get_tensor_pairs(
+    source_module: nn.Module, eval_module: nn.Module
+) -> Tuple[List[torch.Tensor], List[torch.Tensor]]:
+    source_tensors = [*source_module.parameters(), *source_module.buffers()]
+    eval_tensors = [*eval_module.parameters(), *eval_module.buffers()]
+    if len(source_tensors) != len(eval_tensors) or any(
+        source.shape != target.shape
+        for source, target in zip(source_tensors, eval_tensors)
+    ):
+        raise ValueError(
+            "The eval module must have the same parameters and buffers as the train module."
+        )
+    if any(
+        source.data_ptr() == target.data_ptr()
+        for source, target in zip(source_tensors, eval_tensors)
+    ):
+        raise ValueError("The eval module must be a separate copy of the train module.")
+    # the source tensors aren't detached, since an offloaded averaged model swaps their data when uploaded
+    return source_tensors, [tensor.detach() for tensor in eval_tensors]
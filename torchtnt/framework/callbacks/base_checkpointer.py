@@ -32,6 +32,7 @@ from torchtnt.framework.unit import (
 from torchtnt.utils.checkpoint import (
     BestCheckpointConfig,
     CheckpointManager,
+    CheckpointPath,
     get_best_checkpoint_path,
     get_latest_checkpoint_path,
     MetricData,
@@ -83,6 +84,10 @@ class BaseCheckpointer(Callback, metaclass=abc.ABCMeta):
         If best_checkpoint_config is enabled, the attribute must be on the unit upon checkpoint time, and must be castable to "float". This value must be maintained by the unit, and updated
         appropriately. For example, if logging validation accuracy, the unit must be responsible for maintaining the value and resetting it when the epoch ends. If the metric value is None, the
         checkpoint will be saved, without the metric value in the checkpoint name
+
+    Note:
+        If the monitored metric is computed after the checkpoints it applies to, e.g. by asynchronous evaluation, call :meth:`expect_delayed_metrics`
+        and report the metric with :meth:`record_delayed_metric` instead of maintaining the attribute on the unit.
     """
 
     # No metadata file is checked by default. This can be overridden by subclasses.
@@ -146,6 +151,11 @@ class BaseCheckpointer(Callback, metaclass=abc.ABCMeta):
         self._keep_last_n_checkpoints = keep_last_n_checkpoints
         self._best_checkpoint_config = best_checkpoint_config
 
+        # checkpoints and metric values of delayed metrics waiting for each other, by train step
+        self._delayed_metrics = False
+        self._checkpoints_without_metric: Dict[int, CheckpointPath] = {}
+        self._metrics_without_checkpoint: Dict[int, float] = {}
+
         self._process_group: Optional[dist.ProcessGroup] = None
         self._setup_gloo_pg(process_group)
         self._pg_wrapper = PGWrapper(process_group)
@@ -225,9 +235,14 @@ class BaseCheckpointer(Callback, metaclass=abc.ABCMeta):
 
             # 1.1) append metric data only if best_checkpoint_config is defined
             metric_data: Optional[MetricData] = None
-            if self._best_checkpoint_config and (
-                metric_value := self._get_tracked_metric_value(cast(TTrainUnit, unit))
-            ):
+            train_step = step_mapping.get(Phase.TRAIN)
+            if self._delayed_metrics and train_step is not None:
+                metric_value = self._pop_delayed_metric_value(train_step)
+            elif self._best_checkpoint_config:
+                metric_value = self._get_tracked_metric_value(cast(TTrainUnit, unit))
+            else:
+                metric_value = None
+            if metric_value:
                 metric_data = MetricData(
                     name=none_throws(self._best_checkpoint_config).monitored_metric,
                     value=metric_value,
@@ -242,7 +257,14 @@ class BaseCheckpointer(Callback, metaclass=abc.ABCMeta):
 
             # 2) Determine if we should save checkpoint. This is a no-op for eval and predict entrypoints
             # since neither best_checkpoint_config nor keep_last_n_checkpoints are supported.
-            if not self._checkpoint_manager.should_save_checkpoint(checkpoint_path):
+            # A checkpoint waiting for a delayed metric is always saved, its optimality is known later.
+            awaits_delayed_metric = (
+                self._delayed_metrics and train_step is not None and metric_data is None
+            )
+            if not (
+                awaits_delayed_metric
+                or self._checkpoint_manager.should_save_checkpoint(checkpoint_path)
+            ):
                 return False
 
             if hook == "on_train_end":
@@ -280,13 +302,131 @@ class BaseCheckpointer(Callback, metaclass=abc.ABCMeta):
                 return False
 
             # 4) track checkpoint and clean up surplus if needed
-            self._checkpoint_manager.append_checkpoint(checkpoint_path)
+            if awaits_delayed_metric:
+                self._checkpoints_without_metric[none_throws(train_step)] = (
+                    checkpoint_path
+                )
+            else:
+                self._checkpoint_manager.append_checkpoint(checkpoint_path)
 
             # 5) invoke on_checkpoint_save callback on the unit since checkpoint was saved successfully
             unit.on_checkpoint_save(state, checkpoint_id=checkpoint_path.path)
 
             return True
 
+    def expect_delayed_metrics(self) -> None:
+        """
+        Marks the metric monitored by ``best_checkpoint_config`` as computed after the checkpoints it applies to, e.g. by
+        :class:`~torchtnt.framework.callbacks.AsyncEvaluator`. The metric is then not read off the unit, checkpoints are saved
+        without metric and tracked for optimality once :meth:`record_delayed_metric` reports the metric of their train step.
+
+        If ``keep_last_n_checkpoints`` is set, checkpoints saved without metric by a previous run, e.g. before a restart, are
+        treated like checkpoints waiting for a delayed metric. Must be called on all ranks.
+
+        Raises:
+            ValueError: if ``best_checkpoint_config`` is not set.
+        """
+        if self._best_checkpoint_config is None:
+            raise ValueError("Delayed metrics require a best_checkpoint_config.")
+        self._delayed_metrics = True
+        if self._keep_last_n_checkpoints:
+            for ckpt in self._checkpoint_manager.get_checkpoints_without_metric():
+                train_step = ckpt.step.get(Phase.TRAIN)
+                if train_step is not None:
+                    self._checkpoints_without_metric.setdefault(train_step, ckpt)
+
+    def record_delayed_metric(self, train_step: int, value: float) -> None:
+        """
+        Records the value of the monitored metric for the weights after ``train_step`` train steps. The checkpoint saved at that
+        step is renamed to include the metric and tracked for optimality, which may delete the least optimal checkpoint. If the
+        checkpoint of that step is not saved yet, the value is used when it is saved. Checkpoints of earlier steps which didn't
+        receive a metric won't receive one anymore: if ``keep_last_n_checkpoints`` is set, they are deleted, except for the
+        latest checkpoint which is kept to resume from. Otherwise, they are kept but not tracked, like checkpoints whose
+        metric is None.
+
+        Must be called on all ranks, the value of rank 0 is used.
+
+        Raises:
+            RuntimeError: if :meth:`expect_delayed_metrics` wasn't called.
+        """
+        if not self._delayed_metrics:
+            raise RuntimeError(
+                "expect_delayed_metrics must be called before recording delayed metrics."
+            )
+        # the checkpoint of the step may still be written in the background, and must not be renamed or deleted before
+        self._wait_for_pending_checkpoint()
+        values = [value]
+        self._pg_wrapper.broadcast_object_list(values, src=0)
+        value = float(values[0])
+
+        self._drop_checkpoints_without_metric(train_step)
+        checkpoint_path = self._checkpoints_without_metric.pop(train_step, None)
+        if not math.isfinite(value):
+            logger.error(
+                f"Delayed metric of train step {train_step} is {value}. Will not be tracked for optimality."
+            )
+            return
+        if checkpoint_path is None:
+            self._metrics_without_checkpoint[train_step] = value
+            return
+
+        metric_checkpoint_path = self._checkpoint_manager.add_metric_to_checkpoint(
+            checkpoint_path,
+            MetricData(
+                name=none_throws(self._best_checkpoint_config).monitored_metric,
+                value=value,
+            ),
+        )
+        rank_zero_info(
+            (
+                f"Tracking checkpoint {metric_checkpoint_path} for optimality."
+                if metric_checkpoint_path is not None
+                else f"Deleted checkpoint {checkpoint_path}, less optimal than the tracked checkpoints."
+            ),
+            logger=logger,
+        )
+
+    def _wait_for_pending_checkpoint(self) -> None:
+        """
+        Waits for the checkpoint which is still being saved in the background, if any. Checkpointers saving
+        asynchronously must override this.
+        """
+        pass
+
+    def _drop_checkpoints_without_metric(self, train_step: int) -> None:
+        checkpoints = self._checkpoints_without_metric
+        dropped_steps = [step for step in checkpoints if step < train_step]
+        if not self._keep_last_n_checkpoints:
+            for step in dropped_steps:
+                del checkpoints[step]
+            return
+
+        # keep the latest checkpoint to resume from, until a later one is saved
+        latest_step = max(
+            [
+                *checkpoints,
+                *(
+                    ckpt.step.get(Phase.TRAIN, -1)
+                    for ckpt in self._checkpoint_manager._ckpt_paths
+                ),
+            ]
+        )
+        for step in dropped_steps:
+            if step == latest_step:
+                continue
+            ckpt = checkpoints.pop(step)
+            rank_zero_info(
+                f"Deleting checkpoint {ckpt}, which didn't receive a value of the monitored metric.",
+                logger=logger,
+            )
+            self._checkpoint_manager.remove_untracked_checkpoint(ckpt)
+
+    def _pop_delayed_metric_value(self, train_step: int) -> Optional[float]:
+        metrics = self._metrics_without_checkpoint
+        for step in [step for step in metrics if step < train_step]:
+            del metrics[step]
+        return metrics.pop(train_step, None)
+
     def _get_tracked_metric_value(self, unit: TTrainUnit) -> Optional[float]:
         """
         If the checkpointer has a tracked metric, look the value in the unit using reflection, and cast to float.
@@ -414,6 +554,7 @@ class BaseCheckpointer(Callback, metaclass=abc.ABCMeta):
             )
             self._best_checkpoint_config = None
             self._checkpoint_manager._best_checkpoint_config = None
+            self._delayed_metrics = False
 
         if self._keep_last_n_checkpoints:
             logger.warning(
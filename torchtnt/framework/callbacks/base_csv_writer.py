@@ -7,17 +7,24 @@
 # pyre-strict
 
 import csv
+import json
+import logging
 import os
 from abc import ABC, abstractmethod
-from typing import Any, List, TextIO, Union
+from typing import Any, List, Optional, TextIO, Union
 
 from pyre_extensions import none_throws
 from torchtnt.framework.callback import Callback
+from torchtnt.framework.callbacks._background_writer import _BackgroundWriter
 from torchtnt.framework.state import EntryPoint, State
 from torchtnt.framework.unit import TEvalUnit, TPredictUnit, TTestUnit, TTrainUnit
 from torchtnt.utils import get_filesystem, get_global_rank
+from torchtnt.utils.distributed import all_gather_str
+
+logger: logging.Logger = logging.getLogger(__name__)
 
 DEFAULT_FILE_NAME = "predictions.csv"
+MANIFEST_SUFFIX = ".manifest.json"
 
 
 class BaseCSVWriter(Callback, ABC):
@@ -32,11 +39,20 @@ class BaseCSVWriter(Callback, ABC):
     The outputs in each row is a a list of strings, and should match
     the columns names defined in ``header_row``.
 
+    With ``shard_by_rank``, every process writes its rows into its own part file instead, e.g. ``predictions-rank0.csv``,
+    which is safe on object stores. At the end of prediction, rank 0 writes a manifest listing the part files and their
+    number of rows to ``{filename}.manifest.json``, and merges the parts into ``filename`` if ``merge_shards`` is set.
+
     Args:
         header_row: columns of the CSV file
         dir_path: directory path of where to save the CSV file
         delimiter: separate columns in one row. Default is tab
         filename: name of the file. Default filename is "predictions.csv"
+        shard_by_rank: whether every process writes into its own part file, each starting with the header row
+        merge_shards: whether rank 0 merges the part files into ``filename`` at the end of prediction. Requires ``shard_by_rank``
+        async_write: whether rows are written by a background thread, so that the predict loop doesn't wait for I/O
+        max_queue_size: maximum number of steps whose rows are pending in the background thread before the predict loop waits
+        compression: compression of the files, as supported by fsspec, e.g. ``"gzip"``
     """
 
     def __init__(
@@ -45,16 +61,43 @@ class BaseCSVWriter(Callback, ABC):
         dir_path: str,
         delimiter: str = "\t",
         filename: str = DEFAULT_FILE_NAME,
+        *,
+        shard_by_rank: bool = False,
+        merge_shards: bool = False,
+        async_write: bool = False,
+        max_queue_size: int = 64,
+        compression: Optional[str] = None,
     ) -> None:
         super().__init__()
+        if merge_shards and not shard_by_rank:
+            raise ValueError("merge_shards requires shard_by_rank to be set.")
         self.header_row = header_row
         self.delimiter = delimiter
+        self.shard_by_rank = shard_by_rank
+        self.merge_shards = merge_shards
+        self.compression = compression
 
         self.output_path: str = os.path.join(dir_path, filename)
-        fs = get_filesystem(self.output_path)
-        self._file: TextIO = fs.open(self.output_path, mode="a")
+        self.manifest_path: str = self.output_path + MANIFEST_SUFFIX
+        if shard_by_rank:
+            stem, dot, extension = filename.partition(".")
+            self.part_path: str = os.path.join(
+                dir_path, f"{stem}-rank{get_global_rank()}{dot}{extension}"
+            )
+            file_path, mode = self.part_path, "w"
+        else:
+            self.part_path = self.output_path
+            file_path, mode = self.output_path, "a"
+        fs = get_filesystem(file_path)
+        self._file: TextIO = fs.open(file_path, mode=mode, compression=compression)
         # pyrefly: ignore [missing-attribute]
         self._writer: csv._writer = csv.writer(self._file, delimiter=delimiter)
+        self._num_rows = 0
+        self._background_writer: Optional[_BackgroundWriter[List[List[str]]]] = (
+            _BackgroundWriter(self._writer.writerows, max_queue_size)
+            if async_write
+            else None
+        )
 
     @abstractmethod
     def get_step_output_rows(
@@ -65,8 +108,8 @@ class BaseCSVWriter(Callback, ABC):
     ) -> Union[List[str], List[List[str]]]: ...
 
     def on_predict_start(self, state: State, unit: TPredictUnit) -> None:
-        if get_global_rank() == 0:
-            self._writer.writerow(self.header_row)
+        if self.shard_by_rank or get_global_rank() == 0:
+            self._write_rows([self.header_row])
 
     def on_predict_step_end(self, state: State, unit: TPredictUnit) -> None:
         predict_state = none_throws(state.predict_state)
@@ -75,15 +118,71 @@ class BaseCSVWriter(Callback, ABC):
 
         # Check whether the first item is a list or not
         if len(output_rows) > 0:
-            if isinstance(output_rows[0], list):
-                for row in output_rows:
-                    self._writer.writerow(row)
-            else:
-                self._writer.writerow(output_rows)
+            rows = output_rows if isinstance(output_rows[0], list) else [output_rows]
+            # pyre-ignore[6]: rows are lists of strings
+            self._write_rows(rows)
+            self._num_rows += len(rows)
 
     def on_predict_end(self, state: State, unit: TPredictUnit) -> None:
-        self._file.flush()
-        self._file.close()
+        self._close()
+        if self.shard_by_rank:
+            self._write_manifest()
+
+    def _write_rows(self, rows: List[List[str]]) -> None:
+        background_writer = self._background_writer
+        if background_writer is not None:
+            background_writer.submit(rows)
+        else:
+            self._writer.writerows(rows)
+
+    def _close(self) -> None:
+        background_writer = self._background_writer
+        try:
+            if background_writer is not None:
+                self._background_writer = None
+                background_writer.close()
+        finally:
+            self._file.flush()
+            self._file.close()
+
+    def _write_manifest(self) -> None:
+        parts = [
+            json.loads(part)
+            for part in all_gather_str(
+                json.dumps({"path": self.part_path, "num_rows": self._num_rows})
+            )
+        ]
+        if get_global_rank() != 0:
+            return
+        if self.merge_shards:
+            self._merge_parts([part["path"] for part in parts])
+        manifest = {
+            "header": self.header_row,
+            "delimiter": self.delimiter,
+            "compression": self.compression,
+            "num_rows": sum(part["num_rows"] for part in parts),
+            "parts": parts,
+            "merged_path": self.output_path if self.merge_shards else None,
+        }
+        fs = get_filesystem(self.manifest_path)
+        with fs.open(self.manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    def _merge_parts(self, part_paths: List[str]) -> None:
+        fs = get_filesystem(self.output_path)
+        with fs.open(
+            self.output_path, "w", compression=self.compression
+        ) as merged_file:
+            # pyrefly: ignore [missing-attribute]
+            csv.writer(merged_file, delimiter=self.delimiter).writerow(self.header_row)
+            for part_path in part_paths:
+                with get_filesystem(part_path).open(
+                    part_path, "r", compression=self.compression
+                ) as part_file:
+                    # skip the header row of the part
+                    part_file.readline()
+                    for lines in iter(lambda: part_file.readlines(1 << 20), []):
+                        merged_file.writelines(lines)
 
     def on_exception(
         self,
@@ -92,5 +191,7 @@ class BaseCSVWriter(Callback, ABC):
         exc: BaseException,
     ) -> None:
         if state.entry_point == EntryPoint.PREDICT:
-            self._file.flush()
-            self._file.close()
+            try:
+                self._close()
+            except Exception as e:
+                logger.error(f"Failed to close {self.part_path}: {e}")
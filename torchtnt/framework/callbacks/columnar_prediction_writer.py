@@ -0,0 +1,449 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from pyre_extensions import none_throws
+from torchtnt.framework.callback import Callback
+from torchtnt.framework.callbacks._background_writer import _BackgroundWriter
+from torchtnt.framework.state import EntryPoint, State
+from torchtnt.framework.unit import TEvalUnit, TPredictUnit, TTestUnit, TTrainUnit
+from torchtnt.utils import get_filesystem, get_global_rank
+from torchtnt.utils.distributed import all_gather_str
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+_STEP_OFFSETS_DIR = "_step_offsets"
+
+
+@dataclass
+class _RowGroup:
+    index: int
+    first_step: int
+    # outputs of consecutive steps, for every column
+    columns: Dict[str, List[torch.Tensor]]
+    num_rows_per_step: List[int]
+
+
+class ColumnarPredictionWriter(Callback):
+    """
+    A callback to write tensor prediction outputs into typed, columnar files.
+
+    Unlike :class:`~torchtnt.framework.callbacks.BaseCSVWriter`, outputs are not converted to strings. The tensors
+    returned by ``get_step_output_columns`` are buffered per column, and once ``rows_per_group`` rows are buffered
+    they are written as a row group with one NumPy ``.npy`` file per column, from a background thread. The first
+    dimension of the tensors indexes rows, and every column keeps the dtype and trailing shape of its first step.
+    ``bfloat16`` columns are stored as ``float32``, which NumPy supports.
+
+    Every process writes into its own directory, ``{dir_path}/rank{rank}``, and keeps a manifest of its row groups
+    there, which also records the number of predict steps whose outputs have been written. When prediction resumes
+    from a checkpoint taken in the middle of an epoch, the row groups are truncated to the steps completed according
+    to ``predict_progress``, so that no row is written twice. Rows which are still buffered when the process is killed
+    are lost, so checkpoints must not be saved ahead of the written rows: set ``flush_every_n_steps`` to the
+    ``save_every_n_predict_steps`` of the checkpointer and pass this callback before the checkpointer. Resuming from a
+    checkpoint taken after the last written step raises an error. At the end of prediction, rank 0 writes
+    ``{dir_path}/manifest.json`` listing the columns and the rows of every rank. Files can be read back with
+    :func:`read_columnar_predictions`.
+
+    By default, a step output which is a tensor is written into the ``output`` column and a mapping of tensors into
+    one column per key. Override ``get_step_output_columns`` for other outputs.
+
+    Args:
+        dir_path: directory where the files are written
+        rows_per_group: number of rows buffered before a row group is written. Row groups hold whole steps, so they
+            can be slightly larger.
+        async_write: whether row groups are copied to the host and written by a background thread, so that the
+            predict loop doesn't wait for the device or I/O. Buffered outputs are kept on their device until written.
+        max_queue_size: maximum number of row groups pending in the background thread before the predict loop waits
+        flush_every_n_steps: if set, the buffered rows are written as a row group every ``flush_every_n_steps``
+            predict steps, and the predict loop waits for them to be written.
+
+    Example::
+
+        class ScoreWriter(ColumnarPredictionWriter):
+            def get_step_output_columns(self, state, unit, step_output):
+                ids, scores = step_output
+                return {"id": ids, "score": scores}
+
+        predict(unit, dataloader, callbacks=[ScoreWriter(dir_path="/tmp/scores")])
+        scores = read_columnar_predictions("/tmp/scores")["score"]
+    """
+
+    def __init__(
+        self,
+        dir_path: str,
+        *,
+        rows_per_group: int = 1 << 16,
+        async_write: bool = True,
+        max_queue_size: int = 4,
+        flush_every_n_steps: Optional[int] = None,
+    ) -> None:
+        super().__init__()
+        if rows_per_group <= 0:
+            raise ValueError(
+                f"rows_per_group must be greater than 0. Got {rows_per_group}."
+            )
+        if flush_every_n_steps is not None and flush_every_n_steps <= 0:
+            raise ValueError(
+                f"flush_every_n_steps must be greater than 0. Got {flush_every_n_steps}."
+            )
+        self.dir_path = dir_path
+        self.rows_per_group = rows_per_group
+        self.async_write = async_write
+        self.max_queue_size = max_queue_size
+        self.flush_every_n_steps = flush_every_n_steps
+
+        self.rank_dir_path: str = os.path.join(dir_path, f"rank{get_global_rank()}")
+        self.manifest_path: str = os.path.join(self.rank_dir_path, MANIFEST_FILE)
+        self._fs: Any = get_filesystem(self.rank_dir_path)
+        self._manifest: Dict[str, Any] = {}
+        self._buffer: Optional[_RowGroup] = None
+        self._num_buffered_rows = 0
+        # row groups are added to the manifest by the background writer once written
+        self._num_submitted_groups = 0
+        self._schema: Optional[Dict[str, Tuple[torch.dtype, torch.Size]]] = None
+        self._background_writer: Optional[_BackgroundWriter[_RowGroup]] = None
+
+    def get_step_output_columns(
+        self,
+        state: State,
+        unit: TPredictUnit,
+        step_output: Any,
+    ) -> Mapping[str, torch.Tensor]:
+        """Returns the columns to write for a step, whose tensors all have the number of rows of the step as first dimension."""
+        if isinstance(step_output, torch.Tensor):
+            return {"output": step_output}
+        if isinstance(step_output, Mapping):
+            return step_output
+        raise TypeError(
+            f"Step outputs of type {type(step_output)} can't be written, override `get_step_output_columns`."
+        )
+
+    def on_predict_start(self, state: State, unit: TPredictUnit) -> None:
+        num_steps_completed = unit.predict_progress.num_steps_completed
+        if num_steps_completed > 0 and self._fs.exists(self.manifest_path):
+            self._resume(num_steps_completed)
+        else:
+            if self._fs.exists(self.rank_dir_path):
+                self._fs.rm(self.rank_dir_path, recursive=True)
+            self._fs.makedirs(self.rank_dir_path, exist_ok=True)
+            self._manifest = {
+                "columns": None,
+                "row_groups": [],
+                "num_rows": 0,
+                "num_steps_completed": num_steps_completed,
+                "completed": False,
+            }
+            self._num_submitted_groups = 0
+            self._save_manifest()
+        self._schema = None
+        if self.async_write:
+            self._background_writer = _BackgroundWriter(
+                self._write_row_group, self.max_queue_size
+            )
+
+    def on_predict_step_end(self, state: State, unit: TPredictUnit) -> None:
+        step_output = none_throws(state.predict_state).step_output
+        columns = self._check_columns(
+            self.get_step_output_columns(state, unit, step_output)
+        )
+        buffer = self._buffer
+        if buffer is None:
+            buffer = _RowGroup(
+                index=self._num_submitted_groups,
+                first_step=unit.predict_progress.num_steps_completed - 1,
+                columns={name: [] for name in columns},
+                num_rows_per_step=[],
+            )
+            self._buffer = buffer
+        num_rows = 0
+        for name, tensor in columns.items():
+            buffer.columns[name].append(tensor.detach())
+            num_rows = tensor.shape[0]
+        buffer.num_rows_per_step.append(num_rows)
+        self._num_buffered_rows += num_rows
+        flush_every_n_steps = self.flush_every_n_steps
+        if (
+            flush_every_n_steps is not None
+            and unit.predict_progress.num_steps_completed % flush_every_n_steps == 0
+        ):
+            # a checkpoint may be saved after this step
+            self._flush()
+            background_writer = self._background_writer
+            if background_writer is not None:
+                background_writer.wait()
+        elif self._num_buffered_rows >= self.rows_per_group:
+            self._flush()
+
+    def on_predict_end(self, state: State, unit: TPredictUnit) -> None:
+        self._close()
+        self._manifest["completed"] = True
+        self._save_manifest()
+
+        ranks = [
+            json.loads(rank)
+            for rank in all_gather_str(
+                json.dumps(
+                    {
+                        "path": self.rank_dir_path,
+                        "num_rows": self._manifest["num_rows"],
+                        "columns": self._manifest["columns"],
+                    }
+                )
+            )
+        ]
+        if get_global_rank() != 0:
+            return
+        columns = next(
+            (rank["columns"] for rank in ranks if rank["columns"] is not None), None
+        )
+        manifest = {
+            "columns": columns,
+            "num_rows": sum(rank["num_rows"] for rank in ranks),
+            "ranks": [
+                {"path": rank["path"], "num_rows": rank["num_rows"]} for rank in ranks
+            ],
+        }
+        _write_json(os.path.join(self.dir_path, MANIFEST_FILE), manifest)
+
+    def on_exception(
+        self,
+        state: State,
+        unit: Union[TTrainUnit, TEvalUnit, TPredictUnit, TTestUnit],
+        exc: BaseException,
+    ) -> None:
+        if state.entry_point != EntryPoint.PREDICT:
+            return
+        try:
+            # outputs of completed steps are kept for resuming
+            self._close()
+        except Exception as e:
+            logger.error(f"Failed to write predictions to {self.rank_dir_path}: {e}")
+
+    def _check_columns(
+        self, columns: Mapping[str, torch.Tensor]
+    ) -> Dict[str, torch.Tensor]:
+        checked = {}
+        num_rows = None
+        for name, tensor in columns.items():
+            if name.startswith("_") or "/" in name:
+                raise ValueError(
+                    f"Column names can't start with '_' or contain '/'. Got {name}."
+                )
+            if tensor.dim() == 0:
+                tensor = tensor.reshape(1)
+            if num_rows is not None and tensor.shape[0] != num_rows:
+                raise ValueError(
+                    f"All columns of a step must have the same number of rows. Got {tensor.shape[0]} rows for column "
+                    f"{name} and {num_rows} for the previous ones."
+                )
+            num_rows = tensor.shape[0]
+            checked[name] = tensor
+
+        schema = {
+            name: (tensor.dtype, tensor.shape[1:]) for name, tensor in checked.items()
+        }
+        expected_schema = self._schema
+        if expected_schema is None:
+            self._check_manifest_columns(schema)
+            self._schema = schema
+        elif schema != expected_schema:
+            raise ValueError(
+                f"Columns of a step don't match the columns of previous steps. Got {schema}, expected {expected_schema}."
+            )
+        return checked
+
+    def _check_manifest_columns(
+        self, schema: Dict[str, Tuple[torch.dtype, torch.Size]]
+    ) -> None:
+        columns = {
+            name: {"dtype": str(_get_numpy_dtype(dtype)), "shape": list(shape)}
+            for name, (dtype, shape) in schema.items()
+        }
+        expected_columns = self._manifest["columns"]
+        if expected_columns is None:
+            self._manifest["columns"] = columns
+        elif columns != expected_columns:
+            # columns of the steps written before resuming
+            raise ValueError(
+                f"Columns of a step don't match the columns of previous steps. Got {columns}, expected {expected_columns}."
+            )
+
+    def _flush(self) -> None:
+        buffer = self._buffer
+        if buffer is None:
+            return
+        self._buffer = None
+        self._num_buffered_rows = 0
+        self._num_submitted_groups += 1
+        background_writer = self._background_writer
+        if background_writer is not None:
+            background_writer.submit(buffer)
+        else:
+            self._write_row_group(buffer)
+
+    def _close(self) -> None:
+        background_writer = self._background_writer
+        if background_writer is None:
+            self._flush()
+            return
+        try:
+            self._flush()
+        finally:
+            self._background_writer = None
+            background_writer.close()
+
+    def _write_row_group(self, row_group: _RowGroup) -> None:
+        files = {}
+        for name, tensors in row_group.columns.items():
+            array = torch.cat(tensors).cpu()
+            if array.dtype == torch.bfloat16:
+                array = array.float()
+            files[name] = self._get_path(name, row_group.index)
+            _save_array(self._fs, files[name], array.numpy())
+        step_offsets = np.cumsum([0] + row_group.num_rows_per_step, dtype=np.int64)
+        _save_array(
+            self._fs, self._get_path(_STEP_OFFSETS_DIR, row_group.index), step_offsets
+        )
+
+        num_rows = int(step_offsets[-1])
+        self._manifest["row_groups"].append(
+            {
+                "files": files,
+                "num_rows": num_rows,
+                "first_step": row_group.first_step,
+                "num_steps": len(row_group.num_rows_per_step),
+            }
+        )
+        self._manifest["num_rows"] += num_rows
+        self._manifest["num_steps_completed"] = row_group.first_step + len(
+            row_group.num_rows_per_step
+        )
+        self._save_manifest()
+
+    def _resume(self, num_steps_completed: int) -> None:
+        with self._fs.open(self.manifest_path, "r") as f:
+            manifest = json.load(f)
+        num_steps_written = manifest["num_steps_completed"]
+        if num_steps_written < num_steps_completed:
+            raise RuntimeError(
+                f"Outputs of predict steps {num_steps_written} to {num_steps_completed - 1} were not written to "
+                f"{self.rank_dir_path} before the restart, and the checkpoint doesn't predict them again. "
+                "Set flush_every_n_steps to the checkpoint frequency so that checkpoints don't run ahead of the written rows."
+            )
+
+        row_groups = []
+        for index, row_group in enumerate(manifest["row_groups"]):
+            num_steps_kept = min(
+                max(num_steps_completed - row_group["first_step"], 0),
+                row_group["num_steps"],
+            )
+            if num_steps_kept == row_group["num_steps"]:
+                row_groups.append(row_group)
+                continue
+            # outputs of the steps after the checkpoint are predicted again
+            offsets_path = self._get_path(_STEP_OFFSETS_DIR, index)
+            step_offsets = _load_array(self._fs, offsets_path)
+            num_rows = int(step_offsets[num_steps_kept])
+            for path in row_group["files"].values():
+                if num_steps_kept > 0:
+                    _save_array(self._fs, path, _load_array(self._fs, path)[:num_rows])
+                else:
+                    self._fs.rm(path)
+            if num_steps_kept > 0:
+                _save_array(self._fs, offsets_path, step_offsets[: num_steps_kept + 1])
+                row_groups.append(
+                    {**row_group, "num_rows": num_rows, "num_steps": num_steps_kept}
+                )
+            else:
+                self._fs.rm(offsets_path)
+
+        manifest["row_groups"] = row_groups
+        manifest["num_rows"] = sum(row_group["num_rows"] for row_group in row_groups)
+        manifest["num_steps_completed"] = num_steps_completed
+        manifest["completed"] = False
+        self._manifest = manifest
+        self._num_submitted_groups = len(row_groups)
+        self._save_manifest()
+        logger.info(
+            f"Resuming to write predictions into {self.rank_dir_path} after {manifest['num_rows']} rows"
+        )
+
+    def _save_manifest(self) -> None:
+        _write_json(self.manifest_path, self._manifest)
+
+    def _get_path(self, name: str, index: int) -> str:
+        return os.path.join(self.rank_dir_path, name, f"{index:06d}.npy")
+
+
+def read_columnar_predictions(
+    dir_path: str, columns: Optional[Sequence[str]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Reads the predictions written by :class:`ColumnarPredictionWriter` into ``dir_path``, concatenating the rows of
+    all ranks in rank order.
+
+    Args:
+        dir_path: directory where the predictions were written
+        columns: names of the columns to read. Defaults to all columns.
+    """
+    fs = get_filesystem(dir_path)
+    with fs.open(os.path.join(dir_path, MANIFEST_FILE), "r") as f:
+        manifest = json.load(f)
+    schema = manifest["columns"] or {}
+    names = list(columns) if columns is not None else list(schema)
+    arrays: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+    for rank in manifest["ranks"]:
+        with fs.open(os.path.join(rank["path"], MANIFEST_FILE), "r") as f:
+            rank_manifest = json.load(f)
+        for row_group in rank_manifest["row_groups"]:
+            for name in names:
+                arrays[name].append(_load_array(fs, row_group["files"][name]))
+    return {
+        name: (
+            np.concatenate(parts)
+            if parts
+            else np.empty(
+                [0] + schema[name]["shape"], dtype=np.dtype(schema[name]["dtype"])
+            )
+        )
+        for name, parts in arrays.items()
+    }
+
+
+def _get_numpy_dtype(dtype: torch.dtype) -> np.dtype:
+    if dtype == torch.bfloat16:
+        dtype = torch.float32
+    return torch.empty(0, dtype=dtype).numpy().dtype
+
+
+def _save_array(fs: Any, path: str, array: np.ndarray) -> None:
+    fs.makedirs(os.path.dirname(path), exist_ok=True)
+    with fs.open(path, "wb") as f:
+        np.save(f, array)
+
+
+def _load_array(fs: Any, path: str) -> np.ndarray:
+    with fs.open(path, "rb") as f:
+        return np.load(f)
+
+
+def _write_json(path: str, obj: Dict[str, Any]) -> None:
+    fs = get_filesystem(path)
+    # written to a temporary file first, so that a manifest is never partially written
+    tmp_path = path + ".tmp"
+    with fs.open(tmp_path, "w") as f:
+        json.dump(obj, f, indent=2)
+    fs.mv(tmp_path, path)
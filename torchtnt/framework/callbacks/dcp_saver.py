@@ -255,6 +255,9 @@ class DistributedCheckpointSaver(BaseCheckpointer):
             logger=logger,
         )
 
+    def _wait_for_pending_checkpoint(self) -> None:
+        self._wait(log_warning=False)
+
     def on_exception(
         self,
         state: State,
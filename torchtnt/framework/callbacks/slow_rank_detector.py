@@ -8,9 +8,12 @@
 
 import logging
 import time
-from typing import List, Optional, Tuple
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
 
 import torch
+from pyre_extensions import none_throws
 from torch import distributed as dist
 from torchtnt.framework.callback import Callback
 from torchtnt.framework.state import State
@@ -21,6 +24,47 @@ from torchtnt.utils.loggers.logger import MetricLogger
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# phases whose per-rank time is gathered at each check
+PHASES: Tuple[str, ...] = (
+    "data_wait",
+    "train_step",
+    "forward_backward",
+    "optimizer_step",
+    "callbacks",
+)
+
+# suffixes of the actions recorded by AutoUnit in ``state.timer`` that make up each phase
+_FORWARD_BACKWARD_ACTIONS: Tuple[str, ...] = ("compute_loss", "backward")
+_OPTIMIZER_STEP_ACTIONS: Tuple[str, ...] = (
+    "grad_unscale",
+    "clip_grad_norm",
+    "clip_grad_value",
+    "optimizer_step",
+    "optimizer_zero_grad",
+)
+
+
+@dataclass
+class SlowRankReport:
+    """
+    Per-phase timing statistics gathered across ranks at one check of :class:`SlowRankDetector`.
+
+    Args:
+        epoch: number of epochs completed at the check
+        step: number of steps completed at the check
+        phase_times: mapping of phase name to the mean time per step (seconds) of each rank over the window since the previous check
+        zscores: mapping of phase name to the z-score of each rank's time for that phase
+        straggler_rank: the rank with the largest total time per step in the window
+        straggler_phase: the phase in which the straggler rank deviates the most from the other ranks
+    """
+
+    epoch: int
+    step: int
+    phase_times: Dict[str, List[float]]
+    zscores: Dict[str, List[float]]
+    straggler_rank: int
+    straggler_phase: str
+
 
 class SlowRankDetector(Callback):
     """
@@ -28,16 +72,29 @@ class SlowRankDetector(Callback):
     This is useful to debug ranks which are lagging behind and are likely to cause a NCCL timeout.
     If a logger is passed, the difference between the fastest rank and slowest rank is also reported.
 
+    Between checks, the callback also accumulates how much time each rank spends in every training phase
+    (see ``PHASES``). At each check, these per-rank timings are gathered together with the current time in a
+    single collective, and the phase responsible for the slowest rank is reported along with per-rank z-scores.
+    The most recent reports are kept in :attr:`history`.
+
     Args:
         check_every_n_steps: frequency of steps to check for slow ranks.
         check_every_n_epochs: frequency of epochs to check for slow ranks.
         pg: the process group to use for all_gather_tensors. If None, the default process group will be used.
-        logger: an optional logger to log time difference.
+        logger: an optional logger to log time difference and per-phase statistics.
         device: the device that will be used to store the time as a tensor. If none, the device will be inferred from the environment.
+        history_size: number of :class:`SlowRankReport` to keep in :attr:`history`.
 
     Note:
         It is recommended to use this callback after you detect a timeout, and to make sure this callback runs before
         the logic triggering timeout (other callback, train_step, etc).
+
+    Note:
+        ``data_wait`` is read from the train iteration timer. ``train_step`` is measured between ``on_train_step_start``
+        and ``on_train_step_end`` of this callback, so it is most accurate when this callback runs first. ``forward_backward``
+        and ``optimizer_step`` are read from ``state.timer`` when a :class:`~torchtnt.utils.timer.Timer` is passed to the loop,
+        and are 0 otherwise. ``callbacks`` is the rest of the train iteration time, and trails by one step since the iteration
+        time of the current step is only known after all ``on_train_step_end`` callbacks run.
     """
 
     def __init__(
@@ -48,6 +105,7 @@ class SlowRankDetector(Callback):
         pg: Optional[dist.ProcessGroup] = None,
         logger: Optional[MetricLogger] = None,
         device: Optional[torch.device] = None,
+        history_size: int = 100,
     ) -> None:
         if not (check_every_n_steps or check_every_n_epochs):
             raise ValueError(
@@ -71,7 +129,44 @@ class SlowRankDetector(Callback):
         self._device: torch.device = device or init_from_env()
         self._rank: int = get_global_rank()
 
+        self._history: Deque[SlowRankReport] = deque(maxlen=history_size)
+        self._window_steps: int = 0
+        self._window_times: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self._step_start_time: Optional[float] = None
+        self._prev_step_time: Optional[float] = None
+        self._timer_action_counts: Dict[str, int] = {}
+
+    @property
+    def history(self) -> List[SlowRankReport]:
+        """Most recent per-phase reports, from oldest to newest."""
+        return list(self._history)
+
+    def on_train_step_start(self, state: State, unit: TTrainUnit) -> None:
+        iteration_timer = none_throws(state.train_state).iteration_timer
+        if self._prev_step_time is not None:
+            # the iteration time of the previous step is complete now
+            iteration_times = iteration_timer.recorded_durations.get(
+                "train_iteration_time"
+            )
+            if iteration_times:
+                self._window_times["callbacks"] += max(
+                    iteration_times[-1] - self._prev_step_time, 0.0
+                )
+            self._prev_step_time = None
+
+        timer = state.timer
+        if timer is not None:
+            self._timer_action_counts = {
+                action: len(durations)
+                for action, durations in timer.recorded_durations.items()
+            }
+        self._step_start_time = time.perf_counter()
+
     def on_train_step_end(self, state: State, unit: TTrainUnit) -> None:
+        if self._step_start_time is not None:
+            self._record_step(state, unit, time.perf_counter() - self._step_start_time)
+            self._step_start_time = None
+
         if (
             self._check_every_n_steps is not None
             and unit.train_progress.num_steps_completed % self._check_every_n_steps == 0
@@ -92,13 +187,49 @@ class SlowRankDetector(Callback):
                 unit.train_progress.num_steps_completed,
             )
 
+    def _record_step(self, state: State, unit: TTrainUnit, step_time: float) -> None:
+        self._window_steps += 1
+        self._window_times["train_step"] += step_time
+        self._prev_step_time = step_time
+
+        data_wait_times = none_throws(
+            state.train_state
+        ).iteration_timer.recorded_durations.get("data_wait_time")
+        if data_wait_times:
+            self._window_times["data_wait"] += data_wait_times[-1]
+
+        timer = state.timer
+        if timer is None:
+            return
+        prefix = unit.__class__.__name__
+        for phase, actions in (
+            ("forward_backward", _FORWARD_BACKWARD_ACTIONS),
+            ("optimizer_step", _OPTIMIZER_STEP_ACTIONS),
+        ):
+            for action in actions:
+                durations = timer.recorded_durations.get(f"{prefix}.{action}")
+                if not durations:
+                    continue
+                prev_count = self._timer_action_counts.get(f"{prefix}.{action}", 0)
+                # bounded timers may have dropped old samples during the step
+                new_durations = (
+                    durations[prev_count:]
+                    if len(durations) >= prev_count
+                    else durations[-1:]
+                )
+                self._window_times[phase] += sum(new_durations)
+
     def _sync_times(self, epochs: int, steps: int) -> None:
         curr_time = time.perf_counter()
-        curr_time_tensor = torch.Tensor([curr_time]).to(self._device)
-        timings_as_tensor_list = all_gather_tensors(curr_time_tensor, self._pg)
-        timings_as_list: List[float] = [
-            tensor.item() for tensor in timings_as_tensor_list
-        ]
+        # gather the current time, the window size and the per-phase times in a single collective
+        local_values = torch.tensor(
+            [curr_time, float(self._window_steps)]
+            + [self._window_times[phase] for phase in PHASES],
+            dtype=torch.float64,
+            device=self._device,
+        )
+        gathered = torch.stack(all_gather_tensors(local_values, self._pg)).cpu()
+        timings_as_list: List[float] = gathered[:, 0].tolist()
         fastest_rank, slowest_rank = _get_min_max_indices(timings_as_list)
         time_on_fastest_rank = timings_as_list[fastest_rank]
         time_on_slowest_rank = timings_as_list[slowest_rank]
@@ -113,6 +244,61 @@ class SlowRankDetector(Callback):
                 steps,
             )
 
+        window_steps = gathered[:, 1]
+        self._window_steps = 0
+        self._window_times = dict.fromkeys(PHASES, 0.0)
+        if not bool((window_steps > 0).all()):
+            return
+
+        report = _make_report(
+            epochs, steps, gathered[:, 2:] / window_steps.unsqueeze(1)
+        )
+        self._history.append(report)
+        logger.info(
+            f"Rank {report.straggler_rank} is the slowest rank after {epochs} epochs and {steps} steps, "
+            f"mostly due to {report.straggler_phase} "
+            f"(z-score {report.zscores[report.straggler_phase][report.straggler_rank]:.2f}). "
+            f"Mean time per step (seconds) on each rank: {report.phase_times}"
+        )
+        if self._logger and self._rank == 0:
+            payload: Dict[str, float] = {"Straggler rank": float(report.straggler_rank)}
+            for phase in PHASES:
+                times = report.phase_times[phase]
+                payload[f"Max z-score across ranks ({phase})"] = max(
+                    report.zscores[phase]
+                )
+                payload[
+                    f"Difference between fastest/slowest rank ({phase}, seconds per step)"
+                ] = max(times) - min(times)
+            self._logger.log_dict(payload, steps)
+
+
+def _make_report(epoch: int, step: int, phase_times: torch.Tensor) -> SlowRankReport:
+    """
+    Builds the report from a (world_size, len(PHASES)) tensor of mean time per step.
+    """
+    mean = phase_times.mean(dim=0, keepdim=True)
+    std = phase_times.std(dim=0, unbiased=False, keepdim=True)
+    zscores = torch.where(
+        std > 0, (phase_times - mean) / std.clamp_min(1e-12), torch.zeros_like(mean)
+    )
+    # forward_backward and optimizer_step are already included in train_step
+    total_times = phase_times[
+        :, [PHASES.index(p) for p in ("data_wait", "train_step", "callbacks")]
+    ].sum(dim=1)
+    straggler_rank = int(total_times.argmax().item())
+    straggler_phase = PHASES[int(zscores[straggler_rank].argmax().item())]
+    return SlowRankReport(
+        epoch=epoch,
+        step=step,
+        phase_times={
+            phase: phase_times[:, i].tolist() for i, phase in enumerate(PHASES)
+        },
+        zscores={phase: zscores[:, i].tolist() for i, phase in enumerate(PHASES)},
+        straggler_rank=straggler_rank,
+        straggler_phase=straggler_phase,
+    )
+
 
 # instead of taking a dependency on numpy
 def _get_min_max_indices(input_list: List[float]) -> Tuple[int, int]:
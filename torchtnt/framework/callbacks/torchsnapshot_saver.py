@@ -204,6 +204,9 @@ class TorchSnapshotSaver(BaseCheckpointer):
         if self._prev_snapshot is not None:
             self._prev_snapshot.wait()
 
+    def _wait_for_pending_checkpoint(self) -> None:
+        self._wait()
+
     def _async_snapshot(
         self,
         snapshot_path: str,
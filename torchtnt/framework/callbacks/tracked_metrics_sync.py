@@ -0,0 +1,83 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+from typing import Any, Dict, List, Optional, Union
+
+import torch
+import torch.distributed as dist
+from torchtnt.framework.callback import Callback
+from torchtnt.framework.state import EntryPoint, State
+from torchtnt.framework.unit import TEvalUnit, TrainUnit
+from torchtnt.utils.distributed import get_global_rank
+from torchtnt.utils.loggers.logger import MetricLogger
+from torchtnt.utils.metric_sync import sync_and_compute_metrics
+
+
+class TrackedMetricsSync(Callback):
+    """
+    A callback which merges the metrics tracked by the eval unit across ranks at the end of every eval epoch, and computes
+    them once instead of gathering predictions to a single rank.
+
+    Metrics are the :class:`~torchtnt.utils.stateful.MetricStateful` attributes of the unit, returned by its ``tracked_metrics``,
+    which must implement ``merge_state`` like torcheval metrics. Their states are gathered to rank 0 with one collective per
+    dtype, merged and computed there, and broadcast to all ranks with :func:`~torchtnt.utils.metric_sync.sync_and_compute_metrics`.
+    The results are available in :attr:`computed_metrics`, and scalar results are logged with ``loggers`` on rank 0, at the
+    train step during ``fit`` and at the eval step otherwise.
+
+    Args:
+        loggers: an optional :class:`~torchtnt.utils.loggers.logger.MetricLogger` or list of them.
+        rank_zero_only: whether to only compute the metrics on rank 0, in which case :attr:`computed_metrics` is None on other ranks.
+        process_group: the process group to sync the metrics on. Defaults to all processes (world).
+
+    Note:
+        The metrics are not reset, the unit remains responsible for resetting them, e.g. in ``on_eval_epoch_start``.
+    """
+
+    def __init__(
+        self,
+        loggers: Optional[Union[MetricLogger, List[MetricLogger]]] = None,
+        *,
+        rank_zero_only: bool = False,
+        process_group: Optional[dist.ProcessGroup] = None,
+    ) -> None:
+        if loggers is None:
+            loggers = []
+        elif not isinstance(loggers, list):
+            loggers = [loggers]
+        self._loggers: List[MetricLogger] = loggers
+        self.rank_zero_only = rank_zero_only
+        self.process_group = process_group
+        self.computed_metrics: Optional[Dict[str, Any]] = None
+
+    def on_eval_epoch_end(self, state: State, unit: TEvalUnit) -> None:
+        metrics = unit.tracked_metrics()
+        if not metrics:
+            return
+
+        computed_metrics = sync_and_compute_metrics(
+            metrics,
+            rank_zero_only=self.rank_zero_only,
+            process_group=self.process_group,
+        )
+        self.computed_metrics = computed_metrics
+        if computed_metrics is None or not self._loggers or get_global_rank() != 0:
+            return
+
+        scalars = {
+            name: float(value)
+            for name, value in computed_metrics.items()
+            if isinstance(value, (int, float))
+            or (isinstance(value, torch.Tensor) and value.numel() == 1)
+        }
+        step = (
+            unit.train_progress.num_steps_completed
+            if state.entry_point == EntryPoint.FIT and isinstance(unit, TrainUnit)
+            else unit.eval_progress.num_steps_completed
+        )
+        for metric_logger in self._loggers:
+            metric_logger.log_dict(scalars, step)
@@ -0,0 +1,342 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import bisect
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import torch
+from pyre_extensions import none_throws
+from torch.utils._pytree import tree_flatten, tree_map, tree_unflatten, TreeSpec
+from torchtnt.framework.auto_unit import _AutoUnitMixin
+from torchtnt.framework.callback import Callback
+from torchtnt.framework.predict import predict
+from torchtnt.framework.state import State
+from torchtnt.framework.unit import TPredictUnit
+from torchtnt.utils.timer import get_durations_histogram, TimerProtocol
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_STOP = object()
+_MAX_RECORDED_VALUES = 5_000
+
+
+@dataclass
+class _Request:
+    leaves: List[torch.Tensor]
+    treespec: TreeSpec
+    num_rows: int
+    future: "Future[Any]"
+    submit_time: float = field(default_factory=time.perf_counter)
+
+    @property
+    def signature(self) -> Tuple[TreeSpec, List[Tuple[torch.Size, torch.dtype]]]:
+        # requests can be batched together if their tensors only differ in number of rows
+        return self.treespec, [(x.shape[1:], x.dtype) for x in self.leaves]
+
+
+class DynamicBatchingServer:
+    """
+    Serves prediction requests submitted from any thread by running the ``predict_step`` of a unit, typically an
+    :class:`~torchtnt.framework.auto_unit.AutoPredictUnit`, on batches coalesced from several requests.
+
+    A request is a pytree of tensors whose first dimension indexes the rows of the request. Requests are coalesced in
+    arrival order into a batch until the batch holds ``max_batch_size`` rows, or ``max_latency_ms`` milliseconds have
+    passed since the arrival of its first request. Only requests whose tensors have the same structure, trailing
+    shapes and dtypes are coalesced, a request larger than ``max_batch_size`` is run as its own batch. If
+    ``batch_size_buckets`` is set, batches are padded with zero rows to the smallest bucket holding them, which bounds
+    the number of distinct input shapes, e.g. for ``torch.compile`` or CUDA graphs.
+
+    The outputs of ``predict_step`` must be a pytree whose tensors have the padded batch size as first dimension.
+    They are split back per request, and the future returned by :meth:`submit` is resolved with the rows of its
+    request. The server runs the :py:func:`~torchtnt.framework.predict` loop, so callbacks are run for every batch.
+
+    Args:
+        predict_unit: the unit whose ``predict_step`` is run on the batches.
+        max_batch_size: maximum number of rows of a batch coalesced from several requests.
+        max_latency_ms: maximum time to wait for more requests after the first request of a batch arrives.
+        batch_size_buckets: sizes to which batches are padded.
+        callbacks: callbacks of the predict loop.
+
+    Example::
+
+        server = DynamicBatchingServer(AutoPredictUnit(module=module), max_batch_size=64, max_latency_ms=5)
+        server.start()
+        future = server.submit(torch.randn(3, 16))
+        outputs = future.result()  # 3 rows of outputs
+        server.stop()
+        print(server.get_stats())
+
+    Note:
+        The ``predict`` loop of a unit runs once, so a stopped server can't be restarted with the same unit.
+
+    Note:
+        The unit must not prefetch batches, e.g. with ``enable_prefetch=True``: fetching the next batch waits for
+        the next request, which would hold back the outputs of the current batch until another request arrives.
+    """
+
+    def __init__(
+        self,
+        predict_unit: TPredictUnit,
+        *,
+        max_batch_size: int,
+        max_latency_ms: float,
+        batch_size_buckets: Optional[Sequence[int]] = None,
+        callbacks: Optional[List[Callback]] = None,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError(
+                f"max_batch_size must be greater than 0. Got {max_batch_size}."
+            )
+        if max_latency_ms < 0:
+            raise ValueError(f"max_latency_ms must be >= 0. Got {max_latency_ms}.")
+        buckets = sorted(batch_size_buckets or [])
+        if buckets and (buckets[0] <= 0 or buckets[-1] < max_batch_size):
+            raise ValueError(
+                f"batch_size_buckets must be positive and include a bucket of at least max_batch_size {max_batch_size}. "
+                f"Got {batch_size_buckets}."
+            )
+        if isinstance(predict_unit, _AutoUnitMixin) and predict_unit._enable_prefetch:
+            raise ValueError(
+                "The predict unit must be created with enable_prefetch=False, since prefetching would wait for the "
+                "next request before the outputs of the current batch are returned."
+            )
+        self.predict_unit = predict_unit
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+        self.batch_size_buckets: List[int] = buckets
+        self.callbacks: List[Callback] = callbacks or []
+
+        self._requests: "queue.Queue[object]" = queue.Queue()
+        # request which didn't fit in the previous batch
+        self._next_request: Optional[object] = None
+        # batches which have been yielded to the predict loop and whose outputs are not returned yet
+        self._in_flight: Deque[Tuple[List[_Request], List[int]]] = deque()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+        # bounded like the iteration timer of the predict loop
+        self._request_latencies: Deque[float] = deque(maxlen=_MAX_RECORDED_VALUES)
+        self._batch_sizes: Deque[float] = deque(maxlen=_MAX_RECORDED_VALUES)
+        self._iteration_timer: Optional[TimerProtocol] = None
+        self._num_requests = 0
+        self._num_rows = 0
+        self._start_time: Optional[float] = None
+        self._serving_time = 0.0
+
+    def submit(self, data: Any) -> "Future[Any]":
+        """
+        Submits a request and returns a future resolved with the outputs of its rows.
+
+        Raises:
+            RuntimeError: if the server is stopped.
+        """
+        leaves, treespec = tree_flatten(data)
+        if not leaves or not all(
+            isinstance(x, torch.Tensor) and x.dim() > 0 for x in leaves
+        ):
+            raise ValueError(
+                "Requests must be pytrees of tensors with at least one dimension."
+            )
+        num_rows = leaves[0].shape[0]
+        if any(x.shape[0] != num_rows for x in leaves):
+            raise ValueError(
+                "All tensors of a request must have the same number of rows."
+            )
+        future: "Future[Any]" = Future()
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError("Can't submit requests to a stopped server.")
+            self._requests.put(_Request(leaves, treespec, num_rows, future))
+        return future
+
+    def start(self) -> None:
+        """Starts serving requests on a background thread."""
+        if self._thread is not None:
+            raise RuntimeError("The server has already been started.")
+        self._thread = threading.Thread(target=self.serve, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops accepting requests and waits for the pending requests to be served."""
+        with self._lock:
+            if not self._stopped:
+                self._stopped = True
+                self._requests.put(_STOP)
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+        error = self._error
+        if error is not None:
+            raise RuntimeError("Serving requests failed") from error
+
+    def serve(self) -> None:
+        """Serves requests on the calling thread until :meth:`stop` is called."""
+        self._start_time = time.perf_counter()
+        try:
+            predict(
+                self.predict_unit,
+                _BatchIterable(self),
+                callbacks=[_ResponseCallback(self), *self.callbacks],
+            )
+        except BaseException as e:
+            self._error = e
+            self._fail_pending_requests(e)
+        finally:
+            self._serving_time = time.perf_counter() - self._start_time
+
+    def get_stats(
+        self, percentiles: Sequence[float] = (50.0, 90.0, 99.0)
+    ) -> Dict[str, float]:
+        """
+        Returns percentiles of the latency of requests from submission to resolution and of the predict iteration
+        time in seconds, percentiles of the number of rows of the batches, and the throughput in requests and rows
+        per second.
+        """
+        iteration_timer = self._iteration_timer
+        durations = {
+            name: list(values)
+            for name, values in (
+                ("request_latency", self._request_latencies),
+                (
+                    "predict_iteration_time",
+                    (
+                        iteration_timer.recorded_durations["predict_iteration_time"]
+                        if iteration_timer is not None
+                        else []
+                    ),
+                ),
+                ("batch_size", self._batch_sizes),
+            )
+            if values
+        }
+        stats = {
+            f"{name}/{key}": float(value)
+            for name, histogram in get_durations_histogram(
+                durations, percentiles
+            ).items()
+            for key, value in histogram.items()
+        }
+        serving_time = self._serving_time
+        if self._thread is not None and self._thread.is_alive():
+            serving_time = time.perf_counter() - none_throws(self._start_time)
+        if serving_time > 0:
+            stats["requests_per_second"] = self._num_requests / serving_time
+            stats["rows_per_second"] = self._num_rows / serving_time
+        return stats
+
+    def _get_request(self, timeout: Optional[float] = None) -> object:
+        request = self._next_request
+        if request is not None:
+            self._next_request = None
+            return request
+        if timeout is not None and timeout <= 0:
+            return self._requests.get_nowait()
+        return self._requests.get(timeout=timeout)
+
+    def _next_batch(self) -> Any:
+        request = self._get_request()
+        if request is _STOP:
+            raise StopIteration
+        assert isinstance(request, _Request)
+        requests = [request]
+        num_rows = request.num_rows
+        signature = request.signature
+        deadline = request.submit_time + self.max_latency_ms / 1000
+        while num_rows < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                next_request = self._get_request(timeout)
+            except queue.Empty:
+                break
+            if (
+                not isinstance(next_request, _Request)
+                or next_request.signature != signature
+                or num_rows + next_request.num_rows > self.max_batch_size
+            ):
+                # starts the next batch
+                self._next_request = next_request
+                break
+            requests.append(next_request)
+            num_rows += next_request.num_rows
+
+        batch_size = self._get_padded_batch_size(num_rows)
+        leaves = []
+        for i, leaf in enumerate(request.leaves):
+            parts = [r.leaves[i] for r in requests]
+            if batch_size > num_rows:
+                parts.append(leaf.new_zeros((batch_size - num_rows, *leaf.shape[1:])))
+            leaves.append(torch.cat(parts) if len(parts) > 1 else parts[0])
+        self._in_flight.append((requests, [r.num_rows for r in requests]))
+        self._batch_sizes.append(num_rows)
+        return tree_unflatten(leaves, request.treespec)
+
+    def _get_padded_batch_size(self, num_rows: int) -> int:
+        buckets = self.batch_size_buckets
+        index = bisect.bisect_left(buckets, num_rows)
+        return buckets[index] if index < len(buckets) else num_rows
+
+    def _resolve(self, outputs: Any) -> None:
+        requests, num_rows = self._in_flight.popleft()
+        offset = 0
+        now = time.perf_counter()
+        for request, n in zip(requests, num_rows):
+            request_outputs = tree_map(
+                lambda x, start=offset, end=offset + n: (
+                    x[start:end] if isinstance(x, torch.Tensor) else x
+                ),
+                outputs,
+            )
+            offset += n
+            self._request_latencies.append(now - request.submit_time)
+            self._num_requests += 1
+            self._num_rows += n
+            request.future.set_result(request_outputs)
+
+    def _fail_pending_requests(self, error: BaseException) -> None:
+        with self._lock:
+            self._stopped = True
+        while self._in_flight:
+            for request in self._in_flight.popleft()[0]:
+                request.future.set_exception(error)
+        while True:
+            try:
+                request = self._get_request(timeout=0)
+            except queue.Empty:
+                return
+            if isinstance(request, _Request):
+                request.future.set_exception(error)
+
+
+class _BatchIterable:
+    def __init__(self, server: DynamicBatchingServer) -> None:
+        self._server = server
+
+    def __iter__(self) -> Iterator[Any]:
+        return self
+
+    def __next__(self) -> Any:
+        return self._server._next_batch()
+
+
+class _ResponseCallback(Callback):
+    def __init__(self, server: DynamicBatchingServer) -> None:
+        self._server = server
+
+    def on_predict_start(self, state: State, unit: TPredictUnit) -> None:
+        self._server._iteration_timer = none_throws(state.predict_state).iteration_timer
+
+    def on_predict_step_end(self, state: State, unit: TPredictUnit) -> None:
+        self._server._resolve(none_throws(state.predict_state).step_output)
@@ -19,6 +19,7 @@ from torchtnt.framework._loop_utils import (
     _set_module_training_mode,
 )
 from torchtnt.framework.callback import Callback
+from torchtnt.framework.callbacks.base_checkpointer import BaseCheckpointer
 from torchtnt.framework.state import ActivePhase, EntryPoint, PhaseState, State
 from torchtnt.framework.unit import TEvalData, TEvalUnit
 from torchtnt.framework.utils import get_timing_context
@@ -35,6 +36,7 @@ def evaluate(
     max_steps_per_epoch: Optional[int] = None,
     callbacks: Optional[List[Callback]] = None,
     timer: Optional[TimerProtocol] = None,
+    inference_mode: bool = True,
 ) -> None:
     """
     The ``evaluate`` entry point takes in a :class:`~torchtnt.framework.unit.EvalUnit` object, a train dataloader (any Iterable), optional arguments to modify loop execution,
@@ -46,6 +48,7 @@ def evaluate(
         max_steps_per_epoch: the max number of steps to run per epoch. None means evaluate until the dataloader is exhausted.
         callbacks: an optional list of :class:`~torchtnt.framework.callback.Callback` s.
         timer: an optional Timer which will be used to time key events (using a Timer with CUDA synchronization may degrade performance).
+        inference_mode: whether to run the loop under ``torch.inference_mode()``, which is faster than ``torch.no_grad()``. Tensors created by the loop can't be used in autograd afterwards. Falls back to ``torch.no_grad()`` when a checkpointing callback is used, since collectives may not support inference mode.
 
 
     Below is an example of calling :py:func:`~torchtnt.framework.evaluate`.
@@ -79,7 +82,9 @@ def evaluate(
         call on_eval_end on unit first and then callbacks
     """
     _log_api_usage("evaluate")
-    callback_handler = CallbackHandler(callbacks or [])
+    callbacks = callbacks or []
+    callback_handler = CallbackHandler(callbacks)
+    checkpoint_cb_exists = any(isinstance(cb, BaseCheckpointer) for cb in callbacks)
     state = State(
         entry_point=EntryPoint.EVALUATE,
         eval_state=PhaseState(
@@ -89,7 +94,14 @@ def evaluate(
         timer=timer,
     )
     try:
-        _evaluate_impl(state, eval_unit, callback_handler)
+        # see predict for why checkpointing requires torch.no_grad
+        inference_ctx = (
+            torch.inference_mode
+            if inference_mode and not checkpoint_cb_exists
+            else torch.no_grad
+        )
+        with inference_ctx():
+            _evaluate_impl(state, eval_unit, callback_handler)
         logger.info("Finished evaluation")
         if state.timer:
             logger.info(get_timer_summary(state.timer))
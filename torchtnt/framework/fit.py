@@ -11,6 +11,7 @@ from typing import Iterable, List, Optional
 
 import torch
 from torchtnt.framework._callback_handler import CallbackHandler
+from torchtnt.framework._fit_eval import _wrap_fit_eval_dataloader
 from torchtnt.framework._loop_utils import _log_api_usage
 from torchtnt.framework.callback import Callback
 from torchtnt.framework.state import EntryPoint, PhaseState, State
@@ -45,6 +46,8 @@ def fit(
     timer: Optional[TimerProtocol] = None,
     test_dataloader: Optional[Iterable[TTestData]] = None,
     max_test_steps: Optional[int] = None,
+    persistent_eval_iterator: bool = False,
+    eval_cache_device: Optional[torch.device] = None,
 ) -> None:
     """
     The ``fit`` entry point interleaves training and evaluation loops. The ``fit`` entry point takes in an object which subclasses both :class:`~torchtnt.framework.unit.TrainUnit` and :class:`~torchtnt.framework.unit.EvalUnit`, train and eval dataloaders (any Iterables), optional arguments to modify loop execution,
@@ -65,6 +68,14 @@ def fit(
         timer: an optional Timer which will be used to time key events (using a Timer with CUDA synchronization may degrade performance).
         test_dataloader: an optional dataloader to be used during testing after training completes.
         max_test_steps: the max number of steps to run for testing. None means test until ``test_dataloader`` is exhausted.
+        persistent_eval_iterator: whether to keep the worker processes of ``eval_dataloader`` alive across evaluations, if it is
+         a multi-process PyTorch DataLoader, by resetting its iterator instead of creating a new one for every evaluation.
+        eval_cache_device: an optional device on which the batches of the first evaluation are cached and replayed in the following evaluations,
+         instead of iterating ``eval_dataloader`` again. Meant for a fixed eval subset, e.g. set with ``max_eval_steps_per_epoch``, which fits on the device.
+         ``eval_step`` must not modify the batches in place.
+
+    The wall time spent in evaluations as a fraction of the wall time spent training is logged after every evaluation,
+    and available as ``state.eval_overhead``.
 
     Below is an example of calling :py:func:`~torchtnt.framework.fit`.
 
@@ -124,7 +135,15 @@ def fit(
             max_steps_per_epoch=max_train_steps_per_epoch,
         ),
         eval_state=PhaseState(
-            dataloader=eval_dataloader,
+            dataloader=(
+                _wrap_fit_eval_dataloader(
+                    eval_dataloader,
+                    persistent_iterator=persistent_eval_iterator,
+                    cache_device=eval_cache_device,
+                )
+                if persistent_eval_iterator or eval_cache_device is not None
+                else eval_dataloader
+            ),
             max_steps_per_epoch=max_eval_steps_per_epoch,
             evaluate_every_n_steps=evaluate_every_n_steps,
             evaluate_every_n_epochs=evaluate_every_n_epochs,
@@ -147,6 +166,8 @@ def fit(
         f"max_eval_steps_per_epoch={max_eval_steps_per_epoch} "
         f"evaluate_every_n_steps={evaluate_every_n_steps} "
         f"evaluate_every_n_epochs={evaluate_every_n_epochs} "
+        f"persistent_eval_iterator={persistent_eval_iterator} "
+        f"eval_cache_device={eval_cache_device} "
     )
 
     try:
@@ -36,6 +36,7 @@ def predict(
     max_steps_per_epoch: Optional[int] = None,
     callbacks: Optional[List[Callback]] = None,
     timer: Optional[TimerProtocol] = None,
+    inference_mode: bool = True,
 ) -> None:
     """
     The ``predict`` entry point takes in a :class:`~torchtnt.framework.unit.PredictUnit` object, a train dataloader (any Iterable), optional arguments to modify loop execution,
@@ -47,6 +48,7 @@ def predict(
         max_steps_per_epoch: the max number of steps to run per epoch. None means predict until the dataloader is exhausted.
         callbacks: an optional list of :class:`~torchtnt.framework.callback.Callback` s.
         timer: an optional Timer which will be used to time key events (using a Timer with CUDA synchronization may degrade performance).
+        inference_mode: whether to run the loop under ``torch.inference_mode()``, which is faster than ``torch.no_grad()``. Tensors created by the loop can't be used in autograd afterwards. Falls back to ``torch.no_grad()`` when a checkpointing callback is used, since collectives may not support inference mode.
 
 
     Below is an example of calling :py:func:`~torchtnt.framework.predict`.
@@ -96,7 +98,11 @@ def predict(
         # all_gather using inference_mode with gloo backend is not supported. Since this collective
         # is necessary for checkpointing, we need to use torch.no_grad instead.
         # TODO: remove this once all_gather is supported in inference_mode.
-        inference_ctx = torch.no_grad if checkpoint_cb_exists else torch.inference_mode
+        inference_ctx = (
+            torch.inference_mode
+            if inference_mode and not checkpoint_cb_exists
+            else torch.no_grad
+        )
         with inference_ctx():
             _predict_impl(state, predict_unit, callback_handler)
 
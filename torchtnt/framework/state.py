@@ -202,6 +202,10 @@ class State:
         self._test_state = test_state
         self._should_stop: bool = False
         self._active_phase: ActivePhase = ActivePhase.TRAIN
+        # wall time spent training and evaluating in fit, and start of the current train period
+        self._fit_train_time_sec: float = 0.0
+        self._fit_eval_time_sec: float = 0.0
+        self._fit_train_period_start: Optional[float] = None
 
     @property
     def entry_point(self) -> EntryPoint:
@@ -238,6 +242,13 @@ class State:
         """A :class:`~torchtnt.framework.state.PhaseState` object which contains meta information about the test phase."""
         return self._test_state
 
+    @property
+    def eval_overhead(self) -> Optional[float]:
+        """Wall time spent in evaluations during ``fit`` as a fraction of the wall time spent training, or None before the first evaluation."""
+        if self._fit_eval_time_sec == 0.0 or self._fit_train_time_sec == 0.0:
+            return None
+        return self._fit_eval_time_sec / self._fit_train_time_sec
+
     @property
     def should_stop(self) -> bool:
         """Read-only property for whether to terminate the loop after the current step completes."""
@@ -7,6 +7,7 @@
 # pyre-strict
 
 import logging
+import time
 from typing import cast, Iterable, List, Optional
 
 import torch
@@ -141,6 +142,8 @@ def _train_impl(
     train_unit.on_train_start(state)
     callback_handler.on_train_start(state, train_unit)
 
+    if state.entry_point == EntryPoint.FIT:
+        state._fit_train_period_start = time.perf_counter()
     _maybe_run_pending_fit_eval(state, train_unit, callback_handler)
 
     while not (
@@ -190,6 +193,10 @@ def _run_fit_eval(
 ) -> None:
     eval_unit = cast(EvalUnit[object], train_unit)
     eval_unit.eval_progress.mark_eval_pending()
+    eval_start = time.perf_counter()
+    train_period_start = state._fit_train_period_start
+    if train_period_start is not None:
+        state._fit_train_time_sec += eval_start - train_period_start
     _evaluate_impl(
         state,
         eval_unit,
@@ -198,6 +205,15 @@ def _run_fit_eval(
     eval_unit.eval_progress.mark_eval_completed()
     state._active_phase = ActivePhase.TRAIN
 
+    eval_end = time.perf_counter()
+    state._fit_eval_time_sec += eval_end - eval_start
+    state._fit_train_period_start = eval_end
+    eval_overhead = state.eval_overhead
+    if eval_overhead is not None:
+        logger.info(
+            f"Evaluation took {eval_end - eval_start:.3f} seconds, eval overhead is {eval_overhead:.1%} of train time"
+        )
+
 
 def _train_epoch_impl(
     state: State,
@@ -29,10 +29,13 @@ from .device import (
 from .distributed import (
     all_gather_tensors,
     barrier,
+    gather_pytree,
     get_global_rank,
     get_local_rank,
     get_process_group_backend_from_device,
     get_world_size,
+    HierarchicalProcessGroups,
+    init_hierarchical_process_groups,
     PGWrapper,
     spawn_multi_process,
     sync_bool,
@@ -59,7 +62,7 @@ from .oom import (
     is_out_of_memory_error,
     log_memory_snapshot,
 )
-from .optimizer import extract_lr_from_optimizer, init_optim_state
+from .optimizer import extract_lr_from_optimizer, GradientClipper, init_optim_state
 from .precision import convert_precision_str_to_dtype
 from .prepare_module import (
     DDPStrategy,
@@ -111,10 +114,13 @@ __all__ = [
     "record_data_in_stream",
     "all_gather_tensors",
     "barrier",
+    "gather_pytree",
     "get_global_rank",
     "get_local_rank",
     "get_process_group_backend_from_device",
     "get_world_size",
+    "HierarchicalProcessGroups",
+    "init_hierarchical_process_groups",
     "PGWrapper",
     "sync_bool",
     "EarlyStopChecker",
@@ -134,6 +140,7 @@ __all__ = [
     "is_out_of_memory_error",
     "log_memory_snapshot",
     "extract_lr_from_optimizer",
+    "GradientClipper",
     "init_optim_state",
     "convert_precision_str_to_dtype",
     "DDPStrategy",
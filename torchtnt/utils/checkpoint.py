@@ -568,6 +568,73 @@ class CheckpointManager:
             # No metric tracked, most recents goes last
             self._ckpt_paths.append(ckpt)
 
+    def add_metric_to_checkpoint(
+        self, ckpt: CheckpointPath, metric_data: MetricData
+    ) -> Optional[CheckpointPath]:
+        """
+        Adds the value of the monitored metric to a checkpoint which was saved without it, because the metric was only
+        computed later. The checkpoint is renamed (rank 0) to include the metric and tracked like a checkpoint appended
+        with `append_checkpoint`. If it is not more optimal than the tracked checkpoints when `keep_last_n_checkpoints`
+        are already kept, it is deleted instead. Must be called on all ranks, once the checkpoint is completely saved.
+
+        Args:
+            ckpt: The checkpoint saved without metric data.
+            metric_data: The value of the monitored metric for the checkpoint.
+
+        Returns:
+            The renamed checkpoint, or None if it was deleted.
+        """
+        metric_ckpt = CheckpointPath(ckpt.dirpath, ckpt.epoch, ckpt.step, metric_data)
+        should_keep = self.should_save_checkpoint(metric_ckpt)
+        if self._pg_wrapper.get_rank() == 0:
+            try:
+                if should_keep:
+                    self._file_system.mv(ckpt.path, metric_ckpt.path, recursive=True)
+                else:
+                    self._file_system.rm(ckpt.path, recursive=True)
+            except Exception as exc:
+                logger.error(
+                    f"Failed to add metric {metric_data} to checkpoint '{ckpt}'. Exception: {exc}"
+                )
+        self._pg_wrapper.barrier()
+
+        if not should_keep:
+            return None
+        self.append_checkpoint(metric_ckpt)
+        return metric_ckpt
+
+    def get_checkpoints_without_metric(self) -> List[CheckpointPath]:
+        """
+        Returns the checkpoints in the dirpath which were saved without metric data, and are thus not tracked when
+        `best_checkpoint_config` is set, e.g. checkpoints still waiting for a delayed metric when training stopped.
+        The dirpath is read on rank 0 and the result broadcasted to all ranks.
+        """
+        return [
+            ckpt
+            for ckpt in get_checkpoint_dirpaths(
+                self.dirpath,
+                metadata_fname=self._metadata_fnames,
+                process_group=self._pg_wrapper.pg,
+            )
+            if ckpt.metric_data is None
+        ]
+
+    def remove_untracked_checkpoint(self, ckpt: CheckpointPath) -> None:
+        """
+        Delete a checkpoint which is not tracked, e.g. because it never received the value of the monitored metric,
+        from the file system (rank 0). The checkpoint must be completely saved.
+
+        Args:
+            ckpt: The checkpoint to delete.
+        """
+        if self._pg_wrapper.get_rank() == 0:
+            try:
+                self._file_system.rm(ckpt.path, recursive=True)
+            except Exception as exc:
+                logger.error(
+                    f"Failed to remove untracked checkpoint '{ckpt}'. Exception: {exc}"
+                )
+
     def does_checkpoint_exist(
         self,
         ckpt: CheckpointPath,
@@ -6,6 +6,12 @@
 
 # pyre-strict
 
+from .bucketing_sampler import (
+    BatchSamplerBenchmarkResult,
+    benchmark_batch_sampler,
+    BucketBatchSampler,
+)
+from .cached_dataloader import CachedDataLoader
 from .data_prefetcher import CudaDataPrefetcher
 from .iterators import (
     AllDatasetBatchesIterator,
@@ -17,13 +23,27 @@ from .iterators import (
     RoundRobinIterator,
 )
 from .multi_dataloader import MultiDataLoader
-from .profile_dataloader import profile_dataloader
-from .synthetic_data import AbstractRandomDataset
+from .profile_dataloader import (
+    benchmark_dataloader,
+    DataLoaderConfig,
+    DataLoaderProfileResult,
+    DataLoaderSweepReport,
+    get_dataloader_sweep_summary,
+    profile_dataloader,
+    sweep_dataloader_configs,
+)
+from .synthetic_data import AbstractRandomDataset, get_synthetic_dataloader
 
 __all__ = [
     "AbstractRandomDataset",
     "AllDatasetBatchesIterator",
+    "BatchSamplerBenchmarkResult",
+    "BucketBatchSampler",
+    "CachedDataLoader",
     "CudaDataPrefetcher",
+    "DataLoaderConfig",
+    "DataLoaderProfileResult",
+    "DataLoaderSweepReport",
     "DataIterationStrategy",
     "DataIterationStrategyRegistry",
     "InOrderIterator",
@@ -31,5 +51,10 @@ __all__ = [
     "MultiIterator",
     "RandomizedBatchSamplerIterator",
     "RoundRobinIterator",
+    "benchmark_batch_sampler",
+    "benchmark_dataloader",
+    "get_dataloader_sweep_summary",
+    "get_synthetic_dataloader",
     "profile_dataloader",
+    "sweep_dataloader_configs",
 ]
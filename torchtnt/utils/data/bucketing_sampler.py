@@ -0,0 +1,273 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import logging
+from dataclasses import dataclass
+from itertools import islice
+from time import perf_counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import torch
+from torch.utils.data import Sampler
+from torchtnt.utils.distributed import get_global_rank, get_world_size
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class BucketBatchSampler(Sampler[List[int]]):
+    r"""BucketBatchSampler groups samples of similar lengths into batches bounded by a number of padded tokens.
+
+    Padding every batch to the longest sample wastes compute on variable-length inputs. This batch sampler forms
+    batches of samples of similar lengths, and sizes every batch so that its length once padded, i.e. its number of
+    samples times the length of its longest sample, is at most ``max_tokens``. Short samples thus form large batches
+    and long samples small ones.
+
+    Without ``bucket_boundaries``, samples are sorted by length before batching, with samples of equal lengths in
+    random order, which minimizes padding. With ``bucket_boundaries``, samples are assigned to the buckets delimited by
+    the boundaries and batches are formed from the samples of a bucket in random order, which trades some padding for
+    more randomness. The order of the batches is shuffled. Batches only depend on the seed and the epoch, so all ranks
+    form the same batches and every rank yields every ``num_replicas``-th batch.
+
+    The epoch is incremented after every complete iteration, or set with :meth:`set_epoch`. The sampler is stateful:
+    its state holds the epoch and the number of batches yielded in that epoch, from which an iteration resumes.
+
+    Args:
+        lengths: length of every sample of the dataset, e.g. its number of tokens.
+        max_tokens: maximum number of padded tokens of a batch.
+        bucket_boundaries (optional): increasing lengths delimiting the buckets. Bucket ``i`` holds the samples whose
+            length is in ``[bucket_boundaries[i - 1], bucket_boundaries[i])``.
+        max_batch_size (optional): maximum number of samples of a batch.
+        shuffle: whether to shuffle the samples and the batches. If False, batches are formed in order of the indices
+            of the samples, sorted by length if ``bucket_boundaries`` is not set.
+        seed: seed of the shuffling, which must be the same on all ranks.
+        num_replicas (optional): number of ranks between which batches are split. Defaults to the world size.
+        rank (optional): rank of this process. Defaults to the global rank.
+        drop_last: whether to drop the last batches if their number is not divisible by ``num_replicas``. Otherwise,
+            batches of the start of the epoch are repeated so that all ranks yield the same number of batches.
+
+    Raises:
+        ValueError: if a sample is longer than ``max_tokens``.
+
+    Note:
+        When used as the ``batch_sampler`` of a DataLoader, the sampler runs ahead of the training loop by the
+        batches the DataLoader prefetches, which its state also counts.
+
+    Example::
+
+        lengths = [len(tokens) for tokens in dataset]
+        batch_sampler = BucketBatchSampler(lengths, max_tokens=16384, bucket_boundaries=[64, 128, 256, 512])
+        dataloader = DataLoader(dataset, batch_sampler=batch_sampler, collate_fn=pad_collate)
+    """
+
+    def __init__(
+        self,
+        lengths: Union[Sequence[int], torch.Tensor],
+        *,
+        max_tokens: int,
+        bucket_boundaries: Optional[Sequence[int]] = None,
+        max_batch_size: Optional[int] = None,
+        shuffle: bool = True,
+        seed: int = 0,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+        drop_last: bool = False,
+    ) -> None:
+        self._lengths: torch.Tensor = torch.as_tensor(lengths, dtype=torch.int64)
+        if self._lengths.numel() > 0 and int(self._lengths.max()) > max_tokens:
+            num_too_long = int((self._lengths > max_tokens).sum())
+            raise ValueError(
+                f"{num_too_long} samples are longer than max_tokens {max_tokens}, the longest has length "
+                f"{int(self._lengths.max())}."
+            )
+        if bucket_boundaries is not None and list(bucket_boundaries) != sorted(
+            set(bucket_boundaries)
+        ):
+            raise ValueError(
+                f"bucket_boundaries must be strictly increasing. Got {bucket_boundaries}."
+            )
+        if max_batch_size is not None and max_batch_size <= 0:
+            raise ValueError(
+                f"max_batch_size must be greater than 0. Got {max_batch_size}."
+            )
+        self.max_tokens = max_tokens
+        self.bucket_boundaries: Optional[List[int]] = (
+            list(bucket_boundaries) if bucket_boundaries is not None else None
+        )
+        self.max_batch_size = max_batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.num_replicas: int = (
+            num_replicas if num_replicas is not None else get_world_size()
+        )
+        self.rank: int = rank if rank is not None else get_global_rank()
+        if not 0 <= self.rank < self.num_replicas:
+            raise ValueError(
+                f"rank must be in [0, {self.num_replicas}). Got {self.rank}."
+            )
+        self.drop_last = drop_last
+
+        self._epoch = 0
+        self._num_batches_yielded = 0
+        self._num_batches_to_skip = 0
+        self._batches: List[List[int]] = []
+        self._batches_epoch: Optional[int] = None
+
+    def set_epoch(self, epoch: int) -> None:
+        """Sets the epoch of the next iteration."""
+        self._epoch = epoch
+        self._num_batches_to_skip = 0
+
+    def __len__(self) -> int:
+        return len(self._get_batches(self._epoch))
+
+    def __iter__(self) -> Iterator[List[int]]:
+        epoch = self._epoch
+        num_batches_to_skip = self._num_batches_to_skip
+        self._num_batches_to_skip = 0
+        self._num_batches_yielded = num_batches_to_skip
+        for batch in islice(self._get_batches(epoch), num_batches_to_skip, None):
+            self._num_batches_yielded += 1
+            yield batch
+        self._epoch = epoch + 1
+        self._num_batches_yielded = 0
+
+    def state_dict(self) -> Dict[str, Any]:
+        return {"epoch": self._epoch, "num_batches_yielded": self._num_batches_yielded}
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        """Restores the position of the next iteration."""
+        self._epoch = state_dict["epoch"]
+        self._num_batches_yielded = state_dict["num_batches_yielded"]
+        self._num_batches_to_skip = self._num_batches_yielded
+
+    def _get_batches(self, epoch: int) -> List[List[int]]:
+        if self._batches_epoch != epoch:
+            self._batches = self._create_batches(epoch)[self.rank :: self.num_replicas]
+            self._batches_epoch = epoch
+        return self._batches
+
+    def _create_batches(self, epoch: int) -> List[List[int]]:
+        generator = torch.Generator().manual_seed(self.seed + epoch)
+        lengths = self._lengths
+        order = (
+            torch.randperm(len(lengths), generator=generator)
+            if self.shuffle
+            else torch.arange(len(lengths))
+        )
+        boundaries = self.bucket_boundaries
+        if boundaries is None:
+            # a stable sort keeps samples of equal lengths in shuffled order
+            buckets = [order[torch.sort(lengths[order], stable=True).indices]]
+        else:
+            bucket_ids = torch.bucketize(
+                lengths[order], torch.tensor(boundaries), right=True
+            )
+            buckets = [order[bucket_ids == i] for i in range(len(boundaries) + 1)]
+
+        batches = []
+        for bucket in buckets:
+            batch: List[int] = []
+            max_length = 0
+            for index, length in zip(bucket.tolist(), lengths[bucket].tolist()):
+                new_max_length = max(max_length, length)
+                if batch and (
+                    new_max_length * (len(batch) + 1) > self.max_tokens
+                    or len(batch) == self.max_batch_size
+                ):
+                    batches.append(batch)
+                    batch = []
+                    new_max_length = length
+                batch.append(index)
+                max_length = new_max_length
+            if batch:
+                batches.append(batch)
+
+        if self.shuffle:
+            batches = [
+                batches[i]
+                for i in torch.randperm(len(batches), generator=generator).tolist()
+            ]
+        num_uneven_batches = len(batches) % self.num_replicas
+        if self.drop_last:
+            batches = batches[: len(batches) - num_uneven_batches]
+        elif num_uneven_batches > 0 and batches:
+            num_padding_batches = self.num_replicas - num_uneven_batches
+            batches += [batches[i % len(batches)] for i in range(num_padding_batches)]
+        return batches
+
+
+@dataclass
+class BatchSamplerBenchmarkResult:
+    """
+    Padding efficiency and throughput of the batches of a batch sampler.
+
+    Args:
+        num_batches: number of batches sampled.
+        num_samples: number of samples of the batches.
+        num_tokens: sum of the lengths of the samples.
+        num_padded_tokens: sum over batches of the number of samples times the length of the longest sample.
+        padding_efficiency: fraction of the padded tokens which are tokens of the samples.
+        batches_per_sec: number of batches sampled per second.
+        tokens_per_sec: number of tokens sampled per second.
+    """
+
+    num_batches: int
+    num_samples: int
+    num_tokens: int
+    num_padded_tokens: int
+    padding_efficiency: float
+    batches_per_sec: float
+    tokens_per_sec: float
+
+
+def benchmark_batch_sampler(
+    batch_sampler: Iterable[List[int]],
+    lengths: Union[Sequence[int], torch.Tensor],
+    *,
+    max_steps: Optional[int] = None,
+) -> BatchSamplerBenchmarkResult:
+    """
+    Measures the padding efficiency and throughput of the batches of indices of a batch sampler, e.g. to compare a
+    :class:`BucketBatchSampler` to a ``torch.utils.data.BatchSampler`` with a fixed batch size.
+
+    Args:
+        batch_sampler: the batch sampler to benchmark.
+        lengths: length of every sample of the dataset.
+        max_steps (optional): maximum number of batches to sample. If not set, runs until the sampler is exhausted.
+    """
+    lengths = torch.as_tensor(lengths, dtype=torch.int64)
+    num_batches = 0
+    num_samples = 0
+    num_tokens = 0
+    num_padded_tokens = 0
+    start = perf_counter()
+    for batch in islice(batch_sampler, max_steps):
+        if len(batch) == 0:
+            continue
+        batch_lengths = lengths[batch]
+        num_batches += 1
+        num_samples += len(batch)
+        num_tokens += int(batch_lengths.sum())
+        num_padded_tokens += len(batch) * int(batch_lengths.max())
+    elapsed_time_sec = perf_counter() - start
+
+    result = BatchSamplerBenchmarkResult(
+        num_batches=num_batches,
+        num_samples=num_samples,
+        num_tokens=num_tokens,
+        num_padded_tokens=num_padded_tokens,
+        padding_efficiency=(
+            num_tokens / num_padded_tokens if num_padded_tokens > 0 else 1.0
+        ),
+        batches_per_sec=num_batches / elapsed_time_sec if elapsed_time_sec > 0 else 0.0,
+        tokens_per_sec=num_tokens / elapsed_time_sec if elapsed_time_sec > 0 else 0.0,
+    )
+    logger.info(
+        f"Sampled {num_batches} batches with a padding efficiency of {result.padding_efficiency:.1%}"
+    )
+    return result
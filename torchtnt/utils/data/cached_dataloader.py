@@ -0,0 +1,334 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import logging
+import os
+import pickle
+import shutil
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import torch
+from pyre_extensions import none_throws
+from torch.utils._pytree import tree_flatten, tree_unflatten
+from torchtnt.utils.stateful import Stateful
+
+from .data_prefetcher import Batch
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+_DATA_FILE = "data.bin"
+_INDEX_FILE = "index.pkl"
+# tensors are aligned in the data file so that they can be viewed with any dtype
+_ALIGNMENT = 64
+
+
+class _CachedTensor(NamedTuple):
+    offset: int
+    nbytes: int
+    dtype: torch.dtype
+    shape: List[int]
+
+
+class CachedDataLoader(Iterable[Batch]):
+    r"""CachedDataLoader caches the batches of a dataloader on disk, so that later epochs skip decoding and collation.
+
+    During the first full pass over the dataloader, batches are appended to a data file and their locations to an
+    index. Once the pass completes, the index is written to disk and every later epoch reads batches back from a
+    memory map of the data file without copying them. Batches may be any pytree whose leaves are tensors or
+    picklable objects.
+
+    Caches are stored in ``os.path.join(cache_dir, cache_name)`` and reused across runs, so ``cache_name`` should
+    change whenever the data changes, and differ across ranks that load different data. If the run is interrupted
+    before the first pass completes, the partial cache is discarded.
+
+    Args:
+        dataloader: the dataloader whose batches should be cached.
+        cache_dir: directory where caches are stored. Several caches can share it.
+        cache_name: name of this cache within ``cache_dir``.
+        shuffle: whether to shuffle the order of the cached batches in every epoch read from the cache.
+        seed: seed used to shuffle the cached batches. The order of an epoch depends only on the seed and the epoch.
+        max_cache_bytes (optional): bound on the disk space used by all caches in ``cache_dir``. When the bound is
+            exceeded, the least recently used other caches are deleted. If this cache alone exceeds it, caching is
+            abandoned and batches are always loaded from ``dataloader``. A loader whose cache was deleted by another
+            loader caches its batches again in its next epoch.
+
+    Note:
+        Cached batches are views of a copy-on-write memory map. Writing to them does not modify the cache.
+
+    Example::
+
+        dataloader = CachedDataLoader(
+            DataLoader(dataset, batch_size=32, num_workers=8),
+            cache_dir="/tmp/batch_cache",
+            cache_name=f"train_rank{rank}",
+            shuffle=True,
+        )
+        for epoch in range(num_epochs):
+            for batch in dataloader:
+                # only the first epoch runs the DataLoader
+                ...
+    """
+
+    def __init__(
+        self,
+        dataloader: Iterable[Batch],
+        cache_dir: str,
+        cache_name: str,
+        *,
+        shuffle: bool = False,
+        seed: int = 0,
+        max_cache_bytes: Optional[int] = None,
+    ) -> None:
+        if max_cache_bytes is not None and max_cache_bytes <= 0:
+            raise ValueError(
+                f"`max_cache_bytes` must be greater than 0. Got {max_cache_bytes}."
+            )
+        self.dataloader = dataloader
+        self.cache_dir = cache_dir
+        self.cache_path: str = os.path.join(cache_dir, cache_name)
+        self.shuffle = shuffle
+        self.seed = seed
+        self.max_cache_bytes = max_cache_bytes
+
+        self._index: Optional[List[Any]] = None
+        self._data: Optional[np.memmap] = None
+        self._caching_disabled = False
+        self._epoch = 0
+        self._num_batches_yielded = 0
+        self._from_cache = False
+        self._restored_state: Optional[Dict[str, Any]] = None
+        self._load_index()
+
+    @property
+    def is_cached(self) -> bool:
+        """Whether batches are read from the cache."""
+        return self._index is not None
+
+    def __len__(self) -> int:
+        index = self._index
+        if index is not None:
+            return len(index)
+        # pyre-ignore[6]: fall back to the length of the wrapped dataloader if it has one
+        return len(self.dataloader)
+
+    def __iter__(self) -> Iterator[Batch]:
+        num_batches_to_skip = 0
+        # batches of the epoch being resumed were read in dataloader order if it was not read from the cache
+        shuffle = self.shuffle
+        restored_state = self._restored_state
+        self._restored_state = None
+        if restored_state is not None:
+            self._epoch = restored_state["epoch"]
+            num_batches_to_skip = restored_state["num_batches_yielded"]
+            shuffle = shuffle and restored_state.get("from_cache", True)
+        epoch = self._epoch
+        self._epoch += 1
+        self._num_batches_yielded = num_batches_to_skip
+
+        if self._index is not None and not os.path.exists(
+            os.path.join(self.cache_path, _INDEX_FILE)
+        ):
+            # evicted by another loader sharing the cache directory
+            logger.info(f"Cache {self.cache_path} was evicted, caching it again")
+            self._index = None
+            self._data = None
+        self._from_cache = self._index is not None
+        if self._from_cache:
+            return self._iter_cache(epoch, num_batches_to_skip, shuffle)
+        return self._iter_dataloader(num_batches_to_skip, restored_state)
+
+    def state_dict(self) -> Dict[str, Any]:
+        state_dict: Dict[str, Any] = {
+            # epoch of the current (or last) iteration
+            "epoch": max(self._epoch - 1, 0),
+            "num_batches_yielded": self._num_batches_yielded,
+            "from_cache": self._from_cache,
+        }
+        if not self._from_cache and isinstance(self.dataloader, Stateful):
+            state_dict["dataloader"] = self.dataloader.state_dict()
+        return state_dict
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        """Restores the position of the next iteration."""
+        self._restored_state = state_dict
+
+    def _iter_cache(
+        self, epoch: int, num_batches_to_skip: int, shuffle: bool
+    ) -> Iterator[Batch]:
+        index = self._index
+        assert index is not None
+        # mark the cache as recently used
+        try:
+            os.utime(os.path.join(self.cache_path, _INDEX_FILE))
+        except FileNotFoundError:
+            # evicted since the iteration started, the memory map stays readable until the next epoch
+            pass
+        if shuffle:
+            generator = torch.Generator().manual_seed(self.seed + epoch)
+            order = torch.randperm(len(index), generator=generator).tolist()
+        else:
+            order = range(len(index))
+        for i in islice(order, num_batches_to_skip, None):
+            batch = self._read_batch(index[i])
+            self._num_batches_yielded += 1
+            yield batch
+
+    def _iter_dataloader(
+        self, num_batches_to_skip: int, restored_state: Optional[Dict[str, Any]]
+    ) -> Iterator[Batch]:
+        if (
+            num_batches_to_skip > 0
+            and restored_state is not None
+            and "dataloader" in restored_state
+            and isinstance(self.dataloader, Stateful)
+        ):
+            self.dataloader.load_state_dict(restored_state["dataloader"])
+            data_iter = iter(self.dataloader)
+            # only a complete pass can be cached
+            cache = False
+        else:
+            data_iter = iter(self.dataloader)
+            if num_batches_to_skip > 0:
+                logger.info(
+                    f"Fast-forwarding dataloader by {num_batches_to_skip} batches"
+                )
+                next(islice(data_iter, num_batches_to_skip, num_batches_to_skip), None)
+            cache = num_batches_to_skip == 0 and not self._caching_disabled
+
+        if not cache:
+            for batch in data_iter:
+                self._num_batches_yielded += 1
+                yield batch
+            return
+
+        shutil.rmtree(self.cache_path, ignore_errors=True)
+        os.makedirs(self.cache_path)
+        max_cache_bytes = self.max_cache_bytes
+        # the other caches are only scanned again once the bound is crossed
+        other_caches = self._get_other_caches() if max_cache_bytes is not None else []
+        other_caches_bytes = sum(size for _, size in other_caches)
+        index = []
+        completed = False
+        try:
+            with open(os.path.join(self.cache_path, _DATA_FILE), "wb") as data_file:
+                for batch in data_iter:
+                    if cache:
+                        index.append(self._write_batch(data_file, batch))
+                        cache_bytes = data_file.tell()
+                        if (
+                            max_cache_bytes is not None
+                            and cache_bytes + other_caches_bytes > max_cache_bytes
+                        ):
+                            cache = self._fits_in_cache(cache_bytes, other_caches)
+                            other_caches_bytes = sum(size for _, size in other_caches)
+                    self._num_batches_yielded += 1
+                    yield batch
+            completed = cache
+        finally:
+            if completed:
+                with open(os.path.join(self.cache_path, _INDEX_FILE), "wb") as f:
+                    pickle.dump(index, f)
+                self._load_index()
+            else:
+                shutil.rmtree(self.cache_path, ignore_errors=True)
+
+    def _get_other_caches(self) -> List[Tuple[str, int]]:
+        """Returns the paths and sizes of the other caches in the cache directory, least recently used first."""
+        other_caches = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if path != self.cache_path and os.path.isdir(path):
+                other_caches.append((_get_last_used_time(path), path))
+        other_caches.sort()
+        return [(path, _get_size_bytes(path)) for _, path in other_caches]
+
+    def _fits_in_cache(
+        self, cache_bytes: int, other_caches: List[Tuple[str, int]]
+    ) -> bool:
+        """Evicts least recently used caches from ``other_caches`` until the cache fits in ``max_cache_bytes``."""
+        max_cache_bytes = none_throws(self.max_cache_bytes)
+        total_bytes = cache_bytes + sum(size for _, size in other_caches)
+        while total_bytes > max_cache_bytes and other_caches:
+            path, size = other_caches.pop(0)
+            logger.info(f"Evicting least recently used cache {path}")
+            total_bytes -= size
+            shutil.rmtree(path, ignore_errors=True)
+        if total_bytes > max_cache_bytes:
+            logger.warning(
+                f"Cache {self.cache_path} does not fit in {max_cache_bytes} bytes, "
+                "batches will be loaded from the dataloader in every epoch."
+            )
+            self._caching_disabled = True
+            return False
+        return True
+
+    def _write_batch(self, data_file: Any, batch: Batch) -> Any:
+        leaves, treespec = tree_flatten(batch)
+        cached_leaves = []
+        for leaf in leaves:
+            if not isinstance(leaf, torch.Tensor):
+                cached_leaves.append(leaf)
+                continue
+            offset = data_file.tell()
+            padding = -offset % _ALIGNMENT
+            if padding:
+                data_file.write(b"\0" * padding)
+                offset += padding
+            data = leaf.detach().cpu().contiguous().reshape(-1).view(torch.uint8)
+            data_file.write(memoryview(data.numpy()))
+            cached_leaves.append(
+                _CachedTensor(offset, data.numel(), leaf.dtype, list(leaf.shape))
+            )
+        return (treespec, cached_leaves)
+
+    def _read_batch(self, entry: Any) -> Batch:
+        treespec, cached_leaves = entry
+        data = self._data
+        leaves = []
+        for leaf in cached_leaves:
+            if not isinstance(leaf, _CachedTensor):
+                leaves.append(leaf)
+            elif leaf.nbytes == 0:
+                leaves.append(torch.empty(leaf.shape, dtype=leaf.dtype))
+            else:
+                assert data is not None
+                buffer = torch.from_numpy(data[leaf.offset : leaf.offset + leaf.nbytes])
+                leaves.append(buffer.view(leaf.dtype).view(leaf.shape))
+        return tree_unflatten(leaves, treespec)
+
+    def _load_index(self) -> None:
+        index_path = os.path.join(self.cache_path, _INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "rb") as f:
+            self._index = pickle.load(f)
+        data_path = os.path.join(self.cache_path, _DATA_FILE)
+        # an empty file can't be memory mapped, which only happens if no batch holds tensor data
+        if os.path.getsize(data_path) > 0:
+            self._data = np.memmap(data_path, dtype=np.uint8, mode="c")
+        logger.info(f"Reading batches from cache {self.cache_path}")
+
+
+def _get_last_used_time(path: str) -> float:
+    index_path = os.path.join(path, _INDEX_FILE)
+    if os.path.exists(index_path):
+        return os.path.getmtime(index_path)
+    return os.path.getmtime(path)
+
+
+def _get_size_bytes(path: str) -> int:
+    size_bytes = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                size_bytes += os.path.getsize(os.path.join(root, file))
+            except FileNotFoundError:
+                continue
+    return size_bytes
@@ -13,7 +13,7 @@ import logging
 import random
 from abc import abstractmethod
 from dataclasses import dataclass
-from itertools import cycle
+from itertools import cycle, islice
 from typing import (
     Any,
     cast,
@@ -41,6 +41,7 @@ except ImportError:
 
 import torch
 import torch.distributed as dist
+from torchtnt.utils.stateful import Stateful
 
 if TYPE_CHECKING:
     from torch.utils.data import DataLoader
@@ -93,6 +94,56 @@ class MultiIterator(Iterator[Dict[str, Any]]):
     def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
         pass
 
+    @staticmethod
+    def get_saved_dataloader_states(
+        state_dict: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Returns the states of individual dataloaders contained in a state dict of this iterator, keyed by dataloader name.
+
+        Args:
+            state_dict: a state dict returned by :meth:`state_dict`
+        """
+        return state_dict.get("dataloaders", {})
+
+    def _get_dataloader_state(
+        self, name: str, num_batches_consumed: int
+    ) -> Dict[str, Any]:
+        """Returns the state needed to resume iterating over an individual dataloader.
+
+        Args:
+            name: name of the dataloader
+            num_batches_consumed: number of batches consumed from the current iterator of the dataloader
+        """
+        dataloader_state: Dict[str, Any] = {
+            "num_batches_consumed": num_batches_consumed
+        }
+        dataloader = self.individual_dataloaders[name]
+        if isinstance(dataloader, Stateful):
+            dataloader_state["state_dict"] = dataloader.state_dict()
+        return dataloader_state
+
+    def _restore_dataloader_iterator(
+        self, name: str, dataloader_state: Dict[str, Any]
+    ) -> Iterator[object]:
+        """Creates an iterator over an individual dataloader, positioned where the checkpointed one stopped.
+
+        Stateful dataloaders restore their own position. Other dataloaders are fast-forwarded
+        by skipping the batches that were already consumed.
+        """
+        dataloader = self.individual_dataloaders[name]
+        if isinstance(dataloader, Stateful) and "state_dict" in dataloader_state:
+            dataloader.load_state_dict(dataloader_state["state_dict"])
+            return iter(dataloader)
+
+        iterator = iter(dataloader)
+        num_batches_consumed = dataloader_state.get("num_batches_consumed", 0)
+        if num_batches_consumed > 0:
+            logger.info(
+                f"Fast-forwarding dataloader {name} by {num_batches_consumed} batches"
+            )
+            next(islice(iterator, num_batches_consumed, num_batches_consumed), None)
+        return iterator
+
 
 # pyrefly: ignore [invalid-inheritance]
 class StoppingMechanism(StrEnum):
@@ -158,7 +209,7 @@ class RoundRobinIterator(MultiIterator):
             raise NotImplementedError(
                 "WRAP_AROUND_UNTIL_KILLED is not implemented for RoundRobin"
             )
-        self.individual_iterators: Mapping[
+        self.individual_iterators: MutableMapping[
             str, Union[Iterator[DataLoader], Iterator[object]]
         ] = {name: iter(dl) for name, dl in individual_dataloaders.items()}
         round_robin_order = iteration_strategy.iteration_order or list(
@@ -167,6 +218,9 @@ class RoundRobinIterator(MultiIterator):
         self.dataloader_cycle: Iterator[str] = cycle(round_robin_order)
         self.cur_dataloader: str = round_robin_order[0]
         self.finished_dataloaders: List[str] = []
+        self.num_batches_consumed: Dict[str, int] = dict.fromkeys(
+            self.individual_iterators, 0
+        )
 
     def __next__(self) -> Dict[str, Any]:
         if len(self.finished_dataloaders) == len(self.individual_iterators):
@@ -176,11 +230,9 @@ class RoundRobinIterator(MultiIterator):
         while self.cur_dataloader in self.finished_dataloaders:
             self.cur_dataloader = next(self.dataloader_cycle)
         try:
-            return {
-                self.cur_dataloader: next(
-                    self.individual_iterators[self.cur_dataloader]
-                )
-            }
+            batch = next(self.individual_iterators[self.cur_dataloader])
+            self.num_batches_consumed[self.cur_dataloader] += 1
+            return {self.cur_dataloader: batch}
         except StopIteration:
             if (
                 # pyrefly: ignore [missing-attribute]
@@ -198,8 +250,13 @@ class RoundRobinIterator(MultiIterator):
 
     def state_dict(self) -> Dict[str, Any]:
         return {
-            "finished_dataloaders": self.finished_dataloaders,
+            "finished_dataloaders": list(self.finished_dataloaders),
             "cur_dataloader": self.cur_dataloader,
+            "dataloaders": {
+                name: self._get_dataloader_state(name, num_batches_consumed)
+                for name, num_batches_consumed in self.num_batches_consumed.items()
+                if name not in self.finished_dataloaders
+            },
         }
 
     def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
@@ -207,6 +264,14 @@ class RoundRobinIterator(MultiIterator):
             f"Loading RoundRobinIterator state. Finished dataloaders: {state_dict['finished_dataloaders']} and trying to set cur_dataloader to {self.cur_dataloader}"
         )
         self.finished_dataloaders = state_dict["finished_dataloaders"]
+        for name, dataloader_state in state_dict.get("dataloaders", {}).items():
+            if name in self.individual_iterators:
+                self.individual_iterators[name] = self._restore_dataloader_iterator(
+                    name, dataloader_state
+                )
+                self.num_batches_consumed[name] = dataloader_state[
+                    "num_batches_consumed"
+                ]
         cur_dataloader = state_dict["cur_dataloader"]
         if cur_dataloader not in self.dataloader_cycle:
             logger.warning(
@@ -279,6 +344,9 @@ class AllDatasetBatchesIterator(MultiIterator):
             str, Union[Iterator[DataLoader], Iterator[object]]
         ] = {name: iter(dl) for name, dl in individual_dataloaders.items()}
         self.iterators_finished: List[str] = []
+        self.num_batches_consumed: Dict[str, int] = dict.fromkeys(
+            self.individual_iterators, 0
+        )
 
     def __next__(self) -> Dict[str, Any]:
         batch_dict = {}
@@ -286,6 +354,7 @@ class AllDatasetBatchesIterator(MultiIterator):
             try:
                 # pyrefly: ignore [unsupported-operation]
                 batch_dict[iterator] = next(self.individual_iterators[iterator])
+                self.num_batches_consumed[iterator] += 1
             except StopIteration:
                 if (
                     # pyrefly: ignore [missing-attribute]
@@ -308,11 +377,75 @@ class AllDatasetBatchesIterator(MultiIterator):
                         )
                         # pyrefly: ignore [unsupported-operation]
                         batch_dict[iterator] = next(self.individual_iterators[iterator])
+                        self.num_batches_consumed[iterator] = 1
 
         if len(batch_dict) == 0:
             raise StopIteration
         return batch_dict
 
+    def state_dict(self) -> Dict[str, Any]:
+        return {
+            "iterators_finished": list(self.iterators_finished),
+            "dataloaders": {
+                name: self._get_dataloader_state(name, num_batches_consumed)
+                for name, num_batches_consumed in self.num_batches_consumed.items()
+            },
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        logger.info(
+            f"Loading AllDatasetBatchesIterator state. Finished iterators: {state_dict['iterators_finished']}"
+        )
+        self.iterators_finished = [
+            name
+            for name in state_dict["iterators_finished"]
+            if name in self.individual_iterators
+        ]
+        for name, dataloader_state in state_dict["dataloaders"].items():
+            if name in self.individual_iterators:
+                self.individual_iterators[name] = self._restore_dataloader_iterator(
+                    name, dataloader_state
+                )
+                self.num_batches_consumed[name] = dataloader_state[
+                    "num_batches_consumed"
+                ]
+
+
+class _AliasTable:
+    """Alias table (Vose's method) to sample indices with O(1) cost per draw.
+
+    Args:
+        indices: the values to sample from
+        weights: the relative weight of each value in ``indices``
+    """
+
+    def __init__(self, indices: List[int], weights: List[float]) -> None:
+        total = sum(weights)
+        if not indices or total <= 0:
+            raise ValueError("Total of weights must be greater than zero")
+
+        n = len(indices)
+        scaled = [weight * n / total for weight in weights]
+        self._indices = indices
+        self._prob: List[float] = [1.0] * n
+        self._alias: List[int] = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # leftovers are 1.0 up to floating point error
+
+    def sample(self, rng: random.Random) -> int:
+        slot = rng.randrange(len(self._indices))
+        if rng.random() >= self._prob[slot]:
+            slot = self._alias[slot]
+        return self._indices[slot]
+
 
 @dataclass
 class RandomizedBatchSampler(DataIterationStrategy):
@@ -328,6 +461,13 @@ class RandomizedBatchSamplerIterator(MultiIterator):
     By default, the iterator stops after all datasets are exhausted. This can be changed
     by setting another stopping mechanism.
 
+    Each draw costs O(1) by sampling from a precomputed alias table, which is only rebuilt
+    when a dataset is exhausted. Draws come from a random generator seeded once per iterator
+    (i.e. per epoch) from the global ``random`` module. When ``enforce_same_loader_across_ranks``
+    is set, the seed is broadcast from rank 0 when the iterator is created, so every rank computes
+    the same sequence of dataloaders locally without communicating on each batch. This requires
+    the dataloaders to yield the same number of batches on every rank.
+
     Returns batches of the format: {dataloader_name: batch_from_dataloader}
 
     Args:
@@ -380,16 +520,37 @@ class RandomizedBatchSamplerIterator(MultiIterator):
         self.enforce_same_loader_across_ranks: bool = (
             iteration_strategy.enforce_same_loader_across_ranks
         )
-        if self.enforce_same_loader_across_ranks:
-            self._iterator_names_dict: Dict[str, torch.IntTensor] = {
-                name: torch.IntTensor([idx])
-                for idx, name in enumerate(self._iterator_names)
-            }
+        # draw a per-epoch seed, which rank 0 shares with the other ranks if requested
+        seed = torch.tensor([random.getrandbits(63)], dtype=torch.int64)
+        if (
+            self.enforce_same_loader_across_ranks
+            and dist.is_available()
+            and dist.is_initialized()
+        ):
             self._process_group: dist.ProcessGroup = cast(
                 dist.ProcessGroup, dist.new_group(backend="gloo", ranks=None)
             )
+            dist.broadcast(seed, 0, group=self._process_group)
+        self._rng: random.Random = random.Random(int(seed.item()))
 
         self._iterators_finished: List[str] = []
+        self._num_batches_consumed: Dict[str, int] = dict.fromkeys(
+            self._iterator_names, 0
+        )
+        self._alias_table: _AliasTable = self._build_alias_table()
+
+    def _build_alias_table(self) -> _AliasTable:
+        indices = list(range(len(self._iterator_names)))
+        if self.stopping_mechanism == StoppingMechanism.ALL_DATASETS_EXHAUSTED:
+            # exhausted dataloaders are only skipped when all of them must be drained
+            indices = [i for i in indices if not self._iterator_is_exhausted[i]]
+        iterator_weights = self._iterator_weights
+        weights = (
+            [iterator_weights[i] for i in indices]
+            if iterator_weights is not None
+            else [1.0] * len(indices)
+        )
+        return _AliasTable(indices, weights)
 
     def __next__(self) -> Dict[str, Any]:
         if (
@@ -409,39 +570,11 @@ class RandomizedBatchSamplerIterator(MultiIterator):
         ):
             raise StopIteration
 
-        iterator_names = self._iterator_names
-        iterator_weights = self._iterator_weights
-
-        if (
-            self.stopping_mechanism != StoppingMechanism.WRAP_AROUND_UNTIL_KILLED
-            and iterator_weights is not None
-        ):
-            iterator_names = [
-                name
-                for name, exhausted in zip(iterator_names, self._iterator_is_exhausted)
-                if not exhausted
-            ]
-            iterator_weights = [
-                weight
-                for weight, exhausted in zip(
-                    iterator_weights, self._iterator_is_exhausted
-                )
-                if not exhausted
-            ]
-
-        selected_key = random.choices(iterator_names, weights=iterator_weights)[0]
-
-        if (
-            self.enforce_same_loader_across_ranks
-            and dist.is_available()
-            and dist.is_initialized()
-        ):
-            key_idx = self._iterator_names_dict[selected_key]
-            dist.broadcast(key_idx, 0, group=self._process_group)
-            selected_key = self._iterator_names[cast(int, key_idx.item())]
+        selected_key = self._iterator_names[self._alias_table.sample(self._rng)]
 
         try:
             batch = next(self._individual_iterators[selected_key])
+            self._num_batches_consumed[selected_key] += 1
         except StopIteration:
             if (
                 self.stopping_mechanism
@@ -456,18 +589,57 @@ class RandomizedBatchSamplerIterator(MultiIterator):
                         self._individual_dataloaders[selected_key]
                     )
                 batch = next(self._individual_iterators[selected_key])
+                self._num_batches_consumed[selected_key] = 1
             elif self.stopping_mechanism == StoppingMechanism.WRAP_AROUND_UNTIL_KILLED:
                 self._individual_iterators[selected_key] = iter(
                     self._individual_dataloaders[selected_key]
                 )
                 batch = next(self._individual_iterators[selected_key])
+                self._num_batches_consumed[selected_key] = 1
             else:
                 selected_index = self._iterator_names.index(selected_key)
                 self._iterator_is_exhausted[selected_index] = True
+                if not all(self._iterator_is_exhausted) and (
+                    self.stopping_mechanism == StoppingMechanism.ALL_DATASETS_EXHAUSTED
+                ):
+                    self._alias_table = self._build_alias_table()
                 return next(self)
 
         return {selected_key: batch}
 
+    def state_dict(self) -> Dict[str, Any]:
+        version, internal_state, gauss_next = self._rng.getstate()
+        return {
+            "rng_state": [version, list(internal_state), gauss_next],
+            "iterator_is_exhausted": list(self._iterator_is_exhausted),
+            "iterators_finished": list(self._iterators_finished),
+            "dataloaders": {
+                name: self._get_dataloader_state(name, num_batches_consumed)
+                for name, num_batches_consumed in self._num_batches_consumed.items()
+            },
+        }
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        logger.info("Loading RandomizedBatchSamplerIterator state")
+        dataloader_states: Dict[str, Any] = state_dict["dataloaders"]
+        if sorted(dataloader_states.keys()) != self._iterator_names:
+            logger.warning(
+                f"Will not restore RandomizedBatchSamplerIterator state, since the checkpointed dataloaders {sorted(dataloader_states.keys())} do not match {self._iterator_names}"
+            )
+            return
+
+        version, internal_state, gauss_next = state_dict["rng_state"]
+        self._rng.setstate((version, tuple(internal_state), gauss_next))
+        self._iterator_is_exhausted = list(state_dict["iterator_is_exhausted"])
+        self._iterators_finished = list(state_dict["iterators_finished"])
+        for name, dataloader_state in dataloader_states.items():
+            self._individual_iterators[name] = self._restore_dataloader_iterator(
+                name, dataloader_state
+            )
+            self._num_batches_consumed[name] = dataloader_state["num_batches_consumed"]
+        if not all(self._iterator_is_exhausted):
+            self._alias_table = self._build_alias_table()
+
 
 @dataclass
 class InOrder(DataIterationStrategy):
@@ -519,6 +691,8 @@ class InOrderIterator(MultiIterator):
         self.cur_iterator: str = self.iteration_order[0]
         self.num_iterators: int = len(self.iteration_order)
         self.iterators_finished: int = 0
+        self.num_batches_consumed: int = 0
+        self._restored_dataloader_state: Optional[Dict[str, Any]] = None
 
     def __next__(self) -> Dict[str, Any]:
         if self.iterators_finished == self.num_iterators:
@@ -527,16 +701,26 @@ class InOrderIterator(MultiIterator):
         # If the current iterator doesn't match the expected number of finished iterators,
         # it means we restored from checkpoint and we need to initialize expected iterator
         # This is to avoid calling iter() in the load_state_dict() function.
-        if self.iterators_finished != self.cur_iterator_idx:
+        if (
+            self.iterators_finished != self.cur_iterator_idx
+            or self._restored_dataloader_state is not None
+        ):
+            self.cur_iterator_idx = self.iterators_finished
+            self.cur_iterator = self.iteration_order[self.iterators_finished]
             logger.info(
                 f"Initializing iterator {self.cur_iterator} after resuming from checkpoint"
             )
-            self.cur_iterator_idx = self.iterators_finished
-            self.cur_iterator = self.iteration_order[self.iterators_finished]
-            self.cur_iter = iter(self.individual_dataloaders[self.cur_iterator])
+            dataloader_state = self._restored_dataloader_state or {}
+            self._restored_dataloader_state = None
+            self.cur_iter = self._restore_dataloader_iterator(
+                self.cur_iterator, dataloader_state
+            )
+            self.num_batches_consumed = dataloader_state.get("num_batches_consumed", 0)
 
         try:
-            return {self.cur_iterator: next(self.cur_iter)}
+            batch = next(self.cur_iter)
+            self.num_batches_consumed += 1
+            return {self.cur_iterator: batch}
         except StopIteration:
             self.iterators_finished += 1
 
@@ -547,14 +731,30 @@ class InOrderIterator(MultiIterator):
             self.cur_iterator_idx += 1
             self.cur_iterator = self.iteration_order[self.iterators_finished]
             self.cur_iter = iter(self.individual_dataloaders[self.cur_iterator])
+            self.num_batches_consumed = 0
 
             return self.__next__()
 
     def state_dict(self) -> Dict[str, Any]:
-        return {
+        state_dict = {
             "iterators_finished": self.iterators_finished,
             "cur_iterator": self.cur_iterator,
         }
+        if self.iterators_finished == self.num_iterators:
+            return state_dict
+        if (
+            self.iterators_finished != self.cur_iterator_idx
+            or self._restored_dataloader_state is not None
+        ):
+            # a restored state is only applied once iteration resumes
+            state_dict["dataloader"] = self._restored_dataloader_state or {
+                "num_batches_consumed": 0
+            }
+        else:
+            state_dict["dataloader"] = self._get_dataloader_state(
+                self.cur_iterator, self.num_batches_consumed
+            )
+        return state_dict
 
     def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
         iterators_finished: int = state_dict["iterators_finished"]
@@ -573,6 +773,16 @@ class InOrderIterator(MultiIterator):
 
         self.iterators_finished = iterators_finished
         # We do not initialize actual iterator here to avoid checkpoint restore taking longer
+        self._restored_dataloader_state = state_dict.get("dataloader")
+
+    @staticmethod
+    def get_saved_dataloader_states(
+        state_dict: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
+        dataloader_state = state_dict.get("dataloader")
+        if dataloader_state is None:
+            return {}
+        return {state_dict["cur_iterator"]: dataloader_state}
 
 
 class DataIterationStrategyRegistry:
@@ -10,7 +10,21 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, Iterable, Iterator, Optional, Type, TYPE_CHECKING, Union
+import queue
+import threading
+from typing import (
+    Any,
+    cast,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+    Union,
+)
 
 from pyre_extensions import none_throws
 from torchtnt.utils.data.iterators import (
@@ -26,6 +40,123 @@ if TYPE_CHECKING:
 
 logger: logging.Logger = logging.getLogger(__name__)
 
+# markers put in the prefetch queue by the worker thread
+_END_OF_DATA = object()
+_WORKER_ERROR = object()
+
+
+class _PrefetchIterator(Iterator[object]):
+    """Iterator which reads batches from a dataloader in a background thread into a bounded queue.
+
+    If the dataloader is :class:`~torchtnt.utils.stateful.Stateful`, its state is recorded after producing
+    each batch, so that ``consumed_state`` reflects the batches returned by this iterator rather than the
+    batches read ahead.
+    """
+
+    def __init__(
+        self, dataloader: Union[DataLoader, Iterable[object]], num_prefetch: int
+    ) -> None:
+        self._queue: queue.Queue[Tuple[object, Any]] = queue.Queue(maxsize=num_prefetch)
+        self._stop_event = threading.Event()
+        self._done = False
+        self.consumed_state: Optional[Dict[str, Any]] = (
+            dataloader.state_dict() if isinstance(dataloader, Stateful) else None
+        )
+        self._thread = threading.Thread(
+            target=self._worker,
+            args=(dataloader,),
+            name="MultiDataLoaderPrefetch",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _worker(self, dataloader: Union[DataLoader, Iterable[object]]) -> None:
+        try:
+            iterator = iter(dataloader)
+            while not self._stop_event.is_set():
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    self._put((_END_OF_DATA, None))
+                    return
+                state = (
+                    dataloader.state_dict()
+                    if isinstance(dataloader, Stateful)
+                    else None
+                )
+                self._put((batch, state))
+        except Exception as e:
+            self._put((_WORKER_ERROR, e))
+
+    def _put(self, item: Tuple[object, Any]) -> None:
+        # wake up periodically so that close() can stop a worker blocked on a full queue
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def __next__(self) -> object:
+        if self._done:
+            raise StopIteration
+        item, extra = self._queue.get()
+        if item is _END_OF_DATA:
+            self._done = True
+            raise StopIteration
+        if item is _WORKER_ERROR:
+            self._done = True
+            raise extra
+        self.consumed_state = extra
+        return item
+
+    def close(self, join: bool = False) -> None:
+        self._stop_event.set()
+        self._done = True
+        if join:
+            # waits for an in-flight read from the dataloader to finish
+            self._thread.join()
+
+
+class _PrefetchingIterable(Iterable[object]):
+    """Wraps a dataloader so that iterating over it reads ahead in a background thread."""
+
+    def __init__(
+        self, dataloader: Union[DataLoader, Iterable[object]], num_prefetch: int
+    ) -> None:
+        self.dataloader = dataloader
+        self.num_prefetch = num_prefetch
+        self.current_iterator: Optional[_PrefetchIterator] = None
+
+    def __iter__(self) -> Iterator[object]:
+        if self.current_iterator is not None:
+            self.current_iterator.close()
+        self.current_iterator = _PrefetchIterator(self.dataloader, self.num_prefetch)
+        return self.current_iterator
+
+    def close(self) -> None:
+        if self.current_iterator is not None:
+            self.current_iterator.close(join=True)
+            self.current_iterator = None
+
+
+class _StatefulPrefetchingIterable(_PrefetchingIterable):
+    """Prefetching wrapper of a :class:`~torchtnt.utils.stateful.Stateful` dataloader.
+
+    Its state is the one of the wrapped dataloader after producing the last batch consumed from the wrapper.
+    """
+
+    def state_dict(self) -> Dict[str, Any]:
+        current_iterator = self.current_iterator
+        if current_iterator is not None and current_iterator.consumed_state is not None:
+            return current_iterator.consumed_state
+        return cast(Stateful, self.dataloader).state_dict()
+
+    def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
+        # background reads must not race with restoring the dataloader
+        self.close()
+        cast(Stateful, self.dataloader).load_state_dict(state_dict)
+
 
 class MultiDataLoader:
     """MultiDataLoader cycles through individual dataloaders passed to it.
@@ -36,6 +167,9 @@ class MultiDataLoader:
         iteration_strategy (DataIterationStrategy): A dataclass indicating how the dataloaders are iterated over.
         iterator_cls (MultiIterator, optional): A subclass of MultiIterator defining iteration logic. This is the type, not an object instance
         ignore_empty_data (bool): skip dataloaders which contain no data. It's False by default, and an exception is raised.
+        num_prefetch_batches (int): if greater than 0, each dataloader is read by a background thread which keeps up to this many
+        batches ready, so that a slow dataloader does not stall reading from the others. The iteration strategy still decides the
+        order in which batches are returned. It's 0 by default, where dataloaders are read synchronously.
 
     Note:
         `TorchData <https://pytorch.org/data/beta/index.html>`_ also has generic
@@ -51,11 +185,28 @@ class MultiDataLoader:
         iteration_strategy: DataIterationStrategy,
         iterator_cls: Optional[Type[MultiIterator]] = None,
         ignore_empty_data: bool = False,
+        num_prefetch_batches: int = 0,
     ) -> None:
+        if num_prefetch_batches < 0:
+            raise ValueError(
+                f"num_prefetch_batches must be non-negative. Value passed is {num_prefetch_batches}"
+            )
         self.individual_dataloaders = individual_dataloaders
         self.iteration_strategy = iteration_strategy
         self.iterator_cls = iterator_cls
         self.current_iterator: Optional[MultiIterator] = None
+        self._prefetching_dataloaders: Optional[Dict[str, _PrefetchingIterable]] = (
+            {
+                name: (
+                    _StatefulPrefetchingIterable(dl, num_prefetch_batches)
+                    if isinstance(dl, Stateful)
+                    else _PrefetchingIterable(dl, num_prefetch_batches)
+                )
+                for name, dl in individual_dataloaders.items()
+            }
+            if num_prefetch_batches > 0
+            else None
+        )
         for name in list(individual_dataloaders.keys()):
             try:
                 next(iter(self.individual_dataloaders[name]))
@@ -76,13 +227,17 @@ class MultiDataLoader:
             a newly created iterator based on DataIterationStrategy
 
         """
-        iterator_cls = self.iterator_cls
-        if iterator_cls is None:
-            iterator_cls = DataIterationStrategyRegistry.get(self.iteration_strategy)
+        self._close_prefetching_dataloaders()
+        iterator_cls = self._get_iterator_cls()
         # in practice, DataIterationStrategyRegistry.get() returns just concrete classes
+        individual_dataloaders: Mapping[str, Union[DataLoader, Iterable[object]]] = (
+            self._prefetching_dataloaders
+            if self._prefetching_dataloaders is not None
+            else self.individual_dataloaders
+        )
         # pyre-ignore[45]: Cannot instantiate abstract class `MultiIterator`.
         self.current_iterator = iterator_cls(
-            individual_dataloaders=self.individual_dataloaders,
+            individual_dataloaders=individual_dataloaders,
             iteration_strategy=self.iteration_strategy,
         )
         if self.iterator_state is not None:
@@ -91,6 +246,12 @@ class MultiDataLoader:
         self.iterator_state = None
         return none_throws(self.current_iterator)
 
+    def _get_iterator_cls(self) -> Type[MultiIterator]:
+        iterator_cls = self.iterator_cls
+        if iterator_cls is None:
+            iterator_cls = DataIterationStrategyRegistry.get(self.iteration_strategy)
+        return iterator_cls
+
     def state_dict(self) -> Dict[str, Any]:
         """Return an aggregated state dict based on individual dataloaders.
 
@@ -98,23 +259,47 @@ class MultiDataLoader:
 
         Note:
             Only states from dataloaders that implement the :class:`~torchtnt.utils.stateful.Stateful` protocol are included in the returned state dict.
+            When prefetching, the state of each dataloader is the one recorded after producing the last batch returned by the iterator.
+            The state of a dataloader which is saved in the state of the current iterator, under ``iterator_state``, is not repeated
+            under its name.
         """
         state_dict = {}
-        for name, dl in self.individual_dataloaders.items():
-            if isinstance(dl, Stateful):
-                state_dict[name] = dl.state_dict()
-
+        iterator_state: Dict[str, Any] = {}
+        saved_dataloader_states: Dict[str, Dict[str, Any]] = {}
         if (current_iterator := self.current_iterator) is not None:
             iterator_state = current_iterator.state_dict()
-            if iterator_state:
-                logger.info("Storing iterator state in MultiDataLoader state_dict")
-                # we make an implicit assumption here that none of the dataloaders have the "iterator_state" key in order to be backwards compatible
-                # with already saved checkpoints (we don't want to modify the dataloaders stateful names)
-                # pyrefly: ignore [unsupported-operation]
-                state_dict["iterator_state"] = iterator_state
+            saved_dataloader_states = current_iterator.get_saved_dataloader_states(
+                iterator_state
+            )
+
+        for name, dl in self.individual_dataloaders.items():
+            if isinstance(dl, Stateful) and "state_dict" not in (
+                saved_dataloader_states.get(name, {})
+            ):
+                state_dict[name] = self._get_consumed_state(name, dl)
+
+        if iterator_state:
+            logger.info("Storing iterator state in MultiDataLoader state_dict")
+            # we make an implicit assumption here that none of the dataloaders have the "iterator_state" key in order to be backwards compatible
+            # with already saved checkpoints (we don't want to modify the dataloaders stateful names)
+            # pyrefly: ignore [unsupported-operation]
+            state_dict["iterator_state"] = iterator_state
 
         return state_dict
 
+    def _close_prefetching_dataloaders(self) -> None:
+        if self._prefetching_dataloaders is not None:
+            for prefetching_dataloader in self._prefetching_dataloaders.values():
+                prefetching_dataloader.close()
+
+    def _get_consumed_state(self, name: str, dl: Stateful) -> Dict[str, Any]:
+        prefetching_dataloaders = self._prefetching_dataloaders
+        if prefetching_dataloaders is not None:
+            return cast(
+                _StatefulPrefetchingIterable, prefetching_dataloaders[name]
+            ).state_dict()
+        return dl.state_dict()
+
     def load_state_dict(self, state_dict: Dict[str, Any]) -> None:
         """Loads aggregated state dict based on individual dataloaders.
 
@@ -122,9 +307,20 @@ class MultiDataLoader:
 
         Note:
             Only states from dataloaders that implement the :class:`~torchtnt.utils.stateful.Stateful` protocol are loaded.
+            Dataloaders whose state is saved under ``iterator_state`` are restored by the iterator on the next ``__iter__`` call.
         """
+        # background reads must not race with restoring the dataloaders
+        self._close_prefetching_dataloaders()
+        iterator_state = state_dict.get("iterator_state")
+        saved_dataloader_states = (
+            self._get_iterator_cls().get_saved_dataloader_states(iterator_state)
+            if iterator_state
+            else {}
+        )
         for name, dl in self.individual_dataloaders.items():
             if isinstance(dl, Stateful):
+                if "state_dict" in saved_dataloader_states.get(name, {}):
+                    continue
                 contents = state_dict.get(name, None)
                 if contents is None:
                     logger.warning(
@@ -8,12 +8,37 @@
 # pyre-strict
 
 import logging
-from typing import Iterable, Optional
+from dataclasses import dataclass
+from itertools import product
+from time import perf_counter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
 
+import psutil
 import torch
+from pyre_extensions import none_throws
+from tabulate import tabulate
 from torch.profiler import record_function
+from torch.utils.data import DataLoader, Dataset, default_collate, IterableDataset
+from torch.utils.data._utils.pin_memory import pin_memory
 from torchtnt.utils.device import copy_data_to_device
-from torchtnt.utils.timer import Timer, TimerProtocol
+from torchtnt.utils.memory import RSSProfiler
+from torchtnt.utils.timer import (
+    _validate_percentiles,
+    get_durations_histogram,
+    Timer,
+    TimerProtocol,
+)
 
 _log: logging.Logger = logging.getLogger(__name__)
 
@@ -61,3 +86,442 @@ def profile_dataloader(
             break
 
     return timer
+
+
+@dataclass(frozen=True)
+class DataLoaderConfig:
+    """
+    A DataLoader configuration evaluated by :func:`sweep_dataloader_configs`.
+
+    Args:
+        batch_size: number of samples per batch.
+        num_workers: number of DataLoader worker processes.
+        prefetch_factor: number of batches loaded in advance by each worker. Must be None when ``num_workers`` is 0.
+        pin_memory: whether batches are copied into pinned memory before being returned.
+    """
+
+    batch_size: int
+    num_workers: int = 0
+    prefetch_factor: Optional[int] = None
+    pin_memory: bool = False
+
+
+@dataclass
+class DataLoaderProfileResult:
+    """
+    Throughput and per-stage latency measurements of a single dataloader run.
+
+    Args:
+        config: the configuration which was profiled, if the dataloader was built by :func:`sweep_dataloader_configs`.
+        num_batches: number of batches fetched.
+        num_samples: number of samples fetched.
+        elapsed_time_sec: wall time spent iterating, including the creation of the iterator.
+        samples_per_sec: number of samples fetched per second of wall time.
+        worker_cpu_utilization: CPU time used by the data loading processes, divided by the wall time and the number of processes.
+            With ``num_workers`` > 0 this covers the worker processes only, otherwise the main process.
+        peak_rss_delta_bytes: peak increase of the main process' resident set size while iterating.
+        stage_latencies: percentiles and mean of the latency of each measured stage, in seconds.
+            Stages are ``fetch`` (loading the samples of a batch), ``collate``, ``pin``, ``h2d`` (copying to the device)
+            and ``next(iter)`` (time the main process waits for a batch).
+        bottleneck: the stage with the highest effective cost per batch, or None if no stage could be attributed.
+            Costs of ``fetch`` and ``collate`` are divided by the number of workers, since workers run them in parallel.
+    """
+
+    config: Optional[DataLoaderConfig]
+    num_batches: int
+    num_samples: int
+    elapsed_time_sec: float
+    samples_per_sec: float
+    worker_cpu_utilization: float
+    peak_rss_delta_bytes: int
+    stage_latencies: Dict[str, Dict[str, float]]
+    bottleneck: Optional[str]
+
+
+@dataclass
+class DataLoaderSweepReport:
+    """
+    Results of :func:`sweep_dataloader_configs`.
+
+    Args:
+        results: profiling results of every configuration, in the order they were run.
+        recommended: the recommended configuration.
+    """
+
+    results: List[DataLoaderProfileResult]
+    recommended: DataLoaderConfig
+
+
+class _TimedBatch:
+    """
+    Carries a collated batch together with the time its worker spent on each stage.
+    The DataLoader pin memory thread calls :meth:`pin_memory`, which lets pinning be timed too.
+    """
+
+    def __init__(
+        self, data: object, num_samples: int, stage_durations: Dict[str, float]
+    ) -> None:
+        self.data = data
+        self.num_samples = num_samples
+        self.stage_durations = stage_durations
+
+    def pin_memory(self) -> "_TimedBatch":
+        start = perf_counter()
+        self.data = pin_memory(self.data)
+        self.stage_durations["pin"] = perf_counter() - start
+        return self
+
+
+# time spent fetching samples for the batch currently being built in this process.
+# Fetching and collating a batch always happen in the same process, one batch at a time.
+_pending_fetch_time: List[float] = [0.0]
+
+
+def _record_fetch_time(start: float) -> None:
+    _pending_fetch_time[0] += perf_counter() - start
+
+
+class _TimedMapDataset(Dataset):
+    def __init__(self, dataset: Dataset) -> None:
+        self.dataset = dataset
+
+    def __getitem__(self, index: int) -> object:
+        start = perf_counter()
+        sample = self.dataset[index]
+        _record_fetch_time(start)
+        return sample
+
+    def __len__(self) -> int:
+        # pyre-ignore[6]: map-style datasets passed to the sweep must define __len__
+        return len(self.dataset)
+
+
+class _TimedIterableDataset(IterableDataset):
+    def __init__(self, dataset: IterableDataset) -> None:
+        self.dataset = dataset
+
+    def __iter__(self) -> Iterator[object]:
+        iterator = iter(self.dataset)
+        while True:
+            start = perf_counter()
+            try:
+                sample = next(iterator)
+            except StopIteration:
+                return
+            _record_fetch_time(start)
+            yield sample
+
+
+class _TimedCollate:
+    def __init__(self, collate_fn: Callable[[List[Any]], object]) -> None:
+        self.collate_fn = collate_fn
+
+    def __call__(self, samples: List[Any]) -> _TimedBatch:
+        fetch_time = _pending_fetch_time[0]
+        _pending_fetch_time[0] = 0.0
+        start = perf_counter()
+        data = self.collate_fn(samples)
+        collate_time = perf_counter() - start
+        return _TimedBatch(
+            data, len(samples), {"fetch": fetch_time, "collate": collate_time}
+        )
+
+
+def _get_cpu_time(processes: List[psutil.Process]) -> float:
+    cpu_time = 0.0
+    for process in processes:
+        try:
+            cpu_times = process.cpu_times()
+        except psutil.NoSuchProcess:
+            continue
+        cpu_time += cpu_times.user + cpu_times.system
+    return cpu_time
+
+
+def benchmark_dataloader(
+    dataloader: Iterable[object],
+    *,
+    max_steps: Optional[int] = None,
+    device: Optional[torch.device] = None,
+    percentiles: Sequence[float] = (50.0, 90.0, 99.0),
+    rss_profiler: Optional[RSSProfiler] = None,
+    config: Optional[DataLoaderConfig] = None,
+) -> DataLoaderProfileResult:
+    """
+    Measures the throughput of a dataloader and the latency of each of its stages. Runs offline, no training step is executed.
+
+    Any iterable can be benchmarked. Worker-side stages (``fetch``, ``collate`` and ``pin``) are only measured
+    for dataloaders built by :func:`sweep_dataloader_configs`; for other iterables the main process wait time
+    and, if a device is set, the ``h2d`` copy are measured.
+
+    Args:
+        dataloader: dataloader to be benchmarked.
+        max_steps (optional): maximum number of batches to fetch. If not set, the dataloader will run until its iterator is exhausted.
+        device (optional): device to copy the data to. If set, the ``h2d`` stage is measured.
+        percentiles: the latency percentiles to report for each stage. Values should be in the range [0, 100].
+        rss_profiler (optional): profiler used to track the RSS of the main process. A new one is created if not set.
+        config (optional): the configuration the dataloader was built with, attached to the result.
+
+    Raises:
+        ValueError: If the input percentiles are not in the range [0, 100].
+    """
+    _validate_percentiles(percentiles)
+    timer = Timer(cuda_sync=False)
+    rss_profiler = rss_profiler if rss_profiler is not None else RSSProfiler()
+    rss_profile_name = str(config) if config is not None else "dataloader"
+    num_workers = config.num_workers if config is not None else 0
+
+    main_process = psutil.Process()
+    steps_completed = 0
+    num_samples = 0
+    with rss_profiler.profile(rss_profile_name):
+        main_cpu_time_start = _get_cpu_time([main_process])
+        existing_children = set(main_process.children())
+        start = perf_counter()
+        with timer.time("iter(dataloader)"):
+            data_iter = iter(dataloader)
+        worker_processes = [
+            child for child in main_process.children() if child not in existing_children
+        ]
+        while max_steps is None or (steps_completed < max_steps):
+            try:
+                with timer.time("next(iter)"):
+                    data = next(data_iter)
+            except StopIteration:
+                break
+
+            if isinstance(data, _TimedBatch):
+                for stage, duration in data.stage_durations.items():
+                    timer.recorded_durations[stage].append(duration)
+                num_samples += data.num_samples
+                data = data.data
+            else:
+                num_samples += _get_batch_size(data)
+
+            if device is not None:
+                with timer.time("h2d"):
+                    data = copy_data_to_device(data, device)
+                    if device.type == "cuda":
+                        torch.cuda.synchronize(device)
+            steps_completed += 1
+
+        elapsed_time_sec = perf_counter() - start
+        # measure workers before deleting the iterator, which shuts them down
+        if num_workers > 0:
+            cpu_time = _get_cpu_time(worker_processes)
+            num_processes = num_workers
+        else:
+            cpu_time = _get_cpu_time([main_process]) - main_cpu_time_start
+            num_processes = 1
+        del data_iter
+
+    rss_deltas = rss_profiler.rss_deltas_bytes.get(rss_profile_name, [])
+    return DataLoaderProfileResult(
+        config=config,
+        num_batches=steps_completed,
+        num_samples=num_samples,
+        elapsed_time_sec=elapsed_time_sec,
+        samples_per_sec=num_samples / elapsed_time_sec if elapsed_time_sec > 0 else 0.0,
+        worker_cpu_utilization=(
+            cpu_time / (elapsed_time_sec * num_processes)
+            if elapsed_time_sec > 0
+            else 0.0
+        ),
+        peak_rss_delta_bytes=max(rss_deltas, default=0),
+        stage_latencies=get_durations_histogram(
+            {k: v for k, v in timer.recorded_durations.items() if len(v) > 0},
+            percentiles=percentiles,
+        ),
+        bottleneck=_attribute_bottleneck(timer.recorded_durations, num_workers),
+    )
+
+
+def sweep_dataloader_configs(
+    dataset: Union[Dataset, IterableDataset],
+    *,
+    batch_sizes: Sequence[int],
+    num_workers: Sequence[int] = (0,),
+    prefetch_factors: Sequence[int] = (2,),
+    pin_memory: Sequence[bool] = (False,),
+    collate_fn: Optional[Callable[[List[Any]], object]] = None,
+    max_steps: Optional[int] = None,
+    device: Optional[torch.device] = None,
+    percentiles: Sequence[float] = (50.0, 90.0, 99.0),
+    tolerance: float = 0.05,
+) -> DataLoaderSweepReport:
+    """
+    Benchmarks a DataLoader over the dataset for every combination of the given settings and recommends a configuration.
+
+    The recommended configuration is the cheapest one, i.e. with the fewest workers, then the smallest prefetch factor,
+    without pinned memory if possible, whose throughput is within ``tolerance`` of the best throughput measured.
+
+    Args:
+        dataset: map-style or iterable dataset to load from. Iterable datasets are responsible for sharding their data across workers.
+        batch_sizes: batch sizes to evaluate.
+        num_workers: numbers of workers to evaluate.
+        prefetch_factors: prefetch factors to evaluate. Only applies to configurations with workers.
+        pin_memory: pin memory settings to evaluate. Pinned memory is skipped when CUDA is not available.
+        collate_fn (optional): function merging a list of samples into a batch. Defaults to the DataLoader default.
+        max_steps (optional): maximum number of batches to fetch per configuration. If not set, each configuration runs for a full epoch.
+        device (optional): device to copy the data to. If set, the ``h2d`` stage is measured.
+        percentiles: the latency percentiles to report for each stage. Values should be in the range [0, 100].
+        tolerance: relative throughput loss accepted in exchange for a cheaper configuration.
+
+    Raises:
+        ValueError: If no configuration can be evaluated, or if the tolerance is negative.
+    """
+    if tolerance < 0:
+        raise ValueError(f"tolerance must be non-negative. Got {tolerance}")
+
+    configs = _get_sweep_configs(batch_sizes, num_workers, prefetch_factors, pin_memory)
+    if not configs:
+        raise ValueError("No DataLoader configuration to evaluate.")
+
+    if isinstance(dataset, IterableDataset):
+        timed_dataset = _TimedIterableDataset(dataset)
+    else:
+        timed_dataset = _TimedMapDataset(dataset)
+    timed_collate = _TimedCollate(
+        collate_fn if collate_fn is not None else default_collate
+    )
+
+    rss_profiler = RSSProfiler()
+    results = []
+    for config in configs:
+        dataloader = DataLoader(
+            timed_dataset,
+            batch_size=config.batch_size,
+            num_workers=config.num_workers,
+            prefetch_factor=config.prefetch_factor,
+            pin_memory=config.pin_memory,
+            collate_fn=timed_collate,
+        )
+        result = benchmark_dataloader(
+            dataloader,
+            max_steps=max_steps,
+            device=device,
+            percentiles=percentiles,
+            rss_profiler=rss_profiler,
+            config=config,
+        )
+        _log.info(
+            f"{config}: {result.samples_per_sec:.1f} samples/sec, bottleneck: {result.bottleneck}"
+        )
+        results.append(result)
+
+    recommended = _select_recommended(results, tolerance)
+    _log.info(f"Recommended DataLoader configuration: {recommended}")
+    return DataLoaderSweepReport(results=results, recommended=recommended)
+
+
+def get_dataloader_sweep_summary(report: DataLoaderSweepReport) -> str:
+    """
+    Returns a table summarizing the results of :func:`sweep_dataloader_configs`.
+
+    Args:
+        report: the report to summarize.
+    """
+    rows = []
+    for result in report.results:
+        config = none_throws(result.config)
+        rows.append(
+            [
+                "*" if config == report.recommended else "",
+                config.batch_size,
+                config.num_workers,
+                config.prefetch_factor,
+                config.pin_memory,
+                f"{result.samples_per_sec:.1f}",
+                f"{result.worker_cpu_utilization:.0%}",
+                f"{result.peak_rss_delta_bytes / 2**20:.1f}",
+                result.bottleneck,
+            ]
+        )
+    return tabulate(
+        rows,
+        headers=[
+            "",
+            "batch size",
+            "workers",
+            "prefetch",
+            "pin memory",
+            "samples/sec",
+            "worker cpu",
+            "peak rss delta (MB)",
+            "bottleneck",
+        ],
+    )
+
+
+def _get_sweep_configs(
+    batch_sizes: Sequence[int],
+    num_workers: Sequence[int],
+    prefetch_factors: Sequence[int],
+    pin_memory: Sequence[bool],
+) -> List[DataLoaderConfig]:
+    if any(pin_memory) and not torch.cuda.is_available():
+        _log.warning("CUDA is not available, skipping pinned memory configurations.")
+        pin_memory = [pin for pin in pin_memory if not pin]
+
+    configs = []
+    for batch_size, workers, prefetch_factor, pin in product(
+        batch_sizes, num_workers, prefetch_factors, pin_memory
+    ):
+        config = DataLoaderConfig(
+            batch_size=batch_size,
+            num_workers=workers,
+            # prefetching only applies to worker processes
+            prefetch_factor=prefetch_factor if workers > 0 else None,
+            pin_memory=pin,
+        )
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+
+def _attribute_bottleneck(
+    recorded_durations: Mapping[str, List[float]], num_workers: int
+) -> Optional[str]:
+    costs = {}
+    for stage in ("fetch", "collate", "pin", "h2d"):
+        durations = recorded_durations.get(stage)
+        if not durations:
+            continue
+        cost = sum(durations) / len(durations)
+        if stage in ("fetch", "collate"):
+            cost /= max(num_workers, 1)
+        costs[stage] = cost
+    if not costs:
+        return None
+    return max(costs, key=lambda stage: costs[stage])
+
+
+def _select_recommended(
+    results: Sequence[DataLoaderProfileResult], tolerance: float
+) -> DataLoaderConfig:
+    best_samples_per_sec = max(result.samples_per_sec for result in results)
+    candidates = [
+        none_throws(result.config)
+        for result in results
+        if result.samples_per_sec >= (1 - tolerance) * best_samples_per_sec
+    ]
+    return min(
+        candidates,
+        key=lambda config: (
+            config.num_workers,
+            config.prefetch_factor or 0,
+            config.pin_memory,
+            -config.batch_size,
+        ),
+    )
+
+
+def _get_batch_size(data: object) -> int:
+    if isinstance(data, torch.Tensor):
+        return data.shape[0] if data.dim() > 0 else 1
+    if isinstance(data, Mapping):
+        data = next(iter(data.values()), None)
+        return _get_batch_size(data) if data is not None else 1
+    if isinstance(data, (list, tuple)) and len(data) > 0:
+        return _get_batch_size(data[0])
+    return 1
@@ -11,11 +11,15 @@ from __future__ import annotations
 
 import abc
 import logging
+import operator
 from dataclasses import dataclass, field
-from typing import Generic, TypeVar
+from typing import Any, Generic, List, Optional, Sequence, TypeVar, Union
 
 import torch
-from torch.utils.data import Dataset
+from pyre_extensions import none_throws
+from torch.utils._pytree import tree_flatten, tree_map, tree_unflatten
+from torch.utils.data import BatchSampler, DataLoader, Dataset, SequentialSampler
+from torch.utils.data._utils.collate import default_collate
 from torchtnt.utils.device import get_device_from_env
 
 
@@ -34,15 +38,41 @@ class AbstractRandomDataset(Dataset, abc.ABC, Generic[TItem]):
     of the `_generate_random_item` method that produces a single random dataset
     item of type `TItem`.
 
+    Subclasses may also override `_generate_random_batch` to generate a whole batch
+    in one vectorized call. Indexing the dataset with a sequence of indices returns
+    such a batch, which avoids per-item generation and collation when the dataset is
+    loaded through `get_synthetic_dataloader`.
+
     Attributes:
         size (int, default=100): The total number of items the dataset will contain.
+        seed (Optional[int], default=None): If set, the item at each index is generated
+            from its own generator, seeded from `seed` and the index, so it is the same
+            whether fetched alone or in any batch. Batches are then generated one item at
+            a time. Subclasses overriding `_generate_random_batch` must draw from the
+            generator it is passed.
+        pool_size (Optional[int], default=None): If set, this many items are generated
+            once into shared memory, and items are served from this pool instead of
+            being generated on access. DataLoader workers read the pool without copying
+            it, which isolates framework overhead from data generation cost.
     """
 
     size: int = field(default=100)
+    seed: Optional[int] = field(default=None)
+    pool_size: Optional[int] = field(default=None)
+    _pool: Optional[TItem] = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
         if self.size <= 0:
             raise ValueError(f"Size must be greater than zero. (Received {self.size})")
+        if self.pool_size is not None:
+            if self.pool_size <= 0:
+                raise ValueError(
+                    f"Pool size must be greater than zero. (Received {self.pool_size})"
+                )
+            pool = self._generate_random_batch(
+                self.pool_size, self._get_generator(self.seed)
+            )
+            self._pool = tree_map(_share_memory, pool)
         logger.debug(f"Instantiated {self.__class__.__name__} with {self.size} items")
 
     def __len__(self) -> int:
@@ -55,23 +85,71 @@ class AbstractRandomDataset(Dataset, abc.ABC, Generic[TItem]):
         return self.size
 
     # pyrefly: ignore [bad-override-param-name]
-    def __getitem__(self, idx: int) -> TItem:
+    def __getitem__(self, idx: Union[int, Sequence[int]]) -> TItem:
         """
-        Fetch a dataset item by index.
+        Fetch a dataset item by index, or a batch of items by a sequence of indices.
 
         Args:
-            idx (int): Index of the desired dataset item.
+            idx (Union[int, Sequence[int]]): Index of the desired dataset item, or
+                indices of the items making up the desired batch.
 
         Returns:
-            TItem: A single random item of type `TItem`.
+            TItem: A single random item of type `TItem`, or a batch of items
+                stacked along the first dimension.
 
         Raises:
-            IndexError: If the provided index is out of valid range.
+            IndexError: If a provided index is out of valid range.
         """
-        if 0 <= idx < self.size:
+        try:
+            # accepts any integer index, such as numpy integers and 0-d tensors
+            index = operator.index(idx)
+        except TypeError:
+            indices = [operator.index(i) for i in idx]
+            for i in indices:
+                self._check_index(i)
+            return self._get_batch(indices)
+
+        self._check_index(index)
+        if self._pool is None and self.seed is None:
             return self._generate_random_item()
+        return tree_map(lambda x: x[0], self._get_batch([index]))
+
+    def _check_index(self, idx: int) -> None:
+        if not 0 <= idx < self.size:
+            raise IndexError(f"Index {idx} out of range [0, {self.size-1}]")
 
-        raise IndexError(f"Index {idx} out of range [0, {self.size-1}]")
+    def _get_batch(self, indices: Sequence[int]) -> TItem:
+        pool = self._pool
+        if pool is None:
+            seed = self.seed
+            if seed is None:
+                return self._generate_random_batch(
+                    len(indices), self._get_generator(None)
+                )
+            # items don't depend on the other indices of the batch
+            return _concat_batches(
+                [
+                    self._generate_random_batch(1, self._get_generator(hash((seed, i))))
+                    for i in indices
+                ]
+            )
+
+        pool_size = none_throws(self.pool_size)
+        start = indices[0] % pool_size
+        if all(i % pool_size == start + n for n, i in enumerate(indices)):
+            # contiguous indices are served as a view of the pool
+            return tree_map(lambda x: x[start : start + len(indices)], pool)
+        pool_indices = torch.tensor([i % pool_size for i in indices])
+        return tree_map(lambda x: x[pool_indices], pool)
+
+    @staticmethod
+    def _get_generator(seed: Optional[int]) -> torch.Generator:
+        generator = torch.Generator()
+        if seed is None:
+            generator.seed()
+        else:
+            generator.manual_seed(seed & 0x7FFF_FFFF_FFFF_FFFF)
+        return generator
 
     @abc.abstractmethod
     def _generate_random_item(self) -> TItem:
@@ -87,9 +165,81 @@ class AbstractRandomDataset(Dataset, abc.ABC, Generic[TItem]):
             "Subclasses of AbstractRandomDataset should implement _generate_random_item."
         )
 
+    def _generate_random_batch(
+        self, batch_size: int, generator: torch.Generator
+    ) -> TItem:
+        """
+        Produce a batch of random items, stacked along the first dimension.
+
+        The default implementation collates `batch_size` calls to
+        `_generate_random_item`, with the global CPU random number generator set to
+        the state of `generator`. Subclasses should override this to generate the
+        batch in one vectorized call drawing from `generator`.
+
+        Args:
+            batch_size (int): Number of items in the batch.
+            generator (torch.Generator): Generator to draw random numbers from.
+
+        Returns:
+            TItem: A batch of random items.
+        """
+        with torch.random.fork_rng(devices=[]):
+            torch.default_generator.set_state(generator.get_state())
+            return default_collate(
+                [self._generate_random_item() for _ in range(batch_size)]
+            )
+
+
+def _concat_batches(batches: List[TItem]) -> TItem:
+    if len(batches) == 1:
+        return batches[0]
+    leaves, spec = tree_flatten(batches[0])
+    batch_leaves = [tree_flatten(batch)[0] for batch in batches[1:]]
+    return tree_unflatten(
+        [torch.cat(tensors) for tensors in zip(leaves, *batch_leaves)], spec
+    )
+
+
+def get_synthetic_dataloader(
+    dataset: AbstractRandomDataset[TItem],
+    batch_size: int,
+    *,
+    drop_last: bool = False,
+    **dataloader_kwargs: Any,
+) -> DataLoader:
+    """
+    Create a DataLoader which fetches each batch from the dataset with a single vectorized call.
+
+    Batches of sequential indices are passed to the dataset directly, so no per-item
+    generation or collation happens. When the dataset has a pool, each batch is a view
+    of the shared memory pool.
+
+    Args:
+        dataset (AbstractRandomDataset[TItem]): Dataset to load from.
+        batch_size (int): Number of items per batch.
+        drop_last (bool, default=False): Whether to drop the last incomplete batch.
+        dataloader_kwargs: Additional arguments passed to the DataLoader, such as
+            `num_workers`. Must not contain arguments controlling batching.
+
+    Returns:
+        DataLoader: DataLoader yielding batches of type `TItem`.
+    """
+    return DataLoader(
+        dataset,
+        sampler=BatchSampler(
+            SequentialSampler(dataset), batch_size=batch_size, drop_last=drop_last
+        ),
+        batch_size=None,
+        **dataloader_kwargs,
+    )
+
 
 def generate_random_square_image_tensor(
-    num_channels: int, side_length: int
+    num_channels: int,
+    side_length: int,
+    *,
+    batch_size: Optional[int] = None,
+    generator: Optional[torch.Generator] = None,
 ) -> torch.Tensor:
     """
     Generate a random tensor with the given image dimensions.
@@ -97,9 +247,15 @@ def generate_random_square_image_tensor(
     Args:
         num_channels (int): Number of channels for the random square image.
         side_length (int): Side length of the random square image.
+        batch_size (Optional[int], default=None): If set, a batch of this many images
+            is generated in one call.
+        generator (Optional[torch.Generator], default=None): Generator to draw random
+            numbers from. The tensor is created on the generator's device. If not set,
+            the global generator of the device from the environment is used.
 
     Returns:
-        torch.Tensor: Randomly generated tensor with shape [num_channels, side_length, side_length].
+        torch.Tensor: Randomly generated tensor with shape [num_channels, side_length, side_length],
+            or [batch_size, num_channels, side_length, side_length] if batch_size is set.
 
     Raises:
         ValueError: If num_channels or side_length is not greater than zero.
@@ -112,7 +268,19 @@ def generate_random_square_image_tensor(
         raise ValueError(
             f"side_length must be greater than zero. Received: {side_length}"
         )
+    if batch_size is not None and batch_size <= 0:
+        raise ValueError(
+            f"batch_size must be greater than zero. Received: {batch_size}"
+        )
 
-    return torch.rand(
-        num_channels, side_length, side_length, device=get_device_from_env()
-    )
+    shape: List[int] = [num_channels, side_length, side_length]
+    if batch_size is not None:
+        shape.insert(0, batch_size)
+    device = generator.device if generator is not None else get_device_from_env()
+    return torch.rand(shape, generator=generator, device=device)
+
+
+def _share_memory(x: object) -> object:
+    if isinstance(x, torch.Tensor) and x.device.type == "cpu":
+        return x.share_memory_()
+    return x
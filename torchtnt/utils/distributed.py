@@ -9,6 +9,7 @@
 
 import logging
 import os
+import pickle
 import shutil
 import tempfile
 from contextlib import contextmanager
@@ -22,6 +23,7 @@ import torch
 import torch.nn.functional as F
 from torch import distributed as dist, multiprocessing, Tensor
 from torch.distributed.elastic.utils.distributed import get_free_port
+from torch.utils._pytree import tree_flatten, tree_unflatten
 from typing_extensions import Literal, ParamSpec
 
 
@@ -62,6 +64,10 @@ class PGWrapper:
     def barrier(self) -> None:
         if self.pg is None:
             return
+        hier_pgs = _get_hierarchical_process_groups(self.pg)
+        if hier_pgs is not None:
+            _hierarchical_barrier(hier_pgs)
+            return
         backend = dist.get_backend(group=self.pg)
         if backend == dist.Backend.NCCL:
             dist.barrier(group=self.pg, device_ids=[torch.cuda.current_device()])
@@ -71,6 +77,14 @@ class PGWrapper:
     def broadcast_object_list(self, obj_list: DistObjList, src: int = 0) -> None:
         if self.pg is None:
             return
+        hier_pgs = _get_hierarchical_process_groups(self.pg)
+        if hier_pgs is not None and src == 0:
+            if hier_pgs.leaders_pg is not None:
+                dist.broadcast_object_list(obj_list, src=0, group=hier_pgs.leaders_pg)
+            dist.broadcast_object_list(
+                obj_list, src=hier_pgs.local_leader, group=hier_pgs.local_pg
+            )
+            return
         dist.broadcast_object_list(obj_list, src=src, group=self.pg)
 
     def all_gather_object(self, obj_list: DistObjList, obj: T) -> None:
@@ -114,6 +128,141 @@ class PGWrapper:
         dist.scatter_object_list(output_list, input_list, src=src, group=self.pg)
 
 
+@dataclass
+class HierarchicalProcessGroups:
+    """
+    Two-level topology used to route framework control-plane collectives
+    (barriers, boolean syncs, rank 0 broadcasts) through an intra-node stage
+    followed by an inter-node stage among one leader rank per node.
+
+    Ranks are expected to be assigned contiguously per node, as done by torchelastic:
+    global rank ``r`` lives on node ``r // local_world_size``.
+
+    Attributes:
+        local_pg: process group with all ranks on the current node
+        leaders_pg: process group with local rank 0 of every node. ``None`` on non-leader ranks.
+        local_leader: global rank of local rank 0 on the current node
+        local_world_size: number of ranks per node
+        num_nodes: number of nodes
+    """
+
+    local_pg: dist.ProcessGroup
+    leaders_pg: Optional[dist.ProcessGroup]
+    local_leader: int
+    local_world_size: int
+    num_nodes: int
+
+
+_HIERARCHICAL_PROCESS_GROUPS: Optional[HierarchicalProcessGroups] = None
+
+
+def init_hierarchical_process_groups(
+    local_world_size: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> Optional[HierarchicalProcessGroups]:
+    """
+    Builds the intra-node and inter-node leader process groups and registers them so that
+    :func:`barrier`, :func:`sync_bool`, :func:`broadcast_str` and :class:`PGWrapper` collectives
+    over the global process group are routed hierarchically.
+
+    This must be called on all ranks, after the global process group is initialized.
+
+    Args:
+        local_world_size: number of ranks per node. If ``None``, the default is fetched using :func:`get_local_world_size`.
+        backend: backend of the created process groups. If ``None``, the backend of the global process group is used.
+
+    Returns:
+        The created :class:`HierarchicalProcessGroups`, or ``None`` if torch.distributed is not initialized.
+
+    Note:
+        Hierarchical routing is only used when there is more than one node and more than one rank per node.
+        Otherwise collectives fall back to the global process group.
+    """
+    global _HIERARCHICAL_PROCESS_GROUPS
+
+    if not (dist.is_available() and dist.is_initialized()):
+        logger.info(
+            "Not in a distributed environment, hierarchical process groups not created"
+        )
+        return None
+
+    local_world_size = (
+        local_world_size if local_world_size is not None else get_local_world_size()
+    )
+    world_size = dist.get_world_size()
+    if local_world_size < 1 or world_size % local_world_size != 0:
+        raise ValueError(
+            f"Invalid local_world_size value provided: {local_world_size}. World size ({world_size}) must be a multiple of it."
+        )
+
+    rank = dist.get_rank()
+    num_nodes = world_size // local_world_size
+    node_idx = rank // local_world_size
+
+    # new_group must be called by all ranks for every group, including those they are not part of
+    local_pg = None
+    for node in range(num_nodes):
+        ranks = list(range(node * local_world_size, (node + 1) * local_world_size))
+        pg = dist.new_group(ranks=ranks, backend=backend)
+        if node == node_idx:
+            local_pg = pg
+
+    leader_ranks = [node * local_world_size for node in range(num_nodes)]
+    leaders_pg = dist.new_group(ranks=leader_ranks, backend=backend)
+
+    _HIERARCHICAL_PROCESS_GROUPS = HierarchicalProcessGroups(
+        local_pg=cast(dist.ProcessGroup, local_pg),
+        leaders_pg=(
+            cast(dist.ProcessGroup, leaders_pg) if rank in leader_ranks else None
+        ),
+        local_leader=node_idx * local_world_size,
+        local_world_size=local_world_size,
+        num_nodes=num_nodes,
+    )
+    return _HIERARCHICAL_PROCESS_GROUPS
+
+
+def _get_hierarchical_process_groups(
+    pg: Optional[dist.ProcessGroup],
+) -> Optional[HierarchicalProcessGroups]:
+    """
+    Returns the registered hierarchical process groups if collectives over ``pg`` should be routed through them.
+    Only collectives over the global process group (``None`` or WORLD) are routed.
+    """
+    hier_pgs = _HIERARCHICAL_PROCESS_GROUPS
+    if hier_pgs is None or hier_pgs.num_nodes == 1 or hier_pgs.local_world_size == 1:
+        return None
+    if pg is not None and pg is not dist.group.WORLD:
+        return None
+    return hier_pgs
+
+
+def _hierarchical_barrier(hier_pgs: HierarchicalProcessGroups) -> None:
+    # gather each node on its leader, sync leaders, then release each node
+    PGWrapper(hier_pgs.local_pg).barrier()
+    if hier_pgs.leaders_pg is not None:
+        PGWrapper(hier_pgs.leaders_pg).barrier()
+    PGWrapper(hier_pgs.local_pg).barrier()
+
+
+def _hierarchical_all_reduce_sum(
+    tensor: Tensor, hier_pgs: HierarchicalProcessGroups
+) -> None:
+    dist.reduce(tensor, dst=hier_pgs.local_leader, group=hier_pgs.local_pg)
+    if hier_pgs.leaders_pg is not None:
+        dist.all_reduce(tensor, op=dist.ReduceOp.SUM, group=hier_pgs.leaders_pg)
+    dist.broadcast(tensor, src=hier_pgs.local_leader, group=hier_pgs.local_pg)
+
+
+def _hierarchical_broadcast_from_rank_zero(
+    tensor: Tensor, hier_pgs: HierarchicalProcessGroups
+) -> None:
+    # global rank 0 is always the leader of the first node
+    if hier_pgs.leaders_pg is not None:
+        dist.broadcast(tensor, src=0, group=hier_pgs.leaders_pg)
+    dist.broadcast(tensor, src=hier_pgs.local_leader, group=hier_pgs.local_pg)
+
+
 def get_global_rank() -> int:
     """
     Get rank using torch.distributed if available. Otherwise, the RANK env var instead if initialized.
@@ -170,10 +319,15 @@ def barrier() -> None:
     """
     Add a synchronization point across all processes when using distributed.
     If torch.distributed is initialized, this function will invoke a barrier across the global process group.
+    If :func:`init_hierarchical_process_groups` was called, the barrier is done within each node first and then across nodes.
     For more granular process group wrapping, please refer to :class:`~torchtnt.utils.PGWrapper`.
     """
     if not (dist.is_available() and dist.is_initialized()):
         return
+    hier_pgs = _get_hierarchical_process_groups(None)
+    if hier_pgs is not None:
+        _hierarchical_barrier(hier_pgs)
+        return
     backend = dist.get_backend()
     if backend == dist.Backend.NCCL:
         dist.barrier(device_ids=[torch.cuda.current_device()])
@@ -183,6 +337,9 @@ def barrier() -> None:
 
 def destroy_process_group() -> None:
     """Destroy the global process group, if one is already initialized."""
+    global _HIERARCHICAL_PROCESS_GROUPS
+    # subgroups are destroyed together with the global process group
+    _HIERARCHICAL_PROCESS_GROUPS = None
     if dist.is_available() and dist.is_initialized():
         dist.destroy_process_group()
 
@@ -341,6 +498,127 @@ def all_gather_tensors(
     return gathered_result
 
 
+@dataclass
+class _TensorMetadata:
+    dtype: torch.dtype
+    shape: torch.Size
+
+
+def gather_pytree(
+    obj: T,
+    *,
+    dst: Optional[int] = None,
+    group: Optional[dist.ProcessGroup] = None,
+) -> Optional[List[T]]:
+    """Function to gather a pytree of tensors, e.g. a state dict, from several distributed processes.
+
+    Instead of gathering every tensor with :func:`all_gather_tensors`, the tensors are packed into one buffer per dtype.
+    Gathering takes one collective to exchange the structure of the pytrees and the shapes of the tensors, and one
+    collective per dtype, however many tensors the pytree holds. Tensors may have different shapes, and pytrees different
+    structures, on every process. Leaves which aren't tensors are gathered along with the structure.
+
+    Args:
+        obj: the pytree to gather
+        dst: the global rank of the process to gather to. Defaults to gathering to all processes
+        group: the process group to gather from. Defaults to all processes (world)
+
+    Return:
+        gathered_result: list with size equal to the process group where gathered_result[i] corresponds to the pytree
+            from process i, or None on processes other than ``dst``. Gathered tensors are on the device used for
+            communication, the current CUDA device for NCCL and CPU otherwise.
+    """
+    # if torch.distributed is not available or not initialized
+    # return single-item list containing the pytree
+    if not dist.is_available() or not dist.is_initialized():
+        return [obj]
+
+    device = (
+        torch.device("cuda", torch.cuda.current_device())
+        if dist.get_backend(group) == dist.Backend.NCCL
+        else torch.device("cpu")
+    )
+    world_size = dist.get_world_size(group)
+    leaves, treespec = tree_flatten(obj)
+    tensors = [leaf for leaf in leaves if isinstance(leaf, Tensor)]
+    metadata = (
+        treespec,
+        [
+            (
+                _TensorMetadata(leaf.dtype, leaf.shape)
+                if isinstance(leaf, Tensor)
+                else leaf
+            )
+            for leaf in leaves
+        ],
+    )
+    # exchange structures the way `all_gather_str` exchanges strings
+    metadata_buffer = torch.frombuffer(
+        bytearray(pickle.dumps(metadata)), dtype=torch.uint8
+    ).to(device)
+    all_metadata = [
+        pickle.loads(buffer.cpu().numpy().tobytes())
+        for buffer in all_gather_tensors(metadata_buffer, group=group)
+    ]
+    all_tensor_metadata = [
+        [leaf for leaf in leaf_metadata if isinstance(leaf, _TensorMetadata)]
+        for _, leaf_metadata in all_metadata
+    ]
+
+    is_dst = dst is None or dist.get_rank() == dst
+    dtypes = sorted(
+        {m.dtype for tensor_metadata in all_tensor_metadata for m in tensor_metadata},
+        key=str,
+    )
+    # tensors of every process, by dtype, in the order of their pytree
+    gathered_tensors: List[Dict[torch.dtype, List[Tensor]]] = [
+        {} for _ in range(world_size)
+    ]
+    for dtype in dtypes:
+        numels = [
+            [m.shape.numel() for m in tensor_metadata if m.dtype == dtype]
+            for tensor_metadata in all_tensor_metadata
+        ]
+        max_numel = max(sum(rank_numels) for rank_numels in numels)
+        # bool tensors are communicated as bytes
+        comm_dtype = torch.uint8 if dtype == torch.bool else dtype
+        packed = torch.zeros(max_numel, dtype=comm_dtype, device=device)
+        local_tensors = [t for t in tensors if t.dtype == dtype]
+        if local_tensors:
+            flat = torch.cat([t.detach().reshape(-1) for t in local_tensors])
+            packed[: flat.numel()] = flat.to(device=device, dtype=comm_dtype)
+
+        if dst is None:
+            buffers = _simple_all_gather_tensors(packed, group, world_size)
+        else:
+            buffers = (
+                [torch.empty_like(packed) for _ in range(world_size)] if is_dst else []
+            )
+            dist.gather(packed, buffers if is_dst else None, dst=dst, group=group)
+        for rank, buffer in enumerate(buffers):
+            if numels[rank]:
+                gathered_tensors[rank][dtype] = list(
+                    torch.split(buffer[: sum(numels[rank])].to(dtype), numels[rank])
+                )
+
+    if not is_dst:
+        return None
+    result = []
+    for rank, (rank_treespec, leaf_metadata) in enumerate(all_metadata):
+        rank_tensors = {
+            dtype: iter(splits) for dtype, splits in gathered_tensors[rank].items()
+        }
+        rank_leaves = [
+            (
+                next(rank_tensors[leaf.dtype]).reshape(leaf.shape)
+                if isinstance(leaf, _TensorMetadata)
+                else leaf
+            )
+            for leaf in leaf_metadata
+        ]
+        result.append(tree_unflatten(rank_leaves, rank_treespec))
+    return result
+
+
 TReturn = TypeVar("TReturn")
 
 
@@ -503,6 +781,10 @@ def sync_bool(
     Returns:
         The synchronized boolean value.
 
+    Note:
+        If ``pg`` is the global process group and :func:`init_hierarchical_process_groups` was called,
+        the value is reduced within each node first and then across node leaders.
+
     Example::
 
         >>> val = True
@@ -531,24 +813,32 @@ def sync_bool(
         else torch.zeros(1, device=device, dtype=dtype)
     )
 
+    hier_pgs = _get_hierarchical_process_groups(pg)
+
+    def _sum_indicator() -> int:
+        # sum up the indicators across all the ranks.
+        if hier_pgs is not None:
+            _hierarchical_all_reduce_sum(indicator, hier_pgs)
+        else:
+            dist.all_reduce(indicator, op=dist.ReduceOp.SUM)
+        return int(indicator.item())
+
     if coherence_mode == "rank_zero":
         # Broadcast from rank 0 to all other ranks
-        dist.broadcast(indicator, src=0, group=pg)
+        if hier_pgs is not None:
+            _hierarchical_broadcast_from_rank_zero(indicator, hier_pgs)
+        else:
+            dist.broadcast(indicator, src=0, group=pg)
         return bool(indicator[0].item())
     elif coherence_mode == "any":
-        # sum up the indicators across all the ranks.
-        dist.all_reduce(indicator, op=dist.ReduceOp.SUM)
-        return indicator.item() > 0
+        return _sum_indicator() > 0
     elif coherence_mode == "all":
-        dist.all_reduce(indicator, op=dist.ReduceOp.SUM)
-        return indicator.item() == pg_wrapper.get_world_size()
+        return _sum_indicator() == pg_wrapper.get_world_size()
     elif isinstance(coherence_mode, int):
         # if >= int(coherence_mode) processes signal to stop, all processes stop
-        dist.all_reduce(indicator, op=dist.ReduceOp.SUM)
-        return indicator.item() >= coherence_mode
+        return _sum_indicator() >= coherence_mode
     elif isinstance(coherence_mode, float):
-        dist.all_reduce(indicator, op=dist.ReduceOp.SUM)
-        return (indicator.item() / pg_wrapper.get_world_size()) >= coherence_mode
+        return (_sum_indicator() / pg_wrapper.get_world_size()) >= coherence_mode
     else:
         raise TypeError(
             f'Invalid value for `coherence_mode` provided: Expected type int, float, or one of ("any", "all", "rank_zero"), but received {coherence_mode}.'
@@ -729,6 +1019,8 @@ def broadcast_str(
         parameter. This will cause the string to be padded to the fixed length and only one broadcast will be performed.
         However, this comes with the cost of extra memory usage.
         If the string length is less than the buffer size, src rank will terminate early. However, receiving ranks may see collective hang, as expecting data from src rank. Please ensure the buffer size is large enough to avoid this issue.
+        If ``src`` is 0, ``process_group`` is the global process group and :func:`init_hierarchical_process_groups` was called,
+        the string is broadcast across node leaders first and then within each node.
     """
     if not dist.is_available() or not dist.is_initialized():
         return val
@@ -766,9 +1058,17 @@ def broadcast_str(
             # Pad the buffer with a special value (e.g., 0) to indicate the end of the string
             buffer = F.pad(buffer, (0, fixed_buffer_size - len(buffer)), value=0)
 
+    hier_pgs = _get_hierarchical_process_groups(process_group) if src == 0 else None
+
+    def _broadcast(tensor: Tensor) -> None:
+        if hier_pgs is not None:
+            _hierarchical_broadcast_from_rank_zero(tensor, hier_pgs)
+        else:
+            dist.broadcast(tensor, src=src, group=process_group)
+
     # first broadcast the buffer length so receiving ranks can allocate the correct amount of memory
     if fixed_buffer_size is None:
-        dist.broadcast(buffer_length, src=src, group=process_group)
+        _broadcast(buffer_length)
 
         if rank != src:
             size = int(buffer_length.item())
@@ -777,7 +1077,7 @@ def broadcast_str(
     elif rank != src:
         buffer = torch.empty((fixed_buffer_size), dtype=torch.uint8, device=device)
 
-    dist.broadcast(buffer, src=src, group=process_group)
+    _broadcast(buffer)
     buffer_list = buffer.tolist()
     null_index = next(
         (i for i, x in enumerate(buffer_list) if x == 0), len(buffer_list)
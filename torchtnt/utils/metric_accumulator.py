@@ -0,0 +1,130 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+from typing import Dict, List, Optional, Sequence
+
+import torch
+
+
+class MetricAccumulator:
+    """
+    Aggregates scalar tensors on their device and copies the aggregates to the host without synchronizing.
+
+    :meth:`update` adds a value to the running sum, min and max of a metric on ``device``, without reading it.
+    :meth:`stage` enqueues a copy of the aggregates to pinned host memory and resets them, and :meth:`poll` returns
+    the staged aggregates once the copy has completed. As long as the host polls without blocking, aggregating and
+    retrieving metrics never waits for the device.
+
+    Args:
+        names: names of the metrics.
+        device: device on which the metrics are aggregated.
+
+    Example::
+
+        accumulator = MetricAccumulator(["loss"], device=torch.device("cuda"))
+        for step, batch in enumerate(dataloader, start=1):
+            loss = train_step(batch)
+            accumulator.update("loss", loss)
+            metrics = accumulator.poll()
+            if metrics is not None:
+                logger.log_dict(metrics, step)
+            if step % 100 == 0:
+                accumulator.poll(block=True)
+                accumulator.stage()
+    """
+
+    def __init__(self, names: Sequence[str], device: torch.device) -> None:
+        self.names: List[str] = list(names)
+        self.device = device
+        self._indices: Dict[str, int] = {name: i for i, name in enumerate(names)}
+        # rows are the sum, min and max of every metric
+        self._stats: torch.Tensor = torch.empty(3, len(names), device=device)
+        self._counts: List[int] = [0] * len(names)
+        self._reset()
+
+        self._staged_stats: torch.Tensor = torch.empty(
+            3, len(names), pin_memory=device.type == "cuda"
+        )
+        self._staged_counts: Optional[List[int]] = None
+        self._staged_event: Optional[torch.cuda.Event] = None
+
+    @property
+    def is_staged(self) -> bool:
+        """Whether staged aggregates have not been returned by :meth:`poll` yet."""
+        return self._staged_counts is not None
+
+    def update(self, name: str, value: torch.Tensor) -> None:
+        """Adds a scalar tensor to the aggregates of the metric ``name``."""
+        value = value.detach().to(device=self.device, dtype=torch.float32).reshape(())
+        index = self._indices[name]
+        stats = self._stats[:, index]
+        stats[0].add_(value)
+        stats[1].clamp_(max=value)
+        stats[2].clamp_(min=value)
+        self._counts[index] += 1
+
+    def stage(self) -> None:
+        """
+        Enqueues a copy of the aggregates to host memory and resets them. Does nothing if no value was added.
+
+        Raises:
+            RuntimeError: if previously staged aggregates have not been returned by :meth:`poll`.
+        """
+        if self.is_staged:
+            raise RuntimeError(
+                "Staged metrics must be retrieved with `poll` before staging again."
+            )
+        if not any(self._counts):
+            return
+        self._staged_stats.copy_(self._stats, non_blocking=True)
+        if self.device.type == "cuda":
+            event = torch.cuda.Event()
+            event.record()
+            self._staged_event = event
+        self._staged_counts = self._counts
+        self._counts = [0] * len(self.names)
+        # ordered after the copy on the device stream
+        self._reset()
+
+    def poll(self, block: bool = False) -> Optional[Dict[str, float]]:
+        """
+        Returns the staged aggregates once they have been copied to the host, as a dictionary with the
+        ``{name}/mean``, ``{name}/min`` and ``{name}/max`` of every metric which was updated.
+
+        Args:
+            block: whether to wait for the copy to complete. Otherwise, returns ``None`` if it hasn't completed.
+
+        Returns:
+            The staged aggregates, or ``None`` if there are none or they are not available yet.
+        """
+        counts = self._staged_counts
+        if counts is None:
+            return None
+        event = self._staged_event
+        if event is not None:
+            if block:
+                event.synchronize()
+            elif not event.query():
+                return None
+        self._staged_counts = None
+        self._staged_event = None
+
+        sums, mins, maxs = self._staged_stats.tolist()
+        metrics = {}
+        for i, name in enumerate(self.names):
+            if counts[i] == 0:
+                continue
+            metrics[f"{name}/mean"] = sums[i] / counts[i]
+            metrics[f"{name}/min"] = mins[i]
+            metrics[f"{name}/max"] = maxs[i]
+        return metrics
+
+    def _reset(self) -> None:
+        self._stats[0].zero_()
+        self._stats[1].fill_(float("inf"))
+        self._stats[2].fill_(float("-inf"))
@@ -0,0 +1,93 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+# All rights reserved.
+#
+# This source code is licensed under the BSD-style license found in the
+# LICENSE file in the root directory of this source tree.
+
+# pyre-strict
+
+import copy
+import logging
+from typing import Any, Dict, List, Mapping, Optional
+
+import torch.distributed as dist
+from pyre_extensions import none_throws
+from torchtnt.utils.distributed import gather_pytree, PGWrapper
+from torchtnt.utils.stateful import MetricStateful
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+def sync_and_compute_metrics(
+    metrics: Mapping[str, MetricStateful],
+    *,
+    rank_zero_only: bool = False,
+    process_group: Optional[dist.ProcessGroup] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Merges the states of metrics across ranks and computes them once.
+
+    The state dicts of all the metrics are gathered to rank 0 with :func:`~torchtnt.utils.distributed.gather_pytree`,
+    which packs their tensors into one buffer per dtype. On rank 0, a copy of every metric is merged with the states of
+    all ranks with ``merge_state``, like torcheval metrics do, and computed. The results are then broadcast to all ranks,
+    unless ``rank_zero_only`` is set. The metrics themselves are not modified.
+
+    Args:
+        metrics: the metrics to sync and compute, by name. They must implement ``merge_state(metrics)``, merging the
+            states of other instances of the metric into their own state.
+        rank_zero_only: whether to only return the results on rank 0, skipping the broadcast.
+        process_group: the process group to sync the metrics on. Defaults to all processes (world).
+
+    Returns:
+        The computed value of every metric, or None on ranks other than 0 if ``rank_zero_only`` is set.
+
+    Raises:
+        TypeError: if a metric doesn't implement ``merge_state``.
+    """
+    for name, metric in metrics.items():
+        if not hasattr(metric, "merge_state"):
+            raise TypeError(
+                f"Metric {name} must implement merge_state to be synced across ranks."
+            )
+
+    pg_wrapper = PGWrapper(process_group)
+    if pg_wrapper.get_world_size() == 1:
+        return {name: metric.compute() for name, metric in metrics.items()}
+
+    for metric in metrics.values():
+        # e.g. concatenates the list states of torcheval metrics into a single tensor
+        prepare_for_merge_state = getattr(metric, "_prepare_for_merge_state", None)
+        if prepare_for_merge_state is not None:
+            prepare_for_merge_state()
+    dst = dist.get_global_rank(process_group, 0) if process_group is not None else 0
+    states = gather_pytree(
+        {name: metric.state_dict() for name, metric in metrics.items()},
+        dst=dst,
+        group=process_group,
+    )
+
+    results: List[Optional[Dict[str, Any]]] = [None]
+    if pg_wrapper.get_rank() == 0:
+        results[0] = {
+            name: _merge_and_compute(
+                metric, [state[name] for state in none_throws(states)]
+            )
+            for name, metric in metrics.items()
+        }
+    if not rank_zero_only:
+        pg_wrapper.broadcast_object_list(results, src=dst)
+    return results[0]
+
+
+def _merge_and_compute(
+    metric: MetricStateful, rank_states: List[Dict[str, Any]]
+) -> Any:
+    rank_metrics = []
+    for state in rank_states:
+        rank_metric = copy.deepcopy(metric)
+        rank_metric.load_state_dict(state)
+        rank_metrics.append(rank_metric)
+    merged_metric = rank_metrics[0]
+    # pyre-ignore[16]: checked by sync_and_compute_metrics
+    merged_metric.merge_state(rank_metrics[1:])
+    return merged_metric.compute()
@@ -7,9 +7,12 @@
 
 # pyre-strict
 
-from typing import Dict
+import math
+from typing import Dict, Iterable, List, NamedTuple, Tuple
 
 import torch
+import torch.distributed as dist
+from torch.distributed.tensor import DTensor
 
 
 def init_optim_state(optimizer: torch.optim.Optimizer) -> None:
@@ -62,3 +65,158 @@ def _get_deduped_name(seen_keys: Dict[str, int], name: str) -> str:
 
     seen_keys[name] += 1
     return name + f":{seen_keys[name]-1}"
+
+
+class _ParamGroup(NamedTuple):
+    params: List[torch.Tensor]
+    # process groups over which the norms of the local gradient shards are reduced
+    process_groups: Tuple[dist.ProcessGroup, ...]
+
+
+class GradientClipper:
+    """
+    Clips the gradients of a fixed set of parameters with multi-tensor (``torch._foreach_*``) kernels.
+
+    The parameters are grouped by device, dtype and, for DTensors, device mesh and placements once at construction,
+    so that clipping neither walks the module nor regroups the gradients in every step. The norm of sharded
+    gradients is computed from the local shards and reduced across ranks as a scalar, instead of materializing
+    the full norm tensor. Gradients of DTensor parameters are expected to have the placements of their parameters,
+    which is the case for FSDP2 and tensor parallelism.
+
+    Args:
+        parameters: parameters whose gradients are clipped. Parameters without gradients are skipped.
+        norm_type: type of the p-norm used by :meth:`clip_grad_norm_`. Can be ``inf`` for the infinity norm.
+
+    Example::
+
+        grad_clipper = GradientClipper(module.parameters())
+        loss.backward()
+        total_grad_norm = grad_clipper.clip_grad_norm_(max_norm=1.0)
+        optimizer.step()
+    """
+
+    def __init__(
+        self, parameters: Iterable[torch.Tensor], norm_type: float = 2.0
+    ) -> None:
+        self.norm_type: float = float(norm_type)
+        groups: Dict[Tuple[object, ...], _ParamGroup] = {}
+        for param in parameters:
+            key = _get_group_key(param)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = _ParamGroup([], _get_shard_process_groups(param))
+            group.params.append(param)
+        self._groups: List[_ParamGroup] = list(groups.values())
+        # the norms are reduced on the device of the (sharded) parameters, which is known even on ranks
+        # without local gradients, so that all ranks join the collectives with tensors the backend supports
+        devices = [
+            group.params[0].device for group in self._groups if group.process_groups
+        ]
+        devices += [group.params[0].device for group in self._groups]
+        self._device: torch.device = devices[0] if devices else torch.device("cpu")
+
+    @torch.no_grad()
+    def clip_grad_norm_(self, max_norm: float) -> torch.Tensor:
+        """
+        Scales the gradients in-place so that their total norm is at most ``max_norm``,
+        as :func:`torch.nn.utils.clip_grad_norm_` does.
+
+        Returns:
+            The total norm of the gradients before clipping, as a float32 tensor.
+        """
+        grouped_grads = self._get_grouped_grads()
+        total_norm = self._get_total_norm(grouped_grads)
+        clip_coef = torch.clamp(max_norm / (total_norm + 1e-6), max=1.0)
+        for grads in grouped_grads:
+            if grads:
+                torch._foreach_mul_(grads, clip_coef.to(grads[0].device))
+        return total_norm
+
+    @torch.no_grad()
+    def clip_grad_value_(self, clip_value: float) -> None:
+        """
+        Clamps the gradients in-place to ``[-clip_value, clip_value]``, as :func:`torch.nn.utils.clip_grad_value_` does.
+        """
+        for grads in self._get_grouped_grads():
+            if grads:
+                torch._foreach_clamp_min_(grads, -clip_value)
+                torch._foreach_clamp_max_(grads, clip_value)
+
+    def _get_grouped_grads(self) -> List[List[torch.Tensor]]:
+        grouped_grads = []
+        for group in self._groups:
+            grads = []
+            for param in group.params:
+                grad = param.grad
+                if grad is None:
+                    continue
+                grads.append(grad.to_local() if isinstance(grad, DTensor) else grad)
+            grouped_grads.append(grads)
+        return grouped_grads
+
+    def _get_total_norm(self, grouped_grads: List[List[torch.Tensor]]) -> torch.Tensor:
+        norm_type = self.norm_type
+        is_inf = math.isinf(norm_type)
+        device = self._device
+
+        # accumulate the norms (or their p-th powers) of groups reduced over the same process groups,
+        # so that a single scalar is all-reduced for all groups sharing a device mesh and placements
+        partial_norms: Dict[Tuple[dist.ProcessGroup, ...], torch.Tensor] = {}
+        for group, grads in zip(self._groups, grouped_grads):
+            if grads:
+                norm = torch.linalg.vector_norm(
+                    torch.stack(torch._foreach_norm(grads, norm_type)), norm_type
+                ).to(device=device, dtype=torch.float32)
+                if not is_inf:
+                    norm = norm.pow(norm_type)
+            elif group.process_groups:
+                # sharded groups take part in the collective even without gradients on this rank
+                norm = torch.zeros((), device=device)
+            else:
+                continue
+            key = group.process_groups
+            partial_norm = partial_norms.get(key)
+            if partial_norm is None:
+                partial_norms[key] = norm
+            else:
+                partial_norms[key] = (
+                    torch.maximum(partial_norm, norm) if is_inf else partial_norm + norm
+                )
+
+        if not partial_norms:
+            return torch.zeros((), device=device)
+        for process_groups, partial_norm in partial_norms.items():
+            for process_group in process_groups:
+                dist.all_reduce(
+                    partial_norm,
+                    op=dist.ReduceOp.MAX if is_inf else dist.ReduceOp.SUM,
+                    group=process_group,
+                )
+        partial_norm_tensor = torch.stack(list(partial_norms.values()))
+        if is_inf:
+            return partial_norm_tensor.max()
+        return partial_norm_tensor.sum().pow(1.0 / norm_type)
+
+
+def _get_group_key(param: torch.Tensor) -> Tuple[object, ...]:
+    if isinstance(param, DTensor):
+        return (
+            param.device,
+            param.dtype,
+            param.device_mesh,
+            tuple(param.placements),
+        )
+    return (param.device, param.dtype)
+
+
+def _get_shard_process_groups(
+    param: torch.Tensor,
+) -> Tuple[dist.ProcessGroup, ...]:
+    if not isinstance(param, DTensor):
+        return ()
+    device_mesh = param.device_mesh
+    return tuple(
+        device_mesh.get_group(mesh_dim)
+        for mesh_dim, placement in enumerate(param.placements)
+        if placement.is_shard()
+    )
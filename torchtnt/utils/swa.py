@@ -6,9 +6,14 @@
 
 # pyre-strict
 
-from typing import Any, Callable, List, Literal, Optional
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Literal, Mapping, Optional, Tuple
 
 import torch
+from pyre_extensions import none_throws
 from torch.distributed.fsdp import FullyShardedDataParallel, ShardingStrategy
 
 _AVERAGED_MODEL_AVAIL: bool = True
@@ -27,6 +32,64 @@ TSWA_avg_fn = Callable[[torch.Tensor, torch.Tensor, int], torch.Tensor]
 TSWA_multi_avg_fn = Callable[[List[torch.Tensor], List[torch.Tensor], int], None]
 
 
+@dataclass
+class _TensorGroup:
+    """
+    Averaged tensors and the tensors of the source model they're updated from,
+    all with the same device and dtype on each side.
+    """
+
+    averaged: List[torch.Tensor]
+    source: List[torch.Tensor]
+    # whether the source tensors must be moved to the device and dtype of the averaged ones
+    convert: bool
+    # foreach lerp only handles float and complex
+    lerp: bool
+
+
+def _group_tensors(
+    averaged: List[torch.Tensor], source: List[torch.Tensor]
+) -> List[_TensorGroup]:
+    groups: Dict[
+        Tuple[torch.device, torch.dtype, torch.device, torch.dtype],
+        Tuple[List[torch.Tensor], List[torch.Tensor]],
+    ] = defaultdict(lambda: ([], []))
+    for averaged_tensor, source_tensor in zip(averaged, source):
+        key = (
+            averaged_tensor.device,
+            averaged_tensor.dtype,
+            source_tensor.device,
+            source_tensor.dtype,
+        )
+        groups[key][0].append(averaged_tensor)
+        groups[key][1].append(source_tensor)
+    return [
+        _TensorGroup(
+            averaged=averaged_tensors,
+            source=source_tensors,
+            convert=(device, dtype) != (source_device, source_dtype),
+            lerp=dtype.is_floating_point or dtype.is_complex,
+        )
+        for (
+            device,
+            dtype,
+            source_device,
+            source_dtype,
+        ), (averaged_tensors, source_tensors) in groups.items()
+    ]
+
+
+def _deepcopy_to_cpu(model: torch.nn.Module) -> torch.nn.Module:
+    memo: Dict[int, Any] = {}
+    for param in model.parameters():
+        memo[id(param)] = torch.nn.Parameter(
+            param.detach().to("cpu", copy=True), requires_grad=param.requires_grad
+        )
+    for buffer in model.buffers():
+        memo[id(buffer)] = buffer.detach().to("cpu", copy=True)
+    return deepcopy(model, memo)
+
+
 class AveragedModel(PyTorchAveragedModel):
     def __init__(
         self,
@@ -37,6 +100,10 @@ class AveragedModel(PyTorchAveragedModel):
         ema_decay: float = 0.999,
         skip_deepcopy: bool = False,
         use_lit: bool = False,
+        ema_steps_per_update: int = 1,
+        update_stream: Optional[torch.cuda.Stream] = None,
+        offload_to_cpu: bool = False,
+        dtype: Optional[torch.dtype] = None,
     ) -> None:
         """
         This class is a custom version of AveragedModel that allows us to skip the
@@ -58,6 +125,28 @@ class AveragedModel(PyTorchAveragedModel):
             use_lit: If True, will use Lit EMA style by adjusting weight decay based on the
                 number of updates. The EMA decay will start small and will approach the
                 specified ema_decay as more updates occur.
+            ema_steps_per_update: The number of steps between two updates, when the model is
+                only averaged every few steps to save time. The EMA decay is applied once per step,
+                so it's raised to this power at every update, and the averaging horizon doesn't
+                depend on the update frequency. Only supported for EMA.
+            update_stream: An optional CUDA stream to run the updates on, so that they overlap
+                with the work of the current stream. :meth:`wait_for_update`, with ``source_only`` set,
+                must then be called before modifying the parameters of the source model in place, e.g.
+                in the optimizer step.
+            offload_to_cpu: If True, the averaged model is kept in pinned CPU memory instead of on ``device``,
+                saving the device memory of a copy of the model. At every update, the tensors of the source
+                model are copied to pinned CPU buffers without blocking (on ``update_stream`` if set), and
+                averaged on the CPU in a worker thread. The averaged model is only uploaded to ``device``
+                (or the device of the source model) when it's called, until the next update. Not supported
+                with skip_deepcopy.
+            dtype: An optional floating point dtype to keep the averaged model in, e.g. ``torch.bfloat16``
+                to halve its memory. The tensors of the source model are converted at every update.
+                Not supported with skip_deepcopy.
+
+        Note:
+            The parameters and buffers of the source model are paired with the averaged ones once,
+            at the first update, and all the tensors with the same device and dtype are then
+            updated together with fused multi-tensor ops, like ``torch._foreach_lerp_``.
         """
         if not _AVERAGED_MODEL_AVAIL:
             raise ImportError(
@@ -76,14 +165,57 @@ class AveragedModel(PyTorchAveragedModel):
 
             if use_lit:
                 raise ValueError("LitEMA is only supported for EMA.")
+            if ema_steps_per_update != 1:
+                raise ValueError("ema_steps_per_update is only supported for EMA.")
         else:
             raise ValueError(
                 f"Unknown averaging method: {averaging_method}. Only ema and swa are supported."
             )
 
+        if offload_to_cpu and skip_deepcopy:
+            raise ValueError("offload_to_cpu is not supported with skip_deepcopy.")
+        if dtype is not None and skip_deepcopy:
+            raise ValueError("dtype is not supported with skip_deepcopy.")
+        if dtype is not None and not dtype.is_floating_point:
+            raise ValueError(f"dtype must be a floating point dtype, got {dtype}")
+
+        if ema_steps_per_update < 1:
+            raise ValueError(
+                f"ema_steps_per_update must be a positive integer, got {ema_steps_per_update}"
+            )
+
+        self._averaging_method = averaging_method
         self._ema_decay = ema_decay
         self._use_lit = use_lit
         self._num_updates = 0
+        self._ema_steps_per_update = ema_steps_per_update
+        self._update_stream = update_stream
+        self._update_event: Optional[torch.cuda.Event] = None
+        # tensors to average and to copy, paired at the first update
+        self._averaged_groups: Optional[List[_TensorGroup]] = None
+        self._copied_groups: Optional[List[_TensorGroup]] = None
+        self._source_model_id: Optional[int] = None
+        # host copy of n_averaged, to avoid a device sync at every update
+        self._n_averaged: Optional[int] = None
+
+        self._offload_to_cpu = offload_to_cpu
+        self._offload_device = device
+        self._offload_executor: Optional[ThreadPoolExecutor] = None
+        self._offloaded_update: Optional[Future[None]] = None
+        # the tensors of the module, and the pinned CPU tensors backing them when not uploaded
+        self._module_tensors: Optional[List[torch.Tensor]] = None
+        self._cpu_tensors: Optional[List[torch.Tensor]] = None
+        self._upload_event: Optional[torch.cuda.Event] = None
+        self._uploaded = False
+        # the tensors of the source model and the pinned CPU tensors they're copied to
+        self._staging_pairs: Optional[Tuple[List[torch.Tensor], List[torch.Tensor]]] = (
+            None
+        )
+
+        if offload_to_cpu:
+            # copies the model directly to CPU, without a second copy on its device
+            model = _deepcopy_to_cpu(model)
+            skip_deepcopy = True
 
         if skip_deepcopy:
             # calls parent init manually, but skips deepcopy step
@@ -91,7 +223,10 @@ class AveragedModel(PyTorchAveragedModel):
 
             self.module: torch.nn.Module = model
             self.register_buffer(
-                "n_averaged", torch.tensor(0, dtype=torch.long, device=device)
+                "n_averaged",
+                torch.tensor(
+                    0, dtype=torch.long, device=None if offload_to_cpu else device
+                ),
             )
             # pyrefly: ignore [bad-override-mutable-attribute]
             self.avg_fn: Optional[TSWA_avg_fn] = None
@@ -108,7 +243,15 @@ class AveragedModel(PyTorchAveragedModel):
                 use_buffers=use_buffers,
             )
 
+        if dtype is not None:
+            self.module.to(dtype=dtype)
+        if offload_to_cpu:
+            self._get_cpu_tensors()
+
     def forward(self, *args: Any, **kwargs: Any) -> Any:
+        self.wait_for_update()
+        if self._offload_to_cpu:
+            self._upload()
         output = self.module(*args, **kwargs)
 
         # for fsdp modules, we need to manually reshard the swa_model in case the
@@ -123,10 +266,285 @@ class AveragedModel(PyTorchAveragedModel):
 
     def update_parameters(self, model: torch.nn.Module) -> None:
         self._num_updates += 1
-        if self._use_lit:
-            decay = min(
-                self._ema_decay, (1 + self._num_updates) / (10 + self._num_updates)
+        if self._offload_to_cpu:
+            # the previous update must be done with the CPU tensors
+            self._wait_for_offloaded_update()
+            self._offload()
+
+        update_stream = self._update_stream
+        if update_stream is None:
+            self._update_parameters(model)
+            return
+
+        update_stream.wait_stream(torch.cuda.current_stream(update_stream.device))
+        with torch.cuda.stream(update_stream):
+            self._update_parameters(model)
+        event = torch.cuda.Event()
+        event.record(update_stream)
+        self._update_event = event
+
+    def wait_for_update(self, *, source_only: bool = False) -> None:
+        """
+        Waits for the last update: makes the current CUDA stream wait for it if it runs on ``update_stream``,
+        and blocks until the worker thread is done with it if the averaged model is offloaded to CPU.
+        Must be called before reading the averaged tensors directly, e.g. to copy them.
+
+        Args:
+            source_only: if True, only waits until the tensors of the source model were read by the update,
+                so that they may be modified in place, e.g. by the optimizer step.
+        """
+        event = self._update_event
+        if event is not None:
+            torch.cuda.current_stream(
+                none_throws(self._update_stream).device
+            ).wait_event(event)
+            self._update_event = None
+        if not source_only:
+            self._wait_for_offloaded_update()
+
+    def state_dict(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        self.wait_for_update()
+        return super().state_dict(*args, **kwargs)
+
+    def load_state_dict(
+        self, state_dict: Mapping[str, Any], strict: bool = True, assign: bool = False
+    ) -> Any:
+        self.wait_for_update()
+        self._offload()
+        result = super().load_state_dict(state_dict, strict=strict, assign=assign)
+        # the tensors may have been replaced, and n_averaged changed
+        self._reset_update_cache()
+        return result
+
+    def _apply(
+        self, fn: Callable[[torch.Tensor], torch.Tensor], recurse: bool = True
+    ) -> "AveragedModel":
+        self.wait_for_update()
+        self._offload()
+        result = super()._apply(fn, recurse=recurse)
+        self._reset_update_cache()
+        return result
+
+    def __getstate__(self) -> Dict[str, Any]:
+        self.wait_for_update()
+        state = self.__dict__.copy()
+        # the worker thread, events and tensor pairs are recreated when needed
+        state.update(
+            _update_event=None,
+            _offload_executor=None,
+            _averaged_groups=None,
+            _copied_groups=None,
+            _source_model_id=None,
+            _module_tensors=None,
+            _cpu_tensors=None,
+            _upload_event=None,
+            _uploaded=False,
+            _staging_pairs=None,
+        )
+        return state
+
+    def _reset_update_cache(self) -> None:
+        self._averaged_groups = None
+        self._copied_groups = None
+        self._source_model_id = None
+        self._n_averaged = None
+        self._module_tensors = None
+        self._cpu_tensors = None
+        self._staging_pairs = None
+
+    def _update_parameters(self, model: torch.nn.Module) -> None:
+        averaged_groups, copied_groups = self._get_tensor_groups(model)
+        n_averaged = self._n_averaged
+        if n_averaged is None:
+            n_averaged = int(self.n_averaged)
+        self._n_averaged = n_averaged + 1
+
+        if self._averaging_method == "ema":
+            decay = self._ema_decay
+            if self._use_lit:
+                decay = min(decay, (1 + self._num_updates) / (10 + self._num_updates))
+            weight = 1 - decay**self._ema_steps_per_update
+        else:
+            weight = 1 / (n_averaged + 1)
+
+        staging_pairs = self._staging_pairs
+        if staging_pairs is None:
+            self._update_tensors(averaged_groups, copied_groups, n_averaged, weight)
+            return
+
+        staging, source = staging_pairs
+        with torch.no_grad():
+            torch._foreach_copy_(staging, source, non_blocking=True)
+        copy_event = None
+        if any(t.is_cuda for t in source):
+            copy_event = torch.cuda.Event()
+            copy_event.record()
+
+        executor = self._offload_executor
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="averaged_model_offload"
             )
+            self._offload_executor = executor
+        self._offloaded_update = executor.submit(
+            self._update_offloaded_tensors,
+            copy_event,
+            averaged_groups,
+            copied_groups,
+            n_averaged,
+            weight,
+        )
+
+    def _update_offloaded_tensors(
+        self,
+        copy_event: Optional[torch.cuda.Event],
+        averaged_groups: List[_TensorGroup],
+        copied_groups: List[_TensorGroup],
+        n_averaged: int,
+        weight: float,
+    ) -> None:
+        if copy_event is not None:
+            copy_event.synchronize()
+        self._update_tensors(averaged_groups, copied_groups, n_averaged, weight)
+
+    @torch.no_grad()
+    def _update_tensors(
+        self,
+        averaged_groups: List[_TensorGroup],
+        copied_groups: List[_TensorGroup],
+        n_averaged: int,
+        weight: float,
+    ) -> None:
+        if n_averaged == 0:
+            for group in averaged_groups:
+                torch._foreach_copy_(group.averaged, group.source)
+        else:
+            for group in averaged_groups:
+                source = group.source
+                if group.convert:
+                    device, dtype = group.averaged[0].device, group.averaged[0].dtype
+                    source = [t.to(device=device, dtype=dtype) for t in source]
+                if group.lerp:
+                    torch._foreach_lerp_(group.averaged, source, weight)
+                else:
+                    for averaged_tensor, source_tensor in zip(group.averaged, source):
+                        averaged_tensor.copy_(
+                            averaged_tensor * (1 - weight) + source_tensor * weight
+                        )
+
+        # if not applying running averages to the buffers,
+        # keep the buffers in sync with the source model
+        for group in copied_groups:
+            torch._foreach_copy_(group.averaged, group.source)
+
+        self.n_averaged += 1
+
+    def _wait_for_offloaded_update(self) -> None:
+        future = self._offloaded_update
+        if future is None:
+            return
+        self._offloaded_update = None
+        try:
+            future.result()
+        except Exception as e:
+            raise RuntimeError("Updating the offloaded averaged model failed") from e
+
+    def _get_cpu_tensors(self) -> List[torch.Tensor]:
+        cpu_tensors = self._cpu_tensors
+        if cpu_tensors is not None:
+            return cpu_tensors
+
+        pin_memory = torch.cuda.is_available()
+        module_tensors = [*self.module.parameters(), *self.module.buffers()]
+        for t in module_tensors:
+            if not t.is_cpu or (pin_memory and not t.is_pinned()):
+                cpu_tensor = t.data.cpu()
+                t.data = cpu_tensor.pin_memory() if pin_memory else cpu_tensor
+        if not self.n_averaged.is_cpu:
+            self.n_averaged = self.n_averaged.cpu()
+        cpu_tensors = [t.data for t in module_tensors]
+        self._module_tensors = module_tensors
+        self._cpu_tensors = cpu_tensors
+        return cpu_tensors
+
+    def _upload(self) -> None:
+        device = self._offload_device
+        if self._uploaded or device is None or torch.device(device).type == "cpu":
+            return
+        cpu_tensors = self._get_cpu_tensors()
+        for t, cpu_tensor in zip(none_throws(self._module_tensors), cpu_tensors):
+            t.data = cpu_tensor.to(device, non_blocking=True)
+        if torch.device(device).type == "cuda":
+            # the CPU tensors must not be updated while they're being copied
+            upload_event = torch.cuda.Event()
+            upload_event.record()
+            self._upload_event = upload_event
+        self._uploaded = True
+
+    def _offload(self) -> None:
+        if not self._uploaded:
+            return
+        upload_event = self._upload_event
+        if upload_event is not None:
+            upload_event.synchronize()
+            self._upload_event = None
+        # the uploaded tensors are freed, the CPU tensors hold the same values
+        for t, cpu_tensor in zip(
+            none_throws(self._module_tensors), none_throws(self._cpu_tensors)
+        ):
+            t.data = cpu_tensor
+        self._uploaded = False
+
+    def _get_tensor_groups(
+        self, model: torch.nn.Module
+    ) -> Tuple[List[_TensorGroup], List[_TensorGroup]]:
+        averaged_groups = self._averaged_groups
+        copied_groups = self._copied_groups
+        if (
+            averaged_groups is not None
+            and copied_groups is not None
+            and self._source_model_id == id(model)
+        ):
+            return averaged_groups, copied_groups
+
+        averaged = list(self.module.parameters())
+        source = list(model.parameters())
+        averaged_buffers = list(self.module.buffers())
+        source_buffers = list(model.buffers())
+        if len(averaged) != len(source) or len(averaged_buffers) != len(source_buffers):
+            raise ValueError(
+                "The model must have the same parameters and buffers as the averaged model, got "
+                f"{len(source)} parameters and {len(source_buffers)} buffers instead of "
+                f"{len(averaged)} parameters and {len(averaged_buffers)} buffers."
+            )
+        if self._offload_to_cpu:
+            # average the CPU tensors with pinned CPU copies of the source tensors
+            num_params = len(source)
+            cpu_tensors = self._get_cpu_tensors()
+            averaged = cpu_tensors[:num_params]
+            averaged_buffers = cpu_tensors[num_params:]
+            pin_memory = torch.cuda.is_available()
+            all_source = source + source_buffers
+            staging = [
+                torch.empty(t.shape, dtype=t.dtype, pin_memory=pin_memory)
+                for t in all_source
+            ]
+            self._staging_pairs = (staging, all_source)
+            source = staging[:num_params]
+            source_buffers = staging[num_params:]
+            if self._offload_device is None and all_source:
+                self._offload_device = all_source[0].device
+
+        if self.use_buffers:
+            averaged_groups = _group_tensors(
+                averaged + averaged_buffers, source + source_buffers
+            )
+            copied_groups = []
+        else:
+            averaged_groups = _group_tensors(averaged, source)
+            copied_groups = _group_tensors(averaged_buffers, source_buffers)
 
-            self.multi_avg_fn = get_ema_multi_avg_fn(decay)
-        super().update_parameters(model)
+        self._averaged_groups = averaged_groups
+        self._copied_groups = copied_groups
+        self._source_model_id = id(model)
+        return averaged_groups, copied_groups